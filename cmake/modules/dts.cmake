@@ -121,6 +121,10 @@ set(DTS_DEPS                    ${PROJECT_BINARY_DIR}/zephyr.dts.d)
 set(GEN_DRIVER_KCONFIG_SCRIPT   ${DT_SCRIPTS}/gen_driver_kconfig_dts.py)
 # Generated Kconfig symbols go here.
 set(DTS_KCONFIG                 ${KCONFIG_BINARY_DIR}/Kconfig.dts)
+# Cache of the compatibles of the bindings, shared by all builds.
+set(DTS_BINDING_INDEX           ${USER_CACHE_DIR}/dts_binding_index.json)
+# Cache of the contents of the included bindings, shared by all builds.
+set(DTS_BINDING_CACHE           ${USER_CACHE_DIR}/dts_binding_cache.pickle)
 
 # This generates DT information needed by the CMake APIs.
 set(GEN_DTS_CMAKE_SCRIPT        ${DT_SCRIPTS}/gen_dts_cmake.py)
@@ -291,12 +295,14 @@ set_property(DIRECTORY APPEND PROPERTY
 #
 
 string(REPLACE ";" " " EXTRA_DTC_FLAGS_RAW "${EXTRA_DTC_FLAGS}")
-set(CMD_GEN_EDT ${PYTHON_EXECUTABLE} ${GEN_EDT_SCRIPT}
+set(CMD_GEN_EDT ${BUILD_SERVER_PYTHON} ${GEN_EDT_SCRIPT}
 --dts ${DTS_POST_CPP}
 --dtc-flags '${EXTRA_DTC_FLAGS_RAW}'
 --bindings-dirs ${DTS_ROOT_BINDINGS}
 --dts-out ${ZEPHYR_DTS}.new # for debugging and dtc
 --edt-pickle-out ${EDT_PICKLE}.new
+--binding-index ${DTS_BINDING_INDEX}
+--binding-cache ${DTS_BINDING_CACHE}
 ${EXTRA_GEN_EDT_ARGS}
 )
 
@@ -315,7 +321,7 @@ message(STATUS "Generated pickled edt: ${EDT_PICKLE}")
 # Run GEN_DEFINES_SCRIPT.
 #
 
-set(CMD_GEN_DEFINES ${PYTHON_EXECUTABLE} ${GEN_DEFINES_SCRIPT}
+set(CMD_GEN_DEFINES ${BUILD_SERVER_PYTHON} ${GEN_DEFINES_SCRIPT}
 --header-out ${DEVICETREE_GENERATED_H}.new
 --edt-pickle ${EDT_PICKLE}
 ${EXTRA_GEN_DEFINES_ARGS}
@@ -335,9 +341,10 @@ message(STATUS "Generated devicetree_generated.h: ${DEVICETREE_GENERATED_H}")
 #
 
 execute_process(
-  COMMAND ${PYTHON_EXECUTABLE} ${GEN_DRIVER_KCONFIG_SCRIPT}
+  COMMAND ${BUILD_SERVER_PYTHON} ${GEN_DRIVER_KCONFIG_SCRIPT}
   --kconfig-out ${DTS_KCONFIG}
   --bindings-dirs ${DTS_ROOT_BINDINGS}
+  --binding-index ${DTS_BINDING_INDEX}
   WORKING_DIRECTORY ${PROJECT_BINARY_DIR}
   RESULT_VARIABLE ret
   )
@@ -356,7 +363,7 @@ endif()
 set(dts_cmake_tmp ${DTS_CMAKE}.new)
 
 execute_process(
-  COMMAND ${PYTHON_EXECUTABLE} ${GEN_DTS_CMAKE_SCRIPT}
+  COMMAND ${BUILD_SERVER_PYTHON} ${GEN_DTS_CMAKE_SCRIPT}
   --edt-pickle ${EDT_PICKLE}
   --cmake-out ${dts_cmake_tmp}
   WORKING_DIRECTORY ${PROJECT_BINARY_DIR}
@@ -44,3 +44,12 @@ find_package(Python3 ${PYTHON_MINIMUM_REQUIRED} REQUIRED)
 
 # Zephyr internally used Python variable.
 set(PYTHON_EXECUTABLE ${Python3_EXECUTABLE})
+
+# Python command of the devicetree and Kconfig scripts. When ZEPHYR_BUILD_SERVER
+# gives the socket of a build server, see scripts/build/build_server.py, they
+# are run by the server, which keeps them loaded between the builds.
+if(DEFINED ENV{ZEPHYR_BUILD_SERVER})
+  set(BUILD_SERVER_PYTHON ${PYTHON_EXECUTABLE} ${ZEPHYR_BASE}/scripts/build/build_server.py run)
+else()
+  set(BUILD_SERVER_PYTHON ${PYTHON_EXECUTABLE})
+endif()
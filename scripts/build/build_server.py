@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""Build server for the devicetree and Kconfig scripts.
+
+Each build runs gen_edt.py, gen_defines.py, gen_dts_cmake.py,
+gen_driver_kconfig_dts.py and kconfig.py in their own Python processes,
+which all start the interpreter, import their modules and load the pickled
+devicetree again. The build server keeps these scripts imported in long
+running processes, which serve them over a Unix socket, along with:
+
+- the parsed bindings, see the binding caches of edtlib
+- the EDT objects, by the hash of their pickle files
+- the parsed Kconfig trees, as long as the Kconfig files, the environment
+  variables and the devicetree they depend on are the same
+
+Start the server, and point the builds to its socket:
+
+    build_server.py serve --socket /tmp/zephyr-build.sock &
+    export ZEPHYR_BUILD_SERVER=/tmp/zephyr-build.sock
+
+The build system then runs the scripts with 'build_server.py run <script>',
+including in the builds of twister, which inherit the environment.
+Without a server, or for scripts the server doesn't serve, the client runs
+the script itself, just as Python would.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import inspect
+import io
+import json
+import logging
+import os
+import pickle
+import runpy
+import signal
+import socket
+import sys
+import traceback
+from collections import OrderedDict
+
+ZEPHYR_BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+# Environment variable with the path of the socket of the server
+SOCKET_VAR = 'ZEPHYR_BUILD_SERVER'
+
+# Version of the protocol between the client and the server
+PROTOCOL_VERSION = 1
+
+# Scripts served by the server, relative to the scripts directory
+SCRIPTS = [
+    os.path.join('dts', 'gen_edt.py'),
+    os.path.join('dts', 'gen_defines.py'),
+    os.path.join('dts', 'gen_dts_cmake.py'),
+    os.path.join('dts', 'gen_driver_kconfig_dts.py'),
+    os.path.join('kconfig', 'kconfig.py'),
+]
+
+# Scripts which load pickled EDT objects
+EDT_SCRIPTS = ['gen_defines.py', 'gen_dts_cmake.py']
+
+# Environment variables read by kconfiglib and kconfigfunctions.py when
+# parsing, besides the ones referenced in the Kconfig files
+KCONFIG_ENV_VARS = [
+    'srctree', 'CONFIG_', 'KCONFIG_CONFIG_HEADER', 'KCONFIG_AUTOHEADER_HEADER',
+    'KCONFIG_WARN_UNDEF', 'KCONFIG_WARN_UNDEF_ASSIGN', 'KCONFIG_STRICT',
+    'KCONFIG_FUNCTIONS', 'SHIELD_AS_LIST',
+]
+
+logger = logging.getLogger('build_server')
+
+
+class _Stop(Exception):
+    # Raised by the signal handlers, to stop waiting
+    pass
+
+
+def _file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class EdtCache:
+    """EDT objects loaded from pickle files, by the hash of the files.
+
+    The scripts don't modify the EDT objects, so the same object is used
+    by all of them.
+    """
+
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self._edts = OrderedDict()
+        # Hash of the last file loaded from each path
+        self.hashes = {}
+
+    def load(self, f):
+        """Load an EDT object from an open pickle file, like pickle.load()."""
+        data = f.read()
+        key = hashlib.sha256(data).hexdigest()
+        self.hashes[os.path.abspath(f.name)] = key
+        if key in self._edts:
+            self._edts.move_to_end(key)
+            return self._edts[key]
+
+        edt = pickle.loads(data)
+        self._edts[key] = edt
+        while len(self._edts) > self.maxsize:
+            self._edts.popitem(last=False)
+        return edt
+
+    def load_file(self, path):
+        """Load an EDT object from a pickle file, None when it doesn't exist."""
+        if not path or not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            return self.load(f)
+
+
+class _Pickle:
+    # Stands for the pickle module in the served scripts, loading the EDT
+    # objects through the cache
+
+    def __init__(self, edt_cache):
+        self._edt_cache = edt_cache
+
+    def load(self, f):
+        return self._edt_cache.load(f)
+
+    def __getattr__(self, name):
+        return getattr(pickle, name)
+
+
+class KconfigCache:
+    """Parsed Kconfig trees, reused as long as their inputs didn't change.
+
+    A tree is reused when the Kconfig files it was parsed from have the same
+    content, the glob patterns of their 'source' statements match the same
+    files, the environment variables they use have the same values and, for
+    the preprocessor functions of kconfigfunctions.py, the devicetree is the
+    same. Trees which used $(shell) are not reused.
+    """
+
+    def __init__(self, kconfiglib, edt_cache, maxsize=2):
+        self.kconfiglib = kconfiglib
+        self.edt_cache = edt_cache
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._file_hashes = {}
+
+    def _hash(self, path):
+        # Hash of the content of a file, memoized by modification time
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        known = self._file_hashes.get(path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        digest = _file_hash(path)
+        self._file_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _edt_hash(self):
+        edt_pickle = os.environ.get('EDT_PICKLE')
+        if not edt_pickle or not os.path.isfile(edt_pickle):
+            return None
+        return self.edt_cache.hashes.get(os.path.abspath(edt_pickle))
+
+    def _valid(self, entry):
+        if entry['edt'] != self._edt_hash():
+            return False
+        if any(os.environ.get(var) != value for var, value in entry['env'].items()):
+            return False
+        if any(sorted(self.kconfiglib.iglob(pattern)) != matches
+               for pattern, matches in entry['globs'].items()):
+            return False
+        return all(self._hash(path) == digest for path, digest in entry['files'].items())
+
+    def kconfig(self, filename='Kconfig', warn=True, warn_to_stderr=True,
+                encoding='utf-8', suppress_traceback=False):
+        """Return the Kconfig tree of filename, like the Kconfig constructor."""
+        key = (os.path.abspath(os.path.join(os.environ.get('srctree', ''), filename)),
+               warn, encoding)
+        entry = self._entries.get(key)
+        if entry is not None and self._valid(entry):
+            self._entries.move_to_end(key)
+            kconf = entry['kconf']
+            # Back to the state after the parsing
+            kconf.unset_values()
+            kconf.missing_syms = []
+            kconf.warnings = list(entry['warnings'])
+            kconf.warn_to_stderr = warn_to_stderr
+            kconf.warn_assign_undef = os.getenv('KCONFIG_WARN_UNDEF_ASSIGN') == 'y'
+            kconf.warn_assign_override = True
+            kconf.warn_assign_redun = True
+            return kconf
+
+        globs = {}
+        shell_used = []
+        iglob = self.kconfiglib.iglob
+        shell_fn = self.kconfiglib._shell_fn
+
+        def record_iglob(pattern):
+            globs[pattern] = sorted(iglob(pattern))
+            return iter(globs[pattern])
+
+        def record_shell_fn(*args):
+            shell_used.append(True)
+            return shell_fn(*args)
+
+        self.kconfiglib.iglob = record_iglob
+        self.kconfiglib._shell_fn = record_shell_fn
+        try:
+            kconf = self.kconfiglib.Kconfig(filename, warn, warn_to_stderr, encoding,
+                                            suppress_traceback)
+        finally:
+            self.kconfiglib.iglob = iglob
+            self.kconfiglib._shell_fn = shell_fn
+
+        if not shell_used:
+            files = [os.path.join(kconf.srctree, name) for name in kconf.kconfig_filenames]
+            self._entries[key] = {
+                'kconf': kconf,
+                'warnings': list(kconf.warnings),
+                'edt': self._edt_hash(),
+                'env': {var: os.environ.get(var)
+                        for var in sorted(kconf.env_vars | set(KCONFIG_ENV_VARS))},
+                'globs': globs,
+                'files': {path: self._hash(path) for path in files},
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return kconf
+
+
+class _Output(io.TextIOBase):
+    # Captures what the served script writes to stdout or stderr, keeping the
+    # order of the writes to both
+
+    def __init__(self, fd, chunks):
+        self.fd = fd
+        self.chunks = chunks
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        if self.chunks and self.chunks[-1][0] == self.fd:
+            self.chunks[-1][1] += s
+        else:
+            self.chunks.append([self.fd, s])
+        return len(s)
+
+
+class BuildServer:
+    """Serves the scripts to the clients connecting to a Unix socket.
+
+    The scripts are imported once by the server, which then forks the worker
+    processes. The workers accept the connections and run one script at a
+    time, each keeping its own caches.
+    """
+
+    def __init__(self, socket_path, jobs):
+        """
+        @param socket_path Path of the Unix socket to listen on
+        @param jobs Number of worker processes
+        """
+        self.socket_path = os.path.abspath(socket_path)
+        self.jobs = jobs
+        self.modules = {}
+        self.workers = set()
+        self.stopping = False
+        self.busy = False
+        self.edt_cache = EdtCache()
+        self.kconfig_cache = None
+        # Modification times of the sources of the imported modules
+        self.sources = {}
+
+    def import_scripts(self):
+        """Import the served scripts, and the modules they use."""
+        scripts_dir = os.path.join(ZEPHYR_BASE, 'scripts')
+        for script in SCRIPTS:
+            path = os.path.join(scripts_dir, script)
+            script_dir = os.path.dirname(path)
+            if script_dir not in sys.path:
+                sys.path.insert(0, script_dir)
+            name = os.path.splitext(os.path.basename(script))[0]
+            spec = importlib.util.spec_from_file_location(f'_served_{name}', path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self.modules[path] = module
+
+        # Without EDT_PICKLE, kconfigfunctions.py imports without a devicetree,
+        # which is set for each Kconfig tree which is parsed.
+        os.environ.pop('EDT_PICKLE', None)
+        os.environ.pop('KCONFIG_DOC_MODE', None)
+        importlib.import_module('kconfigfunctions')
+
+        pickle_proxy = _Pickle(self.edt_cache)
+        for path, module in self.modules.items():
+            if os.path.basename(path) in EDT_SCRIPTS:
+                module.pickle = pickle_proxy
+            if os.path.basename(path) == 'kconfig.py':
+                self.kconfig_cache = KconfigCache(sys.modules['kconfiglib'], self.edt_cache)
+                module.Kconfig = self.kconfig_cache.kconfig
+
+        for module in list(sys.modules.values()) + list(self.modules.values()):
+            path = getattr(module, '__file__', None)
+            if path and os.path.realpath(path).startswith(scripts_dir + os.sep):
+                self.sources[path] = self._mtime(path)
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def serve(self):
+        """Serve the clients until the server is stopped."""
+        self.import_scripts()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        listener.listen(64)
+        logger.info(f"Serving {len(self.modules)} scripts on {self.socket_path} "
+                    f"with {self.jobs} workers")
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        try:
+            while not self.stopping:
+                # Workers which died, e.g. killed by a script, are replaced
+                while len(self.workers) < self.jobs:
+                    self._fork_worker(listener)
+                pid, _ = os.wait()
+                self.workers.discard(pid)
+        except _Stop:
+            pass
+        finally:
+            listener.close()
+            for pid in self.workers:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            for pid in self.workers:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _stop(self, signum, frame):
+        # Workers finish the script they are running first
+        self.stopping = True
+        if not self.busy:
+            raise _Stop()
+
+    def _fork_worker(self, listener):
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return
+        self.workers = set()
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            while not self.stopping:
+                connection, _ = listener.accept()
+                self.busy = True
+                with connection:
+                    self._handle(connection)
+                self.busy = False
+        except _Stop:
+            pass
+        finally:
+            os._exit(0)
+
+    def _handle(self, connection):
+        try:
+            request = json.loads(_receive(connection))
+        except ValueError:
+            return
+        if request.get('command') == 'stop':
+            os.kill(os.getppid(), signal.SIGTERM)
+            response = {'status': 'stopped'}
+        else:
+            response = self.run(request)
+            logger.debug(f"{response['status']}: {request.get('script')} "
+                         f"{' '.join(request.get('argv', []))}")
+        try:
+            connection.sendall(json.dumps(response).encode() + b'\n')
+        except OSError as e:
+            logger.debug(f"Unable to answer a client: {e}")
+
+    def _stale(self):
+        return any(self._mtime(path) != mtime for path, mtime in self.sources.items())
+
+    def run(self, request):
+        """Run a script for a client.
+
+        @param request Script, arguments, working directory and environment
+        @return Exit code and output of the script, or the reason why the
+            client has to run it itself
+        """
+        if request.get('version') != PROTOCOL_VERSION:
+            return {'status': 'fallback', 'reason': 'protocol version mismatch'}
+        module = self.modules.get(os.path.realpath(request['script']))
+        if module is None:
+            return {'status': 'fallback', 'reason': 'script not served'}
+        if request['env'].get('KCONFIG_DOC_MODE') == '1':
+            return {'status': 'fallback', 'reason': 'documentation mode'}
+        if self._stale():
+            # The sources of the scripts changed, a new server has to import them
+            os.kill(os.getppid(), signal.SIGTERM)
+            return {'status': 'fallback', 'reason': 'scripts changed'}
+
+        environ = dict(os.environ)
+        cwd = os.getcwd()
+        argv = sys.argv
+        stdout, stderr = sys.stdout, sys.stderr
+        chunks = []
+        returncode = 0
+        try:
+            os.environ.clear()
+            os.environ.update(request['env'])
+            os.chdir(request['cwd'])
+            sys.argv = [request['script']] + request['argv']
+            sys.stdout = _Output(1, chunks)
+            sys.stderr = _Output(2, chunks)
+            # Scripts add log handlers writing to the stderr of their request
+            for log in [logging.getLogger()] + list(logging.Logger.manager.loggerDict.values()):
+                if isinstance(log, logging.Logger) and log is not logger:
+                    log.handlers.clear()
+            if os.path.basename(request['script']) == 'kconfig.py':
+                self._set_kconfig_edt()
+            module.main()
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                returncode = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+            sys.argv = argv
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(environ)
+        return {'status': 'done', 'returncode': returncode, 'output': chunks}
+
+    def _set_kconfig_edt(self):
+        # kconfigfunctions.py loads the devicetree when imported, it's set for
+        # each request instead.
+        kconfigfunctions = sys.modules['kconfigfunctions']
+        edt = self.edt_cache.load_file(os.environ.get('EDT_PICKLE'))
+        kconfigfunctions.edt = edt
+        kconfigfunctions.edtlib = inspect.getmodule(edt) if edt is not None else None
+
+
+def _receive(connection):
+    data = b''
+    while not data.endswith(b'\n'):
+        block = connection.recv(1 << 16)
+        if not block:
+            break
+        data += block
+    return data
+
+
+def request(socket_path, message):
+    """Send a request to a server.
+
+    @return The response, None when no server answered
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(json.dumps(message).encode() + b'\n')
+            return json.loads(_receive(client))
+    except (OSError, ValueError):
+        return None
+
+
+def run(script, args):
+    """Run a script in the server, or in this process when it isn't served.
+
+    @return Exit code of the script
+    """
+    script = os.path.abspath(script)
+    socket_path = os.environ.get(SOCKET_VAR)
+    if socket_path:
+        response = request(socket_path, {
+            'version': PROTOCOL_VERSION,
+            'script': script,
+            'argv': args,
+            'cwd': os.getcwd(),
+            'env': dict(os.environ),
+        })
+        if response is not None and response['status'] == 'done':
+            for fd, text in response['output']:
+                stream = sys.stdout if fd == 1 else sys.stderr
+                stream.write(text)
+                stream.flush()
+            return response['returncode']
+
+    # Like 'python script args'
+    sys.argv = [script] + args
+    sys.path.insert(0, os.path.dirname(script))
+    runpy.run_path(script, run_name='__main__')
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     allow_abbrev=False)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='run the server')
+    serve_parser.add_argument('--socket', default=os.environ.get(SOCKET_VAR),
+                              help=f'path of the socket, defaults to ${SOCKET_VAR}')
+    serve_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                              help='number of worker processes, defaults to the CPU count')
+    serve_parser.add_argument('-v', '--verbose', action='store_true',
+                              help='log the requests of the clients')
+
+    stop_parser = subparsers.add_parser('stop', help='stop the server')
+    stop_parser.add_argument('--socket', default=os.environ.get(SOCKET_VAR),
+                             help=f'path of the socket, defaults to ${SOCKET_VAR}')
+
+    run_parser = subparsers.add_parser('run', help='run a script, in the server when '
+                                       f'${SOCKET_VAR} is set')
+    run_parser.add_argument('script', help='path of the script')
+    run_parser.add_argument('args', nargs=argparse.REMAINDER, help='arguments of the script')
+
+    args = parser.parse_args()
+    if args.command in ['serve', 'stop'] and not args.socket:
+        parser.error(f'--socket is required without ${SOCKET_VAR}')
+    return args
+
+
+def main():
+    args = parse_args()
+
+    if args.command == 'run':
+        sys.exit(run(args.script, args.args))
+
+    # The handler is not set on the root logger, whose handlers are removed
+    # for the served scripts.
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(name)s: %(message)s'))
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG if args.command == 'serve' and args.verbose else logging.INFO)
+    if args.command == 'serve':
+        BuildServer(args.socket, max(1, args.jobs)).serve()
+    elif request(args.socket, {'command': 'stop'}) is None:
+        sys.exit(f"No build server is listening on {args.socket}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@
 
 import argparse
 import collections
+from concurrent.futures import ProcessPoolExecutor
 from itertools import takewhile
 import json
 import logging
@@ -59,6 +60,18 @@ def git(*args, cwd=None, ignore_non_zero=False):
 
     return cp.stdout.decode("utf-8").rstrip()
 
+# Outputs of cached_git(), by arguments
+_git_cache = {}
+
+def cached_git(*args, cwd=None):
+    # Like git(), but runs each command only once per process. Used for the
+    # 'git grep' calls over the whole tree, which several checks share.
+
+    key = (args, str(cwd))
+    if key not in _git_cache:
+        _git_cache[key] = git(*args, cwd=cwd)
+    return _git_cache[key]
+
 def get_shas(refspec):
     """
     Returns the list of Git SHAs for 'refspec'.
@@ -389,6 +402,10 @@ class KconfigCheck(ComplianceTest):
     # Kconfig symbol prefix/namespace.
     CONFIG_ = "CONFIG_"
 
+    # Parsed Kconfig trees, by parse_key(). Shared by the checks run in the
+    # same process.
+    _kconf_cache = {}
+
     def run(self):
         kconf = self.parse_kconfig()
 
@@ -579,11 +596,29 @@ class KconfigCheck(ComplianceTest):
             for arch in v2_archs['archs']:
                 fp.write('source "' + (Path(arch['path']) / 'Kconfig').as_posix() + '"\n')
 
+    @classmethod
+    def parse_key(cls):
+        """
+        Returns a key for the inputs of parse_kconfig(). Checks with the same
+        key parse the same Kconfig tree.
+        """
+        return (cls.FILENAME, cls.get_modules)
+
     def parse_kconfig(self):
         """
         Returns a kconfiglib.Kconfig object for the Kconfig files. We reuse
         this object for all tests to avoid having to reparse for each test.
+        The object is also reused by the other checks of this process which
+        parse the same tree.
         """
+        key = self.parse_key()
+        if key in self._kconf_cache:
+            return self._kconf_cache[key]
+
+        self._kconf_cache[key] = self._parse_kconfig()
+        return self._kconf_cache[key]
+
+    def _parse_kconfig(self):
         # Put the Kconfiglib path first to make sure no local Kconfiglib version is
         # used
         kconfig_path = os.path.join(ZEPHYR_BASE, "scripts", "kconfig")
@@ -662,8 +697,8 @@ class KconfigCheck(ComplianceTest):
         regex = r"^\s*(?:module\s*=\s*)([A-Z0-9_]+)\s*(?:#|$)"
 
         # Grep samples/ and tests/ for symbol definitions
-        grep_stdout = git("grep", "-I", "-h", "--perl-regexp", regex, "--",
-                          ":samples", ":tests", cwd=ZEPHYR_BASE)
+        grep_stdout = cached_git("grep", "-I", "-h", "--perl-regexp", regex, "--",
+                                 ":samples", ":tests", cwd=ZEPHYR_BASE)
 
         names = re.findall(regex, grep_stdout, re.MULTILINE)
 
@@ -712,12 +747,12 @@ class KconfigCheck(ComplianceTest):
         regex_boards = r"\bCONFIG_[A-Z0-9_]+\b(?!\s*##|[$@{(.*])"
         regex_socs = r"\bconfig\s+[A-Z0-9_]+$"
 
-        grep_stdout_boards = git("grep", "--line-number", "-I", "--null",
-                                 "--perl-regexp", regex_boards, "--", ":boards",
-                                 cwd=ZEPHYR_BASE)
-        grep_stdout_socs = git("grep", "--line-number", "-I", "--null",
-                               "--perl-regexp", regex_socs, "--", ":soc",
-                               cwd=ZEPHYR_BASE)
+        grep_stdout_boards = cached_git("grep", "--line-number", "-I", "--null",
+                                        "--perl-regexp", regex_boards, "--", ":boards",
+                                        cwd=ZEPHYR_BASE)
+        grep_stdout_socs = cached_git("grep", "--line-number", "-I", "--null",
+                                      "--perl-regexp", regex_socs, "--", ":soc",
+                                      cwd=ZEPHYR_BASE)
 
         # Board processing
         # splitlines() supports various line terminators
@@ -765,8 +800,8 @@ Found disallowed Kconfig symbol in SoC Kconfig files: {sym_name:35}
         regex = r"^\s*(?:menu)?config\s*([A-Z0-9_]+)\s*(?:#|$)"
 
         # Grep samples/ and tests/ for symbol definitions
-        grep_stdout = git("grep", "-I", "-h", "--perl-regexp", regex, "--",
-                          ":samples", ":tests", cwd=ZEPHYR_BASE)
+        grep_stdout = cached_git("grep", "-I", "-h", "--perl-regexp", regex, "--",
+                                 ":samples", ":tests", cwd=ZEPHYR_BASE)
 
         # Generate combined list of configs and choices from the main Kconfig tree.
         kconf_syms = kconf.unique_defined_syms + kconf.unique_choices
@@ -945,10 +980,10 @@ Missing SoC names or CONFIG_SOC vs soc.yml out of sync:
 
         # Skip doc/releases and doc/security/vulnerabilities.rst, which often
         # reference removed symbols
-        grep_stdout = git("grep", "--line-number", "-I", "--null",
-                          "--perl-regexp", regex, "--", ":!/doc/releases",
-                          ":!/doc/security/vulnerabilities.rst",
-                          cwd=Path(GIT_TOP))
+        grep_stdout = cached_git("grep", "--line-number", "-I", "--null",
+                                 "--perl-regexp", regex, "--", ":!/doc/releases",
+                                 ":!/doc/security/vulnerabilities.rst",
+                                 cwd=Path(GIT_TOP))
 
         # splitlines() supports various line terminators
         for grep_line in grep_stdout.splitlines():
@@ -1880,6 +1915,51 @@ def resolve_path_hint(hint):
         return hint
 
 
+def check_group(testcase):
+    # Returns the key of the worker which runs the check. Checks sharing state,
+    # like the Kconfig checks which parse the same Kconfig tree, are run in
+    # the same process.
+
+    if issubclass(testcase, KconfigCheck):
+        return testcase.parse_key()
+    return testcase.name
+
+
+def run_checks(testcases):
+    # Runs the checks in 'testcases' in order. Returns a list with the JUnit
+    # XML of the test case and the arguments of the formatted failures of
+    # each check, which can be passed back from a worker process.
+
+    results = []
+    for testcase in testcases:
+        test = testcase()
+        try:
+            print(f"Running {test.name:16} tests in "
+                  f"{resolve_path_hint(test.path_hint)} ...", flush=True)
+            test.run()
+        except EndTest:
+            pass
+
+        fmtd_failures = [(res.severity, res.title, res.file, res.line, res.col,
+                          res.desc, res.end_line, res.end_col)
+                         for res in test.fmtd_failures]
+        results.append((test.case.tostring(), fmtd_failures))
+    return results
+
+
+def init_worker(zephyr_base, git_top, commit_range, loglevel):
+    # Initializes the globals of a worker process. They are inherited when
+    # the process is forked, but not when it is spawned.
+
+    global ZEPHYR_BASE, GIT_TOP, COMMIT_RANGE
+    ZEPHYR_BASE = zephyr_base
+    GIT_TOP = git_top
+    COMMIT_RANGE = commit_range
+
+    if logger is None:
+        init_logs(loglevel)
+
+
 def parse_args(argv):
 
     default_range = 'HEAD~1..HEAD'
@@ -1909,6 +1989,10 @@ def parse_args(argv):
                         from a previous run and combine with new results.''')
     parser.add_argument('--annotate', action="store_true",
                         help="Print GitHub Actions-compatible annotations.")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='''Number of checks to run in parallel, default
+                        is the number of CPUs. Use 1 to run the checks
+                        serially.''')
 
     return parser.parse_args(argv)
 
@@ -1966,7 +2050,9 @@ def _main(args):
     included = list(map(lambda x: x.lower(), args.module))
     excluded = list(map(lambda x: x.lower(), args.exclude_module))
 
-    for testcase in inheritors(ComplianceTest):
+    # Checks to run, grouped by the process which runs them
+    groups = {}
+    for testcase in sorted(inheritors(ComplianceTest), key=lambda x: x.name):
         # "Modules" and "testcases" are the same thing. Better flags would have
         # been --tests and --exclude-tests or the like, but it's awkward to
         # change now.
@@ -1978,20 +2064,29 @@ def _main(args):
             print("Skipping " + testcase.name)
             continue
 
-        test = testcase()
-        try:
-            print(f"Running {test.name:16} tests in "
-                  f"{resolve_path_hint(test.path_hint)} ...")
-            test.run()
-        except EndTest:
-            pass
+        groups.setdefault(check_group(testcase), []).append(testcase)
+
+    jobs = min(args.jobs or os.cpu_count() or 1, len(groups))
+    if jobs > 1:
+        with ProcessPoolExecutor(
+                max_workers=jobs, initializer=init_worker,
+                initargs=(ZEPHYR_BASE, GIT_TOP, COMMIT_RANGE, args.loglevel)) as executor:
+            # The Kconfig checks take the longest, start them first
+            order = sorted(groups, key=lambda key: not isinstance(key, tuple))
+            futures = {key: executor.submit(run_checks, groups[key]) for key in order}
+            results = [result for key in groups for result in futures[key].result()]
+    else:
+        results = [result for key in groups for result in run_checks(groups[key])]
 
+    # The results are reported in the order of the checks, whichever
+    # process ran them
+    for case_xml, fmtd_failures in results:
         # Annotate if required
         if args.annotate:
-            for res in test.fmtd_failures:
-                annotate(res)
+            for failure_args in fmtd_failures:
+                annotate(FmtdFailure(*failure_args))
 
-        suite.add_testcase(test.case)
+        suite.add_testcase(TestCase.fromstring(case_xml))
 
     if args.output:
         xml = JUnitXml()
@@ -100,9 +100,73 @@ class Tag:
     def __repr__(self):
         return "<Tag {}>".format(self.name)
 
+class TwisterPlanner:
+    """
+    Generates test plans in this process, instead of running twister for each
+    set of options. The tests and platforms are discovered once per set of
+    test roots, and the filters of each set of options are applied to them.
+    """
+    def __init__(self):
+        sys.path.insert(0, os.path.join(zephyr_base, 'scripts', 'pylib', 'twister'))
+        sys.path.insert(0, os.path.join(zephyr_base, 'scripts', 'pylib', 'build_helpers'))
+        from twisterlib.environment import add_parse_arguments, parse_arguments
+
+        self.parse_arguments = parse_arguments
+        self.parser = add_parse_arguments()
+        self.default_options = parse_arguments(self.parser, [], on_init=False)
+        # Discovered test plans, by the options they depend on
+        self.plans = {}
+
+        # The twisterlib modules set their logger to DEBUG when imported: import
+        # the ones used by discover() and get_plan() first, then only show what
+        # twister shows by default.
+        import twisterlib.reports  # noqa: F401
+        import twisterlib.testplan  # noqa: F401
+        logging.getLogger('twister').setLevel(logging.INFO)
+
+    def discover(self, options):
+        from twisterlib.environment import TwisterEnv
+        from twisterlib.hardwaremap import HardwareMap
+        from twisterlib.testplan import TestPlan
+
+        env = TwisterEnv(options, self.default_options)
+        env.discover()
+        env.hwm = HardwareMap(env)
+
+        tplan = TestPlan(env)
+        tplan.discover()
+        return tplan
+
+    def get_plan(self, twister_args):
+        """
+        Returns the test suites twister selects with the given command line
+        arguments, like in the report of 'twister --save-tests'.
+        """
+        from twisterlib.reports import Reporting, ReportingJSONEncoder
+
+        options = self.parse_arguments(self.parser, twister_args)
+        key = (tuple(options.testsuite_root), options.detailed_test_id,
+               tuple(options.quarantine_list or []))
+        if key not in self.plans:
+            self.plans[key] = self.discover(options)
+        tplan = self.plans[key]
+
+        # Only the filters depend on the other options, apply them to the
+        # discovered tests again.
+        tplan.options = tplan.env.options = options
+        tplan.instances = {}
+        tplan.pruned_instances = {}
+        tplan.load()
+
+        report = Reporting(tplan, tplan.env)
+        # Convert the suites like the JSON report, e.g. the statuses to strings
+        return [json.loads(json.dumps(suite, cls=ReportingJSONEncoder))
+                for suite in report.suites()]
+
 class Filters:
     def __init__(self, modified_files, ignore_path, alt_tags, testsuite_root,
-                 pull_request=False, platforms=[], detailed_test_id=True, quarantine_list=None, tc_roots_th=20):
+                 pull_request=False, platforms=[], detailed_test_id=True, quarantine_list=None, tc_roots_th=20,
+                 planner=None):
         self.modified_files = modified_files
         self.testsuite_root = testsuite_root
         self.resolved_files = []
@@ -117,6 +181,7 @@ class Filters:
         self.tag_cfg_file = alt_tags
         self.quarantine_list = quarantine_list
         self.tc_roots_th = tc_roots_th
+        self.planner = planner
 
     def process(self):
         self.find_modules()
@@ -135,19 +200,25 @@ class Filters:
         self.find_excludes()
 
     def get_plan(self, options, integration=False, use_testsuite_root=True):
-        fname = "_test_plan_partial.json"
-        cmd = [f"{zephyr_base}/scripts/twister", "-c"] + options + ["--save-tests", fname ]
+        twister_args = list(options)
         if not self.detailed_test_id:
-            cmd += ["--no-detailed-test-id"]
+            twister_args += ["--no-detailed-test-id"]
         if self.testsuite_root and use_testsuite_root:
             for root in self.testsuite_root:
-                cmd+=["-T", root]
+                twister_args += ["-T", root]
         if integration:
-            cmd.append("--integration")
+            twister_args.append("--integration")
         if self.quarantine_list:
             for q in self.quarantine_list:
-                cmd += ["--quarantine-list", q]
+                twister_args += ["--quarantine-list", q]
 
+        if self.planner:
+            logging.info("twister " + " ".join(twister_args))
+            self.all_tests.extend(self.planner.get_plan(twister_args))
+            return
+
+        fname = "_test_plan_partial.json"
+        cmd = [f"{zephyr_base}/scripts/twister", "-c"] + twister_args + ["--save-tests", fname ]
         logging.info(" ".join(cmd))
         _ = subprocess.call(cmd)
         with open(fname, newline='') as jsonfile:
@@ -444,6 +515,11 @@ def parse_args():
                 "corresponding tests .yaml files. These scenarios "
                 "will be skipped with quarantine as the reason.")
 
+    parser.add_argument(
+            "--in-process", action="store_true",
+            help="Generate the test plan in this process instead of running twister for "
+                "each set of filters. The tests and platforms are discovered once.")
+
     # Include paths in names by default.
     parser.set_defaults(detailed_test_id=True)
 
@@ -472,7 +548,7 @@ if __name__ == "__main__":
 
     f = Filters(files, args.ignore_path, args.alt_tags, args.testsuite_root,
                 args.pull_request, args.platform, args.detailed_test_id, args.quarantine_list,
-                args.testcase_roots_threshold)
+                args.testcase_roots_threshold, TwisterPlanner() if args.in_process else None)
     f.process()
 
     # remove dupes and filtered cases
@@ -7,13 +7,12 @@
 
 import argparse
 import os
+import sys
 
-import yaml
-try:
-    # Use the C LibYAML parser if available, rather than the Python parser.
-    from yaml import CSafeLoader as SafeLoader
-except ImportError:
-    from yaml import SafeLoader     # type: ignore
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'python-devicetree',
+                                'src'))
+
+from devicetree import edtlib
 
 
 HEADER = """\
@@ -52,6 +51,9 @@ def parse_args():
     parser.add_argument("--bindings-dirs", nargs='+', required=True,
                         help="directory with bindings in YAML format, "
                         "we allow multiple")
+    parser.add_argument("--binding-index",
+                        help="path of the cache file of the index of the "
+                        "bindings, shared with gen_edt.py")
 
     return parser.parse_args()
 
@@ -59,25 +61,14 @@ def parse_args():
 def main():
     args = parse_args()
 
-    compats = set()
-
-    for binding_path in binding_paths(args.bindings_dirs):
-        with open(binding_path, encoding="utf-8") as f:
-            try:
-                # Parsed PyYAML representation graph. For our purpose,
-                # we don't need the whole file converted into a dict.
-                root = yaml.compose(f, Loader=SafeLoader)
-            except yaml.YAMLError as e:
-                print(f"WARNING: '{binding_path}' appears in binding "
-                      f"directories but isn't valid YAML: {e}")
-                continue
-
-        if not isinstance(root, yaml.MappingNode):
-            continue
-        for key, node in root.value:
-            if key.value == "compatible" and isinstance(node, yaml.ScalarNode):
-                compats.add(node.value)
-                break
+    # Without a cache file, all bindings are read
+    index = edtlib.BindingIndex(list(binding_paths(args.bindings_dirs)),
+                                args.binding_index)
+    for binding_path, error in index.yaml_errors.items():
+        print(f"WARNING: '{binding_path}' appears in binding "
+              f"directories but isn't valid YAML: {error}")
+
+    compats = set(index.compat2paths)
 
     with open(args.kconfig_out, "w", encoding="utf-8") as kconfig_file:
         print(HEADER, file=kconfig_file)
@@ -49,7 +49,9 @@ def main():
                          default_prop_types=True,
                          infer_binding_for_paths=["/zephyr,user"],
                          werror=args.edtlib_Werror,
-                         vendor_prefixes=vendor_prefixes)
+                         vendor_prefixes=vendor_prefixes,
+                         binding_index_file=args.binding_index,
+                         binding_cache_file=args.binding_cache)
     except edtlib.EDTError as e:
         sys.exit(f"devicetree error: {e}")
 
@@ -83,6 +85,12 @@ def parse_args() -> argparse.Namespace:
                         help="if set, edtlib-specific warnings become errors. "
                              "(this does not apply to warnings shared "
                              "with dtc.)")
+    parser.add_argument("--binding-index",
+                        help="path of the cache file of the index of the "
+                        "bindings, shared with gen_driver_kconfig_dts.py")
+    parser.add_argument("--binding-cache",
+                        help="path of the cache file of the contents of the "
+                        "included bindings")
 
     return parser.parse_args()
 
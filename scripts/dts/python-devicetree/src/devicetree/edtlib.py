@@ -67,16 +67,19 @@ bindings_from_paths() helper function.
 #   @properties are documented in the class docstring, as if they were
 #   variables. See the existing @properties for a template.
 
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import (Any, Callable, Iterable, NoReturn,
                     Optional, TYPE_CHECKING, Union)
 import base64
 import hashlib
+import json
 import logging
 import os
+import pickle
 import re
+import tempfile
 
 import yaml
 try:
@@ -355,12 +358,20 @@ class Binding:
         if not path:
             _err(f"'{fname}' not found")
 
+        # Files like base.yaml are included by most bindings, reuse them
+        contents = _raw_binding_cache.get(path, self._fname2path)
+        if contents is not None:
+            return contents
+
         with open(path, encoding="utf-8") as f:
             contents = yaml.load(f, Loader=_BindingLoader)
             if not isinstance(contents, dict):
                 _err(f'{path}: invalid contents, expected a mapping')
 
-        return self._merge_includes(contents, path)
+        include_names = _include_names(contents.get("include"))
+        contents = self._merge_includes(contents, path)
+        _raw_binding_cache.put(path, include_names, self._fname2path, contents)
+        return contents
 
     def _check(self, require_compatible: bool, require_description: bool):
         # Does sanity checking on the binding.
@@ -1954,7 +1965,9 @@ class EDT:
                  support_fixed_partitions_on_any_bus: bool = True,
                  infer_binding_for_paths: Optional[Iterable[str]] = None,
                  vendor_prefixes: Optional[dict[str, str]] = None,
-                 werror: bool = False):
+                 werror: bool = False,
+                 binding_index_file: Optional[str] = None,
+                 binding_cache_file: Optional[str] = None):
         """EDT constructor.
 
         dts:
@@ -1994,6 +2007,16 @@ class EDT:
           If True, some edtlib specific warnings become errors. This currently
           errors out if 'dts' has any deprecated properties set, or an unknown
           vendor prefix is used.
+
+        binding_index_file (default: None):
+          Path of the cache file of a BindingIndex of the bindings. If given,
+          only the bindings whose 'compatible' appears in the devicetree are
+          read, instead of searching all of them for the compatibles.
+
+        binding_cache_file (default: None):
+          Path of a pickle file to cache the contents of the files included
+          by the bindings in, after merging their own includes. The cached
+          contents are used as long as the files didn't change.
         """
         # All instance attributes should be initialized here.
         # This makes it easy to keep track of them, which makes
@@ -2020,6 +2043,8 @@ class EDT:
         self._infer_binding_for_paths: set[str] = set(infer_binding_for_paths or [])
         self._vendor_prefixes: dict[str, str] = vendor_prefixes or {}
         self._werror: bool = bool(werror)
+        self._binding_index_file: Optional[str] = binding_index_file
+        self._binding_cache_file: Optional[str] = binding_cache_file
 
         # Other internal state
         self._compat2binding: dict[tuple[str, Optional[str]], Binding] = {}
@@ -2109,7 +2134,9 @@ class EDT:
             support_fixed_partitions_on_any_bus=self._fixed_partitions_no_bus,
             infer_binding_for_paths=set(self._infer_binding_for_paths),
             vendor_prefixes=dict(self._vendor_prefixes),
-            werror=self._werror
+            werror=self._werror,
+            binding_index_file=self._binding_index_file,
+            binding_cache_file=self._binding_cache_file
         )
         ret.dts_path = self.dts_path
         ret._dt = deepcopy(self._dt, memo)
@@ -2216,7 +2243,17 @@ class EDT:
             "|".join(re.escape(compat) for compat in dt_compats)
         ).search
 
-        for binding_path in self._binding_paths:
+        if self._binding_cache_file is not None:
+            _raw_binding_cache.load(self._binding_cache_file)
+
+        binding_paths = self._binding_paths
+        if self._binding_index_file is not None:
+            # Only consider the bindings of the compatibles, and those which
+            # aren't valid YAML, to report them below
+            index = BindingIndex(binding_paths, self._binding_index_file)
+            binding_paths = index.select(dt_compats)
+
+        for binding_path in binding_paths:
             with open(binding_path, encoding="utf-8") as f:
                 contents = f.read()
 
@@ -2249,6 +2286,9 @@ class EDT:
                     self._register_binding(binding)
                 binding = binding.child_binding
 
+        if self._binding_cache_file is not None:
+            _raw_binding_cache.save(self._binding_cache_file)
+
     def _binding(self,
                  raw: Optional[dict],
                  binding_path: str,
@@ -2420,6 +2460,79 @@ class EDT:
                 assert isinstance(compat, str)
 
 
+class BindingIndex:
+    """
+    Index of the top-level 'compatible' strings of bindings.
+
+    Finding the bindings of some compatibles requires reading all bindings.
+    The index can be cached in a file, where the compatibles of the bindings
+    are kept along with their modification time and size. Only bindings which
+    are new or changed since are read again.
+
+    These attributes are available on BindingIndex objects:
+
+    paths:
+      The binding paths passed to __init__()
+
+    compat2paths:
+      A dict that maps each top-level 'compatible' string to a list of the
+      paths of the bindings with that compatible
+
+    yaml_errors:
+      A dict that maps the paths of the bindings which aren't valid YAML to
+      the error message
+    """
+
+    # Version of the format of the cache file
+    VERSION = 1
+
+    def __init__(self, binding_paths: list[str],
+                 cache_file: Optional[str] = None):
+        """
+        BindingIndex constructor.
+
+        binding_paths:
+          List of paths to bindings (.yaml files)
+
+        cache_file (default: None):
+          Path of the file to cache the index in, or None to read all
+          bindings. The file can be shared by indexes of different bindings.
+        """
+        self.paths: list[str] = list(binding_paths)
+        self.compat2paths: dict[str, list[str]] = defaultdict(list)
+        self.yaml_errors: dict[str, str] = {}
+
+        cached = _load_binding_index(cache_file) if cache_file else {}
+        updated = False
+        for path in self.paths:
+            stat = os.stat(path)
+            key = os.path.abspath(path)
+            entry = cached.get(key)
+            if not entry or entry[:2] != [stat.st_mtime_ns, stat.st_size]:
+                entry = [stat.st_mtime_ns, stat.st_size, *_binding_compat(path)]
+                cached[key] = entry
+                updated = True
+
+            compat, error = entry[2:]
+            if error is not None:
+                self.yaml_errors[path] = error
+            elif compat is not None:
+                self.compat2paths[compat].append(path)
+
+        if cache_file and updated:
+            _save_binding_index(cache_file, cached, self.paths)
+
+    def select(self, compats: Iterable[str]) -> list[str]:
+        """
+        Returns the paths of the bindings with one of the 'compatible'
+        strings in 'compats', and of those which aren't valid YAML, in the
+        order of 'paths'.
+        """
+        selected = set(self.yaml_errors)
+        for compat in compats:
+            selected.update(self.compat2paths.get(compat, []))
+        return [path for path in self.paths if path in selected]
+
 def bindings_from_paths(yaml_paths: list[str],
                         ignore_errors: bool = False) -> list[Binding]:
     """
@@ -2486,6 +2599,200 @@ def _dt_compats(dt: DT) -> set[str]:
                     for compat in node.props["compatible"].to_strings()}
 
 
+def _binding_compat(path: str) -> tuple[Optional[str], Optional[str]]:
+    # Returns the top-level 'compatible' string of the binding at 'path'
+    # (None if it has none), and the error message if it isn't valid YAML
+
+    with open(path, encoding="utf-8") as f:
+        try:
+            # The representation graph is enough to find the compatible,
+            # without constructing the whole file
+            root = yaml.compose(f, Loader=Loader)
+        except yaml.YAMLError as e:
+            return None, str(e)
+
+    if isinstance(root, yaml.MappingNode):
+        for key, node in root.value:
+            if key.value == "compatible" and isinstance(node, yaml.ScalarNode):
+                return node.value, None
+    return None, None
+
+
+def _load_binding_index(cache_file: str) -> dict[str, list]:
+    # Returns the entries of the BindingIndex cache file 'cache_file', which
+    # map binding paths to [<mtime>, <size>, <compatible>, <YAML error>].
+    # Missing and unusable files are treated as empty.
+
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == BindingIndex.VERSION:
+            return data["bindings"]
+    except (OSError, ValueError, KeyError, AttributeError) as e:
+        _LOG.debug(f"ignoring binding index '{cache_file}': {e}")
+    return {}
+
+
+def _save_binding_index(cache_file: str, entries: dict[str, list],
+                        binding_paths: list[str]) -> None:
+    # Writes the BindingIndex cache file. The entries of other bindings are
+    # kept for other indexes sharing the file, unless the binding was removed.
+
+    listed = {os.path.abspath(path) for path in binding_paths}
+    entries = {path: entry for path, entry in entries.items()
+               if path in listed or os.path.exists(path)}
+    data = {"version": BindingIndex.VERSION, "bindings": entries}
+    _write_cache_file(cache_file, json.dumps(data).encode("utf-8"))
+
+
+def _write_cache_file(cache_file: str, data: bytes) -> None:
+    # Writes 'data' to 'cache_file' atomically, as other processes may use
+    # the same file. Errors are only logged, the caches are optional.
+
+    cache_dir = os.path.dirname(os.path.abspath(cache_file))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=cache_dir, prefix=".edtlib")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+    except OSError as e:
+        _LOG.debug(f"unable to write cache file '{cache_file}': {e}")
+
+
+def _include_names(include: Any) -> list[str]:
+    # Returns the names of the files in the value of an 'include:' key.
+    # Malformed values are reported by Binding._merge_includes().
+
+    if isinstance(include, str):
+        return [include]
+    if isinstance(include, list):
+        return [elem if isinstance(elem, str) else elem.get("name")
+                for elem in include if isinstance(elem, (str, dict))]
+    return []
+
+
+class _RawBindingCache:
+    # Memoizes Binding._load_raw(), the contents of included binding files
+    # after merging the files they include in turn.
+    #
+    # An entry is used as long as the file and the files it includes, directly
+    # or not, have the same content (by hash), and the include names resolve
+    # to the same files. Entries are returned as deep copies, as the callers
+    # modify them when filtering and merging them.
+    #
+    # The entries can be saved to a pickle file and loaded by other processes.
+
+    # Version of the format of the pickle file
+    VERSION = 1
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        # Maps the absolute paths of the files to (<hashes>, <names>, <raw>)
+        # tuples, least recently used first. <hashes> maps the paths of the
+        # file and of the files it includes to the hashes of their contents,
+        # <names> maps the include names to the paths they resolved to.
+        self._entries: OrderedDict[str, tuple[dict, dict, dict]] = OrderedDict()
+        # Maps absolute paths to the (<mtime>, <size>, <hash>) of the files
+        self._hashes: dict[str, tuple[int, int, str]] = {}
+        self._loaded_files: set[str] = set()
+        self._changed = False
+
+    def _hash(self, path: str) -> Optional[str]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        known = self._hashes.get(path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def get(self, path: str, fname2path: dict[str, str]) -> Optional[dict]:
+        path = os.path.abspath(path)
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+
+        hashes, names, raw = entry
+        if (any(name not in fname2path
+                or os.path.abspath(fname2path[name]) != inc_path
+                for name, inc_path in names.items())
+            or any(self._hash(dep) != digest for dep, digest in hashes.items())):
+            del self._entries[path]
+            return None
+
+        self._entries.move_to_end(path)
+        return deepcopy(raw)
+
+    def put(self, path: str, include_names: list[str],
+            fname2path: dict[str, str], raw: dict) -> None:
+        path = os.path.abspath(path)
+        hashes = {path: self._hash(path)}
+        names = {}
+        for name in include_names:
+            inc_path = os.path.abspath(fname2path[name])
+            if inc_path not in self._entries:
+                # Evicted already, the dependencies are unknown
+                return
+            inc_hashes, inc_names, _ = self._entries[inc_path]
+            hashes.update(inc_hashes)
+            names[name] = inc_path
+            names.update(inc_names)
+
+        self._entries[path] = (hashes, names, deepcopy(raw))
+        self._entries.move_to_end(path)
+        self._changed = True
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def load(self, cache_file: str) -> None:
+        # Adds the entries of a file written by save(), which is read once
+        # per process
+
+        if cache_file in self._loaded_files:
+            return
+        self._loaded_files.add(cache_file)
+
+        try:
+            with open(cache_file, "rb") as f:
+                data = pickle.load(f)
+            if data["version"] != self.VERSION:
+                return
+            entries = data["entries"]
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            # Unpickling can fail in many ways, the file is just rewritten
+            _LOG.debug(f"ignoring binding cache '{cache_file}': {e}")
+            return
+
+        for path, entry in entries.items():
+            self._entries.setdefault(path, entry)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def save(self, cache_file: str) -> None:
+        # Writes the entries to 'cache_file', if they changed since the last
+        # load() or save()
+
+        if not self._changed:
+            return
+        self._changed = False
+        data = {"version": self.VERSION, "entries": dict(self._entries)}
+        _write_cache_file(cache_file, pickle.dumps(data, protocol=4))
+
+
+_raw_binding_cache = _RawBindingCache()
+
+
 def _binding_paths(bindings_dirs: list[str]) -> list[str]:
     # Returns a list with the paths to all bindings (.yaml files) in
     # 'bindings_dirs'
@@ -742,6 +742,118 @@ def test_multi_bindings():
     assert str(edt.get_node("/in-dir-2").binding_path) == \
         hpath("test-bindings-2/multidir.yaml")
 
+def test_binding_index(tmp_path, monkeypatch):
+    '''Test the BindingIndex and its cache file'''
+    bindings = tmp_path / "bindings"
+    bindings.mkdir()
+    (bindings / "a.yaml").write_text('compatible: "vnd,a"\n')
+    (bindings / "b.yaml").write_text(
+        'description: b\ncompatible: vnd,b\nchild-binding:\n  compatible: "vnd,c"\n')
+    (bindings / "inc.yaml").write_text('properties:\n  foo:\n    type: int\n')
+    (bindings / "bad.yaml").write_text('compatible: "vnd,bad\n')
+    paths = sorted(str(path) for path in bindings.iterdir())
+    a, b, bad, inc = paths
+    cache_file = str(tmp_path / "cache" / "index.json")
+
+    index = edtlib.BindingIndex(paths, cache_file)
+    assert index.compat2paths == {"vnd,a": [a], "vnd,b": [b]}
+    assert list(index.yaml_errors) == [bad]
+    assert index.select(["vnd,b", "vnd,c", "vnd,x"]) == [b, bad]
+    assert os.path.exists(cache_file)
+
+    # Unchanged bindings are not read again
+    read = []
+    binding_compat = edtlib._binding_compat
+    monkeypatch.setattr(edtlib, "_binding_compat",
+                        lambda path: read.append(path) or binding_compat(path))
+    index = edtlib.BindingIndex(paths, cache_file)
+    assert read == []
+    assert index.compat2paths == {"vnd,a": [a], "vnd,b": [b]}
+
+    (bindings / "inc.yaml").write_text('compatible: "vnd,inc"\n')
+    index = edtlib.BindingIndex(paths, cache_file)
+    assert read == [inc]
+    assert index.compat2paths["vnd,inc"] == [inc]
+
+    # A cache file in another format is ignored
+    with open(cache_file, "w") as f:
+        f.write('{"version": 0}')
+    assert edtlib.BindingIndex(paths, cache_file).compat2paths["vnd,a"] == [a]
+
+def test_binding_index_edt(tmp_path):
+    '''Test that an EDT finds the same bindings with a BindingIndex'''
+    cache_file = str(tmp_path / "index.json")
+    with from_here():
+        edt = edtlib.EDT("test-multidir.dts", ["test-bindings", "test-bindings-2"])
+        for _ in range(2):
+            edt_index = edtlib.EDT("test-multidir.dts", ["test-bindings", "test-bindings-2"],
+                                   binding_index_file=cache_file)
+            assert {key: binding.path for key, binding in edt._compat2binding.items()} == \
+                {key: binding.path for key, binding in edt_index._compat2binding.items()}
+            assert [node.binding_path for node in edt.nodes] == \
+                [node.binding_path for node in edt_index.nodes]
+    assert os.path.exists(cache_file)
+
+def test_raw_binding_cache(tmp_path, monkeypatch):
+    '''Test that included bindings are loaded once, until they change'''
+    (tmp_path / "base.yaml").write_text(
+        'properties:\n  foo:\n    type: int\n    description: foo\n')
+    (tmp_path / "inc.yaml").write_text(
+        'include: base.yaml\nproperties:\n  bar:\n    type: int\n')
+    (tmp_path / "a.yaml").write_text(
+        'description: a\ncompatible: "vnd,a"\ninclude: inc.yaml\n')
+    (tmp_path / "b.yaml").write_text(
+        'description: b\ncompatible: "vnd,b"\ninclude:\n  - name: inc.yaml\n'
+        '    property-allowlist: [foo]\n')
+    fname2path = {path.name: str(path) for path in tmp_path.iterdir()}
+
+    monkeypatch.setattr(edtlib, "_raw_binding_cache", edtlib._RawBindingCache())
+    loaded = []
+    yaml_load = edtlib.yaml.load
+    monkeypatch.setattr(edtlib.yaml, "load",
+                        lambda f, **kwargs: loaded.append(os.path.basename(f.name))
+                        or yaml_load(f, **kwargs))
+
+    def binding(fname):
+        return edtlib.Binding(fname2path[fname], fname2path)
+
+    assert set(binding("a.yaml").prop2specs) == {"foo", "bar"}
+    assert loaded == ["a.yaml", "inc.yaml", "base.yaml"]
+
+    # The filters of b.yaml don't change the cached contents of inc.yaml
+    loaded.clear()
+    assert set(binding("b.yaml").prop2specs) == {"foo"}
+    assert set(binding("a.yaml").prop2specs) == {"foo", "bar"}
+    assert loaded == ["b.yaml", "a.yaml"]
+
+    # Changing a file included indirectly reloads the files including it
+    loaded.clear()
+    (tmp_path / "base.yaml").write_text(
+        'properties:\n  baz:\n    type: int\n    description: the baz\n')
+    assert set(binding("a.yaml").prop2specs) == {"baz", "bar"}
+    assert loaded == ["a.yaml", "inc.yaml", "base.yaml"]
+
+    # The cache file can be used by other processes
+    cache_file = str(tmp_path / "cache" / "bindings.pickle")
+    edtlib._raw_binding_cache.save(cache_file)
+    monkeypatch.setattr(edtlib, "_raw_binding_cache", edtlib._RawBindingCache())
+    edtlib._raw_binding_cache.load(cache_file)
+    loaded.clear()
+    assert set(binding("a.yaml").prop2specs) == {"baz", "bar"}
+    assert loaded == ["a.yaml"]
+
+def test_raw_binding_cache_edt(tmp_path):
+    '''Test that an EDT finds the same bindings with a binding cache file'''
+    cache_file = str(tmp_path / "cache.pickle")
+    with from_here():
+        edt = edtlib.EDT("test.dts", ["test-bindings"])
+        for _ in range(2):
+            edt_cache = edtlib.EDT("test.dts", ["test-bindings"],
+                                   binding_cache_file=cache_file)
+            assert {key: binding.raw for key, binding in edt._compat2binding.items()} == \
+                {key: binding.raw for key, binding in edt_cache._compat2binding.items()}
+    assert os.path.exists(cache_file)
+
 def test_dependencies():
     ''''Test dependency relations'''
     with from_here():
@@ -857,7 +969,7 @@ def test_wrong_props():
         assert value_str.endswith("but no 'specifier-space' was provided.")
 
 
-def test_deepcopy():
+def test_deepcopy(tmp_path):
     with from_here():
         # We intentionally use different kwarg values than the
         # defaults to make sure they're getting copied. This implies
@@ -870,7 +982,9 @@ def test_deepcopy():
                          support_fixed_partitions_on_any_bus=False,
                          infer_binding_for_paths=['/test-node'],
                          vendor_prefixes={'test-vnd': 'A test vendor'},
-                         werror=True)
+                         werror=True,
+                         binding_index_file=str(tmp_path / "index.json"),
+                         binding_cache_file=str(tmp_path / "cache.pickle"))
         edt_copy = deepcopy(edt)
 
     def equal_paths(list1, list2):
@@ -917,6 +1031,8 @@ def test_deepcopy():
     assert edt_copy._vendor_prefixes == {"test-vnd": "A test vendor"}
     assert edt_copy._vendor_prefixes is not edt._vendor_prefixes
     assert edt_copy._werror
+    assert edt_copy._binding_index_file == str(tmp_path / "index.json")
+    assert edt_copy._binding_cache_file == str(tmp_path / "cache.pickle")
     test_equal_but_not_same("_compat2binding", equal_key2path)
     test_equal_but_not_same("_binding_paths")
     test_equal_but_not_same("_binding_fname2path")
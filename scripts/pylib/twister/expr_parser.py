@@ -5,11 +5,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import copy
+import functools
 import logging
+import operator
 import os
 import re
 import sys
 import threading
+import timeit
 
 try:
     import ply.lex as lex
@@ -284,19 +287,104 @@ def ast_expr(ast, env, edt):
 
 mutex = threading.Lock()
 
+def _compile_sym_int(name, op, value):
+    value = int(value)
+    def sym_int(env, edt):
+        return op(ast_sym_int(name, env), value)
+    return sym_int
+
+def _compile_node(ast):
+    """Turn an AST into a closure taking (env, edt), equivalent to ast_expr()"""
+    kind = ast[0]
+    if kind == "not":
+        operand = _compile_node(ast[1])
+        return lambda env, edt: not operand(env, edt)
+    elif kind == "or":
+        left = _compile_node(ast[1])
+        right = _compile_node(ast[2])
+        return lambda env, edt: left(env, edt) or right(env, edt)
+    elif kind == "and":
+        left = _compile_node(ast[1])
+        right = _compile_node(ast[2])
+        return lambda env, edt: left(env, edt) and right(env, edt)
+    elif kind == "==":
+        name, value = ast[1], ast[2]
+        return lambda env, edt: ast_sym(name, env) == value
+    elif kind == "!=":
+        name, value = ast[1], ast[2]
+        return lambda env, edt: ast_sym(name, env) != value
+    elif kind == ">":
+        return _compile_sym_int(ast[1], operator.gt, ast[2])
+    elif kind == "<":
+        return _compile_sym_int(ast[1], operator.lt, ast[2])
+    elif kind == ">=":
+        return _compile_sym_int(ast[1], operator.ge, ast[2])
+    elif kind == "<=":
+        return _compile_sym_int(ast[1], operator.le, ast[2])
+    elif kind == "in":
+        name, values = ast[1], frozenset(ast[2])
+        return lambda env, edt: ast_sym(name, env) in values
+    elif kind == "exists":
+        name = ast[1]
+        return lambda env, edt: bool(ast_sym(name, env))
+    elif kind == ":":
+        name = ast[1]
+        try:
+            match = re.compile(ast[2]).match
+        except re.error:
+            # Report the invalid regex when the expression is evaluated,
+            # like ast_expr() does.
+            pattern = ast[2]
+            return lambda env, edt: bool(re.match(pattern, ast_sym(name, env)))
+        return lambda env, edt: bool(match(ast_sym(name, env)))
+    # Devicetree functions are not worth specializing, they walk the EDT.
+    return lambda env, edt: ast_expr(ast, env, edt)
+
+@functools.lru_cache(maxsize=None)
+def parse_ast(expr_text):
+    """Return the AST of an expression, parsing each expression text once.
+
+    The returned AST is shared between all callers and must not be modified.
+    """
+    # Like it's C counterpart, state machine is not thread-safe
+    with mutex:
+        return parser.parse(expr_text)
+
+@functools.lru_cache(maxsize=None)
+def compile_expr(expr_text):
+    """Return a function evaluating an expression for given (env, edt).
+
+    Filters are evaluated against many platform environments, this way the
+    expression is parsed and compiled only once."""
+    return _compile_node(parse_ast(expr_text))
+
 def parse(expr_text, env, edt):
     """Given a text representation of an expression in our language,
     use the provided environment to determine whether the expression
     is true or false"""
 
-    # Like it's C counterpart, state machine is not thread-safe
-    mutex.acquire()
-    try:
-        ast = parser.parse(expr_text)
-    finally:
-        mutex.release()
+    return compile_expr(expr_text)(env, edt)
 
-    return ast_expr(ast, env, edt)
+def benchmark(expr_text, envs, edt=None, repeat=5):
+    """Compare uncached parsing with the compiled evaluator.
+
+    Returns the best time in seconds, out of repeat runs, to evaluate
+    expr_text against all envs for both methods.
+    """
+    def uncached():
+        for env in envs:
+            with mutex:
+                ast = parser.parse(expr_text)
+            ast_expr(ast, env, edt)
+
+    def compiled():
+        for env in envs:
+            parse(expr_text, env, edt)
+
+    return {
+        "uncached": min(timeit.repeat(uncached, number=1, repeat=repeat)),
+        "compiled": min(timeit.repeat(compiled, number=1, repeat=repeat)),
+    }
 
 # Just some test code
 if __name__ == "__main__":
@@ -309,8 +397,22 @@ if __name__ == "__main__":
         "F" : "baz"
     }
 
-
-    for line in open(sys.argv[1]).readlines():
+    if len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+        # Evaluate each expression against as many environments as there
+        # are test configurations in a typical full twister run.
+        envs = [dict(local_env, BOARD=f"board_{i}") for i in range(10000)]
+        with open(sys.argv[2]) as f:
+            lines = f.readlines()
+        for line in lines:
+            times = benchmark(line, envs)
+            print(f"{line.strip()}: uncached {times['uncached']:.3f}s, "
+                  f"compiled {times['compiled']:.3f}s")
+        sys.exit(0)
+
+    with open(sys.argv[1]) as f:
+        lines = f.readlines()
+
+    for line in lines:
         lex.input(line)
         for tok in iter(lex.token, None):
             print(tok.type, tok.value)
@@ -0,0 +1,384 @@
+# vim: set syntax=python ts=4 :
+#
+# Copyright (c) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""Content addressed cache of build artifacts.
+
+Test configurations with the same CMake inputs, built from the same source
+tree, produce the same binaries. When a configuration was built before, in
+this or an earlier twister run, its artifacts are restored from the cache
+instead of running cmake and the build again.
+
+The cache key is a hash of the CMake arguments of the instance, the content
+of the files and root directories they point to, the test source directory,
+the build environment and the state of the git repositories of Zephyr and
+its modules. The compiler is only known once CMake ran, its version is
+stored with the artifacts and checked when they are restored.
+The cached files are stored by the hash of their content, so identical
+files, such as the .config and devicetree of configurations which only
+differ in their run time settings, are stored once. The least recently
+used builds are removed when the cache grows larger than MAX_SIZE.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from twisterlib.cmakecache import CMakeCache
+
+logger = logging.getLogger('twister')
+logger.setLevel(logging.DEBUG)
+
+
+class BuildCache:
+    """Build artifacts stored by configuration key, with their content in a blob store."""
+
+    VERSION = 2
+
+    # Size in bytes the cache is pruned to
+    MAX_SIZE = 10 * 1024**3
+
+    # Files which are restored when they were built. The logs written when
+    # running the test are not cached, nor is the CMake state (CMakeCache.txt,
+    # build.ninja), which refers to the build directory it was generated in.
+    CACHED_FILES = [
+        'build.log',
+        'build_info.yml',
+        'testbinary',
+        os.path.join('zephyr', '.config'),
+        os.path.join('zephyr', 'edt.pickle'),
+        os.path.join('zephyr', 'runners.yaml'),
+        os.path.join('zephyr', 'zephyr.dts'),
+        os.path.join('zephyr', 'zephyr.elf'),
+        os.path.join('zephyr', 'zephyr.exe'),
+        os.path.join('zephyr', 'zephyr.hex'),
+        os.path.join('zephyr', 'zephyr.bin'),
+    ]
+
+    # Handlers which run the restored binaries without the build system. The
+    # QEMU, simulator and device handlers run or flash through the build system
+    # of the build directory, whose CMake state is not restored.
+    HANDLER_TYPES = ['native', 'unit']
+
+    # CMake variables, also taken from the environment, whose directories
+    # are build inputs outside of the test source directory.
+    ROOT_VARIABLES = [
+        'ARCH_ROOT',
+        'BOARD_ROOT',
+        'DTS_ROOT',
+        'MODULE_EXT_ROOT',
+        'SNIPPET_ROOT',
+        'SOC_ROOT',
+        'ZEPHYR_MODULES',
+        'EXTRA_ZEPHYR_MODULES',
+        'ZEPHYR_EXTRA_MODULES',
+    ]
+
+    # --version output of the compilers, by path
+    _compiler_versions = {}
+
+    def __init__(self, store_dir, source_state):
+        """
+        @param store_dir Directory of the cache
+        @param source_state Hash of the source tree, see source_state()
+        """
+        self.store_dir = store_dir
+        self.source_state = source_state
+        self.hits = 0
+        self.misses = 0
+        # Hashes of the root directories, which don't change during a run
+        self._root_hashes = {}
+
+    @staticmethod
+    def source_state(repositories):
+        """Return a hash of the commit and local changes of git repositories.
+
+        @param repositories Paths of the git repositories
+        @return Hash of the state, None when a repository can't be described
+        """
+        sha = hashlib.sha256()
+        for repository in sorted(set(repositories)):
+            try:
+                head = subprocess.run(['git', '-C', repository, 'rev-parse', 'HEAD'],
+                                      capture_output=True, check=True).stdout
+                diff = subprocess.run(['git', '-C', repository, 'diff', 'HEAD', '--binary'],
+                                      capture_output=True, check=True).stdout
+                untracked = subprocess.run(
+                    ['git', '-C', repository, 'ls-files', '-z', '--others', '--exclude-standard'],
+                    capture_output=True, check=True
+                ).stdout
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.debug(f"Unable to get the git state of {repository}: {e}")
+                return None
+            sha.update(repository.encode() + b'\0' + head)
+            sha.update(hashlib.sha256(diff).digest())
+            for name in sorted(filter(None, untracked.split(b'\0'))):
+                path = os.path.join(repository, os.fsdecode(name))
+                sha.update(name + b'\0' + BuildCache._file_hash(path).encode())
+        return sha.hexdigest()
+
+    @staticmethod
+    def _file_hash(path):
+        sha = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(block)
+        except OSError:
+            return ''
+        return sha.hexdigest()
+
+    @staticmethod
+    def _dir_hash(path):
+        sha = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for name in sorted(filenames):
+                file = os.path.join(dirpath, name)
+                sha.update(os.path.relpath(file, path).encode() + b'\0')
+                sha.update(BuildCache._file_hash(file).encode())
+        return sha.hexdigest()
+
+    @classmethod
+    def compiler_version(cls, compiler):
+        """Return the --version output of a compiler, None if it can't be run."""
+        if compiler not in cls._compiler_versions:
+            try:
+                version = subprocess.run([compiler, '--version'], capture_output=True,
+                                         check=True, timeout=60).stdout.decode(errors='replace')
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.debug(f"Unable to get the version of {compiler}: {e}")
+                version = None
+            cls._compiler_versions[compiler] = version
+        return cls._compiler_versions[compiler]
+
+    @staticmethod
+    def _compiler(build_dir):
+        try:
+            return CMakeCache.from_file(os.path.join(build_dir, 'CMakeCache.txt')).get(
+                'CMAKE_C_COMPILER'
+            )
+        except OSError:
+            return None
+
+    def _root_hash(self, path):
+        if path not in self._root_hashes:
+            if os.path.isdir(path):
+                self._root_hashes[path] = self._dir_hash(path)
+            else:
+                self._root_hashes[path] = self._file_hash(path)
+        return self._root_hashes[path]
+
+    def _roots(self, instance, cmake_args):
+        """Return the hashes of the root and module directories of an instance,
+        given as CMake arguments or in the environment."""
+        values = []
+        for arg in cmake_args:
+            name, _, value = arg.removeprefix('-D').partition('=')
+            name = name.partition(':')[0]
+            if name in self.ROOT_VARIABLES:
+                values.append((name, value.strip('"')))
+        for name in self.ROOT_VARIABLES:
+            if os.environ.get(name):
+                values.append((name, os.environ[name]))
+
+        roots = []
+        for name, value in values:
+            for path in value.replace(';', ' ').split():
+                # Relative roots are relative to the application
+                path = os.path.join(instance.testsuite.source_dir, path)
+                roots.append((name, path, self._root_hash(os.path.normpath(path))))
+        return roots
+
+    @classmethod
+    def supported(cls, instance, options):
+        """Check whether the build of an instance can be replaced by cached artifacts.
+
+        Only builds whose binaries are run without calling the build system,
+        and which need no other artifact of the build tree, are cached.
+        """
+        if options.coverage or options.cmake_only or options.create_rom_ram_report:
+            return False
+        if instance.sysbuild or instance.testsuite.harness == 'bsim':
+            return False
+        run = instance.run and not options.build_only
+        return not run or instance.handler.type_str in cls.HANDLER_TYPES
+
+    def key(self, instance, cmake_args):
+        """Return the cache key of an instance.
+
+        @param instance Test instance
+        @param cmake_args Arguments of the cmake call of the instance, without
+            the run id and the file paths they depend on
+        """
+        files = []
+        for arg in cmake_args:
+            # Configuration files and overlays, e.g. -DOVERLAY_CONFIG="a.conf b.conf"
+            value = arg.partition('=')[2].strip('"')
+            for path in value.replace(';', ' ').split():
+                path = os.path.join(instance.testsuite.source_dir, path)
+                if os.path.isfile(path):
+                    files.append((path.replace(instance.build_dir, ''), self._file_hash(path)))
+        # The files of the build directory, e.g. the Kconfig settings of the test
+        # scenario, are identified by their content: drop the build directory
+        # from the arguments, as TestPlan.shared_build_key() does.
+        cmake_args = [arg.replace(instance.build_dir, '') for arg in cmake_args]
+
+        data = {
+            'version': self.VERSION,
+            'source_state': self.source_state,
+            'platform': instance.platform.name,
+            'toolchain': instance.toolchain,
+            'source_dir': instance.testsuite.source_dir,
+            'source': self._dir_hash(instance.testsuite.source_dir),
+            'filter': instance.testsuite.filter,
+            'harness': instance.testsuite.harness,
+            'cmake_args': cmake_args,
+            'files': files,
+            'roots': self._roots(instance, cmake_args),
+            'python': sys.executable,
+            'cmake': shutil.which('cmake'),
+            'environment': {
+                var: os.environ.get(var)
+                for var in ['ZEPHYR_TOOLCHAIN_VARIANT', 'ZEPHYR_SDK_INSTALL_DIR']
+            },
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    def _entry_file(self, key):
+        return os.path.join(self.store_dir, 'entries', key[:2], f"{key}.json")
+
+    def _blob_file(self, sha):
+        return os.path.join(self.store_dir, 'blobs', sha[:2], sha)
+
+    def _write(self, path, write):
+        """Atomically create path, other processes may store the same file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.build')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_file, path)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+
+    def store(self, key, build_dir, run_id, extra_files=None):
+        """Store the artifacts of a successful build.
+
+        @param key Cache key of the instance
+        @param build_dir Build directory
+        @param run_id Run id the binaries were built with
+        @param extra_files Other files to cache, relative to build_dir
+        """
+        compiler = self._compiler(build_dir)
+        version = self.compiler_version(compiler) if compiler else None
+        if version is None:
+            logger.debug(f"Not storing the build of {build_dir}, the compiler is unknown")
+            return
+
+        files = {}
+        try:
+            for name in dict.fromkeys(self.CACHED_FILES + (extra_files or [])):
+                path = os.path.join(build_dir, name)
+                if os.path.isabs(name) or not os.path.isfile(path):
+                    continue
+                sha = self._file_hash(path)
+                blob = self._blob_file(sha)
+                if not os.path.exists(blob):
+                    with open(path, 'rb') as src:
+                        self._write(blob, lambda f, src=src: shutil.copyfileobj(src, f))
+                files[name] = {'sha': sha, 'mode': os.stat(path).st_mode & 0o777}
+
+            entry = {
+                'run_id': run_id,
+                'files': files,
+                'compiler': {'path': compiler, 'version': version},
+            }
+            self._write(self._entry_file(key), lambda f: f.write(json.dumps(entry).encode()))
+        except OSError as e:
+            logger.debug(f"Unable to store the build of {build_dir}: {e}")
+
+    def restore(self, key, build_dir):
+        """Restore the artifacts of a cached build.
+
+        @return Run id of the restored binaries, None on a cache miss
+        """
+        entry_file = self._entry_file(key)
+        try:
+            with open(entry_file) as f:
+                entry = json.load(f)
+            compiler = entry['compiler']
+            if self.compiler_version(compiler['path']) != compiler['version']:
+                logger.debug(f"Ignoring cached build {key}, the compiler changed")
+                self.misses += 1
+                return None
+            for name, info in entry['files'].items():
+                path = os.path.join(build_dir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Copied, not linked, a later build must not change the cache.
+                shutil.copyfile(self._blob_file(info['sha']), path)
+                os.chmod(path, info['mode'])
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"Ignoring unusable cached build {key}: {e}")
+            self.misses += 1
+            return None
+
+        with contextlib.suppress(OSError):
+            # Marks the build as recently used for prune()
+            os.utime(entry_file)
+        self.hits += 1
+        return entry['run_id']
+
+    def prune(self, max_size=None):
+        """Remove the least recently used builds until the cache fits max_size.
+
+        Files which are not used by the remaining builds are removed.
+        Must not run while other processes store builds.
+
+        @param max_size Size in bytes, MAX_SIZE by default
+        """
+        if max_size is None:
+            max_size = self.MAX_SIZE
+
+        entries = []
+        for dirpath, _, filenames in os.walk(os.path.join(self.store_dir, 'entries')):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    with open(path) as f:
+                        shas = {info['sha'] for info in json.load(f)['files'].values()}
+                    entries.append((os.stat(path).st_mtime, path, shas))
+                except (OSError, ValueError, KeyError, TypeError):
+                    # Unusable, interrupted writes included
+                    entries.append((0, path, None))
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+
+        kept = set()
+        size = 0
+        for _, path, shas in entries:
+            if shas is not None and size <= max_size:
+                for sha in shas - kept:
+                    with contextlib.suppress(OSError):
+                        size += os.stat(self._blob_file(sha)).st_size
+            # Once the cache is full, all less recently used builds are removed
+            if shas is None or size > max_size:
+                with contextlib.suppress(OSError):
+                    os.unlink(path)
+                continue
+            kept |= shas
+
+        for dirpath, _, filenames in os.walk(os.path.join(self.store_dir, 'blobs')):
+            for name in filenames:
+                if name not in kept:
+                    with contextlib.suppress(OSError):
+                        os.unlink(os.path.join(dirpath, name))
@@ -101,8 +101,15 @@ class TwisterConfigParser:
         self.scenarios: dict[str, Any] = {}
         self.common: dict[str, Any] = {}
 
-    def load(self) -> dict[str, Any]:
-        data = scl.yaml_load_verify(self.filename, self.schema)
+    def load(self, loader=None) -> dict[str, Any]:
+        """Load and validate the yaml file
+
+        @param loader Optional replacement for scl.yaml_load_verify(), e.g.
+            a cached one, called with the file name and schema
+        """
+        if loader is None:
+            loader = scl.yaml_load_verify
+        data = loader(self.filename, self.schema)
         self.data = data
 
         if 'tests' in self.data:
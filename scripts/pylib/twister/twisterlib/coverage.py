@@ -5,6 +5,7 @@
 
 import contextlib
 import glob
+import json
 import logging
 import os
 import pathlib
@@ -23,6 +24,108 @@ supported_coverage_formats = {
 }
 
 
+class GcovDumpCollector:
+    """ Extract the GCOV dumps from the output of a test while it runs.
+
+    The harness feeds the lines of the test output. At the end of each dump,
+    the gcda files dumped for the first time are written, and the repeated
+    dumps of a file are saved next to handler.log, to be merged by
+    CoverageTool.capture_data() without parsing handler.log again.
+    """
+
+    DUMPS_FILE = "gcov_dumps.json"
+
+    def __init__(self, build_dir):
+        self.dumps_file = os.path.join(build_dir, self.DUMPS_FILE)
+        self.capture_data = False
+        self.capture_complete = False
+        self.valid = True
+        # dumps since the last flush, per gcda file
+        self.dumps = {}
+        self.written = set()
+        self.repeated = {}
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.dumps_file)
+
+    def feed(self, line):
+        if "GCOV_COVERAGE_DUMP_START" in line:
+            self.capture_data = True
+            self.capture_complete = False
+            self._save()
+            return
+        if "GCOV_COVERAGE_DUMP_END" in line:
+            self.capture_complete = True
+            self._flush()
+            return
+        if not self.capture_data or not line.startswith("*"):
+            return
+        sp = line.split("<")
+        if len(sp) > 1:
+            # Remove the leading delimiter "*"
+            self.dumps.setdefault(sp[0][1:], []).append(sp[1].rstrip())
+            if self.capture_complete:
+                # Data following the end of a dump, as found by
+                # CoverageTool.retrieve_gcov_data()
+                self._flush()
+
+    def _flush(self):
+        for file_name, hex_dumps in self.dumps.items():
+            if "kobject_hash" in file_name:
+                # See CoverageTool.create_gcda_files()
+                with contextlib.suppress(Exception):
+                    os.remove(file_name[:-4] + "gcno")
+                continue
+            if file_name not in self.written:
+                try:
+                    with open(file_name, 'wb') as fp:
+                        fp.write(bytes.fromhex(hex_dumps[0]))
+                except (ValueError, OSError) as e:
+                    logger.error(f"Unable to create gcda file {file_name}: {e}")
+                    self.valid = False
+                    continue
+                self.written.add(file_name)
+                hex_dumps = hex_dumps[1:]
+            if hex_dumps:
+                self.repeated.setdefault(file_name, []).extend(hex_dumps)
+        self.dumps = {}
+        self._save()
+
+    def _save(self):
+        with open(self.dumps_file, 'w') as fp:
+            json.dump({
+                'complete': self.capture_complete,
+                'valid': self.valid,
+                'repeated': self.repeated
+            }, fp)
+
+    @classmethod
+    def load(cls, build_dir):
+        """ Return the dumps collected in build_dir as
+        CoverageTool.retrieve_gcov_data() does, with the written gcda files
+        dumped again in the data, or None if the dumps were not collected.
+        """
+        try:
+            with open(os.path.join(build_dir, cls.DUMPS_FILE)) as fp:
+                collected = json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+        extracted_coverage_info = {}
+        for file_name, hex_dumps in collected['repeated'].items():
+            try:
+                with open(file_name, 'rb') as fp:
+                    written = fp.read().hex()
+            except OSError:
+                collected['valid'] = False
+                continue
+            extracted_coverage_info[file_name] = [written, *hex_dumps]
+        return {
+            'complete': collected['complete'],
+            'valid': collected['valid'],
+            'data': extracted_coverage_info
+        }
+
+
 class CoverageTool:
     """ Base class for every supported coverage tool
     """
@@ -35,6 +138,7 @@ class CoverageTool:
         self.coverage_report = True
         self.coverage_per_instance = False
         self.instances = {}
+        self.jobs = None
 
     @staticmethod
     def factory(tool, jobs=None):
@@ -56,12 +160,12 @@ class CoverageTool:
         capture_data = False
         capture_complete = False
         with open(input_file) as fp:
-            for line in fp.readlines():
-                if re.search("GCOV_COVERAGE_DUMP_START", line):
+            for line in fp:
+                if "GCOV_COVERAGE_DUMP_START" in line:
                     capture_data = True
                     capture_complete = False
                     continue
-                if re.search("GCOV_COVERAGE_DUMP_END", line):
+                if "GCOV_COVERAGE_DUMP_END" in line:
                     capture_complete = True
                     # Keep searching for additional dumps
                 # Loop until the coverage data is found.
@@ -111,39 +215,48 @@ class CoverageTool:
             with open(f'{dirs[-1]}/tmp.gcda', 'rb') as fp:
                 return fp.read(-1).hex()
 
+    def create_gcda_file(self, filename, hexdumps):
+        # if kobject_hash is given for coverage gcovr fails
+        # hence skipping it problem only in gcovr v4.1
+        if "kobject_hash" in filename:
+            filename = (filename[:-4]) + "gcno"
+            with contextlib.suppress(Exception):
+                os.remove(filename)
+            return True
+
+        try:
+            hexdump_val = self.merge_hexdumps(hexdumps)
+            hex_bytes = bytes.fromhex(hexdump_val)
+            with open(filename, 'wb') as fp:
+                fp.write(hex_bytes)
+        except ValueError:
+            logger.exception(f"Unable to convert hex data for file: {filename}")
+            return False
+        except FileNotFoundError:
+            logger.exception(f"Unable to create gcda file: {filename}")
+            return False
+        return True
+
     def create_gcda_files(self, extracted_coverage_info):
-        gcda_created = True
         logger.debug(f"Generating {len(extracted_coverage_info)} gcda files")
-        for filename, hexdumps in extracted_coverage_info.items():
-            # if kobject_hash is given for coverage gcovr fails
-            # hence skipping it problem only in gcovr v4.1
-            if "kobject_hash" in filename:
-                filename = (filename[:-4]) + "gcno"
-                with contextlib.suppress(Exception):
-                    os.remove(filename)
-                continue
-
-            try:
-                hexdump_val = self.merge_hexdumps(hexdumps)
-                hex_bytes = bytes.fromhex(hexdump_val)
-                with open(filename, 'wb') as fp:
-                    fp.write(hex_bytes)
-            except ValueError:
-                logger.exception(f"Unable to convert hex data for file: {filename}")
-                gcda_created = False
-            except FileNotFoundError:
-                logger.exception(f"Unable to create gcda file: {filename}")
-                gcda_created = False
-        return gcda_created
+        # The capture runs in the 'coverage' operation of each instance, and up
+        # to --jobs of them run at the same time: create the files serially.
+        results = [self.create_gcda_file(filename, hexdumps)
+                   for filename, hexdumps in extracted_coverage_info.items()]
+        return all(results)
 
     def capture_data(self, outdir):
         coverage_completed = True
         for filename in glob.glob(f"{outdir}/**/handler.log", recursive=True):
-            gcov_data = self.__class__.retrieve_gcov_data(filename)
+            # Use the dumps collected while the test was running if available.
+            gcov_data = GcovDumpCollector.load(os.path.dirname(filename))
+            if gcov_data is None:
+                gcov_data = self.__class__.retrieve_gcov_data(filename)
             capture_complete = gcov_data['complete']
             extracted_coverage_info = gcov_data['data']
             if capture_complete:
-                gcda_created = self.create_gcda_files(extracted_coverage_info)
+                gcda_created = self.create_gcda_files(extracted_coverage_info) and \
+                    gcov_data.get('valid', True)
                 if gcda_created:
                     logger.debug(f"Gcov data captured: {filename}")
                 else:
@@ -544,6 +657,7 @@ def run_coverage_tool(options, outdir, is_system_gcov, instances,
         return False, {}
 
     coverage_tool.gcov_tool = str(choose_gcov_tool(options, is_system_gcov))
+    coverage_tool.jobs = options.jobs
     logger.debug(f"Using gcov tool: {coverage_tool.gcov_tool}")
 
     coverage_tool.instances = instances
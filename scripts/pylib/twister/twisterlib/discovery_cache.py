@@ -0,0 +1,233 @@
+# vim: set syntax=python ts=4 :
+#
+# Copyright (c) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""Persistent cache of test discovery results.
+
+Walking the test roots is cheap, but parsing and validating every
+testcase.yaml/sample.yaml and scanning every test source for ztest suites
+is not. This module keeps the results of both steps on disk, so subsequent
+twister runs only re-parse the files which actually changed.
+
+Each entry is keyed by the file path and validated against the file size
+and modification time. If those differ, the content hash decides whether
+the entry can still be used.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+
+import scl
+
+logger = logging.getLogger('twister')
+logger.setLevel(logging.DEBUG)
+
+
+def user_cache_dir():
+    """Return the directory used for persistent twister caches.
+
+    Follows the same rules as cmake/modules/user_cache.cmake.
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'zephyr', 'twister')
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class DiscoveryCache:
+    """On-disk cache of parsed test yaml files and ztest source scans."""
+
+    # Increase when the format of cached data changes, e.g. new fields are
+    # added to ScanPathResult.
+    VERSION = 1
+
+    # Sources of the yaml loading and of the source scanning rules. The cache
+    # is discarded when they change, even if VERSION was not increased.
+    SCANNER_SOURCES = [
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testsuite.py'),
+        os.path.abspath(scl.__file__),
+    ]
+
+    FILENAME = 'discovery.pickle'
+
+    def __init__(self, cache_dir, schema=None, rescan=False):
+        """
+        @param cache_dir Directory holding the cache file
+        @param schema Test suite schema, cached yaml data is only reused
+            when it has been validated against the same schema
+        @param rescan Ignore all existing entries (cold rescan), the cache
+            is still refreshed with the new results
+        """
+        self.cache_file = os.path.join(cache_dir, self.FILENAME)
+        self.fingerprint = self._fingerprint(schema)
+        self.rescan = rescan
+        self.yaml_entries = {}
+        self.scan_entries = {}
+        # Entries added or refreshed since the last export_updates() call
+        self.updated = {'yaml': set(), 'scan': set()}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    def _fingerprint(self, schema):
+        sha = hashlib.sha256(json.dumps(schema, sort_keys=True, default=str).encode())
+        for source in self.SCANNER_SOURCES:
+            try:
+                sha.update(file_digest(source).encode())
+            except OSError:
+                sha.update(source.encode())
+        return f"{self.VERSION}:{sha.hexdigest()}"
+
+    def load(self):
+        if self.rescan:
+            logger.info("Ignoring test discovery cache, rescanning all tests")
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cache = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Discarding unreadable test discovery cache {self.cache_file}: {e}")
+            return
+
+        if not isinstance(cache, dict) or cache.get('fingerprint') != self.fingerprint:
+            logger.debug("Test discovery cache is outdated, discarding it")
+            return
+
+        self.yaml_entries = cache.get('yaml', {})
+        self.scan_entries = cache.get('scan', {})
+        logger.debug(f"Loaded test discovery cache from {self.cache_file}")
+
+    def save(self):
+        logger.debug(f"Test discovery cache: {self.hits} hits, {self.misses} misses")
+        if not self.dirty:
+            return
+
+        # Drop entries of files which do not exist anymore, so the cache does
+        # not grow forever when tests get moved around.
+        for entries in (self.yaml_entries, self.scan_entries):
+            for path in [p for p in entries if not os.path.exists(p)]:
+                del entries[path]
+
+        cache = {
+            'fingerprint': self.fingerprint,
+            'yaml': self.yaml_entries,
+            'scan': self.scan_entries,
+        }
+        cache_dir = os.path.dirname(self.cache_file)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Several twister instances may share the cache, so write to a
+            # temporary file first and atomically replace the old cache.
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir, prefix='.discovery')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Unable to write test discovery cache {self.cache_file}: {e}")
+        else:
+            self.dirty = False
+
+    def _entries(self, kind):
+        return self.yaml_entries if kind == 'yaml' else self.scan_entries
+
+    def export_updates(self):
+        """Return the entries updated since the last call.
+
+        Used to pass the results of a worker process back to the cache
+        owned by the main process, see merge_updates().
+        """
+        updates = {
+            kind: {path: self._entries(kind)[path] for path in paths}
+            for kind, paths in self.updated.items()
+        }
+        self.updated = {'yaml': set(), 'scan': set()}
+        return updates
+
+    def merge_updates(self, updates):
+        for kind, entries in updates.items():
+            if entries:
+                self._entries(kind).update(entries)
+                self.dirty = True
+
+    def _lookup(self, kind, path):
+        """Return the cached value for path or None if it is not valid."""
+        path = os.path.abspath(path)
+        entry = self._entries(kind).get(path)
+        if entry is None:
+            return path, None, None
+
+        st = os.stat(path)
+        if entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return path, st, entry
+
+        # The file has been touched, compare its content.
+        digest = file_digest(path)
+        if entry['sha256'] != digest:
+            return path, st, None
+        entry['mtime'] = st.st_mtime_ns
+        entry['size'] = st.st_size
+        self.updated[kind].add(path)
+        self.dirty = True
+        return path, st, entry
+
+    def _store(self, kind, path, st, value):
+        if st is None:
+            st = os.stat(path)
+        self._entries(kind)[path] = {
+            'mtime': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha256': file_digest(path),
+            'value': value,
+        }
+        self.updated[kind].add(path)
+        self.dirty = True
+
+    def yaml_load_verify(self, filename, schema):
+        """Cached equivalent of scl.yaml_load_verify()."""
+        path, st, entry = self._lookup('yaml', filename)
+        if entry is not None:
+            self.hits += 1
+            return entry['value']
+
+        self.misses += 1
+        # Errors are not cached, the file will be parsed again (and the
+        # error reported again) on the next run.
+        data = scl.yaml_load_verify(filename, schema)
+        self._store('yaml', path, st, data)
+        return data
+
+    def scan_file(self, filename, scanner):
+        """Return the cached ScanPathResult of filename, or call scanner.
+
+        A ValueError raised by the scanner is cached as well and raised
+        again, so the caller reports it the same way on every run.
+        """
+        path, st, entry = self._lookup('scan', filename)
+        if entry is None:
+            self.misses += 1
+            try:
+                value = scanner(filename)
+            except ValueError as e:
+                value = e
+            self._store('scan', path, st, value)
+        else:
+            self.hits += 1
+            value = entry['value']
+
+        if isinstance(value, ValueError):
+            raise value
+        return value
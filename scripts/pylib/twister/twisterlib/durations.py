@@ -0,0 +1,72 @@
+# vim: set syntax=python ts=4 :
+#
+# Copyright (c) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""Durations of test configurations recorded by a previous twister run.
+
+The durations are used to start the longest test configurations first, so
+they do not dominate the end of a run, and to balance --subset shards by
+expected duration instead of by number of configurations.
+"""
+
+import json
+import logging
+import os
+from statistics import median
+
+logger = logging.getLogger('twister')
+logger.setLevel(logging.DEBUG)
+
+
+class TestDurations:
+    """Expected duration (build time + execution time) of test configurations."""
+
+    __test__ = False  # for pytest to skip this class when collects tests
+
+    def __init__(self, durations=None):
+        """
+        @param durations Dictionary mapping the instance name or the
+            (platform name, test suite name) tuple to the duration in seconds
+        """
+        self.durations = durations or {}
+        # Configurations not present in the previous run, e.g. new tests,
+        # are expected to take a typical amount of time.
+        self.default = median(self.durations.values()) if self.durations else 0.0
+
+    def __bool__(self):
+        return bool(self.durations)
+
+    @classmethod
+    def from_file(cls, filename):
+        """Load the durations from a twister.json report.
+
+        An unreadable report only disables duration based scheduling.
+        """
+        try:
+            with open(filename) as fp:
+                report = json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unable to read test durations from {filename}: {e}")
+            return cls()
+
+        durations = {}
+        for ts in report.get('testsuites', []):
+            try:
+                duration = float(ts.get('build_time', 0)) + float(ts.get('execution_time', 0))
+            except ValueError:
+                continue
+            durations[(ts['platform'], ts['name'])] = duration
+            if ts.get('toolchain'):
+                durations[os.path.join(ts['platform'], ts['toolchain'], ts['name'])] = duration
+
+        logger.debug(f"Loaded durations of {len(durations)} configurations from {filename}")
+        return cls(durations)
+
+    def estimate(self, instance):
+        """Return the expected duration of a test instance in seconds."""
+        duration = self.durations.get(instance.name)
+        if duration is None:
+            duration = self.durations.get(
+                (instance.platform.name, instance.testsuite.name), self.default
+            )
+        return duration
@@ -23,6 +23,7 @@ from pathlib import Path
 import zephyr_module
 from twisterlib.constants import SUPPORTED_SIMS
 from twisterlib.coverage import supported_coverage_formats
+from twisterlib.discovery_cache import user_cache_dir
 from twisterlib.error import TwisterRuntimeError
 from twisterlib.log_helper import log_command
 
@@ -145,6 +146,16 @@ Artificially long but functional example:
              "called multiple times. Defaults to the 'samples/' and "
              "'tests/' directories at the base of the Zephyr tree.")
 
+    case_select.add_argument(
+        "--discovery-rescan", action="store_true",
+        help="Ignore the test discovery cache and parse all test configuration "
+             "files and sources again. The cache is refreshed with the results.")
+
+    case_select.add_argument(
+        "--parallel-discovery", action="store_true",
+        help="Parse test configuration files and scan test sources in parallel, "
+             "using the number of processes given by --jobs.")
+
     case_select.add_argument(
         "-f",
         "--only-failed",
@@ -337,6 +348,13 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
              "This option is useful when running a large number of tests on "
              "different hosts to speed up execution time.")
 
+    parser.add_argument(
+        "--durations-file", metavar="FILENAME",
+        help="""twister.json report of a previous run. The build and execution
+        times recorded in it are used to start the longest test configurations
+        first and, with --subset, to balance the subsets by expected duration
+        instead of by number of test configurations.""")
+
     parser.add_argument(
         "--shuffle-tests", action="store_true", default=None,
         help="""Shuffle test execution order to get randomly distributed tests across subsets.
@@ -348,6 +366,25 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
                 If not provided, seed in generated by system.
                 Used only when --shuffle-tests is provided.""")
 
+    parser.add_argument(
+        "--cache-dir", default=user_cache_dir(),
+        help="Directory for caches which persist across twister runs, such as "
+             "the test discovery cache. Default is %(default)s.")
+
+    parser.add_argument(
+        "--persistent-filter-cache", action="store_true",
+        help="Keep the Kconfig data parsed for runtime filtering in --cache-dir, "
+             "so it is shared between worker processes and twister runs.")
+
+    parser.add_argument(
+        "--build-cache", action="store_true",
+        help="Restore the artifacts of configurations built before, by this or an "
+             "earlier twister run from the same sources, from --cache-dir instead of "
+             "building them again. Only builds which are not run, or are run on "
+             "native or unit handlers, are cached. Not used with --coverage, "
+             "--cmake-only and --create-rom-ram-report. The least recently used "
+             "builds are removed when the cache grows over 10 GiB.")
+
     parser.add_argument(
         "-c", "--clobber-output", action="store_true",
         help="Cleaning the output directory will simply delete it instead "
@@ -554,6 +591,39 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
         help="Number of jobs for building, defaults to number of CPU threads, "
              "overcommitted by factor 2 when --build-only.")
 
+    parser.add_argument(
+        "--shared-dts-filter", action="store_true",
+        help="""Evaluate runtime filters which only depend on the devicetree
+        with one devicetree-only cmake run per group of test configurations
+        sharing the platform, toolchain, snippets and devicetree related
+        arguments, instead of one cmake run per test configuration.""")
+
+    parser.add_argument(
+        "--shared-builds", action="store_true",
+        help="""Build test configurations with identical build inputs once.
+        Scenarios of the same application which only differ in their run time
+        settings, like the harness configuration or the timeout, run their
+        handler and harness against the binaries of the first of them. Only
+        used for configurations which are not run, or run on native or unit
+        handlers, and not with --coverage, --cmake-only and
+        --create-rom-ram-report.""")
+
+    parser.add_argument(
+        "--scheduler", choices=["queue", "pool"], default="queue",
+        help="""Engine used to process the test instances. 'queue' (default)
+        starts --jobs worker processes which share a managed task queue and
+        the statistics counters. 'pool' keeps the instances and statistics in
+        the main process, which schedules each instance on a process pool,
+        reducing the inter-process communication per task.""")
+
+    parser.add_argument(
+        "--run-jobs", type=int, metavar="JOBS",
+        help="""Number of tests run at the same time by the main process with
+        asyncio, independently of the number of --jobs building them. Only
+        QEMU and native/unit tests without a pytest, ctest or robot harness
+        are run this way, the other tests are run by the --jobs workers.
+        Requires '--scheduler pool'.""")
+
     parser.add_argument(
         "-K", "--force-platform", action="store_true",
         help="""Force testing on selected platforms,
@@ -653,7 +723,9 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
                         help="Treat RAM/SRAM overflows as errors.")
 
     parser.add_argument("--report-filtered", action="store_true",
-                        help="Include filtered tests in the reports.")
+                        help="Include filtered tests in the reports. Otherwise test "
+                             "configurations excluded by static filters are only counted "
+                             "and not instantiated.")
 
     parser.add_argument("-P", "--exclude-platform", action="append", default=[],
             help="""Exclude platforms and do not build or run any tests
@@ -727,6 +799,23 @@ structure in the main Zephyr tree: boards/<vendor>/<board_name>/""")
         version or a commit ID.
         """)
 
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="""Record the wall time, the CPU time of twister and of its child
+        processes, the peak RSS of the child processes and the queue wait time
+        of the phases of each test configuration (filter_cmake, cmake, build,
+        size_calc, handler, coverage) in twister.json. The report phases end
+        after twister.json is written, they are only recorded with
+        --profile-trace.
+        """)
+
+    parser.add_argument(
+        "--profile-trace", metavar="FILENAME",
+        help="""Record the phases as with --profile and write them as a timeline
+        of what each twister process was doing to FILENAME, in the Chrome trace
+        event format, which can be opened with Perfetto or chrome://tracing.
+        """)
+
     parser.add_argument(
         "--report-all-options", action="store_true",
         help="""Show all command line options applied, including defaults, as
@@ -982,6 +1071,14 @@ def parse_arguments(
         logger.error("--device-serial-pty cannot be used when --flash-before is set (for now)")
         sys.exit(1)
 
+    if options.run_jobs is not None:
+        if options.scheduler != 'pool':
+            logger.error("--run-jobs requires --scheduler pool")
+            sys.exit(1)
+        if options.run_jobs < 1:
+            logger.error("--run-jobs must be at least 1")
+            sys.exit(1)
+
     if options.shuffle_tests and options.subset is None:
         logger.error("--shuffle-tests requires --subset")
         sys.exit(1)
@@ -1099,6 +1196,8 @@ class TwisterEnv:
 
         self.alt_config_root = options.alt_config_root
 
+        self.cache_dir = options.cache_dir
+
     def non_default_options(self) -> dict:
         """Returns current command line options which are set to non-default values."""
         diff = {}
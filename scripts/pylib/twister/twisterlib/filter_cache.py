@@ -0,0 +1,135 @@
+# vim: set syntax=python ts=4 :
+#
+# Copyright (c) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""Cache of the data used for runtime filtering.
+
+Runtime filters evaluate the devicetree (edt.pickle) and Kconfig (.config)
+output of a cmake run. Many test configurations of the same platform produce
+identical files, so the parsed data is cached by the hash of the file
+content instead of being deserialized or parsed again for every instance.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+
+logger = logging.getLogger('twister')
+logger.setLevel(logging.DEBUG)
+
+
+class FilterDataCache:
+    """Content hash keyed LRU cache, with an optional on-disk store.
+
+    Cached objects are shared between all users and must not be modified.
+    """
+
+    # Increase when the format of the stored objects changes
+    VERSION = 2
+
+    # Number of objects kept in the on-disk store by prune()
+    MAX_STORED = 1000
+
+    def __init__(self, maxsize=16, store_dir=None):
+        """
+        @param maxsize Number of objects kept in memory
+        @param store_dir Directory to persist the objects in, so they are
+            shared with other processes and twister runs
+        """
+        self.maxsize = maxsize
+        self.store_dir = store_dir
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, content, loader, persist=False):
+        """Return the object loaded from content, calling loader(content) on a miss.
+
+        @param kind Kind of the content, e.g. 'edt' or 'defconfig'
+        @param content File content as bytes or str
+        @param loader Function creating the object from the content
+        @param persist Also use the on-disk store, only worth it when loading
+            the stored pickle is cheaper than calling loader
+        """
+        data = content.encode() if isinstance(content, str) else content
+        key = (kind, hashlib.sha256(data).hexdigest())
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        value = None
+        store_file = None
+        if persist and self.store_dir:
+            store_file = os.path.join(self.store_dir,
+                                      f"{kind}-v{self.VERSION}-{key[1]}.pickle")
+            value = self._load(store_file)
+        if value is None:
+            value = loader(content)
+            if store_file:
+                self._store(store_file, value)
+
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _load(store_file):
+        try:
+            with open(store_file, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable filter data {store_file}: {e}")
+            return None
+        try:
+            # Marks the object as recently used for prune()
+            os.utime(store_file)
+        except OSError:
+            pass
+        return value
+
+    def prune(self, max_stored=None):
+        """Remove the least recently used objects from the on-disk store.
+
+        @param max_stored Number of objects to keep, MAX_STORED by default
+        """
+        if not self.store_dir:
+            return
+        if max_stored is None:
+            max_stored = self.MAX_STORED
+        try:
+            names = os.listdir(self.store_dir)
+        except OSError:
+            return
+
+        stored = []
+        for name in names:
+            path = os.path.join(self.store_dir, name)
+            try:
+                stored.append((os.stat(path).st_mtime, path))
+            except OSError:
+                continue
+        stored.sort(reverse=True)
+        for _, path in stored[max_stored:]:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logger.debug(f"Unable to remove filter data {path}: {e}")
+
+    def _store(self, store_file, value):
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            # Other processes may store the same file at the same time.
+            fd, tmp_file = tempfile.mkstemp(dir=self.store_dir, prefix='.filter')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, store_file)
+        except OSError as e:
+            logger.debug(f"Unable to store filter data {store_file}: {e}")
@@ -8,18 +8,20 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import argparse
+import asyncio
 import contextlib
 import logging
 import math
 import os
 import re
-import select
+import selectors
 import shlex
 import signal
 import subprocess
 import sys
 import threading
 import time
+from collections import deque
 from contextlib import contextmanager
 from pathlib import Path
 from queue import Empty, Queue
@@ -27,6 +29,7 @@ from queue import Empty, Queue
 import psutil
 from twisterlib.environment import ZEPHYR_BASE, strip_ansi_sequences
 from twisterlib.error import TwisterException
+from twisterlib.hardwaremap import DUTPool
 from twisterlib.platform import Platform
 from twisterlib.statuses import TwisterStatus
 
@@ -69,6 +72,217 @@ def terminate_process(proc):
     proc.kill()
 
 
+class LineReader:
+    """Reads the output of a test in large chunks and returns it line by line.
+
+    Subclasses implement _read(), which returns the next chunk of data,
+    b"" at the end of the output, or None if no data arrived in time.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, errors="strict"):
+        """
+        @param errors How to handle invalid UTF-8, see bytes.decode()
+        """
+        self.errors = errors
+        self.lines = deque()
+        self.partial = b""
+        self.eof = False
+
+    def readline(self, timeout=None):
+        """Return the next line of output, including the line ending.
+
+        A last line without line ending is returned as is, followed by ""
+        at the end of the output. Returns None if no complete line was
+        received within timeout seconds. With the "strict" error handler,
+        UnicodeDecodeError is raised for the line holding an invalid byte.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.lines:
+            if self.eof:
+                return ""
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            data = self._read(remaining)
+            if data is None:
+                return None
+            self._feed(data)
+        return self.lines.popleft().decode("utf-8", self.errors)
+
+    def _feed(self, data):
+        if not data:
+            self.eof = True
+            if self.partial:
+                self.lines.append(self.partial)
+                self.partial = b""
+        elif b"\n" not in data:
+            self.partial += data
+        else:
+            # UTF-8 sequences never contain b"\n", so lines are split before
+            # decoding and a line is decoded only once it is complete.
+            lines = (self.partial + data).split(b"\n")
+            self.partial = lines.pop()
+            self.lines.extend(line + b"\n" for line in lines)
+
+    def _read(self, timeout):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FdLineReader(LineReader):
+    """Reads lines from a pipe or FIFO file descriptor."""
+
+    def __init__(self, fd, errors="strict"):
+        super().__init__(errors)
+        self.fd = fd
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(fd, selectors.EVENT_READ)
+
+    def _read(self, timeout):
+        if not self.selector.select(timeout):
+            return None
+        return os.read(self.fd, self.CHUNK_SIZE)
+
+    def close(self):
+        self.selector.close()
+
+
+class QueueLineReader(LineReader):
+    """Reads lines from chunks put in a queue by another thread.
+
+    Used where the output cannot be waited for with selectors, e.g. for
+    named pipes on Windows.
+    """
+
+    def __init__(self, queue, errors="strict"):
+        super().__init__(errors)
+        self.queue = queue
+
+    def _read(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+
+class AsyncFdLineReader(LineReader):
+    """Reads lines from a pipe or FIFO file descriptor in an asyncio event loop."""
+
+    def __init__(self, fd, errors="strict", writer_exited=None):
+        """
+        @param fd File descriptor, it is made non-blocking and closed by close()
+        @param errors How to handle invalid UTF-8, see bytes.decode()
+        @param writer_exited Future done when the writer exited. Required to
+            detect the end of the output of a FIFO which is also open for
+            writing in this process.
+        """
+        super().__init__(errors)
+        self.fd = fd
+        self.writer_exited = writer_exited
+        os.set_blocking(fd, False)
+
+    async def areadline(self, timeout=None):
+        """Asynchronous equivalent of LineReader.readline()"""
+        if self.lines:
+            return self.lines.popleft().decode("utf-8", self.errors)
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not self.lines:
+            if self.eof:
+                return ""
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            data = await self._aread(remaining)
+            if data is None:
+                return None
+            self._feed(data)
+        return self.lines.popleft().decode("utf-8", self.errors)
+
+    async def _aread(self, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            try:
+                return os.read(self.fd, self.CHUNK_SIZE)
+            except BlockingIOError:
+                pass
+            # All data written before the writer exited has been read.
+            if self.writer_exited is not None and self.writer_exited.done():
+                return b""
+
+            readable = loop.create_future()
+            loop.add_reader(self.fd, lambda: readable.done() or readable.set_result(None))
+            waits = [readable]
+            if self.writer_exited is not None:
+                waits.append(self.writer_exited)
+            try:
+                done, _ = await asyncio.wait(
+                    waits,
+                    timeout=None if deadline is None else max(deadline - loop.time(), 0),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                loop.remove_reader(self.fd)
+                readable.cancel()
+            if not done:
+                return None
+
+    def close(self):
+        os.close(self.fd)
+
+
+class AsyncHandlerEngine:
+    """Runs the handlers of many test instances concurrently in one thread.
+
+    Handlers implementing handle_async() supervise their test with asyncio
+    instead of blocking a worker process for the whole test duration.
+    """
+
+    def __init__(self, jobs):
+        """
+        @param jobs Maximum number of handlers running at the same time
+        """
+        self.jobs = jobs
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = asyncio.Semaphore(jobs)
+        self.thread = threading.Thread(target=self.loop.run_forever, name="async-handlers",
+                                       daemon=True)
+
+    @staticmethod
+    def supports(handler):
+        return getattr(handler, "ready", False) and \
+            callable(getattr(handler, "handle_async", None))
+
+    def start(self):
+        self.thread.start()
+        logger.debug(f"Started asyncio handler engine for {self.jobs} tests")
+
+    def submit(self, coro):
+        """Run coro in the engine once one of the jobs is free.
+
+        Returns a concurrent.futures.Future of its result, cancelling it
+        also stops the test.
+        """
+        async def limited():
+            async with self.semaphore:
+                return await coro
+        return asyncio.run_coroutine_threadsafe(limited(), self.loop)
+
+    def stop(self):
+        async def cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self.thread.is_alive():
+            asyncio.run_coroutine_threadsafe(cancel_all(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+        self.loop.close()
+
+
 class Handler:
     def __init__(self, instance, type_str: str, options: argparse.Namespace,
                  generator_cmd: str | None = None, suite_name_check: bool = True):
@@ -105,6 +319,19 @@ class Handler:
         terminate_process(proc)
         self.terminated = True
 
+    async def terminate_async(self, proc):
+        """Equivalent of terminate() for an asyncio subprocess"""
+        with contextlib.suppress(ProcessLookupError, psutil.NoSuchProcess):
+            for child in psutil.Process(proc.pid).children(recursive=True):
+                with contextlib.suppress(ProcessLookupError, psutil.NoSuchProcess):
+                    os.kill(child.pid, signal.SIGTERM)
+        with contextlib.suppress(ProcessLookupError):
+            proc.terminate()
+            # sleep for a while before attempting to kill
+            await asyncio.sleep(0.5)
+            proc.kill()
+        self.terminated = True
+
     def _verify_ztest_suite_name(self, harness_status, detected_suite_names, handler_time):
         """
         If test suite names was found in test's C source code, then verify if
@@ -195,7 +422,6 @@ class BinaryHandler(Handler):
 
         self.seed = None
         self.extra_test_args = None
-        self.line = b""
         self.binary: str | None = None
 
     def try_kill_process_by_pid(self):
@@ -207,31 +433,32 @@ class BinaryHandler(Handler):
             with contextlib.suppress(ProcessLookupError, psutil.NoSuchProcess):
                 os.kill(pid, signal.SIGKILL)
 
-    def _output_reader(self, proc):
-        self.line = proc.stdout.readline()
-
-    def _output_handler(self, proc, harness):
+    @staticmethod
+    def _handle_output_line(line_decoded, harness, log_out_fp):
         suffix = '\\r\\n'
 
-        with open(self.log, "w") as log_out_fp:
+        stripped_line = line_decoded.rstrip()
+        if stripped_line.endswith(suffix):
+            stripped_line = stripped_line[:-len(suffix)].rstrip()
+        logger.debug(f"OUTPUT: {stripped_line}")
+        log_out_fp.write(strip_ansi_sequences(line_decoded))
+        log_out_fp.flush()
+        harness.handle(stripped_line)
+
+    def _output_handler(self, proc, harness):
+        with (
+            open(self.log, "w") as log_out_fp,
+            contextlib.closing(FdLineReader(proc.stdout.fileno(), "replace")) as reader
+        ):
             timeout_extended = False
             timeout_time = time.time() + self.get_test_timeout()
             while True:
                 this_timeout = timeout_time - time.time()
                 if this_timeout < 0:
                     break
-                reader_t = threading.Thread(target=self._output_reader, args=(proc,), daemon=True)
-                reader_t.start()
-                reader_t.join(this_timeout)
-                if not reader_t.is_alive() and self.line != b"":
-                    line_decoded = self.line.decode('utf-8', "replace")
-                    stripped_line = line_decoded.rstrip()
-                    if stripped_line.endswith(suffix):
-                        stripped_line = stripped_line[:-len(suffix)].rstrip()
-                    logger.debug(f"OUTPUT: {stripped_line}")
-                    log_out_fp.write(strip_ansi_sequences(line_decoded))
-                    log_out_fp.flush()
-                    harness.handle(stripped_line)
+                line_decoded = reader.readline(this_timeout)
+                if line_decoded:
+                    self._handle_output_line(line_decoded, harness, log_out_fp)
                     if (
                         harness.status != TwisterStatus.NONE
                         and not timeout_extended
@@ -243,7 +470,6 @@ class BinaryHandler(Handler):
                         else:
                             timeout_time = time.time() + 2
                 else:
-                    reader_t.join(0)
                     break
             try:
                 # POSIX arch based ztests end on their own,
@@ -385,6 +611,79 @@ class BinaryHandler(Handler):
 
         self._final_handle_actions(harness, handler_time)
 
+    async def _output_handler_async(self, proc, harness, reader):
+        with open(self.log, "w") as log_out_fp:
+            timeout_extended = False
+            timeout_time = time.time() + self.get_test_timeout()
+            while True:
+                this_timeout = timeout_time - time.time()
+                if this_timeout < 0:
+                    break
+                line_decoded = await reader.areadline(this_timeout)
+                if line_decoded:
+                    self._handle_output_line(line_decoded, harness, log_out_fp)
+                    if (
+                        harness.status != TwisterStatus.NONE
+                        and not timeout_extended
+                        or harness.capture_coverage
+                    ):
+                        timeout_extended = True
+                        if harness.capture_coverage:
+                            timeout_time = time.time() + 30
+                        else:
+                            timeout_time = time.time() + 2
+                else:
+                    break
+            try:
+                # POSIX arch based ztests end on their own,
+                # so let's give it up to 100ms to do so
+                await asyncio.wait_for(proc.wait(), 0.1)
+            except asyncio.TimeoutError:
+                await self.terminate_async(proc)
+
+    async def handle_async(self, harness):
+        """Equivalent of handle() for the AsyncHandlerEngine"""
+        command = self._create_command(False)
+
+        logger.debug("Spawning process: " +
+                     " ".join(shlex.quote(word) for word in command) + os.linesep +
+                     "in directory: " + self.build_dir)
+
+        start_time = time.time()
+
+        env = self._create_env()
+
+        stderr_log = f"{self.instance.build_dir}/handler_stderr.log"
+        read_fd, write_fd = os.pipe()
+        with (
+            contextlib.closing(AsyncFdLineReader(read_fd, "replace")) as reader,
+            open(stderr_log, "w+") as stderr_log_fp
+        ):
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *command, stdout=write_fd, stderr=stderr_log_fp, cwd=self.build_dir, env=env
+                )
+            finally:
+                os.close(write_fd)
+            try:
+                await self._output_handler_async(proc, harness, reader)
+                await proc.wait()
+            finally:
+                if proc.returncode is None:
+                    # cancelled
+                    await asyncio.shield(self.terminate_async(proc))
+            self.returncode = proc.returncode
+            if proc.returncode != 0:
+                self.instance.status = TwisterStatus.ERROR
+                self.instance.reason = f"BinaryHandler returned {proc.returncode}"
+            self.try_kill_process_by_pid()
+
+        handler_time = time.time() - start_time
+
+        self._update_instance_info(harness, handler_time)
+
+        self._final_handle_actions(harness, handler_time)
+
 
 class SimulationHandler(BinaryHandler):
     def __init__(
@@ -409,6 +708,9 @@ class SimulationHandler(BinaryHandler):
 
 
 class DeviceHandler(Handler):
+    # set by the runner, a DUTPool or a list of DUTs
+    duts = None
+
     def get_test_timeout(self):
         timeout = super().get_test_timeout()
         if self.options.enable_coverage:
@@ -530,6 +832,8 @@ class DeviceHandler(Handler):
         with self.acquire_dut_locks(duts_shared_hw):
             for _d in duts_shared_hw:
                 _d.available = 1
+        if isinstance(self.duts, DUTPool):
+            self.duts.release(dut)
 
     @staticmethod
     def run_custom_script(script, timeout):
@@ -668,21 +972,37 @@ class DeviceHandler(Handler):
 
     def get_hardware(self):
         hardware = None
+        start_time = time.time()
         try:
-            hardware = self.device_is_available(self.instance)
-            in_waiting = 0
-            while not hardware:
-                time.sleep(1)
-                in_waiting += 1
-                if in_waiting%60 == 0:
-                    logger.debug(f"Waiting for a DUT to run {self.instance.name}")
+            if isinstance(self.duts, DUTPool):
+                hardware = self._wait_for_hardware()
+            else:
                 hardware = self.device_is_available(self.instance)
+                in_waiting = 0
+                while not hardware:
+                    time.sleep(1)
+                    in_waiting += 1
+                    if in_waiting%60 == 0:
+                        logger.debug(f"Waiting for a DUT to run {self.instance.name}")
+                    hardware = self.device_is_available(self.instance)
         except TwisterException as error:
             self.instance.status = TwisterStatus.FAIL
             self.instance.reason = str(error)
             logger.error(self.instance.reason)
+        self.instance.metrics["dut_wait_time"] = time.time() - start_time
         return hardware
 
+    def _wait_for_hardware(self):
+        platform = self.instance.platform.name
+        fixture = self.instance.testsuite.harness_config.get("fixture")
+        while True:
+            hardware = self.duts.acquire(
+                platform, fixture, lambda: self.device_is_available(self.instance), timeout=60
+            )
+            if hardware:
+                return hardware
+            logger.debug(f"Waiting for a DUT to run {self.instance.name}")
+
     def _get_serial_device(self, serial_pty, hardware_serial):
         ser_pty_process = None
         if serial_pty:
@@ -916,8 +1236,7 @@ class QEMUHandler(Handler):
             handler.instance.reason = "Unknown"
 
     @staticmethod
-    def _thread(handler, timeout, outdir, logfile, fifo_fn, pid_fn,
-                harness, ignore_unexpected_eof=False):
+    def _thread_make_fifos(fifo_fn):
         fifo_in, fifo_out = QEMUHandler._thread_get_fifo_names(fifo_fn)
 
         # These in/out nodes are named from QEMU's perspective, not ours
@@ -928,119 +1247,149 @@ class QEMUHandler(Handler):
             os.unlink(fifo_out)
         os.mkfifo(fifo_out)
 
-        with (
-            # We don't do anything with out_fp but we need to open it for
-            # writing so that QEMU doesn't block, due to the way pipes work
-            open(fifo_in, "wb") as _,
-            # Disable internal buffering, we don't
-            # want read() or poll() to ever block if there is data in there
-            open(fifo_out, "rb", buffering=0) as in_fp,
-            open(logfile, "w") as log_out_fp
-        ):
-            start_time = time.time()
-            timeout_time = start_time + timeout
-            p = select.poll()
-            p.register(in_fp, select.POLLIN)
-            _status = TwisterStatus.NONE
-            _reason = None
-
-            line = ""
-            timeout_extended = False
-
-            pid = 0
-            if os.path.exists(pid_fn):
-                with open(pid_fn) as pid_file:
-                    pid = int(pid_file.read())
+        return fifo_in, fifo_out
 
-            while True:
-                this_timeout = int((timeout_time - time.time()) * 1000)
-                if timeout_extended:
-                    # Quit early after timeout extension if no more data is being received
-                    this_timeout = min(this_timeout, 1000)
-                if this_timeout < 0 or not p.poll(this_timeout):
-                    try:
-                        if pid and this_timeout > 0:
-                            # there's possibility we polled nothing because
-                            # of not enough CPU time scheduled by host for
-                            # QEMU process during p.poll(this_timeout)
-                            cpu_time = QEMUHandler._get_cpu_time(pid)
-                            if cpu_time < timeout and _status == TwisterStatus.NONE:
-                                timeout_time = time.time() + (timeout - cpu_time)
-                                continue
-                    except psutil.NoSuchProcess:
-                        pass
-                    except ProcessLookupError:
-                        _status = TwisterStatus.FAIL
-                        _reason = "Execution error"
-                        break
+    @staticmethod
+    def _thread_monitor(handler, timeout, log_out_fp, pid_fn, harness,
+                        ignore_unexpected_eof=False):
+        """Check the QEMU output line by line, independently of how it is read.
+
+        Generator yielding the number of seconds to wait for the next line,
+        which is sent back, or None if no line was received in time. An
+        UnicodeDecodeError raised by the reader is thrown in. Returns the
+        QEMU pid once the instance status is known.
+        """
+        start_time = time.time()
+        timeout_time = start_time + timeout
+        _status = TwisterStatus.NONE
+        _reason = None
 
-                    if _status == TwisterStatus.NONE:
-                        _status = TwisterStatus.FAIL
-                        _reason = "timeout"
-                    break
+        timeout_extended = False
 
-                if pid == 0 and os.path.exists(pid_fn):
-                    with open(pid_fn) as pid_file:
-                        pid = int(pid_file.read())
+        pid = 0
+        if os.path.exists(pid_fn):
+            with open(pid_fn) as pid_file:
+                pid = int(pid_file.read())
 
+        while True:
+            this_timeout = int((timeout_time - time.time()) * 1000)
+            if timeout_extended:
+                # Quit early after timeout extension if no more data is being received
+                this_timeout = min(this_timeout, 1000)
+            line = None
+            if this_timeout >= 0:
                 try:
-                    c = in_fp.read(1).decode("utf-8")
+                    line = yield this_timeout / 1000
                 except UnicodeDecodeError:
                     # Test is writing something weird, fail
                     _status = TwisterStatus.FAIL
                     _reason = "unexpected byte"
                     break
-
-                if c == "":
-                    # EOF, this shouldn't happen unless QEMU crashes
-                    if not ignore_unexpected_eof:
-                        _status = TwisterStatus.FAIL
-                        _reason = "unexpected eof"
+            if line is None:
+                try:
+                    if pid and this_timeout > 0:
+                        # there's possibility we polled nothing because
+                        # of not enough CPU time scheduled by host for
+                        # QEMU process while waiting for the output
+                        cpu_time = QEMUHandler._get_cpu_time(pid)
+                        if cpu_time < timeout and _status == TwisterStatus.NONE:
+                            timeout_time = time.time() + (timeout - cpu_time)
+                            continue
+                except psutil.NoSuchProcess:
+                    pass
+                except ProcessLookupError:
+                    _status = TwisterStatus.FAIL
+                    _reason = "Execution error"
                     break
-                line = line + c
-                if c != "\n":
-                    continue
 
-                # line contains a full line of data output from QEMU
-                log_out_fp.write(strip_ansi_sequences(line))
-                log_out_fp.flush()
-                line = line.rstrip()
-                logger.debug(f"QEMU ({pid}): {line}")
-
-                harness.handle(line)
-                if harness.status != TwisterStatus.NONE:
-                    # if we have registered a fail make sure the status is not
-                    # overridden by a false success message coming from the
-                    # testsuite
-                    if _status != TwisterStatus.FAIL:
-                        _status = harness.status
-                        _reason = harness.reason
-
-                    # if we get some status, that means test is doing well, we reset
-                    # the timeout and wait for 2 more seconds to catch anything
-                    # printed late. We wait much longer if code
-                    # coverage is enabled since dumping this information can
-                    # take some time.
-                    if not timeout_extended or harness.capture_coverage:
-                        timeout_extended = True
-                        if harness.capture_coverage:
-                            timeout_time = time.time() + 30
-                        else:
-                            timeout_time = time.time() + 2
-                line = ""
+                if _status == TwisterStatus.NONE:
+                    _status = TwisterStatus.FAIL
+                    _reason = "timeout"
+                break
 
-            handler_time = time.time() - start_time
-            logger.debug(
-                f"QEMU ({pid}) complete with {_status} ({_reason}) after {handler_time} seconds"
-            )
+            if pid == 0 and os.path.exists(pid_fn):
+                with open(pid_fn) as pid_file:
+                    pid = int(pid_file.read())
+
+            if not line.endswith("\n"):
+                # EOF, this shouldn't happen unless QEMU crashes
+                if not ignore_unexpected_eof:
+                    _status = TwisterStatus.FAIL
+                    _reason = "unexpected eof"
+                break
+
+            # line contains a full line of data output from QEMU
+            log_out_fp.write(strip_ansi_sequences(line))
+            log_out_fp.flush()
+            line = line.rstrip()
+            logger.debug(f"QEMU ({pid}): {line}")
 
-            QEMUHandler._thread_update_instance_info(handler, handler_time, _status, _reason)
+            harness.handle(line)
+            if harness.status != TwisterStatus.NONE:
+                # if we have registered a fail make sure the status is not
+                # overridden by a false success message coming from the
+                # testsuite
+                if _status != TwisterStatus.FAIL:
+                    _status = harness.status
+                    _reason = harness.reason
 
+                # if we get some status, that means test is doing well, we reset
+                # the timeout and wait for 2 more seconds to catch anything
+                # printed late. We wait much longer if code
+                # coverage is enabled since dumping this information can
+                # take some time.
+                if not timeout_extended or harness.capture_coverage:
+                    timeout_extended = True
+                    if harness.capture_coverage:
+                        timeout_time = time.time() + 30
+                    else:
+                        timeout_time = time.time() + 2
+
+        handler_time = time.time() - start_time
+        logger.debug(
+            f"QEMU ({pid}) complete with {_status} ({_reason}) after {handler_time} seconds"
+        )
+
+        QEMUHandler._thread_update_instance_info(handler, handler_time, _status, _reason)
+        return pid
+
+    @staticmethod
+    def _thread_kill_qemu(pid):
         if pid:
             # Oh well, as long as it's dead! User probably sent Ctrl-C
             with contextlib.suppress(ProcessLookupError, psutil.NoSuchProcess):
-                if pid:
-                    os.kill(pid, signal.SIGTERM)
+                os.kill(pid, signal.SIGTERM)
+
+    @staticmethod
+    def _thread(handler, timeout, outdir, logfile, fifo_fn, pid_fn,
+                harness, ignore_unexpected_eof=False):
+        fifo_in, fifo_out = QEMUHandler._thread_make_fifos(fifo_fn)
+
+        with (
+            # We don't do anything with out_fp but we need to open it for
+            # writing so that QEMU doesn't block, due to the way pipes work
+            open(fifo_in, "wb") as _,
+            # Disable internal buffering, we don't
+            # want read() or select() to ever block if there is data in there
+            open(fifo_out, "rb", buffering=0) as in_fp,
+            open(logfile, "w") as log_out_fp,
+            contextlib.closing(FdLineReader(in_fp.fileno())) as reader
+        ):
+            monitor = QEMUHandler._thread_monitor(handler, timeout, log_out_fp, pid_fn,
+                                                  harness, ignore_unexpected_eof)
+            try:
+                this_timeout = next(monitor)
+                while True:
+                    try:
+                        line = reader.readline(this_timeout)
+                    except UnicodeDecodeError as e:
+                        this_timeout = monitor.throw(e)
+                    else:
+                        this_timeout = monitor.send(line)
+            except StopIteration as e:
+                pid = e.value
+
+        QEMUHandler._thread_kill_qemu(pid)
 
         os.unlink(fifo_in)
         os.unlink(fifo_out)
@@ -1147,6 +1496,126 @@ class QEMUHandler(Handler):
 
         self._final_handle_actions(harness, 0)
 
+    @staticmethod
+    @contextmanager
+    def _unlinking(*paths):
+        try:
+            yield
+        finally:
+            for path in paths:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+
+    async def _monitor_async(self, timeout, harness, proc_exited, fifo_in, fifo_out):
+        """Equivalent of _thread() for the AsyncHandlerEngine, the FIFOs are
+        made by handle_async() before QEMU is started."""
+        # Opening a FIFO blocks until the other side opens it too, which
+        # read-write opening avoids. QEMU then does not see the end of its
+        # input, and the end of its output is detected with proc_exited.
+        in_fd = os.open(fifo_in, os.O_RDWR)
+        try:
+            with (
+                contextlib.closing(
+                    AsyncFdLineReader(os.open(fifo_out, os.O_RDWR), writer_exited=proc_exited)
+                ) as reader,
+                open(self.log_fn, "w") as log_out_fp
+            ):
+                monitor = self._thread_monitor(self, timeout, log_out_fp, self.pid_fn,
+                                               harness, self.ignore_unexpected_eof)
+                try:
+                    this_timeout = next(monitor)
+                    while True:
+                        try:
+                            line = await reader.areadline(this_timeout)
+                        except UnicodeDecodeError as e:
+                            this_timeout = monitor.throw(e)
+                        else:
+                            this_timeout = monitor.send(line)
+                except StopIteration as e:
+                    pid = e.value
+        finally:
+            os.close(in_fd)
+
+        self._thread_kill_qemu(pid)
+
+    async def handle_async(self, harness):
+        """Equivalent of handle() for the AsyncHandlerEngine"""
+        self.run = True
+
+        domain_build_dir = self.get_default_domain_build_dir()
+
+        command = self._create_command(domain_build_dir)
+
+        self._set_qemu_filenames(domain_build_dir)
+
+        logger.debug(f"Running {self.name} ({self.type_str})")
+
+        is_timeout = False
+        qemu_pid = None
+        max_time = time.time() + self.get_test_timeout()
+
+        # QEMU opens the FIFOs as it starts
+        fifo_in, fifo_out = self._thread_make_fifos(self.fifo_fn)
+
+        with (
+            open(self.stdout_fn, "w") as stdout_fp,
+            open(self.stderr_fn, "w") as stderr_fp,
+            self._unlinking(fifo_in, fifo_out)
+        ):
+            proc = await asyncio.create_subprocess_exec(
+                *command, stdout=stdout_fp, stderr=stderr_fp, cwd=self.build_dir
+            )
+            proc_exited = asyncio.ensure_future(proc.wait())
+            monitor = asyncio.ensure_future(
+                self._monitor_async(self.get_test_timeout(), harness, proc_exited,
+                                    fifo_in, fifo_out)
+            )
+            try:
+                try:
+                    await asyncio.wait_for(asyncio.shield(proc_exited), self.get_test_timeout())
+                except asyncio.TimeoutError:
+                    # sometimes QEMU can't handle SIGTERM signal correctly
+                    # in that case kill -9 QEMU process directly and leave
+                    # twister to judge testing result by console output
+
+                    is_timeout = True
+                    await self.terminate_async(proc)
+                    if harness.status == TwisterStatus.PASS:
+                        self.returncode = 0
+                    else:
+                        self.returncode = proc.returncode
+                else:
+                    if os.path.exists(self.pid_fn):
+                        with open(self.pid_fn) as pid_file:
+                            qemu_pid = int(pid_file.read())
+                    logger.debug(
+                        f"No timeout, return code from QEMU ({qemu_pid}): {proc.returncode}"
+                    )
+                    self.returncode = proc.returncode
+                # Need to wait for harness to finish processing
+                # output from QEMU. Otherwise it might miss some
+                # messages.
+                await asyncio.wait([monitor], timeout=max(max_time - time.time(), 0))
+                if not monitor.done():
+                    logger.debug("Timed out while monitoring QEMU output")
+            finally:
+                if not monitor.done():
+                    monitor.cancel()
+                if proc.returncode is None:
+                    await asyncio.shield(self.terminate_async(proc))
+                await asyncio.shield(proc_exited)
+
+            if os.path.exists(self.pid_fn):
+                with open(self.pid_fn) as pid_file:
+                    qemu_pid = int(pid_file.read())
+                os.unlink(self.pid_fn)
+
+        logger.debug(f"return code from QEMU ({qemu_pid}): {self.returncode}")
+
+        self._update_instance_info(harness, is_timeout)
+
+        self._final_handle_actions(harness, 0)
+
     def get_fifo(self):
         return self.fifo_fn
 
@@ -1255,7 +1724,7 @@ class QEMUWinHandler(Handler):
                     self.instance.reason = f"Exited with {self.returncode}"
             self.instance.add_missing_case_status(TwisterStatus.BLOCK)
 
-    def _enqueue_char(self, queue):
+    def _enqueue_output(self, queue):
         while not self.stop_thread:
             if not self.pipe_handle:
                 try:
@@ -1266,11 +1735,11 @@ class QEMUWinHandler(Handler):
                         time.sleep(1)
                 continue
 
-            c = ""
+            data = b""
             try:
-                c = os.read(self.pipe_handle, 1)
+                data = os.read(self.pipe_handle, LineReader.CHUNK_SIZE)
             finally:
-                queue.put(c)
+                queue.put(data)
 
     def _monitor_output(
         self,
@@ -1285,9 +1754,9 @@ class QEMUWinHandler(Handler):
         timeout_time = start_time + timeout
         _status = TwisterStatus.NONE
         _reason = None
-        line = ""
         timeout_extended = False
         self.pid = 0
+        reader = QueueLineReader(queue)
 
         log_out_fp = self._open_log_file(logfile)
 
@@ -1298,7 +1767,7 @@ class QEMUWinHandler(Handler):
                     if self.pid and this_timeout > 0:
                         # there's possibility we polled nothing because
                         # of not enough CPU time scheduled by host for
-                        # QEMU process during p.poll(this_timeout)
+                        # QEMU process during reader.readline()
                         cpu_time = self._get_cpu_time(self.pid)
                         if cpu_time < timeout and _status == TwisterStatus.NONE:
                             timeout_time = time.time() + (timeout - cpu_time)
@@ -1324,26 +1793,22 @@ class QEMUWinHandler(Handler):
                     self.pid = int(pid_file.read())
 
             try:
-                c = queue.get_nowait()
-            except Empty:
-                continue
-            try:
-                c = c.decode("utf-8")
+                # Wake up regularly to check for the pid file
+                line = reader.readline(min(this_timeout / 1000, 1))
             except UnicodeDecodeError:
                 # Test is writing something weird, fail
                 _status = TwisterStatus.FAIL
                 _reason = "unexpected byte"
                 break
+            if line is None:
+                continue
 
-            if c == "":
+            if not line.endswith("\n"):
                 # EOF, this shouldn't happen unless QEMU crashes
                 if not ignore_unexpected_eof:
                     _status = TwisterStatus.FAIL
                     _reason = "unexpected eof"
                 break
-            line = line + c
-            if c != "\n":
-                continue
 
             # line contains a full line of data output from QEMU
             log_out_fp.write(line)
@@ -1371,7 +1836,6 @@ class QEMUWinHandler(Handler):
                         timeout_time = time.time() + 30
                     else:
                         timeout_time = time.time() + 2
-            line = ""
 
         self.stop_thread = True
 
@@ -1399,7 +1863,7 @@ class QEMUWinHandler(Handler):
                               cwd=self.build_dir) as proc:
             logger.debug(f"Spawning QEMUHandler Thread for {self.name}")
 
-            self.thread = threading.Thread(target=self._enqueue_char, args=(queue,))
+            self.thread = threading.Thread(target=self._enqueue_output, args=(queue,))
             self.thread.daemon = True
             self.thread.start()
 
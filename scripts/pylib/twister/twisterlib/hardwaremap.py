@@ -8,7 +8,8 @@ import logging
 import os
 import platform
 import re
-from multiprocessing import Lock, Value
+import time
+from multiprocessing import Condition, Lock, Value
 from pathlib import Path
 
 import scl
@@ -129,6 +130,74 @@ class DUT:
     def __repr__(self):
         return f"<{self.platform} ({self.product}) on {self.serial}>"
 
+
+class DUTPool:
+    """DUTs shared by the processes running tests on hardware.
+
+    Tests waiting for a DUT block on a condition of their (platform, fixture)
+    key, which is notified as soon as a DUT serving the key is released,
+    instead of polling the DUTs. The pool must be created before the worker
+    processes are started.
+    """
+
+    def __init__(self, duts):
+        self.duts = list(duts)
+        self._lock = Lock()
+        self._released = {}
+        for d in self.duts:
+            for key in self._keys(d):
+                if key not in self._released:
+                    self._released[key] = Condition(self._lock)
+
+    def __iter__(self):
+        return iter(self.duts)
+
+    def __len__(self):
+        return len(self.duts)
+
+    @staticmethod
+    def _keys(dut):
+        yield dut.platform, None
+        for fixture in dut.fixtures:
+            yield dut.platform, fixture.split(sep=':')[0]
+
+    def acquire(self, platform, fixture, select, timeout=None):
+        """Wait until select() returns a DUT for the platform and fixture.
+
+        select() is called with the pool locked, it must mark the DUT it
+        returns as unavailable, or return None if no DUT is available.
+        Returns None if no DUT was selected within timeout seconds.
+        """
+        released = self._released.get((platform, fixture))
+        if released is None:
+            # No DUT can serve the key, let select() report it.
+            return select()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with released:
+            while (dut := select()) is None:
+                if deadline is None:
+                    released.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    released.wait(remaining)
+            return dut
+
+    def release(self, dut):
+        """Wake up a test waiting for each key served by the released dut.
+
+        Must be called after the DUT (and the DUTs sharing its hardware) are
+        marked as available.
+        """
+        with self._lock:
+            for d in self.duts:
+                if d.id == dut.id:
+                    for key in self._keys(d):
+                        self._released[key].notify()
+
+
 class HardwareMap:
     schema_path = os.path.join(ZEPHYR_BASE, "scripts", "schemas", "twister", "hwmap-schema.yaml")
 
@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: Apache-2.0
 from __future__ import annotations
 
+import argparse
 import json
 import logging
 import os
@@ -10,8 +11,10 @@ import shlex
 import shutil
 import subprocess
 import sys
+import tempfile
 import threading
 import time
+import timeit
 import xml.etree.ElementTree as ET
 from collections import OrderedDict
 from enum import Enum
@@ -23,9 +26,11 @@ from twisterlib.constants import SUPPORTED_SIMS_IN_PYTEST
 from twisterlib.environment import PYTEST_PLUGIN_INSTALLED, ZEPHYR_BASE
 from twisterlib.error import ConfigurationError, StatusAttributeError
 from twisterlib.handlers import Handler, terminate_process
+from twisterlib.platform import Platform
 from twisterlib.reports import ReportStatus
 from twisterlib.statuses import TwisterStatus
 from twisterlib.testinstance import TestInstance
+from twisterlib.testsuite import TestSuite
 
 logger = logging.getLogger('twister')
 logger.setLevel(logging.DEBUG)
@@ -33,6 +38,65 @@ logger.setLevel(logging.DEBUG)
 _WINDOWS = platform.system() == 'Windows'
 
 
+class LineMatcher:
+    """Find the first of several patterns matching a line with a single scan.
+
+    Lines without any of the literals required by the patterns are rejected
+    by one search for all the literals. The other lines are matched against
+    an alternation of all the patterns, which are tried in the given order,
+    so the result is the same as calling re.search() or re.match() with each
+    pattern in sequence.
+    """
+
+    def __init__(self, rules):
+        """
+        @param rules List of (name, pattern, literal, anchored) tuples in
+            priority order. The literal must be part of any line matched by
+            the pattern, anchored patterns are matched at the start of the
+            line as by re.match()
+        """
+        self.patterns = {}
+        alternatives = []
+        for name, pattern, _, anchored in rules:
+            pattern = re.compile(pattern)
+            self.patterns[name] = (pattern, anchored)
+            # The groups are only needed in the match of the selected pattern,
+            # named groups of different patterns would clash in the alternation.
+            body = re.sub(r'\(\?P<\w+>', '(?:', pattern.pattern)
+            prefix = '' if anchored else r'[\s\S]*?'
+            alternatives.append(f'(?P<{name}>(?={prefix}(?:{body})))')
+        self.prefilter = re.compile('|'.join(re.escape(rule[2]) for rule in rules))
+        self.dispatch = re.compile('|'.join(alternatives))
+
+    def match(self, line):
+        """Return the name and the match object of the first matching pattern.
+
+        Returns (None, None) if no pattern matches the line.
+        """
+        if not self.prefilter.search(line):
+            return None, None
+        dispatch_match = self.dispatch.match(line)
+        if not dispatch_match:
+            return None, None
+        name = dispatch_match.lastgroup
+        pattern, anchored = self.patterns[name]
+        return name, pattern.match(line) if anchored else pattern.search(line)
+
+    @staticmethod
+    def any_of(patterns):
+        """Return a pattern searching for all the patterns at once.
+
+        Returns None if the patterns cannot be combined, e.g. because they
+        use backreferences, global flags or the same group names.
+        """
+        if any(re.search(r'\\\d|\(\?P=', p.pattern) for p in patterns):
+            return None
+        try:
+            return re.compile('|'.join(f'(?:{p.pattern})' for p in patterns))
+        except re.error:
+            return None
+
+
 class Harness:
     GCOV_START = "GCOV_COVERAGE_DUMP_START"
     GCOV_END = "GCOV_COVERAGE_DUMP_END"
@@ -68,6 +132,8 @@ class Harness:
         self.instance: TestInstance | None = None
         self.testcase_output = ""
         self._match = False
+        # extracts the coverage data while the test runs, set by the runner
+        self.gcov_collector = None
 
 
     @property
@@ -154,7 +220,7 @@ class Harness:
 
         self.parse_record(line)
 
-        runid_match = re.search(self.run_id_pattern, line)
+        runid_match = "RunID: " in line and re.search(self.run_id_pattern, line)
         if runid_match:
             run_id = runid_match.group("run_id")
             self.run_id_exists = True
@@ -180,6 +246,9 @@ class Harness:
         elif self.GCOV_END in line:
             self.capture_coverage = False
 
+        if self.gcov_collector:
+            self.gcov_collector.feed(line)
+
 class Robot(Harness):
 
     is_robot_test = True
@@ -251,6 +320,8 @@ class Robot(Harness):
 
 class Console(Harness):
 
+    any_pattern = None
+
     def get_testcase_name(self):
         '''
         Get current TestCase name.
@@ -282,6 +353,9 @@ class Console(Harness):
             for r in self.regex:
                 self.patterns.append(re.compile(r))
             self.patterns_expected = len(self.patterns)
+            # Unordered patterns are all searched in every line, rule out
+            # most of the lines with one search for any of them.
+            self.any_pattern = None if self.ordered else LineMatcher.any_of(self.patterns)
         else:
             self.status = TwisterStatus.FAIL
             tc = self.instance.set_case_status_by_name(
@@ -309,13 +383,14 @@ class Console(Harness):
                 if self.next_pattern >= len(self.patterns):
                     self.status = TwisterStatus.PASS
         elif self.type == "multi_line" and not self.ordered:
-            for i, pattern in enumerate(self.patterns):
-                r = self.regex[i]
-                if pattern.search(line) and r not in self.matches:
-                    self.matches[r] = line
-                    logger.debug(f"HARNESS:{self.__class__.__name__}:EXPECTED("
-                                 f"{len(self.matches)}/{self.patterns_expected}):"
-                                 f"'{pattern.pattern}'")
+            if self.any_pattern is None or self.any_pattern.search(line):
+                for i, pattern in enumerate(self.patterns):
+                    r = self.regex[i]
+                    if r not in self.matches and pattern.search(line):
+                        self.matches[r] = line
+                        logger.debug(f"HARNESS:{self.__class__.__name__}:EXPECTED("
+                                     f"{len(self.matches)}/{self.patterns_expected}):"
+                                     f"'{pattern.pattern}'")
             if len(self.matches) == len(self.regex):
                 self.status = TwisterStatus.PASS
         else:
@@ -789,6 +864,16 @@ class Test(Harness):
     test_case_summary_pattern = re.compile(
         r" - (PASS|FAIL|SKIP) - \[([^\.]*).(test_)?(\S*)\] duration = (\d*[.,]?\d*) seconds"
     )
+    # All the patterns above in the order handle() tries them, with a literal
+    # part of each, to classify a line with one scan.
+    line_matcher = LineMatcher([
+        ('suite_start', test_suite_start_pattern, 'Running TESTSUITE ', False),
+        ('suite_end', test_suite_end_pattern, 'TESTSUITE ', False),
+        ('case_start', test_case_start_pattern, 'START - ', False),
+        ('case_end', test_case_end_pattern, ' seconds', True),
+        ('suite_summary', test_suite_summary_pattern, 'SUITE ', True),
+        ('case_summary', test_case_summary_pattern, ' duration = ', True),
+    ])
 
 
     def get_testcase(self, tc_name, phase, ts_name=None):
@@ -887,17 +972,17 @@ class Test(Harness):
 
 
     def handle(self, line):
-        testcase_match = None
         if self._match:
             self.testcase_output += line + "\n"
 
-        if test_suite_start_match := re.search(self.test_suite_start_pattern, line):
-            self.start_suite(test_suite_start_match.group("suite_name"))
-        elif test_suite_end_match := re.search(self.test_suite_end_pattern, line):
-            suite_name=test_suite_end_match.group("suite_name")
+        kind, match = self.line_matcher.match(line)
+        if kind == 'suite_start':
+            self.start_suite(match.group("suite_name"))
+        elif kind == 'suite_end':
+            suite_name=match.group("suite_name")
             self.end_suite(suite_name)
-        elif testcase_match := re.search(self.test_case_start_pattern, line):
-            tc_name = testcase_match.group(2)
+        elif kind == 'case_start':
+            tc_name = match.group(2)
             tc = self.get_testcase(tc_name, 'TC_START')
             self.start_case(tc.name)
             # Mark the test as started, if something happens here, it is mostly
@@ -910,36 +995,36 @@ class Test(Harness):
         # some testcases are skipped based on predicates and do not show up
         # during test execution, however they are listed in the summary. Parse
         # the summary for status and use that status instead.
-        elif result_match := self.test_case_end_pattern.match(line):
-            matched_status = result_match.group(1)
-            tc_name = result_match.group(3)
+        elif kind == 'case_end':
+            matched_status = match.group(1)
+            tc_name = match.group(3)
             tc = self.get_testcase(tc_name, 'TC_END')
             self.end_case(tc.name)
             tc.status = TwisterStatus[matched_status]
             if tc.status == TwisterStatus.SKIP:
                 tc.reason = "ztest skip"
-            tc.duration = float(result_match.group(4))
+            tc.duration = float(match.group(4))
             if tc.status == TwisterStatus.FAIL:
                 tc.output = self.testcase_output
             self.testcase_output = ""
             self._match = False
             self.ztest = True
-        elif test_suite_summary_match := self.test_suite_summary_pattern.match(line):
-            suite_name=test_suite_summary_match.group("suite_name")
-            suite_status=test_suite_summary_match.group("suite_status")
+        elif kind == 'suite_summary':
+            suite_name=match.group("suite_name")
+            suite_status=match.group("suite_status")
             self._match = False
             self.ztest = True
             self.end_suite(suite_name, 'TS_SUM', suite_status=suite_status)
-        elif test_case_summary_match := self.test_case_summary_pattern.match(line):
-            matched_status = test_case_summary_match.group(1)
-            suite_name = test_case_summary_match.group(2)
-            tc_name = test_case_summary_match.group(4)
+        elif kind == 'case_summary':
+            matched_status = match.group(1)
+            suite_name = match.group(2)
+            tc_name = match.group(4)
             tc = self.get_testcase(tc_name, 'TS_SUM', suite_name)
             self.end_case(tc.name, 'TS_SUM')
             tc.status = TwisterStatus[matched_status]
             if tc.status == TwisterStatus.SKIP:
                 tc.reason = "ztest skip"
-            tc.duration = float(test_case_summary_match.group(5))
+            tc.duration = float(match.group(5))
             if tc.status == TwisterStatus.FAIL:
                 tc.output = self.testcase_output
             self.testcase_output = ""
@@ -1147,3 +1232,66 @@ class HarnessImporter:
         except AttributeError as e:
             logger.debug(f"harness {harness_name} not implemented: {e}")
             return None
+
+
+def benchmark(log_files, harness_name='Test', harness_config=None, repeat=3):
+    """Replay recorded handler.log files through a harness.
+
+    The lines of the logs are handled as the handlers do with the output of
+    a test, by a harness configured for a dummy test instance.
+    Returns the number of lines replayed, the best number of lines handled
+    per second out of repeat runs and the harness of the last run.
+    """
+    lines = []
+    for log_file in log_files:
+        with open(log_file, errors='replace') as log:
+            lines.extend(line.rstrip() for line in log)
+
+    platform = Platform()
+    platform.name = platform.normalized_name = 'benchmark'
+    testsuite = TestSuite(ZEPHYR_BASE, ZEPHYR_BASE, 'harness.benchmark', data={
+        'harness': harness_name.lower(),
+        'harness_config': harness_config or {},
+        'ignore_faults': False,
+        'sysbuild': False,
+    })
+    outdir = tempfile.gettempdir()
+    harness = None
+
+    def replay():
+        nonlocal harness
+        instance = TestInstance(testsuite, platform, 'zephyr', outdir)
+        instance.handler = Handler(instance, 'benchmark', argparse.Namespace(verbose=0))
+        harness = HarnessImporter.get_harness(harness_name.capitalize())
+        harness.configure(instance)
+        for line in lines:
+            harness.handle(line)
+
+    best = min(timeit.repeat(replay, number=1, repeat=repeat))
+    rate = len(lines) / best if best else float('inf')
+    return len(lines), rate, harness
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=scripts:scripts/pylib/twister python3 -m twisterlib.harness handler.log
+    parser = argparse.ArgumentParser(
+        description="Measure the harness throughput by replaying recorded handler.log files."
+    )
+    parser.add_argument('log_files', nargs='+', metavar='LOG_FILE')
+    parser.add_argument('--harness', default='Test',
+                        help="Harness to replay the logs with, default: %(default)s")
+    parser.add_argument('--regex', action='append',
+                        help="Pattern of the console harness, may be repeated")
+    parser.add_argument('--unordered', action='store_true',
+                        help="Match the console harness patterns in any order")
+    args = parser.parse_args()
+
+    config = None
+    if args.regex:
+        config = {
+            'type': 'multi_line' if len(args.regex) > 1 else 'one_line',
+            'regex': args.regex,
+            'ordered': not args.unordered,
+        }
+    count, rate, harness = benchmark(args.log_files, args.harness, config)
+    print(f"{args.harness}: {count} lines, {rate:.0f} lines/s, status {harness.status}")
@@ -10,6 +10,7 @@ import logging
 import os
 import shutil
 from argparse import Namespace
+from collections import defaultdict
 from itertools import groupby
 
 import list_boards
@@ -29,9 +30,13 @@ class Simulator:
         assert data["name"] in SUPPORTED_SIMS
         self.name = data["name"]
         self.exec = data.get("exec")
+        self._runnable = None
 
     def is_runnable(self) -> bool:
-        return not bool(self.exec) or bool(shutil.which(self.exec))
+        # Checked for every instance of the platform, look the executable up once.
+        if self._runnable is None:
+            self._runnable = not bool(self.exec) or bool(shutil.which(self.exec))
+        return self._runnable
 
     def __str__(self):
         return f"Simulator(name: {self.name}, exec: {self.exec})"
@@ -189,6 +194,68 @@ class Platform:
         return f"<{self.name} on {self.arch}>"
 
 
+class PlatformIndex:
+    """Set based index of platform attributes used by static test filters.
+
+    Allows finding all platforms failing a test suite constraint with a few
+    set operations instead of checking every platform one by one.
+    The index is a snapshot, it has to be rebuilt if platforms are modified.
+    """
+
+    def __init__(self, platforms: list[Platform]):
+        self.names = {p.name for p in platforms}
+        self._attrs = {
+            'arch': defaultdict(set),
+            'vendor': defaultdict(set),
+            'type': defaultdict(set),
+        }
+        self._features = defaultdict(set)
+        self._ignore_tags = defaultdict(set)
+        self._only_tags = {}
+        self._platforms = platforms
+        self._below = {}
+        self.env_unsatisfied = set()
+
+        for p in platforms:
+            for attr, index in self._attrs.items():
+                index[getattr(p, attr)].add(p.name)
+            for feature in p.supported:
+                self._features[feature].add(p.name)
+            for tag in p.ignore_tags:
+                self._ignore_tags[tag].add(p.name)
+            if p.only_tags:
+                self._only_tags[p.name] = set(p.only_tags)
+            if not p.env_satisfied:
+                self.env_unsatisfied.add(p.name)
+
+    def with_attr(self, attr: str, values) -> set[str]:
+        """Names of platforms having attribute 'attr' set to one of 'values'."""
+        index = self._attrs[attr]
+        return set().union(*(index.get(v, ()) for v in values))
+
+    def below(self, attr: str, minimum) -> set[str]:
+        """Names of platforms with attribute 'attr' (ram, flash) below 'minimum'."""
+        key = (attr, minimum)
+        if key not in self._below:
+            self._below[key] = {
+                p.name for p in self._platforms if getattr(p, attr) < minimum
+            }
+        return self._below[key]
+
+    def lacking_features(self, features) -> set[str]:
+        """Names of platforms not supporting all of 'features'."""
+        supporting = set(self.names)
+        for feature in features:
+            supporting &= self._features.get(feature, set())
+        return self.names - supporting
+
+    def excluded_by_tags(self, tags) -> set[str]:
+        """Names of platforms which exclude a suite with 'tags' (ignore_tags/only_tags)."""
+        excluded = set().union(*(self._ignore_tags.get(t, ()) for t in tags))
+        excluded.update(name for name, only in self._only_tags.items() if not only & tags)
+        return excluded
+
+
 def generate_platforms(board_roots, soc_roots, arch_roots):
     """Initialize and yield all Platform instances.
 
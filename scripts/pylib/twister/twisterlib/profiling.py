@@ -0,0 +1,249 @@
+# vim: set syntax=python ts=4 :
+#
+# Copyright (c) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""Profiling of the phases of twister and of its test instances.
+
+With --profile, the following is recorded for each phase of an instance
+(filter_cmake, cmake, build, size_calc, handler, coverage):
+- the wall time
+- the CPU time of twister
+- the CPU time of the child processes
+- the peak RSS of the child processes
+- the time the instance waited in the queue
+
+The records are written into the JSON report. The global phases, like the
+discovery of the tests, go into the environment section. The phases which
+end after the JSON report is serialized (report, save_reports) are
+timing-only: they are only written to the trace.
+
+With --profile-trace, all phases are also written to a Chrome trace event
+file. The file can be opened with Perfetto or chrome://tracing, and shows
+what each process was doing over time.
+"""
+
+import glob
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, the resources of child processes are not recorded.
+    resource = None
+
+logger = logging.getLogger('twister')
+logger.setLevel(logging.DEBUG)
+
+# Names of the phases of the ProjectBuilder operations, other operations keep their name
+PHASE_NAMES = {
+    'filter': 'filter_cmake',
+    'gather_metrics': 'size_calc',
+    'run': 'handler',
+}
+
+# Phases ending after the reports are serialized, which are only traced
+TRACE_ONLY_PHASES = ['report', 'save_reports']
+
+
+def _children_usage():
+    """Return the CPU time and the peak RSS in kB of the waited for child processes."""
+    if resource is None:
+        return 0.0, 0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss
+
+
+class Phase:
+    """A phase being profiled, with the resource usage at its start."""
+
+    def __init__(self, name, instance, lane):
+        self.name = name
+        self.instance = instance
+        self.lane = lane
+        self.stopped = False
+        self.start = time.time()
+        self.cpu = time.process_time()
+        self.children_cpu, self.children_rss = _children_usage()
+
+
+class Profiler:
+    """Records the phases of the process and of the instances it processes.
+
+    The configuration is kept in class attributes, which are set by setup()
+    before the worker processes are started, so they inherit it.
+    """
+
+    enabled = False
+    # Directory of the trace event files of the processes, None without a trace
+    trace_dir = None
+    start_time = 0.0
+    main_pid = None
+    # Records of the global phases of the main process
+    phases = {}
+
+    # Phases running in this process, by trace lane
+    _lanes = []
+    _trace_file = None
+    _trace_pid = None
+
+    @classmethod
+    def setup(cls, trace_dir=None):
+        """Enable profiling.
+
+        @param trace_dir Directory for the trace events, None to not record them
+        """
+        cls.enabled = True
+        cls.start_time = time.time()
+        cls.main_pid = os.getpid()
+        cls.phases = {}
+        cls.trace_dir = trace_dir
+        if trace_dir:
+            shutil.rmtree(trace_dir, ignore_errors=True)
+            os.makedirs(trace_dir)
+
+    @classmethod
+    def queued(cls, instance):
+        """Mark an instance as waiting for its next phase."""
+        if cls.enabled:
+            instance.queued_at = time.time()
+
+    @staticmethod
+    def instance_profile(instance):
+        if instance.profile is None:
+            instance.profile = {'queue_wait': 0.0, 'phases': {}}
+        return instance.profile
+
+    @classmethod
+    def start(cls, name, instance=None):
+        """Start a phase.
+
+        @param name Name of the phase, or of the ProjectBuilder operation
+        @param instance Test instance, None for a global phase
+        @return The phase to pass to stop(), None when profiling is disabled
+        """
+        if not cls.enabled:
+            return None
+        if instance is not None and instance.queued_at is not None:
+            profile = cls.instance_profile(instance)
+            wait = max(0.0, time.time() - instance.queued_at)
+            profile['queue_wait'] = round(profile['queue_wait'] + wait, 3)
+            instance.queued_at = None
+
+        # Phases can overlap when handlers are run asynchronously, each gets a lane in the trace.
+        if None in cls._lanes:
+            lane = cls._lanes.index(None)
+        else:
+            lane = len(cls._lanes)
+            cls._lanes.append(None)
+        phase = Phase(PHASE_NAMES.get(name, name), instance, lane)
+        cls._lanes[lane] = phase
+        return phase
+
+    @classmethod
+    def stop(cls, phase):
+        """Stop a phase and record it, phases which were stopped before are ignored."""
+        if phase is None or phase.stopped:
+            return
+        phase.stopped = True
+        end = time.time()
+        children_cpu, children_rss = _children_usage()
+        if phase.lane < len(cls._lanes) and cls._lanes[phase.lane] is phase:
+            cls._lanes[phase.lane] = None
+
+        record = {
+            'wall': end - phase.start,
+            'cpu': time.process_time() - phase.cpu,
+            'children_cpu': children_cpu - phase.children_cpu,
+        }
+        # The peak RSS of the child processes is only known per process. It is
+        # recorded for the phase, when one of its child processes raised it.
+        if children_rss > phase.children_rss:
+            record['max_rss_kb'] = children_rss
+
+        if phase.name not in TRACE_ONLY_PHASES:
+            if phase.instance is not None:
+                phases = cls.instance_profile(phase.instance)['phases']
+            else:
+                phases = cls.phases
+            cls._add_record(phases.setdefault(phase.name, {'count': 0}), record)
+
+        if cls.trace_dir:
+            cls._trace_event(phase, end, record)
+
+    @staticmethod
+    def _add_record(total, record):
+        total['count'] += 1
+        for key, value in record.items():
+            if key == 'max_rss_kb':
+                total[key] = max(total.get(key, 0), value)
+            else:
+                total[key] = round(total.get(key, 0.0) + value, 3)
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name, instance=None):
+        """Profile the enclosed code as a phase."""
+        phase = cls.start(name, instance)
+        try:
+            yield
+        finally:
+            cls.stop(phase)
+
+    @classmethod
+    def _trace_event(cls, phase, end, record):
+        pid = os.getpid()
+        events = []
+        if cls._trace_pid != pid:
+            # Files are not shared with the parent process of a worker.
+            cls._trace_pid = pid
+            cls._trace_file = open(os.path.join(cls.trace_dir, f"{pid}.jsonl"), 'a')
+            name = 'twister' if pid == cls.main_pid else f'worker {pid}'
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': name}})
+        args = dict(record)
+        if phase.instance is not None:
+            args['instance'] = phase.instance.name
+        events.append({
+            'name': phase.name,
+            'cat': 'instance' if phase.instance is not None else 'twister',
+            'ph': 'X',
+            'ts': round((phase.start - cls.start_time) * 1e6),
+            'dur': round((end - phase.start) * 1e6),
+            'pid': pid,
+            'tid': phase.lane,
+            'args': args,
+        })
+        try:
+            for event in events:
+                cls._trace_file.write(json.dumps(event) + '\n')
+            cls._trace_file.flush()
+        except OSError as e:
+            logger.debug(f"Unable to write the trace event of {phase.name}: {e}")
+
+    @classmethod
+    def write_trace(cls, filename):
+        """Write the trace events of all processes to a Chrome trace event file."""
+        if not cls.trace_dir:
+            return
+        if cls._trace_file and cls._trace_pid == os.getpid():
+            cls._trace_file.close()
+            cls._trace_file = None
+            cls._trace_pid = None
+
+        events = []
+        for trace_file in sorted(glob.glob(os.path.join(cls.trace_dir, '*.jsonl'))):
+            with open(trace_file) as f:
+                # A worker which was terminated may have left an incomplete line.
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        continue
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        shutil.rmtree(cls.trace_dir, ignore_errors=True)
+        logger.info(f"Wrote the trace of {len(events)} events to {filename}")
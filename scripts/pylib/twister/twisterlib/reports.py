@@ -7,6 +7,7 @@
 import json
 import logging
 import os
+import pickle
 import string
 import xml.etree.ElementTree as ET
 from datetime import datetime
@@ -14,6 +15,7 @@ from enum import Enum
 from pathlib import Path
 
 from colorama import Fore
+from twisterlib.profiling import Profiler
 from twisterlib.statuses import TwisterStatus
 
 logger = logging.getLogger('twister')
@@ -44,7 +46,8 @@ class Reporting:
         },
         'footprint.json': {
             'deny_status': ['FILTER'],
-            'deny_suite': ['testcases', 'execution_time', 'recording', 'retries', 'runnable']
+            'deny_suite': ['testcases', 'execution_time', 'dut_wait_time', 'recording', 'retries',
+                           'runnable']
         }
     }
 
@@ -137,361 +140,271 @@ class Reporting:
 
         return (fails, passes, errors, skips)
 
-    # Generate a report with all testsuites instead of doing this per platform
-    def xunit_report_suites(self, json_file, filename):
-
-        json_data = {}
-        with open(json_file) as json_results:
-            json_data = json.load(json_results)
-
-
-        env = json_data.get('environment', {})
-        version = env.get('zephyr_version', None)
-
-        eleTestsuites = ET.Element('testsuites')
-        all_suites = json_data.get("testsuites", [])
-
-        suites_to_report = all_suites
-            # do not create entry if everything is filtered out
-        if not self.env.options.detailed_skipped_report:
-            suites_to_report = list(
-                filter(lambda d: TwisterStatus(d.get('status')) != TwisterStatus.FILTER, all_suites)
-            )
-
-        for suite in suites_to_report:
-            duration = 0
-            eleTestsuite = ET.SubElement(eleTestsuites, 'testsuite',
-                                            name=suite.get("name"), time="0",
-                                            timestamp = self.timestamp,
-                                            tests="0",
-                                            failures="0",
-                                            errors="0", skipped="0")
-            eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
-            # Multiple 'property' can be added to 'properties'
-            # differing by name and value
-            ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
-            ET.SubElement(eleTSPropetries, 'property', name="platform", value=suite.get("platform"))
-            ET.SubElement(eleTSPropetries, 'property', name="architecture", value=suite.get("arch"))
-
-            total = 0
-            fails = passes = errors = skips = 0
-            handler_time = suite.get('execution_time', 0)
-            runnable = suite.get('runnable', 0)
-            duration += float(handler_time)
-            ts_status = TwisterStatus(suite.get('status'))
-            classname = Path(suite.get("name","")).name
-            for tc in suite.get("testcases", []):
-                status = TwisterStatus(tc.get('status'))
-                reason = tc.get('reason', suite.get('reason', 'Unknown'))
-                log = tc.get("log", suite.get("log"))
-
-                tc_duration = tc.get('execution_time', handler_time)
-                name = tc.get("identifier")
-                fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
-                    name, classname, status, ts_status, reason, tc_duration, runnable,
-                    (fails, passes, errors, skips), log, True)
-
-            total = errors + passes + fails + skips
-
-            eleTestsuite.attrib['time'] = f"{duration}"
-            eleTestsuite.attrib['failures'] = f"{fails}"
-            eleTestsuite.attrib['errors'] = f"{errors}"
-            eleTestsuite.attrib['skipped'] = f"{skips}"
-            eleTestsuite.attrib['tests'] = f"{total}"
-
-        ET.indent(eleTestsuites, space="\t", level=0)
-        result = ET.tostring(eleTestsuites)
-        with open(filename, 'wb') as report:
-            report.write(result)
-
     def xunit_report(self, json_file, filename, selected_platform=None, full_report=False):
         if selected_platform:
-            selected = [selected_platform]
             logger.info(f"Writing target report for {selected_platform}...")
         else:
             logger.info(f"Writing xunit report {filename}...")
-            selected = self.selected_platforms
 
         json_data = {}
         with open(json_file) as json_results:
             json_data = json.load(json_results)
 
-
         env = json_data.get('environment', {})
-        version = env.get('zephyr_version', None)
-
-        eleTestsuites = ET.Element('testsuites')
-        all_suites = json_data.get("testsuites", [])
-
-        for platform in selected:
-            suites = list(filter(lambda d: d['platform'] == platform, all_suites))
-            # do not create entry if everything is filtered out
-            if not self.env.options.detailed_skipped_report:
-                non_filtered = list(
-                    filter(lambda d: TwisterStatus(d.get('status')) != TwisterStatus.FILTER, suites)
-                )
-                if not non_filtered:
-                    continue
-
-            duration = 0
-            eleTestsuite = ET.SubElement(eleTestsuites, 'testsuite',
-                                            name=platform,
-                                            timestamp = self.timestamp,
-                                            time="0",
-                                            tests="0",
-                                            failures="0",
-                                            errors="0", skipped="0")
-            eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
-            # Multiple 'property' can be added to 'properties'
-            # differing by name and value
-            ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
-
-            total = 0
-            fails = passes = errors = skips = 0
-            for ts in suites:
-                handler_time = ts.get('execution_time', 0)
-                runnable = ts.get('runnable', 0)
-                duration += float(handler_time)
-
-                ts_status = TwisterStatus(ts.get('status'))
-                # Do not report filtered testcases
-                if (
-                    ts_status == TwisterStatus.FILTER
-                    and not self.env.options.detailed_skipped_report
-                ):
-                    continue
-                if full_report:
-                    classname = Path(ts.get("name","")).name
-                    for tc in ts.get("testcases", []):
-                        status = TwisterStatus(tc.get('status'))
-                        reason = tc.get('reason', ts.get('reason', 'Unknown'))
-                        log = tc.get("log", ts.get("log"))
-
-                        tc_duration = tc.get('execution_time', handler_time)
-                        name = tc.get("identifier")
-                        fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
-                            name, classname, status, ts_status, reason, tc_duration, runnable,
-                            (fails, passes, errors, skips), log, True)
-                else:
-                    reason = ts.get('reason', 'Unknown')
-                    name = ts.get("name")
-                    classname = f"{platform}:{name}"
-                    log = ts.get("log")
-                    fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
-                        name, classname, ts_status, ts_status, reason, handler_time, runnable,
-                        (fails, passes, errors, skips), log, False)
-
-            total = errors + passes + fails + skips
-
-            eleTestsuite.attrib['time'] = f"{duration}"
-            eleTestsuite.attrib['failures'] = f"{fails}"
-            eleTestsuite.attrib['errors'] = f"{errors}"
-            eleTestsuite.attrib['skipped'] = f"{skips}"
-            eleTestsuite.attrib['tests'] = f"{total}"
-
-        ET.indent(eleTestsuites, space="\t", level=0)
-        result = ET.tostring(eleTestsuites)
-        with open(filename, 'wb') as report:
-            report.write(result)
-
-    def json_report(self, filename, version="NA", platform=None, filters=None):
-        logger.info(f"Writing JSON report {filename}")
-
+        report = self._xunit_platform_report(env.get('zephyr_version', None),
+                                             selected_platform, full_report)
+        for suite in json_data.get("testsuites", []):
+            report.add(suite)
+        report.write(filename)
+
+    def _xunit_platform_report(self, version, selected_platform=None, full_report=False):
+        selected = [selected_platform] if selected_platform else self.selected_platforms
+        return XunitReport(selected, self.timestamp, version, full_report,
+                           self.env.options.detailed_skipped_report)
+
+    def report_environment(self, version="NA"):
         if self.env.options.report_all_options:
             report_options = vars(self.env.options)
         else:
             report_options = self.env.non_default_options()
 
-        report = {}
-        report["environment"] = {"os": os.name,
-                                 "zephyr_version": version,
-                                 "toolchain": self.env.toolchain,
-                                 "commit_date": self.env.commit_date,
-                                 "run_date": self.env.run_date,
-                                 "options": report_options
-                                 }
-        suites = []
+        environment = {"os": os.name,
+                       "zephyr_version": version,
+                       "toolchain": self.env.toolchain,
+                       "commit_date": self.env.commit_date,
+                       "run_date": self.env.run_date,
+                       "options": report_options
+                       }
+        if Profiler.phases:
+            environment["profile"] = Profiler.phases
+        return environment
+
+    def suite_reported(self, name, status, filters=None, filename=None):
+        """Check whether a test suite with the given status is part of a report.
+
+        @param name Test suite name, for logging
+        @param status Test suite status
+        @param filters One of json_filters
+        @param filename Report name, for logging
+        """
+        status = TwisterStatus(status)
+        if status == TwisterStatus.FILTER and not self.env.options.report_filtered:
+            return False
+        if (filters and 'allow_status' in filters and
+            status not in [TwisterStatus[s] for s in filters['allow_status']]):
+            logger.debug(
+                f"Skip test suite '{name}'"
+                f" status '{status}' not allowed for {filename}"
+            )
+            return False
+        if (filters and 'deny_status' in filters and
+            status in [TwisterStatus[s] for s in filters['deny_status']]):
+            logger.debug(
+                f"Skip test suite '{name}'"
+                f" status '{status}' denied for {filename}"
+            )
+            return False
+        return True
+
+    def filter_suite(self, suite, filters=None, filename=None):
+        """Apply the filters of a report to a test suite report.
+
+        @param suite Test suite report, as created by suite_report()
+        @param filters One of json_filters
+        @param filename Report name, for logging
+        @return Filtered test suite report, None when the suite is not reported
+        """
+        if not self.suite_reported(suite['name'], suite['status'], filters, filename):
+            return None
+        # Pass suite properties through the context filters.
+        if filters and 'allow_suite' in filters:
+            suite = {k:v for k,v in suite.items() if k in filters['allow_suite']}
+        if filters and 'deny_suite' in filters:
+            suite = {k:v for k,v in suite.items() if k not in filters['deny_suite']}
+        return suite
+
+    @classmethod
+    def suite_report(cls, instance, options):
+        """Create the report of a test suite, shared by all report files.
+
+        Logs of failed suites and footprint data are read here, so this is
+        done once per instance.
+
+        @param instance Test instance
+        @param options Twister options
+        """
+        handler_log = os.path.join(instance.build_dir, "handler.log")
+        pytest_log = os.path.join(instance.build_dir, "twister_harness.log")
+        build_log = os.path.join(instance.build_dir, "build.log")
+        device_log = os.path.join(instance.build_dir, "device.log")
+
+        handler_time = instance.metrics.get('handler_time', 0)
+        used_ram = instance.metrics.get ("used_ram", 0)
+        used_rom  = instance.metrics.get("used_rom",0)
+        available_ram = instance.metrics.get("available_ram", 0)
+        available_rom = instance.metrics.get("available_rom", 0)
+        suite = {
+            "name": instance.testsuite.name,
+            "arch": instance.platform.arch,
+            "platform": instance.platform.name,
+            "path": instance.testsuite.source_dir_rel
+        }
+        if instance.run_id:
+            suite['run_id'] = instance.run_id
+
+        suite["runnable"] = False
+        if instance.status != TwisterStatus.FILTER:
+            suite["runnable"] = instance.run
+
+        if used_ram:
+            suite["used_ram"] = used_ram
+        if used_rom:
+            suite["used_rom"] = used_rom
+
+        suite['retries'] = instance.retries
+        if instance.toolchain:
+            suite['toolchain'] = instance.toolchain
+
+        if instance.dut:
+            suite["dut"] = instance.dut
+        if "dut_wait_time" in instance.metrics:
+            suite["dut_wait_time"] = f"{float(instance.metrics['dut_wait_time']):.2f}"
+        if available_ram:
+            suite["available_ram"] = available_ram
+        if available_rom:
+            suite["available_rom"] = available_rom
+        if instance.status in [TwisterStatus.ERROR, TwisterStatus.FAIL]:
+            suite['status'] = instance.status
+            # FIXME
+            if os.path.exists(pytest_log):
+                suite["log"] = cls.process_log(pytest_log)
+            elif os.path.exists(handler_log):
+                suite["log"] = cls.process_log(handler_log)
+            elif os.path.exists(device_log):
+                suite["log"] = cls.process_log(device_log)
+            else:
+                suite["log"] = cls.process_log(build_log)
+
+            suite["reason"] = cls.get_detailed_reason(instance.reason, suite["log"])
+            # update the reason to get more details also in other reports (e.g. junit)
+            # where build log is not available
+            instance.reason = suite["reason"]
+        elif instance.status == TwisterStatus.FILTER:
+            suite["status"] = TwisterStatus.FILTER
+            suite["reason"] = instance.reason
+        elif instance.status == TwisterStatus.PASS:
+            suite["status"] = TwisterStatus.PASS
+        elif instance.status == TwisterStatus.SKIP:
+            suite["status"] = TwisterStatus.SKIP
+            suite["reason"] = instance.reason
+        elif instance.status == TwisterStatus.NOTRUN:
+            suite["status"] = TwisterStatus.NOTRUN
+            suite["reason"] = instance.reason
+        else:
+            suite["status"] = TwisterStatus.NONE
+            suite["reason"] = 'Unknown Instance status.'
 
-        for instance in self.instances.values():
-            if platform and platform != instance.platform.name:
-                continue
-            if instance.status == TwisterStatus.FILTER and not self.env.options.report_filtered:
-                continue
-            if (filters and 'allow_status' in filters and \
-                instance.status not in [TwisterStatus[s] for s in filters['allow_status']]):
-                logger.debug(
-                    f"Skip test suite '{instance.testsuite.name}'"
-                    f" status '{instance.status}' not allowed for {filename}"
-                )
-                continue
-            if (filters and 'deny_status' in filters and \
-                instance.status in [TwisterStatus[s] for s in filters['deny_status']]):
-                logger.debug(
-                    f"Skip test suite '{instance.testsuite.name}'"
-                    f" status '{instance.status}' denied for {filename}"
-                )
-                continue
-            suite = {}
-            handler_log = os.path.join(instance.build_dir, "handler.log")
-            pytest_log = os.path.join(instance.build_dir, "twister_harness.log")
-            build_log = os.path.join(instance.build_dir, "build.log")
-            device_log = os.path.join(instance.build_dir, "device.log")
+        if instance.status != TwisterStatus.NONE:
+            suite["execution_time"] =  f"{float(handler_time):.2f}"
+        suite["build_time"] =  f"{float(instance.build_time):.2f}"
+        if instance.profile:
+            suite["profile"] = instance.profile
 
-            handler_time = instance.metrics.get('handler_time', 0)
-            used_ram = instance.metrics.get ("used_ram", 0)
-            used_rom  = instance.metrics.get("used_rom",0)
-            available_ram = instance.metrics.get("available_ram", 0)
-            available_rom = instance.metrics.get("available_rom", 0)
-            suite = {
-                "name": instance.testsuite.name,
-                "arch": instance.platform.arch,
-                "platform": instance.platform.name,
-                "path": instance.testsuite.source_dir_rel
-            }
-            if instance.run_id:
-                suite['run_id'] = instance.run_id
-
-            suite["runnable"] = False
-            if instance.status != TwisterStatus.FILTER:
-                suite["runnable"] = instance.run
-
-            if used_ram:
-                suite["used_ram"] = used_ram
-            if used_rom:
-                suite["used_rom"] = used_rom
-
-            suite['retries'] = instance.retries
-            if instance.toolchain:
-                suite['toolchain'] = instance.toolchain
-
-            if instance.dut:
-                suite["dut"] = instance.dut
-            if available_ram:
-                suite["available_ram"] = available_ram
-            if available_rom:
-                suite["available_rom"] = available_rom
-            if instance.status in [TwisterStatus.ERROR, TwisterStatus.FAIL]:
-                suite['status'] = instance.status
-                # FIXME
-                if os.path.exists(pytest_log):
-                    suite["log"] = self.process_log(pytest_log)
-                elif os.path.exists(handler_log):
-                    suite["log"] = self.process_log(handler_log)
-                elif os.path.exists(device_log):
-                    suite["log"] = self.process_log(device_log)
-                else:
-                    suite["log"] = self.process_log(build_log)
-
-                suite["reason"] = self.get_detailed_reason(instance.reason, suite["log"])
-                # update the reason to get more details also in other reports (e.g. junit)
-                # where build log is not available
-                instance.reason = suite["reason"]
-            elif instance.status == TwisterStatus.FILTER:
-                suite["status"] = TwisterStatus.FILTER
-                suite["reason"] = instance.reason
-            elif instance.status == TwisterStatus.PASS:
-                suite["status"] = TwisterStatus.PASS
-            elif instance.status == TwisterStatus.SKIP:
-                suite["status"] = TwisterStatus.SKIP
-                suite["reason"] = instance.reason
-            elif instance.status == TwisterStatus.NOTRUN:
-                suite["status"] = TwisterStatus.NOTRUN
-                suite["reason"] = instance.reason
-            else:
-                suite["status"] = TwisterStatus.NONE
-                suite["reason"] = 'Unknown Instance status.'
+        testcases = []
+
+        if len(instance.testcases) == 1:
+            single_case_duration = f"{float(handler_time):.2f}"
+        else:
+            single_case_duration = 0
 
+        for case in instance.testcases:
+            # freeform was set when no sub testcases were parsed, however,
+            # if we discover those at runtime, the fallback testcase wont be
+            # needed anymore and can be removed from the output, it does
+            # not have a status and would otherwise be reported as skipped.
+            if (
+                case.freeform
+                and case.status == TwisterStatus.NONE
+                and len(instance.testcases) > 1
+            ):
+                continue
+            testcase = {}
+            testcase['identifier'] = case.name
             if instance.status != TwisterStatus.NONE:
-                suite["execution_time"] =  f"{float(handler_time):.2f}"
-            suite["build_time"] =  f"{float(instance.build_time):.2f}"
+                if single_case_duration:
+                    testcase['execution_time'] = single_case_duration
+                else:
+                    testcase['execution_time'] = f"{float(case.duration):.2f}"
 
-            testcases = []
+            if case.output != "":
+                testcase['log'] = case.output
 
-            if len(instance.testcases) == 1:
-                single_case_duration = f"{float(handler_time):.2f}"
-            else:
-                single_case_duration = 0
-
-            for case in instance.testcases:
-                # freeform was set when no sub testcases were parsed, however,
-                # if we discover those at runtime, the fallback testcase wont be
-                # needed anymore and can be removed from the output, it does
-                # not have a status and would otherwise be reported as skipped.
-                if (
-                    case.freeform
-                    and case.status == TwisterStatus.NONE
-                    and len(instance.testcases) > 1
-                ):
-                    continue
-                testcase = {}
-                testcase['identifier'] = case.name
-                if instance.status != TwisterStatus.NONE:
-                    if single_case_duration:
-                        testcase['execution_time'] = single_case_duration
-                    else:
-                        testcase['execution_time'] = f"{float(case.duration):.2f}"
-
-                if case.output != "":
-                    testcase['log'] = case.output
-
-                if case.status == TwisterStatus.SKIP:
-                    if instance.status == TwisterStatus.FILTER:
-                        testcase["status"] = TwisterStatus.FILTER
-                    else:
-                        testcase["status"] = TwisterStatus.SKIP
-                        testcase["reason"] = case.reason or instance.reason
+            if case.status == TwisterStatus.SKIP:
+                if instance.status == TwisterStatus.FILTER:
+                    testcase["status"] = TwisterStatus.FILTER
                 else:
-                    testcase["status"] = case.status
-                    if case.reason:
-                        testcase["reason"] = case.reason
+                    testcase["status"] = TwisterStatus.SKIP
+                    testcase["reason"] = case.reason or instance.reason
+            else:
+                testcase["status"] = case.status
+                if case.reason:
+                    testcase["reason"] = case.reason
 
-                testcases.append(testcase)
+            testcases.append(testcase)
 
-            suite['testcases'] = testcases
+        suite['testcases'] = testcases
 
-            if instance.recording is not None:
-                suite['recording'] = instance.recording
+        if instance.recording is not None:
+            suite['recording'] = instance.recording
 
-            if (
-                instance.status not in [
-                    TwisterStatus.NONE,
-                    TwisterStatus.ERROR,
-                    TwisterStatus.FILTER
-                ]
-                and self.env.options.create_rom_ram_report
-                and self.env.options.footprint_report is not None
-            ):
-                # Init as empty data preparing for filtering properties.
-                suite['footprint'] = {}
-
-            # Pass suite properties through the context filters.
-            if filters and 'allow_suite' in filters:
-                suite = {k:v for k,v in suite.items() if k in filters['allow_suite']}
-
-            if filters and 'deny_suite' in filters:
-                suite = {k:v for k,v in suite.items() if k not in filters['deny_suite']}
-
-            # Compose external data only to these properties which pass filtering.
-            if 'footprint' in suite:
-                do_all = 'all' in self.env.options.footprint_report
-                footprint_files = { 'ROM': 'rom.json', 'RAM': 'ram.json' }
-                for k,v in footprint_files.items():
-                    if do_all or k in self.env.options.footprint_report:
-                        footprint_fname = os.path.join(instance.build_dir, v)
-                        try:
-                            with open(footprint_fname) as footprint_json:
-                                logger.debug(f"Collect footprint.{k} for '{instance.name}'")
-                                suite['footprint'][k] = json.load(footprint_json)
-                        except FileNotFoundError:
-                            logger.error(f"Missing footprint.{k} for '{instance.name}'")
-                #
-            #
-
-            suites.append(suite)
-
-        report["testsuites"] = suites
-        with open(filename, 'w') as json_file:
-            json.dump(report, json_file, indent=4, separators=(',',':'), cls=ReportingJSONEncoder)
+        if (
+            instance.status not in [
+                TwisterStatus.NONE,
+                TwisterStatus.ERROR,
+                TwisterStatus.FILTER
+            ]
+            and options.create_rom_ram_report
+            and options.footprint_report is not None
+        ):
+            suite['footprint'] = {}
+            do_all = 'all' in options.footprint_report
+            footprint_files = { 'ROM': 'rom.json', 'RAM': 'ram.json' }
+            for k,v in footprint_files.items():
+                if do_all or k in options.footprint_report:
+                    footprint_fname = os.path.join(instance.build_dir, v)
+                    try:
+                        with open(footprint_fname) as footprint_json:
+                            logger.debug(f"Collect footprint.{k} for '{instance.name}'")
+                            suite['footprint'][k] = json.load(footprint_json)
+                    except FileNotFoundError:
+                        logger.error(f"Missing footprint.{k} for '{instance.name}'")
+
+        return suite
+
+    def suites(self, platform=None, filters=None, filename=None):
+        """Yield the reports of the test suites which are part of a report.
+
+        @param platform Only report the suites of this platform
+        @param filters One of json_filters
+        @param filename Report name, for logging
+        """
+        for instance in self.instances.values():
+            if platform and platform != instance.platform.name:
+                continue
+            # Check the status first, to not read the logs of unreported suites.
+            if not self.suite_reported(instance.testsuite.name, instance.status, filters,
+                                       filename):
+                continue
+            suite = self.suite_report(instance, self.env.options)
+            yield self.filter_suite(suite, filters)
+
+    def json_report(self, filename, version="NA", platform=None, filters=None):
+        logger.info(f"Writing JSON report {filename}")
+
+        report = JsonReportWriter(filename, self.report_environment(version), index=True)
+        for suite in self.suites(platform, filters, filename):
+            report.add(suite)
+        report.close()
 
 
     def compare_metrics(self, filename):
@@ -749,15 +662,9 @@ class Reporting:
             " test configurations were only built."
         )
 
-    def save_reports(self, name, suffix, report_dir, no_update, platform_reports):
-        if not self.instances:
-            return
-
-        logger.info("Saving reports...")
-        if name:
-            report_name = name
-        else:
-            report_name = "twister"
+    def report_filename(self, name, report_dir, suffix):
+        """Return the base name of the report files and their directory."""
+        report_name = name or "twister"
 
         if report_dir:
             os.makedirs(report_dir, exist_ok=True)
@@ -769,46 +676,119 @@ class Reporting:
 
         if suffix:
             filename = f"{filename}_{suffix}"
+        return filename, outdir
+
+    def suite_stream(self, name, suffix, report_dir):
+        """Create the stream the runner writes the test suite reports to as they finish."""
+        filename, _ = self.report_filename(name, report_dir, suffix)
+        return SuiteStream(filename + ".jsonl", self.env.options)
+
+    def save_reports(self, name, suffix, report_dir, no_update, platform_reports):
+        if not self.instances:
+            return
+
+        logger.info("Saving reports...")
+        filename, outdir = self.report_filename(name, report_dir, suffix)
 
         if not no_update:
-            json_file = filename + ".json"
-            self.json_report(json_file, version=self.env.version,
-                             filters=self.json_filters['twister.json'])
-            if self.env.options.footprint_report is not None:
-                self.json_report(filename + "_footprint.json", version=self.env.version,
-                                 filters=self.json_filters['footprint.json'])
-            self.xunit_report(json_file, filename + ".xml", full_report=False)
-            self.xunit_report(json_file, filename + "_report.xml", full_report=True)
-            self.xunit_report_suites(json_file, filename + "_suite_report.xml")
-
-            if platform_reports:
-                self.target_report(json_file, outdir, suffix)
-
-
-    def target_report(self, json_file, outdir, suffix):
-        platforms = {repr(inst.platform):inst.platform for _, inst in self.instances.items()}
-        for platform in platforms.values():
-            if suffix:
-                filename = os.path.join(outdir,f"{platform.normalized_name}_{suffix}.xml")
-                json_platform_file = os.path.join(outdir,f"{platform.normalized_name}_{suffix}")
-            else:
-                filename = os.path.join(outdir,f"{platform.normalized_name}.xml")
-                json_platform_file = os.path.join(outdir, platform.normalized_name)
-            self.xunit_report(json_file, filename, platform.name, full_report=True)
-            self.json_report(json_platform_file + ".json",
-                             version=self.env.version, platform=platform.name,
-                             filters=self.json_filters['twister.json'])
-            if self.env.options.footprint_report is not None:
-                self.json_report(json_platform_file + "_footprint.json",
-                                 version=self.env.version, platform=platform.name,
-                                 filters=self.json_filters['footprint.json'])
-
-    def get_detailed_reason(self, reason: str, log: str) -> str:
+            stream = SuiteStream(filename + ".jsonl", self.env.options)
+            self.complete_stream(stream)
+            self.stream_reports(stream, filename, outdir, suffix, platform_reports)
+
+    def complete_stream(self, stream):
+        """Rewrite the suite stream with the final report of every instance.
+
+        Suites written by the runner are reused as long as the status of the
+        instance did not change since, the other instances are reported now.
+        """
+        logger.info(f"Writing JSON Lines report {stream.filename}")
+        latest = stream.latest()
+        tmp_file = stream.filename + ".tmp"
+        with open(tmp_file, 'w') as new:
+            for name, instance in self.instances.items():
+                status, line = latest.get(name, (None, None))
+                if line is None or status != instance.status:
+                    line = SuiteStream.dumps(self.suite_report(instance, self.env.options))
+                new.write(line)
+        os.replace(tmp_file, stream.filename)
+
+    def stream_reports(self, stream, filename, outdir, suffix, platform_reports):
+        """Write all JSON and JUnit reports in a single pass over the suite stream."""
+        version = self.env.version
+        environment = self.report_environment(version)
+        footprint = self.env.options.footprint_report is not None
+
+        logger.info(f"Writing JSON report {filename}.json")
+        json_reports = [(JsonReportWriter(filename + ".json", environment, index=True),
+                         self.json_filters['twister.json'])]
+        if footprint:
+            logger.info(f"Writing JSON report {filename}_footprint.json")
+            json_reports.append((JsonReportWriter(filename + "_footprint.json", environment),
+                                 self.json_filters['footprint.json']))
+        xunit_reports = [
+            (self._xunit_platform_report(version, full_report=False), filename + ".xml"),
+            (self._xunit_platform_report(version, full_report=True), filename + "_report.xml"),
+        ]
+        xunit_suites = XunitSuitesReport(self.timestamp, version,
+                                         self.env.options.detailed_skipped_report)
+
+        platform_reports_by_name = {}
+        if platform_reports:
+            platforms = {repr(inst.platform):inst.platform for _, inst in self.instances.items()}
+            for platform in platforms.values():
+                if suffix:
+                    platform_file = os.path.join(outdir, f"{platform.normalized_name}_{suffix}")
+                else:
+                    platform_file = os.path.join(outdir, platform.normalized_name)
+                # Not kept open, the number of platforms is not limited.
+                reports = [(JsonReportWriter(platform_file + ".json", environment,
+                                             keep_open=False),
+                            self.json_filters['twister.json'])]
+                if footprint:
+                    reports.append((JsonReportWriter(platform_file + "_footprint.json",
+                                                     environment, keep_open=False),
+                                    self.json_filters['footprint.json']))
+                xunit = (self._xunit_platform_report(version, platform.name, full_report=True),
+                         platform_file + ".xml")
+                platform_reports_by_name[platform.name] = (reports, xunit)
+
+        for suite in stream:
+            platform_json, platform_xunit = platform_reports_by_name.get(
+                suite['platform'], ([], None)
+            )
+            for report, filters in json_reports + platform_json:
+                if (filtered := self.filter_suite(suite, filters, report.filename)):
+                    report.add(filtered)
+
+            # JUnit reports show what twister.json reports.
+            filtered = self.filter_suite(suite, self.json_filters['twister.json'])
+            if not filtered:
+                continue
+            for report, _ in xunit_reports:
+                report.add(filtered)
+            xunit_suites.add(filtered)
+            if platform_xunit:
+                platform_xunit[0].add(filtered)
+
+        for report, _ in json_reports:
+            report.close()
+        for report, xunit_file in xunit_reports:
+            logger.info(f"Writing xunit report {xunit_file}...")
+            report.write(xunit_file)
+        xunit_suites.write(filename + "_suite_report.xml")
+        for platform, (reports, (xunit, xunit_file)) in platform_reports_by_name.items():
+            logger.info(f"Writing target report for {platform}...")
+            xunit.write(xunit_file)
+            for report, _ in reports:
+                report.close()
+
+    @classmethod
+    def get_detailed_reason(cls, reason: str, log: str) -> str:
         if reason == 'CMake build failure':
-            if error_key := self._parse_cmake_build_failure(log):
+            if error_key := cls._parse_cmake_build_failure(log):
                 return f"{reason} - {error_key}"
         elif reason == 'Build failure':  # noqa SIM102
-            if error_key := self._parse_build_failure(log):
+            if error_key := cls._parse_build_failure(log):
                 return f"{reason} - {error_key}"
         return reason
 
@@ -854,3 +834,380 @@ class Reporting:
             elif ": in function " in line:
                 last_warning = line[line.index('in function') :].strip()
         return None
+
+
+class SuiteStream:
+    """JSON Lines file with the report of every test suite.
+
+    The runner appends the report of each instance when it is done, so the
+    results are available while twister runs, and the logs are read before
+    the build directory is cleaned up. A suite reported again, e.g. when it
+    is retried, supersedes the previous line.
+    """
+
+    def __init__(self, filename, options):
+        """
+        @param filename JSON Lines file
+        @param options Twister options
+        """
+        self.filename = filename
+        self.options = options
+
+    @staticmethod
+    def dumps(suite):
+        return json.dumps(suite, separators=(',',':'), cls=ReportingJSONEncoder) + '\n'
+
+    @staticmethod
+    def key(suite):
+        """Return the name of the instance a suite report belongs to."""
+        return os.path.join(suite['platform'], suite.get('toolchain', ''), suite['name'])
+
+    def reset(self):
+        """Start a new stream, forgetting the suites of a previous run."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+        open(self.filename, 'w').close()
+
+    def write(self, instance):
+        """Append the report of an instance.
+
+        Callers in different processes must hold a common lock.
+        """
+        line = self.dumps(Reporting.suite_report(instance, self.options))
+        try:
+            with open(self.filename, 'a') as f:
+                f.write(line)
+        except OSError as e:
+            # The suite is reported again when the reports are saved.
+            logger.error(f"Unable to write {self.filename}: {e}")
+
+    def latest(self):
+        """Return the status and the line of the last report of every instance,
+        reading the stream once."""
+        latest = {}
+        try:
+            with open(self.filename) as f:
+                for line in f:
+                    try:
+                        suite = json.loads(line)
+                        latest[self.key(suite)] = (suite['status'], line)
+                    except (ValueError, KeyError):
+                        # A line truncated by an interrupted run
+                        logger.debug(f"Ignoring invalid line in {self.filename}")
+        except FileNotFoundError:
+            pass
+        return latest
+
+    def __iter__(self):
+        with open(self.filename, 'rb') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+class JsonReportWriter:
+    """JSON report written one test suite at a time, one suite per line."""
+
+    def __init__(self, filename, environment, keep_open=True, index=False):
+        """
+        @param filename JSON report file
+        @param environment Content of the "environment" key of the report
+        @param keep_open Keep the file open between suites, otherwise it is
+            reopened for every suite to not exhaust the file descriptors when
+            many reports are written at once
+        @param index Write a ReportIndex next to the report
+        """
+        self.filename = filename
+        self.keep_open = keep_open
+        self.count = 0
+        self.index = ReportIndex(filename) if index else None
+        self.file = open(filename, 'w')
+        self.file.write('{"environment":')
+        self.file.write(json.dumps(environment, separators=(',',':'), cls=ReportingJSONEncoder))
+        self.file.write(',\n"testsuites":[')
+        if not keep_open:
+            self.file.close()
+
+    def _open(self):
+        if self.file.closed:
+            self.file = open(self.filename, 'a')
+        return self.file
+
+    def add(self, suite):
+        f = self._open()
+        f.write('\n' if self.count == 0 else ',\n')
+        if self.index is not None:
+            self.index.add(suite, f.tell())
+        f.write(json.dumps(suite, separators=(',',':'), cls=ReportingJSONEncoder))
+        self.count += 1
+        if not self.keep_open:
+            f.close()
+
+    def close(self):
+        self._open().write('\n]}\n')
+        self.file.close()
+        if self.index is not None:
+            self.index.save()
+
+
+class ReportIndex:
+    """Index of the test suites of a JSON report, by platform and status.
+
+    Resumed runs (--only-failed, --test-only, --load-tests) load the previous
+    report. The index holds the suites without their logs, which make most
+    of a report with failures, pickled per platform and status, so suites
+    of filtered out platforms are not even unpickled. It is only used while
+    the report has the size and modification time it was indexed with.
+    """
+
+    VERSION = 1
+
+    def __init__(self, report):
+        """
+        @param report JSON report file
+        """
+        self.report = report
+        # platform -> status -> [(offset in report, suite without log)]
+        self.entries = {}
+
+    @staticmethod
+    def index_file(report):
+        return report + ".index"
+
+    @staticmethod
+    def _report_stat(report):
+        st = os.stat(report)
+        return (st.st_size, st.st_mtime_ns)
+
+    def add(self, suite, offset):
+        """Add a suite, written at the given offset of the report."""
+        stub = {k:v for k,v in suite.items() if k != 'log'}
+        status = TwisterStatus(suite['status']).value
+        by_status = self.entries.setdefault(suite['platform'], {})
+        by_status.setdefault(status, []).append((offset, stub))
+
+    def save(self):
+        index = {
+            'version': self.VERSION,
+            'report': self._report_stat(self.report),
+            'platforms': {
+                platform: {
+                    status: pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL)
+                    for status, entries in by_status.items()
+                }
+                for platform, by_status in self.entries.items()
+            }
+        }
+        try:
+            with open(self.index_file(self.report), 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            logger.debug(f"Unable to write report index: {e}")
+
+    @classmethod
+    def load(cls, report):
+        """Return the index of a report, None if there is no valid index."""
+        try:
+            with open(cls.index_file(report), 'rb') as f:
+                index = pickle.load(f)
+            if index['version'] != cls.VERSION or index['report'] != cls._report_stat(report):
+                logger.debug(f"Ignoring outdated index of {report}")
+                return None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable index of {report}: {e}")
+            return None
+
+        report_index = cls(report)
+        # Entries are unpickled on demand.
+        report_index.entries = index['platforms']
+        return report_index
+
+    def platforms(self):
+        return list(self.entries)
+
+    def suites(self, platforms=None, statuses=None):
+        """Return the suites of the report without their log, in report order.
+
+        @param platforms Platform names to load, all platforms when None
+        @param statuses Suite statuses to load, all statuses when None
+        """
+        selected = []
+        for platform, by_status in self.entries.items():
+            if platforms is not None and platform not in platforms:
+                continue
+            for status, entries in by_status.items():
+                if statuses is not None and TwisterStatus(status) not in statuses:
+                    continue
+                if isinstance(entries, bytes):
+                    entries = pickle.loads(entries)
+                selected.extend(entries)
+        selected.sort(key=lambda entry: entry[0])
+        return [suite for _, suite in selected]
+
+
+class XunitReport:
+    """JUnit report with a testsuite element per platform, built suite by suite."""
+
+    def __init__(self, platforms, timestamp, version, full_report, detailed_skipped_report):
+        """
+        @param platforms Names of the reported platforms, in report order
+        @param timestamp Timestamp of the testsuite elements
+        @param version Zephyr version
+        @param full_report Report every testcase instead of every test suite
+        @param detailed_skipped_report Report filtered test suites
+        """
+        self.platforms = platforms
+        self.timestamp = timestamp
+        self.version = version
+        self.full_report = full_report
+        self.detailed_skipped_report = detailed_skipped_report
+        # platform name -> [testsuite element, duration, stats, reported]
+        self.testsuites = {}
+        self.selected = set(platforms)
+
+    def _testsuite(self, platform):
+        if platform not in self.testsuites:
+            eleTestsuite = ET.Element('testsuite',
+                                      name=platform,
+                                      timestamp = self.timestamp,
+                                      time="0",
+                                      tests="0",
+                                      failures="0",
+                                      errors="0", skipped="0")
+            eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
+            # Multiple 'property' can be added to 'properties'
+            # differing by name and value
+            ET.SubElement(eleTSPropetries, 'property', name="version", value=self.version)
+            self.testsuites[platform] = [eleTestsuite, 0, (0, 0, 0, 0), False]
+        return self.testsuites[platform]
+
+    def add(self, ts):
+        platform = ts['platform']
+        if platform not in self.selected:
+            return
+        entry = self._testsuite(platform)
+        eleTestsuite, duration, stats, reported = entry
+
+        handler_time = ts.get('execution_time', 0)
+        runnable = ts.get('runnable', 0)
+        entry[1] = duration + float(handler_time)
+
+        ts_status = TwisterStatus(ts.get('status'))
+        # Do not report filtered testcases
+        if ts_status == TwisterStatus.FILTER and not self.detailed_skipped_report:
+            return
+        entry[3] = True
+        if self.full_report:
+            classname = Path(ts.get("name","")).name
+            for tc in ts.get("testcases", []):
+                status = TwisterStatus(tc.get('status'))
+                reason = tc.get('reason', ts.get('reason', 'Unknown'))
+                log = tc.get("log", ts.get("log"))
+
+                tc_duration = tc.get('execution_time', handler_time)
+                name = tc.get("identifier")
+                stats = Reporting.xunit_testcase(eleTestsuite,
+                    name, classname, status, ts_status, reason, tc_duration, runnable,
+                    stats, log, True)
+        else:
+            reason = ts.get('reason', 'Unknown')
+            name = ts.get("name")
+            classname = f"{platform}:{name}"
+            log = ts.get("log")
+            stats = Reporting.xunit_testcase(eleTestsuite,
+                name, classname, ts_status, ts_status, reason, handler_time, runnable,
+                stats, log, False)
+        entry[2] = stats
+
+    def write(self, filename):
+        eleTestsuites = ET.Element('testsuites')
+        for platform in self.platforms:
+            # do not create entry if everything is filtered out
+            if self.detailed_skipped_report:
+                eleTestsuite, duration, stats, _ = self._testsuite(platform)
+            elif platform in self.testsuites and self.testsuites[platform][3]:
+                eleTestsuite, duration, stats, _ = self.testsuites[platform]
+            else:
+                continue
+
+            fails, passes, errors, skips = stats
+            total = errors + passes + fails + skips
+
+            eleTestsuite.attrib['time'] = f"{duration}"
+            eleTestsuite.attrib['failures'] = f"{fails}"
+            eleTestsuite.attrib['errors'] = f"{errors}"
+            eleTestsuite.attrib['skipped'] = f"{skips}"
+            eleTestsuite.attrib['tests'] = f"{total}"
+            eleTestsuites.append(eleTestsuite)
+
+        ET.indent(eleTestsuites, space="\t", level=0)
+        result = ET.tostring(eleTestsuites)
+        with open(filename, 'wb') as report:
+            report.write(result)
+
+
+class XunitSuitesReport:
+    """JUnit report with a testsuite element per test suite, built suite by suite."""
+
+    def __init__(self, timestamp, version, detailed_skipped_report):
+        """
+        @param timestamp Timestamp of the testsuite elements
+        @param version Zephyr version
+        @param detailed_skipped_report Report filtered test suites
+        """
+        self.timestamp = timestamp
+        self.version = version
+        self.detailed_skipped_report = detailed_skipped_report
+        self.eleTestsuites = ET.Element('testsuites')
+
+    def add(self, suite):
+        # do not create entry if everything is filtered out
+        if (
+            not self.detailed_skipped_report
+            and TwisterStatus(suite.get('status')) == TwisterStatus.FILTER
+        ):
+            return
+
+        eleTestsuite = ET.SubElement(self.eleTestsuites, 'testsuite',
+                                        name=suite.get("name"), time="0",
+                                        timestamp = self.timestamp,
+                                        tests="0",
+                                        failures="0",
+                                        errors="0", skipped="0")
+        eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
+        # Multiple 'property' can be added to 'properties'
+        # differing by name and value
+        ET.SubElement(eleTSPropetries, 'property', name="version", value=self.version)
+        ET.SubElement(eleTSPropetries, 'property', name="platform", value=suite.get("platform"))
+        ET.SubElement(eleTSPropetries, 'property', name="architecture", value=suite.get("arch"))
+
+        fails = passes = errors = skips = 0
+        handler_time = suite.get('execution_time', 0)
+        runnable = suite.get('runnable', 0)
+        duration = float(handler_time)
+        ts_status = TwisterStatus(suite.get('status'))
+        classname = Path(suite.get("name","")).name
+        for tc in suite.get("testcases", []):
+            status = TwisterStatus(tc.get('status'))
+            reason = tc.get('reason', suite.get('reason', 'Unknown'))
+            log = tc.get("log", suite.get("log"))
+
+            tc_duration = tc.get('execution_time', handler_time)
+            name = tc.get("identifier")
+            fails, passes, errors, skips = Reporting.xunit_testcase(eleTestsuite,
+                name, classname, status, ts_status, reason, tc_duration, runnable,
+                (fails, passes, errors, skips), log, True)
+
+        total = errors + passes + fails + skips
+
+        eleTestsuite.attrib['time'] = f"{duration}"
+        eleTestsuite.attrib['failures'] = f"{fails}"
+        eleTestsuite.attrib['errors'] = f"{errors}"
+        eleTestsuite.attrib['skipped'] = f"{skips}"
+        eleTestsuite.attrib['tests'] = f"{total}"
+
+    def write(self, filename):
+        ET.indent(self.eleTestsuites, space="\t", level=0)
+        result = ET.tostring(self.eleTestsuites)
+        with open(filename, 'wb') as report:
+            report.write(result)
@@ -4,6 +4,11 @@
 # Copyright 2022 NXP
 # SPDX-License-Identifier: Apache-2.0
 
+import copy
+import functools
+import glob
+import hashlib
+import io
 import logging
 import multiprocessing
 import os
@@ -12,10 +17,14 @@ import pickle
 import queue
 import re
 import shutil
+import struct
 import subprocess
 import sys
 import time
 import traceback
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from math import log10
 from multiprocessing import Lock, Process, Value
 from multiprocessing.managers import BaseManager
@@ -26,10 +35,13 @@ from colorama import Fore
 from elftools.elf.elffile import ELFFile
 from elftools.elf.sections import SymbolTableSection
 from packaging import version
+from twisterlib.build_cache import BuildCache
 from twisterlib.cmakecache import CMakeCache
 from twisterlib.environment import canonical_zephyr_base
 from twisterlib.error import BuildError, ConfigurationError, StatusAttributeError
+from twisterlib.filter_cache import FilterDataCache
 from twisterlib.log_helper import setup_logging
+from twisterlib.profiling import Profiler
 from twisterlib.statuses import TwisterStatus
 
 if version.parse(elftools.__version__) < version.parse('0.24'):
@@ -43,14 +55,16 @@ from twisterlib.environment import ZEPHYR_BASE
 
 sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/build_helpers"))
 from domains import Domains
-from twisterlib.coverage import run_coverage_instance
+from twisterlib.coverage import GcovDumpCollector, run_coverage_instance
 from twisterlib.environment import TwisterEnv
+from twisterlib.handlers import AsyncHandlerEngine
 from twisterlib.harness import Ctest, HarnessImporter, Pytest
 from twisterlib.log_helper import log_command
 from twisterlib.platform import Platform
 from twisterlib.testinstance import TestInstance
 from twisterlib.testplan import change_skip_to_error_if_integration
 from twisterlib.testsuite import TestSuite
+from zephyr_module import parse_modules
 
 try:
     from yaml import CSafeLoader as SafeLoader
@@ -505,6 +519,31 @@ class ExecutionCounter:
         with self._total.get_lock():
             self._total.value += value
 
+class ExecutionCounterDelta:
+    '''
+    Collects counter increments made in a worker process of the pool scheduler.
+    The increments are sent back with the task result and applied to the
+    ExecutionCounter of the main process in one go, instead of updating the
+    shared counters one by one.
+    '''
+    def __init__(self):
+        self.increments = defaultdict(int)
+
+    def __getattr__(self, name):
+        if not name.endswith('_increment'):
+            raise AttributeError(name)
+        counter = name[:-len('_increment')]
+
+        def increment(value=1):
+            self.increments[counter] += value
+        return increment
+
+    @staticmethod
+    def apply(increments, results):
+        for counter, value in increments.items():
+            getattr(results, f'{counter}_increment')(value)
+
+
 class CMake:
     config_re = re.compile('(CONFIG_[A-Za-z0-9_]+)[=]\"?([^\"]*)\"?$')
     dt_re = re.compile('([A-Za-z0-9_]+)[=]\"?([^\"]*)\"?$')
@@ -761,6 +800,10 @@ class CMake:
         return ret
 
 
+# Parsed devicetree and Kconfig data of the instances filtered by this process.
+filter_data_cache = FilterDataCache()
+
+
 class FilterBuilder(CMake):
 
     def __init__(self, testsuite: TestSuite, platform: Platform, source_dir, build_dir, jobserver):
@@ -768,6 +811,24 @@ class FilterBuilder(CMake):
 
         self.log = "config-twister.log"
 
+    @staticmethod
+    def parse_defconfig(content):
+        """Return the options of a .config file, and its lines which are not options."""
+        defconfig = {}
+        unrecognized = []
+        for line in content.splitlines(keepends=True):
+            m = CMake.config_re.match(line)
+            if not m:
+                if line.strip() and not line.startswith("#"):
+                    unrecognized.append(line)
+                continue
+            defconfig[m.group(1)] = m.group(2).strip()
+        return defconfig, unrecognized
+
+    @staticmethod
+    def load_edt(content):
+        return pickle.load(io.BytesIO(content))
+
     def parse_generated(self, filter_stages=None):
         if filter_stages is None:
             filter_stages = []
@@ -798,16 +859,15 @@ class FilterBuilder(CMake):
 
         if not filter_stages or "kconfig" in filter_stages:
             with open(defconfig_path) as fp:
-                defconfig = {}
-                for line in fp.readlines():
-                    m = self.config_re.match(line)
-                    if not m:
-                        if line.strip() and not line.startswith("#"):
-                            sys.stderr.write(f"Unrecognized line {line}\n")
-                        continue
-                    defconfig[m.group(1)] = m.group(2).strip()
-
-            self.defconfig = defconfig
+                content = fp.read()
+            defconfig, unrecognized = filter_data_cache.get(
+                'defconfig', content, self.parse_defconfig, persist=True
+            )
+            # Reported for every instance, also when the parsed data was cached.
+            for line in unrecognized:
+                sys.stderr.write(f"Unrecognized line {line}\n")
+            # The cached dictionary is shared, keep a copy.
+            self.defconfig = dict(defconfig)
 
         cmake_conf = {}
         try:
@@ -850,7 +910,7 @@ class FilterBuilder(CMake):
             try:
                 if os.path.exists(edt_pickle):
                     with open(edt_pickle, 'rb') as f:
-                        edt = pickle.load(f)
+                        edt = filter_data_cache.get('edt', f.read(), self.load_edt)
                 else:
                     edt = None
                 ret = expr_parser.parse(self.testsuite.filter, filter_data, edt)
@@ -882,6 +942,9 @@ class FilterBuilder(CMake):
 
 class ProjectBuilder(FilterBuilder):
 
+    # BuildCache set by the runner with --build-cache
+    build_cache = None
+
     def __init__(self, instance: TestInstance, env: TwisterEnv, jobserver, **kwargs):
         super().__init__(
             instance.testsuite,
@@ -897,6 +960,9 @@ class ProjectBuilder(FilterBuilder):
         self.options = env.options
         self.env = env
         self.duts = None
+        self.report_stream = None
+        # phase of the operation being processed
+        self.phase = None
 
     @property
     def trace(self) -> bool:
@@ -963,8 +1029,11 @@ class ProjectBuilder(FilterBuilder):
     def _add_to_pipeline(self, pipeline, op: str, additionals: dict=None):
         if additionals is None:
             additionals = {}
+        # Recorded before the instance is sent along with the task.
+        Profiler.stop(self.phase)
         try:
             if op:
+                Profiler.queued(self.instance)
                 task = dict({'op': op, 'test': self.instance}, **additionals)
                 pipeline.put(task)
         # Only possible RuntimeError source here is a mutation of the pipeline during iteration.
@@ -979,11 +1048,17 @@ class ProjectBuilder(FilterBuilder):
         additionals = {}
 
         op = message.get('op')
+        self.phase = Profiler.start(op, self.instance)
         options = self.options
         if not logger.handlers:
             setup_logging(options.outdir, options.log_file, options.log_level, options.timestamps)
         self.instance.setup_handler(self.env)
 
+        if op in ["filter", "cmake"] and self.restore_cached_build():
+            # The configuration was built before, skip cmake and the build
+            self._add_to_pipeline(pipeline, 'build', {'cached': True})
+            return
+
         if op == "filter":
             try:
                 ret = self.cmake(filter_stages=self.instance.filter_stages)
@@ -1046,7 +1121,8 @@ class ProjectBuilder(FilterBuilder):
         elif op == "build":
             try:
                 logger.debug(f"build test: {self.instance.name}")
-                ret = self.build()
+                cached = message.get('cached', False)
+                ret = self.build(cached=cached)
                 if not ret:
                     self.instance.status = TwisterStatus.ERROR
                     self.instance.reason = "Build Failure"
@@ -1082,6 +1158,10 @@ class ProjectBuilder(FilterBuilder):
                                 next_op = 'report'
                         else:
                             next_op = 'gather_metrics'
+                        if next_op == 'gather_metrics':
+                            if not cached:
+                                self.store_cached_build()
+                            self.share_build()
             except StatusAttributeError as sae:
                 logger.error(str(sae))
                 self.instance.status = TwisterStatus.ERROR
@@ -1125,30 +1205,8 @@ class ProjectBuilder(FilterBuilder):
 
         # Run the generated binary using one of the supported handlers
         elif op == "run":
-            try:
-                logger.debug(f"run test: {self.instance.name}")
+            with self.run_operation(pipeline):
                 self.run()
-                logger.debug(f"run status: {self.instance.name} {self.instance.status}")
-
-                # to make it work with pickle
-                self.instance.handler.thread = None
-                self.instance.handler.duts = None
-
-                next_op = "coverage" if self.options.coverage else "report"
-                additionals = {
-                    "status": self.instance.status,
-                    "reason": self.instance.reason
-                }
-            except StatusAttributeError as sae:
-                logger.error(str(sae))
-                self.instance.status = TwisterStatus.ERROR
-                reason = 'Incorrect status assignment'
-                self.instance.reason = reason
-                self.instance.add_missing_case_status(TwisterStatus.BLOCK, reason)
-                next_op = 'report'
-                additionals = {}
-            finally:
-                self._add_to_pipeline(pipeline, next_op, additionals)
 
         # Run per-instance code coverage
         elif op == "coverage":
@@ -1172,13 +1230,26 @@ class ProjectBuilder(FilterBuilder):
             finally:
                 self._add_to_pipeline(pipeline, next_op, additionals)
 
+        # Evaluate the devicetree filters of a group of instances sharing the devicetree
+        elif op == "dts_filter":
+            edt = self.configure_dts_filter(message['build_dir'])
+            Profiler.stop(self.phase)
+            for instance in [self.instance] + message['members']:
+                self.apply_dts_filter(instance, edt, pipeline, results)
+
         # Report results and output progress to screen
         elif op == "report":
             try:
                 with lock:
+                    if self.report_stream:
+                        # Written before done.put(), to pass a detailed reason along.
+                        self.instance.metrics["handler_time"] = self.instance.execution_time
+                        self.report_stream.write(self.instance)
                     done.put(self.instance)
                     self.report_out(results)
 
+                self.release_shared_build_users(pipeline)
+
                 if not self.options.coverage:
                     if self.options.prep_artifacts_for_testing:
                         next_op = 'cleanup'
@@ -1218,28 +1289,70 @@ class ProjectBuilder(FilterBuilder):
                 self.instance.reason = reason
                 self.instance.add_missing_case_status(TwisterStatus.BLOCK, reason)
 
+        Profiler.stop(self.phase)
+
     def demangle(self, symbol_name):
-        if symbol_name[:2] == '_Z':
-            try:
-                cpp_filt = subprocess.run(
-                    'c++filt',
-                    input=symbol_name,
-                    text=True,
-                    check=True,
-                    capture_output=True
-                )
-                if self.trace:
-                    logger.debug(f"Demangle: '{symbol_name}'==>'{cpp_filt.stdout}'")
-                return cpp_filt.stdout.strip()
-            except Exception as e:
-                logger.error(f"Failed to demangle '{symbol_name}': {e}")
-        return symbol_name
+        return self.demangle_all([symbol_name])[0]
+
+    def demangle_all(self, symbol_names):
+        """Demangle C++ symbols, running c++filt once for all of them."""
+        mangled = [name for name in symbol_names if name[:2] == '_Z']
+        if not mangled:
+            return symbol_names
+        try:
+            cpp_filt = subprocess.run(
+                'c++filt',
+                input='\n'.join(mangled) + '\n',
+                text=True,
+                check=True,
+                capture_output=True
+            )
+            demangled = cpp_filt.stdout.splitlines()
+            if len(demangled) != len(mangled):
+                raise ValueError(f"got {len(demangled)} names for {len(mangled)} symbols")
+        except Exception as e:
+            logger.error(f"Failed to demangle {mangled}: {e}")
+            return symbol_names
+
+        names = dict(zip(mangled, (name.strip() for name in demangled)))
+        if self.trace:
+            for symbol_name, name in names.items():
+                logger.debug(f"Demangle: '{symbol_name}'==>'{name}'")
+        return [names.get(name, name) for name in symbol_names]
+
+    @staticmethod
+    def elf_symbol_names(elf, section, marker):
+        """Yield the names of the symbols in section which contain marker.
+
+        The raw symbol table entries are matched against its string table,
+        without creating a Symbol object for every entry of the section.
+        """
+        if not section['sh_entsize']:
+            for sym in section.iter_symbols():
+                if marker in sym.name:
+                    yield sym.name
+            return
+
+        marker = marker.encode()
+        strtab = elf.get_section(section['sh_link']).data()
+        if marker not in strtab:
+            return
+        data = section.data()
+        # st_name is the first member of both Elf32_Sym and Elf64_Sym
+        st_name_fmt = '<I' if elf.little_endian else '>I'
+        for offset in range(0, len(data), section['sh_entsize']):
+            st_name = struct.unpack_from(st_name_fmt, data, offset)[0]
+            end = strtab.find(b'\0', st_name)
+            name = strtab[st_name:end if end >= 0 else None]
+            if marker in name:
+                yield name.decode('utf-8', errors='replace')
 
     def determine_testcases(self, results):
         logger.debug(f"Determine test cases for test suite: {self.instance.testsuite.id}")
 
         new_ztest_unit_test_regex = re.compile(r"z_ztest_unit_test__([^\s]+?)__([^\s]*)")
         detected_cases = []
+        symbol_names = []
 
         elf_file = self.instance.get_elf_file()
         with open(elf_file, "rb") as elf_fp:
@@ -1247,32 +1360,35 @@ class ProjectBuilder(FilterBuilder):
 
             for section in elf.iter_sections():
                 if isinstance(section, SymbolTableSection):
-                    for sym in section.iter_symbols():
-                        # It is only meant for new ztest fx
-                        # because only new ztest fx exposes test functions precisely.
-                        m_ = new_ztest_unit_test_regex.search(sym.name)
-                        if not m_:
-                            continue
-                        # Demangle C++ symbols
-                        m_ = new_ztest_unit_test_regex.search(self.demangle(sym.name))
-                        if not m_:
-                            continue
-                        # The 1st capture group is new ztest suite name.
-                        # The 2nd capture group is new ztest unit test name.
-                        new_ztest_suite = m_[1]
-                        if self.trace and \
-                           new_ztest_suite not in self.instance.testsuite.ztest_suite_names:
-                            # This can happen if a ZTEST_SUITE name is macro-generated
-                            # in the test source files, e.g. based on DT information.
-                            logger.debug(
-                                f"Unexpected Ztest suite '{new_ztest_suite}' is "
-                                f"not present in: {self.instance.testsuite.ztest_suite_names}"
-                            )
-                        test_func_name = m_[2].replace("test_", "", 1)
-                        testcase_id = self.instance.compose_case_name(
-                            f"{new_ztest_suite}.{test_func_name}"
-                        )
-                        detected_cases.append(testcase_id)
+                    # It is only meant for new ztest fx
+                    # because only new ztest fx exposes test functions precisely.
+                    symbol_names.extend(
+                        name
+                        for name in self.elf_symbol_names(elf, section, "z_ztest_unit_test__")
+                        if new_ztest_unit_test_regex.search(name)
+                    )
+
+        # Demangle C++ symbols
+        for symbol_name in self.demangle_all(symbol_names):
+            m_ = new_ztest_unit_test_regex.search(symbol_name)
+            if not m_:
+                continue
+            # The 1st capture group is new ztest suite name.
+            # The 2nd capture group is new ztest unit test name.
+            new_ztest_suite = m_[1]
+            if self.trace and \
+               new_ztest_suite not in self.instance.testsuite.ztest_suite_names:
+                # This can happen if a ZTEST_SUITE name is macro-generated
+                # in the test source files, e.g. based on DT information.
+                logger.debug(
+                    f"Unexpected Ztest suite '{new_ztest_suite}' is "
+                    f"not present in: {self.instance.testsuite.ztest_suite_names}"
+                )
+            test_func_name = m_[2].replace("test_", "", 1)
+            testcase_id = self.instance.compose_case_name(
+                f"{new_ztest_suite}.{test_func_name}"
+            )
+            detected_cases.append(testcase_id)
 
         logger.debug(
             f"Test instance {self.instance.name} already has {len(self.instance.testcases)} "
@@ -1702,6 +1818,9 @@ class ProjectBuilder(FilterBuilder):
     def cmake(self, filter_stages=None):
         if filter_stages is None:
             filter_stages = []
+        return self.run_cmake(self.cmake_args(), filter_stages)
+
+    def cmake_args(self):
         args = []
         for va in self.testsuite.extra_args.copy():
             cond_args = va.split(":")
@@ -1720,7 +1839,7 @@ class ProjectBuilder(FilterBuilder):
                 args.append(va)
 
 
-        args = self.cmake_assemble_args(
+        return self.cmake_assemble_args(
             args,
             self.instance.handler,
             self.testsuite.extra_conf_files,
@@ -1729,11 +1848,144 @@ class ProjectBuilder(FilterBuilder):
             self.options.extra_args, # CMake extra args
             self.instance.build_dir,
         )
-        return self.run_cmake(args,filter_stages)
 
-    def build(self):
+    def build_cache_key(self):
+        """Return the BuildCache key of the instance, from its CMake arguments."""
+        args = self.cmake_args() + [
+            f'-DTC_NAME={self.instance.testsuite.name}',
+            f'-DWARNINGS_AS_ERRORS={not self.options.disable_warnings_as_errors}',
+            f'-G{self.env.generator}',
+            f'-DBOARD={self.platform.name}',
+            '-DSNIPPET={}'.format(';'.join(self.instance.testsuite.required_snippets or [])),
+        ]
+        return self.build_cache.key(self.instance, args)
+
+    def restore_cached_build(self):
+        """Restore the artifacts of the instance from the build cache.
+
+        @return True when the cmake and build steps can be skipped
+        """
+        if not self.build_cache or not BuildCache.supported(self.instance, self.options):
+            return False
+        run_id = self.build_cache.restore(self.build_cache_key(), self.build_dir)
+        if run_id is None:
+            return False
+
+        logger.debug(f"Restored cached build of {self.instance.name}")
+        # The binaries print the run id they were built with.
+        self.instance.run_id = run_id
+        with open(os.path.join(self.build_dir, "run_id.txt"), 'w') as fp:
+            fp.write(run_id)
+        return True
+
+    def store_cached_build(self):
+        if not self.build_cache or not BuildCache.supported(self.instance, self.options):
+            return
+        self.build_cache.store(self.build_cache_key(), self.build_dir, self.instance.run_id,
+                               extra_files=self._get_binaries())
+
+    def share_build(self):
+        """Provide the build of the instance to the instances sharing it."""
+        if not self.instance.shared_build_users:
+            return
+        files = [
+            name for name in dict.fromkeys(BuildCache.CACHED_FILES + self._get_binaries())
+            if not os.path.isabs(name) and os.path.isfile(os.path.join(self.build_dir, name))
+        ]
+        for user in self.instance.shared_build_users:
+            try:
+                for name in files:
+                    path = os.path.join(user.build_dir, name)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    if os.path.lexists(path):
+                        os.unlink(path)
+                    try:
+                        os.link(os.path.join(self.build_dir, name), path)
+                    except OSError:
+                        shutil.copy2(os.path.join(self.build_dir, name), path)
+            except OSError as e:
+                logger.warning(f"Unable to share the build of {self.instance.name}: {e}")
+                continue
+            self.instance.shared_build_done.append(user.name)
+
+    def configure_dts_filter(self, build_dir):
+        """Run the devicetree stage of cmake for the group of the instance.
+
+        @param build_dir Build directory of the group
+        @return The EDT of the group, None if it could not be configured
+        """
+        proxy = copy.copy(self.instance)
+        proxy.testcases = []
+        proxy.build_dir = build_dir
+        pb = ProjectBuilder(proxy, self.env, self.jobserver)
+        try:
+            ret = pb.run_cmake(self.cmake_args(), ["dts"])
+            if ret.get('returncode', 1) != 0:
+                return None
+            with open(os.path.join(build_dir, "zephyr", "edt.pickle"), 'rb') as f:
+                return filter_data_cache.get('edt', f.read(), FilterBuilder.load_edt)
+        except Exception as e:
+            logger.debug(f"Shared devicetree stage failed: {e}")
+            return None
+
+    @staticmethod
+    def apply_dts_filter(instance, edt, pipeline, results):
+        """Evaluate the devicetree filter of an instance and queue its next operation.
+
+        Instances whose filter can not be evaluated go through the regular
+        filter operation, which reports the errors.
+        """
+        filter_data = {
+            "ARCH": instance.platform.arch,
+            "PLATFORM": instance.platform.name
+        }
+        filter_data.update(os.environ)
+        Profiler.queued(instance)
+        try:
+            if edt is None:
+                raise ValueError("no devicetree")
+            ret = expr_parser.parse(instance.testsuite.filter, filter_data, edt)
+        except (ValueError, SyntaxError):
+            pipeline.put({"op": "filter", "test": instance})
+            return
+
+        if ret:
+            pipeline.put({"op": "cmake", "test": instance})
+        else:
+            logger.debug(f"filtering {instance.name}")
+            instance.status = TwisterStatus.FILTER
+            instance.reason = "runtime filter"
+            results.filtered_runtime_increment()
+            instance.add_missing_case_status(TwisterStatus.FILTER)
+            pipeline.put({"op": "report", "test": instance})
+
+    def release_shared_build_users(self, pipeline):
+        """Queue the instances which were waiting for the build of this instance.
+
+        Instances which did not receive the build, because it failed or was
+        filtered, go through their own cmake and build steps.
+        """
+        for user in self.instance.shared_build_users:
+            # The status is passed along, see _run_pool_task()
+            task = {'test': user, 'status': user.status, 'reason': user.reason}
+            Profiler.queued(user)
+            if user.name in self.instance.shared_build_done:
+                logger.debug(f"{user.name} uses the build of {self.instance.name}")
+                task.update(op='build', cached=True)
+            elif user.filter_stages and "full" not in user.filter_stages:
+                task.update(op='filter')
+            else:
+                task.update(op='cmake')
+            pipeline.put(task)
+        self.instance.shared_build_users = []
+
+    def build(self, cached=False):
         harness = HarnessImporter.get_harness(self.instance.testsuite.harness.capitalize())
-        build_result = self.run_build(['--build', self.build_dir])
+        if cached:
+            # The artifacts were restored from the build cache.
+            build_result = {'returncode': 0}
+        else:
+            build_result = self.run_build(['--build', self.build_dir])
         try:
             if harness:
                 harness.instance = self.instance
@@ -1745,35 +1997,49 @@ class ProjectBuilder(FilterBuilder):
             return
         return build_result
 
-    def run(self):
+    def prepare_run(self):
+        """Set up the handler and return the configured harness.
 
+        Returns None if the test cannot be run.
+        """
         instance = self.instance
 
-        if instance.handler.ready:
-            logger.debug(f"Reset instance status from '{instance.status}' to None before run.")
-            instance.status = TwisterStatus.NONE
+        if not instance.handler.ready:
+            return None
 
-            if instance.handler.type_str == "device":
-                instance.handler.duts = self.duts
+        logger.debug(f"Reset instance status from '{instance.status}' to None before run.")
+        instance.status = TwisterStatus.NONE
 
-            if(self.options.seed is not None and instance.platform.name.startswith("native_")):
-                self.parse_generated()
-                if('CONFIG_FAKE_ENTROPY_NATIVE_SIM' in self.defconfig and
-                    self.defconfig['CONFIG_FAKE_ENTROPY_NATIVE_SIM'] == 'y'):
-                    instance.handler.seed = self.options.seed
+        if instance.handler.type_str == "device":
+            instance.handler.duts = self.duts
 
-            if self.options.extra_test_args and instance.platform.arch == "posix":
-                instance.handler.extra_test_args = self.options.extra_test_args
+        if(self.options.seed is not None and instance.platform.name.startswith("native_")):
+            self.parse_generated()
+            if('CONFIG_FAKE_ENTROPY_NATIVE_SIM' in self.defconfig and
+                self.defconfig['CONFIG_FAKE_ENTROPY_NATIVE_SIM'] == 'y'):
+                instance.handler.seed = self.options.seed
 
-            harness = HarnessImporter.get_harness(instance.testsuite.harness.capitalize())
-            try:
-                harness.configure(instance)
-            except ConfigurationError as error:
-                instance.status = TwisterStatus.ERROR
-                instance.reason = str(error)
-                logger.error(instance.reason)
-                return
-            #
+        if self.options.extra_test_args and instance.platform.arch == "posix":
+            instance.handler.extra_test_args = self.options.extra_test_args
+
+        harness = HarnessImporter.get_harness(instance.testsuite.harness.capitalize())
+        try:
+            harness.configure(instance)
+        except ConfigurationError as error:
+            instance.status = TwisterStatus.ERROR
+            instance.reason = str(error)
+            logger.error(instance.reason)
+            return None
+        if self.options.coverage:
+            harness.gcov_collector = GcovDumpCollector(instance.build_dir)
+        return harness
+
+    def run(self):
+
+        instance = self.instance
+
+        harness = self.prepare_run()
+        if harness is not None:
             if isinstance(harness, Pytest):
                 harness.pytest_run(instance.handler.get_test_timeout())
             elif isinstance(harness, Ctest):
@@ -1783,6 +2049,62 @@ class ProjectBuilder(FilterBuilder):
 
         sys.stdout.flush()
 
+    def can_run_async(self):
+        """Whether the test can be run by the AsyncHandlerEngine.
+
+        Harnesses running their own processes (pytest, ctest and robot)
+        are not supported.
+        """
+        self.instance.setup_handler(self.env)
+        return AsyncHandlerEngine.supports(self.instance.handler) and \
+            self.instance.testsuite.harness.lower() not in ['pytest', 'ctest', 'robot']
+
+    @contextmanager
+    def run_operation(self, pipeline):
+        """Context of the 'run' operation, shared by process() and process_run_async().
+
+        The test is run in the context, which then queues the next operation.
+        """
+        next_op = None
+        additionals = {}
+        try:
+            logger.debug(f"run test: {self.instance.name}")
+            yield
+            logger.debug(f"run status: {self.instance.name} {self.instance.status}")
+
+            # to make it work with pickle
+            self.instance.handler.thread = None
+            self.instance.handler.duts = None
+
+            next_op = "coverage" if self.options.coverage else "report"
+            additionals = {
+                "status": self.instance.status,
+                "reason": self.instance.reason
+            }
+        except StatusAttributeError as sae:
+            logger.error(str(sae))
+            self.instance.status = TwisterStatus.ERROR
+            reason = 'Incorrect status assignment'
+            self.instance.reason = reason
+            self.instance.add_missing_case_status(TwisterStatus.BLOCK, reason)
+            next_op = 'report'
+            additionals = {}
+        finally:
+            self._add_to_pipeline(pipeline, next_op, additionals)
+
+    async def process_run_async(self):
+        """Asynchronous equivalent of the 'run' operation of process().
+
+        Returns the next task of the instance.
+        """
+        pipeline = LocalPipeline()
+        self.phase = Profiler.start('run', self.instance)
+        with self.run_operation(pipeline):
+            harness = self.prepare_run()
+            if harness is not None:
+                await self.instance.handler.handle_async(harness)
+        return pipeline.get()
+
     def gather_metrics(self, instance: TestInstance):
         build_result = {"returncode": 0}
         if self.options.create_rom_ram_report:
@@ -1819,31 +2141,111 @@ class ProjectBuilder(FilterBuilder):
                 instance.metrics["unrecognized"] = []
             instance.metrics["handler_time"] = instance.execution_time
 
+class LocalPipeline:
+    '''Pipeline of a single process, collecting the tasks put by ProjectBuilder.process().'''
+    def __init__(self):
+        self.tasks = []
+
+    def put(self, task):
+        self.tasks.append(task)
+
+    def get(self):
+        return self.tasks.pop() if self.tasks else None
+
+
+# State of a pool scheduler worker process, set up by _init_pool_worker()
+_pool_worker = {}
+
+
+def _init_pool_worker(env, jobserver, duts, instances, run_async=False):
+    _pool_worker.update(env=env, jobserver=jobserver, duts=duts, instances=instances,
+                        run_async=run_async)
+
+
+def _run_pool_task(name, op, additionals, instance=None):
+    '''
+    Process the operations of a test instance in a pool scheduler worker,
+    until the instance is ready to be reported by the main process.
+
+    Only the instance name and the operation are sent to the worker, which
+    takes the instance from the copy it received when the pool was started,
+    unless an up to date instance is given.
+    Returns the task to report the instance, or to run it with the
+    AsyncHandlerEngine of the main process, the processed instance and
+    the counter increments, or (None, None, increments) for the final
+    cleanup task. Tasks queued for other instances are returned in a
+    'schedule' task.
+    '''
+    env = _pool_worker['env']
+    jobserver = _pool_worker['jobserver']
+    if instance is None:
+        instance = _pool_worker['instances'][name]
+    # The status and reason are sent with the cleanup task, as the copy of the
+    # instance in this worker may not be up to date.
+    for key in ('status', 'reason'):
+        if key in additionals:
+            setattr(instance, key, additionals[key])
+
+    results = ExecutionCounterDelta()
+    pipeline = LocalPipeline()
+    task = dict({'op': op, 'test': instance}, **additionals)
+    with jobserver.get_job() if jobserver else nullcontext():
+        while task and task['op'] != 'report':
+            pb = ProjectBuilder(instance, env, jobserver)
+            pb.duts = _pool_worker['duts']
+            if task['op'] == 'run' and _pool_worker['run_async'] and pb.can_run_async():
+                break
+            pb.process(pipeline, None, task, None, results)
+            if any(t['test'] is not instance for t in pipeline.tasks):
+                # Tasks of other instances, queued by a shared devicetree filter,
+                # are scheduled by the main process.
+                return {'op': 'schedule', 'tasks': pipeline.tasks}, instance, \
+                    dict(results.increments)
+            task = pipeline.get()
+
+    if task is None:
+        return None, None, dict(results.increments)
+    return {k: v for k, v in task.items() if k != 'test'}, instance, dict(results.increments)
+
+
 class TwisterRunner:
 
-    def __init__(self, instances, suites, env=None) -> None:
+    def __init__(self, instances, suites, env=None, pruned_instances=None) -> None:
         self.pipeline = None
         self.options = env.options
         self.env = env
         self.instances = instances
         self.suites = suites
+        # statically filtered configurations which were not instantiated
+        self.pruned_instances = pruned_instances or {}
+        # durations of a previous run, used to start the longest instances first
+        self.durations = None
         self.duts = None
+        # SuiteStream of the reports, written as instances finish
+        self.report_stream = None
         self.jobs = 1
         self.results = None
         self.jobserver = None
+        # runs the handlers of the pool scheduler with --run-jobs
+        self.run_engine = None
 
     def run(self):
 
         retries = self.options.retry_failed + 1
 
-        BaseManager.register('LifoQueue', queue.LifoQueue)
-        manager = BaseManager()
-        manager.start()
-
-        self.results = ExecutionCounter(total=len(self.instances))
+        self.results = ExecutionCounter(total=len(self.instances) + len(self.pruned_instances))
         self.iteration = 0
-        pipeline = manager.LifoQueue()
-        done_queue = manager.LifoQueue()
+        if self.options.scheduler == 'pool':
+            # All instances are reported by the main process.
+            pipeline = None
+            done_queue = queue.LifoQueue()
+        else:
+            BaseManager.register('LifoQueue', queue.LifoQueue)
+            manager = BaseManager()
+            manager.start()
+
+            pipeline = manager.LifoQueue()
+            done_queue = manager.LifoQueue()
 
         # Set number of jobs
         if self.options.jobs:
@@ -1866,6 +2268,27 @@ class TwisterRunner:
 
             logger.info(f"JOBS: {self.jobs}")
 
+        if self.options.persistent_filter_cache:
+            # Set before the workers are started, so they inherit it.
+            filter_data_cache.store_dir = os.path.join(self.env.cache_dir, 'filter_data')
+            filter_data_cache.prune()
+
+        if self.options.build_cache:
+            repositories = [ZEPHYR_BASE] + [m.project for m in parse_modules(ZEPHYR_BASE)]
+            source_state = BuildCache.source_state(repositories)
+            if source_state:
+                ProjectBuilder.build_cache = BuildCache(
+                    os.path.join(self.env.cache_dir, 'builds'), source_state
+                )
+                ProjectBuilder.build_cache.prune()
+            else:
+                logger.warning("Build cache disabled, the state of the sources is unknown")
+
+        if pipeline is None and self.options.run_jobs:
+            self.run_engine = AsyncHandlerEngine(self.options.run_jobs)
+            self.run_engine.start()
+            logger.info(f"RUN JOBS: {self.options.run_jobs}")
+
         self.update_counting_before_pipeline()
 
         while True:
@@ -1882,7 +2305,11 @@ class TwisterRunner:
             else:
                 self.results.done = self.results.filtered_static
 
-            self.execute(pipeline, done_queue)
+            with Profiler.phase('execute'):
+                if pipeline is None:
+                    self.execute_pool(done_queue)
+                else:
+                    self.execute(pipeline, done_queue)
 
             while True:
                 try:
@@ -1905,6 +2332,10 @@ class TwisterRunner:
             if retries == 0 or ( self.results.failed == 0 and not retry_errors):
                 break
 
+        if self.run_engine:
+            self.run_engine.stop()
+            self.run_engine = None
+
         self.show_brief()
 
     def update_counting_before_pipeline(self):
@@ -1922,9 +2353,16 @@ class TwisterRunner:
             elif instance.status == TwisterStatus.ERROR:
                 self.results.error_increment()
 
+        for pruned in self.pruned_instances.values():
+            self.results.filtered_static_increment()
+            self.results.filtered_configs_increment()
+            self.results.filtered_cases_increment(len(pruned.testsuite.testcases))
+            self.results.cases_increment(len(pruned.testsuite.testcases))
+
     def show_brief(self):
         logger.info(
-            f"{len(self.suites)} test scenarios ({len(self.instances)} configurations) selected,"
+            f"{len(self.suites)} test scenarios"
+            f" ({len(self.instances) + len(self.pruned_instances)} configurations) selected,"
             f" {self.results.filtered_configs} configurations filtered"
             f" ({self.results.filtered_static} by static filter,"
             f" {self.results.filtered_configs - self.results.filtered_static} at runtime)."
@@ -1937,7 +2375,14 @@ class TwisterRunner:
         test_only=False,
         retry_build_errors=False
     ):
-        for instance in self.instances.values():
+        instances = self.instances.values()
+        if self.durations:
+            # Tasks are taken from the top of the pipeline, put the longest
+            # instances last so they are started first.
+            instances = sorted(instances, key=self.durations.estimate)
+        shared_dts_filter = []
+        shared_build_users = []
+        for instance in instances:
             if build_only:
                 instance.run = False
 
@@ -1955,6 +2400,9 @@ class TwisterRunner:
                 if instance.status != TwisterStatus.NONE:
                     instance.retries += 1
                 instance.status = TwisterStatus.NONE
+                instance.shared_build_users = []
+                instance.shared_build_done = []
+                Profiler.queued(instance)
                 # Previous states should be removed from the stats
                 if self.results.iteration > 1:
                     ProjectBuilder._add_instance_testcases_to_status_counts(
@@ -1973,6 +2421,10 @@ class TwisterRunner:
 
                 if test_only and instance.run:
                     pipeline.put({"op": "run", "test": instance})
+                elif instance.shared_build:
+                    shared_build_users.append(instance)
+                elif self.options.shared_dts_filter and instance.filter_stages == ["dts"]:
+                    shared_dts_filter.append(instance)
                 elif instance.filter_stages and "full" not in instance.filter_stages:
                     pipeline.put({"op": "filter", "test": instance})
                 else:
@@ -1982,6 +2434,107 @@ class TwisterRunner:
                     else:
                         pipeline.put({"op": "cmake", "test": instance})
 
+        for instance in shared_build_users:
+            build = self.instances[instance.shared_build]
+            if build.status == TwisterStatus.NONE:
+                # Queued by ProjectBuilder.release_shared_build_users() of the build
+                build.shared_build_users.append(instance)
+            elif instance.name in build.shared_build_done:
+                # Built in an earlier iteration
+                pipeline.put({"op": "build", "test": instance, "cached": True})
+            elif instance.filter_stages and "full" not in instance.filter_stages:
+                pipeline.put({"op": "filter", "test": instance})
+            else:
+                pipeline.put({"op": "cmake", "test": instance})
+
+        if shared_dts_filter:
+            self.queue_shared_dts_filters(shared_dts_filter, pipeline)
+
+    # CMake variables through which an application selects devicetree inputs
+    APP_DTS_VARIABLES_RE = re.compile(
+        r'\b(SHIELD|BOARD_ROOT|DTS_ROOT|SOC_ROOT|SNIPPET|DTC_OVERLAY_FILE|EXTRA_DTC_OVERLAY_FILE)\b'
+    )
+
+    @staticmethod
+    @functools.cache
+    def has_app_dts_inputs(source_dir):
+        """Check if an application has its own devicetree inputs (overlays,
+        bindings, snippets), which are picked up from the application directory,
+        or selects them in its CMake files (e.g. set(SHIELD ...))."""
+        if glob.glob(os.path.join(source_dir, '*.overlay')):
+            return True
+        for subdir in ['boards', 'socs', 'dts', 'snippets']:
+            for _, _, filenames in os.walk(os.path.join(source_dir, subdir)):
+                if any(f.endswith(('.overlay', '.dts', '.dtsi', '.yaml', '.yml'))
+                       for f in filenames):
+                    return True
+        for dirpath, _, filenames in os.walk(source_dir):
+            for filename in filenames:
+                if filename != 'CMakeLists.txt' and not filename.endswith('.cmake'):
+                    continue
+                try:
+                    with open(os.path.join(dirpath, filename), encoding='utf-8',
+                              errors='replace') as f:
+                        if TwisterRunner.APP_DTS_VARIABLES_RE.search(f.read()):
+                            return True
+                except OSError:
+                    # Unknown inputs, do not share the devicetree
+                    return True
+        return False
+
+    def dts_filter_group_key(self, instance, args):
+        """Return the key of the instances sharing the same devicetree.
+
+        Only arguments which are not Kconfig settings are considered.
+        Instances of different applications only share the devicetree, if
+        neither has devicetree inputs in the application directory nor other
+        arguments, which might be relative to the application directory.
+        """
+        handler_args = []
+        if instance.handler.ready:
+            handler_args = ["-D{}".format(a.replace('"', '')) for a in instance.handler.args]
+        dts_args = tuple(
+            arg for arg in args
+            if not arg.startswith(('-DCONFIG_', '-DCONF_FILE=', '-DOVERLAY_CONFIG='))
+            and arg not in handler_args
+        )
+        source_dir = instance.testsuite.source_dir
+        if not dts_args and not self.has_app_dts_inputs(source_dir):
+            source_dir = None
+        return (
+            instance.platform.name,
+            instance.toolchain,
+            tuple(instance.testsuite.required_snippets),
+            dts_args,
+            source_dir
+        )
+
+    def queue_shared_dts_filters(self, instances, pipeline):
+        """Queue the devicetree only runtime filters of instances, as one task
+        per group of instances sharing the same devicetree.
+
+        The devicetree stage of cmake runs once per group, in the build
+        directory of the group, see ProjectBuilder.configure_dts_filter().
+        """
+        groups = {}
+        for instance in instances:
+            instance.setup_handler(self.env)
+            pb = ProjectBuilder(instance, self.env, self.jobserver)
+            key = self.dts_filter_group_key(instance, pb.cmake_args())
+            groups.setdefault(key, []).append(instance)
+        logger.info(
+            f"Evaluating devicetree filters of {len(instances)} instances "
+            f"in {len(groups)} groups"
+        )
+
+        for key, (instance, *members) in groups.items():
+            build_dir = os.path.join(
+                self.env.outdir, 'dts_filter',
+                hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+            )
+            pipeline.put(
+                {"op": "dts_filter", "test": instance, "members": members, "build_dir": build_dir}
+            )
 
     def pipeline_mgr(self, pipeline, done_queue, lock, results):
         try:
@@ -1996,6 +2549,7 @@ class TwisterRunner:
                             instance = task['test']
                             pb = ProjectBuilder(instance, self.env, self.jobserver)
                             pb.duts = self.duts
+                            pb.report_stream = self.report_stream
                             pb.process(pipeline, done_queue, task, lock, results)
                             if self.env.options.quit_on_failure and \
                                 pb.instance.status in [TwisterStatus.FAIL, TwisterStatus.ERROR]:
@@ -2014,6 +2568,7 @@ class TwisterRunner:
                         instance = task['test']
                         pb = ProjectBuilder(instance, self.env, self.jobserver)
                         pb.duts = self.duts
+                        pb.report_stream = self.report_stream
                         pb.process(pipeline, done_queue, task, lock, results)
                         if self.env.options.quit_on_failure and \
                             pb.instance.status in [TwisterStatus.FAIL, TwisterStatus.ERROR]:
@@ -2053,6 +2608,101 @@ class TwisterRunner:
             for p in processes:
                 p.terminate()
 
+    def execute_pool(self, done):
+        '''
+        Process the instances on a process pool, scheduled by the main process.
+
+        Workers receive compact (name, op) task descriptors, process all
+        operations of an instance up to its report and send it back with its
+        counter increments. Reporting and statistics happen in this process.
+        '''
+        lock = Lock()
+        logger.info("Adding tasks to the queue...")
+        pipeline = LocalPipeline()
+        self.add_tasks_to_queue(pipeline, self.options.build_only, self.options.test_only,
+                                retry_build_errors=self.options.retry_build_errors)
+        logger.info("Added initial list of jobs to queue")
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_pool_worker,
+            initargs=(self.env, self.jobserver, self.duts, self.instances,
+                      self.run_engine is not None)
+        )
+        logger.debug(f"Launched a pool of {self.jobs} jobs")
+
+        def submit(task, *instance):
+            additionals = {k: v for k, v in task.items() if k not in ['op', 'test']}
+            return executor.submit(_run_pool_task, task['test'].name, task['op'], additionals,
+                                   *instance)
+
+        async def run_async(instance):
+            pb = ProjectBuilder(instance, self.env, self.jobserver)
+            pb.duts = self.duts
+            pb.report_stream = self.report_stream
+            task = await pb.process_run_async()
+            return {k: v for k, v in task.items() if k != 'test'}, instance, {}
+
+        def report(task):
+            instance = task['test']
+            pipeline = LocalPipeline()
+            pb = ProjectBuilder(instance, self.env, self.jobserver)
+            pb.duts = self.duts
+            pb.report_stream = self.report_stream
+            pb.process(pipeline, done, task, lock, self.results)
+            for task in pipeline.tasks:
+                task.setdefault('status', instance.status)
+                task.setdefault('reason', instance.reason)
+                pending.add(submit(task))
+
+            if self.options.quit_on_failure and \
+                instance.status in [TwisterStatus.FAIL, TwisterStatus.ERROR]:
+                for f in pending:
+                    f.cancel()
+
+        # Submit in the same order as the queue engine takes the tasks (last in, first out)
+        pending = {submit(task) for task in reversed(pipeline.tasks)}
+        try:
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future.cancelled():
+                        continue
+                    try:
+                        report_task, instance, increments = future.result()
+                    except Exception as e:
+                        logger.error(f"General exception: {e}\n{traceback.format_exc()}")
+                        logger.error("Pool worker failed, aborting execution")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        sys.exit(1)
+
+                    ExecutionCounterDelta.apply(increments, self.results)
+                    if report_task is None:
+                        continue
+                    if report_task['op'] == 'schedule':
+                        for task in report_task['tasks']:
+                            if task['op'] == 'report':
+                                report(task)
+                            else:
+                                pending.add(submit(task, task['test']))
+                        continue
+                    if report_task['op'] == 'run':
+                        pending.add(self.run_engine.submit(run_async(instance)))
+                        continue
+                    if report_task['op'] != 'report':
+                        # Continue in the pool with the instance updated by the run.
+                        pending.add(submit(dict(report_task, test=instance), instance))
+                        continue
+                    report(dict(report_task, test=instance))
+        except KeyboardInterrupt:
+            logger.info("Execution interrupted")
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self.run_engine:
+                self.run_engine.stop()
+                self.run_engine = None
+        else:
+            executor.shutdown()
+
     @staticmethod
     def get_cmake_filter_stages(filt, logic_keys):
         """Analyze filter expressions from test yaml
@@ -95,6 +95,15 @@ class TestInstance:
         self.init_cases()
         self.filters = []
         self.filter_type = None
+        # name of the instance whose build this instance runs, see TestPlan.group_shared_builds()
+        self.shared_build = None
+        # instances waiting for the build of this instance, and the names of
+        # those which received it
+        self.shared_build_users = []
+        self.shared_build_done = []
+        # phases recorded with --profile, see profiling.Profiler
+        self.profile = None
+        self.queued_at = None
 
     def setup_run_id(self):
         self.run_id = self._get_run_id()
@@ -10,13 +10,16 @@ import copy
 import itertools
 import json
 import logging
+import multiprocessing
 import os
 import random
 import re
 import subprocess
 import sys
+import warnings
 from argparse import Namespace
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from itertools import islice
 from pathlib import Path
 
@@ -28,10 +31,13 @@ except ImportError:
     print("Install the anytree module to use the --test-tree option")
 
 import scl
+from twisterlib.build_cache import BuildCache
 from twisterlib.config_parser import TwisterConfigParser
+from twisterlib.discovery_cache import DiscoveryCache
 from twisterlib.error import TwisterRuntimeError
-from twisterlib.platform import Platform, generate_platforms
+from twisterlib.platform import Platform, PlatformIndex, generate_platforms
 from twisterlib.quarantine import Quarantine
+from twisterlib.reports import ReportIndex
 from twisterlib.statuses import TwisterStatus
 from twisterlib.testinstance import TestInstance
 from twisterlib.testsuite import TestSuite, scan_testsuite_path
@@ -74,6 +80,98 @@ class Filters:
     ENVIRONMENT = 'Environment filter'
 
 
+class TestsuiteLoadError(Exception):
+    """Error found while loading a test configuration, possibly in another
+    process. Its repr() is the repr() of the original exception."""
+
+    def __repr__(self):
+        return str(self)
+
+
+class TestsuiteConfig:
+    """Test configuration file of one test suite directory, parsed together
+    with the ztest sources of the suite.
+
+    Loading does not depend on the TestPlan state, so it can be done in a
+    worker process. Errors are stored and reported by TestPlan.add_testsuites()
+    at the point where they would have been raised when loading serially.
+    """
+
+    def __init__(self, root, suite_path, suite_yaml_path):
+        self.root = root
+        self.suite_path = suite_path
+        self.suite_yaml_path = suite_yaml_path
+        self.data = None
+        self.subcases = None
+        self.ztest_suite_names = None
+        self.load_error = None
+        self.scan_error = None
+
+    def load(self, schema, cache=None):
+        try:
+            parsed_data = TwisterConfigParser(self.suite_yaml_path, schema)
+            if cache:
+                parsed_data.load(loader=cache.yaml_load_verify)
+            else:
+                parsed_data.load()
+        except Exception as e:
+            self.load_error = repr(e)
+            return self
+        self.data = parsed_data.data
+
+        if self._has_ztest_scenario(parsed_data):
+            try:
+                self.subcases, self.ztest_suite_names = scan_testsuite_path(
+                    self.suite_path, cache=cache
+                )
+            except Exception as e:
+                self.scan_error = repr(e)
+        return self
+
+    @staticmethod
+    def _has_ztest_scenario(parsed_data):
+        with warnings.catch_warnings():
+            # get_scenario() is called again when adding the suites, warn only then.
+            warnings.simplefilter("ignore")
+            for name in parsed_data.scenarios:
+                try:
+                    harness = parsed_data.get_scenario(name)['harness']
+                except Exception:
+                    # Reported when adding the suites, scan to be safe.
+                    return True
+                if harness in ['ztest', 'test']:
+                    return True
+        return False
+
+    def get_parser(self, schema):
+        parsed_data = TwisterConfigParser(self.suite_yaml_path, schema)
+        parsed_data.load(loader=lambda filename, schema: self.data)
+        return parsed_data
+
+
+_discovery_worker_schema = None
+_discovery_worker_cache = None
+
+
+def _init_discovery_worker(schema, cache):
+    global _discovery_worker_schema, _discovery_worker_cache
+    _discovery_worker_schema = schema
+    _discovery_worker_cache = cache
+
+
+def _load_testsuite_config(config):
+    config.load(_discovery_worker_schema, _discovery_worker_cache)
+    cache_updates = None
+    if _discovery_worker_cache:
+        cache_updates = _discovery_worker_cache.export_updates()
+    return config, cache_updates
+
+
+# Configuration not instantiated because it is filtered by static filters,
+# only kept to account for it in the statistics.
+PrunedInstance = collections.namedtuple('PrunedInstance', ['name', 'platform', 'testsuite'])
+
+
 class TestLevel:
     name = None
     levels = []
@@ -103,6 +201,9 @@ class TestPlan:
     SAMPLE_FILENAME = 'sample.yaml'
     TESTSUITE_FILENAME = 'testcase.yaml'
 
+    # Handlers which run the binaries without the build system, see group_shared_builds()
+    SHARED_BUILD_HANDLERS = ['native', 'unit']
+
     def __init__(self, env: Namespace):
 
         self.options = env.options
@@ -117,6 +218,10 @@ class TestPlan:
         self.default_platforms = []
         self.load_errors = 0
         self.instances = dict()
+        self.pruned_instances = dict()
+        self.snippet_index = snippets.SnippetIndex()
+        # durations of a previous run, used to balance the subsets
+        self.durations = None
         self.instance_fail_count = 0
         self.warnings = 0
 
@@ -130,6 +235,7 @@ class TestPlan:
         self.run_individual_testsuite = []
         self.levels = []
         self.test_config =  {}
+        self.discovery_cache = None
 
         self.name = "unnamed"
 
@@ -192,7 +298,16 @@ class TestPlan:
             self.run_individual_testsuite = self.options.test
 
         self.add_configurations()
+        if self.env.cache_dir:
+            self.discovery_cache = DiscoveryCache(
+                self.env.cache_dir,
+                self.suite_schema,
+                rescan=self.options.discovery_rescan
+            )
+            self.discovery_cache.load()
         num = self.add_testsuites(testsuite_filter=self.run_individual_testsuite)
+        if self.discovery_cache:
+            self.discovery_cache.save()
         if num == 0:
             raise TwisterRuntimeError("No testsuites found at the specified location...")
         if self.load_errors:
@@ -311,7 +426,28 @@ class TestPlan:
         # This fixes an issue where some sets would get majority of skips and
         # basically run nothing beside filtering.
         to_run = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.NONE}
-        total = len(to_run)
+        if self.durations:
+            sliced_instances = self.balance_subset(to_run, subset, sets)
+        else:
+            start, end = self.subset_bounds(len(to_run), subset, sets)
+            sliced_instances = islice(to_run.items(), start, end)
+
+        # Like the filtered instances, the statically filtered configurations
+        # are not reported by any subset.
+        self.pruned_instances = {}
+        skipped = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.SKIP}
+        errors = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.ERROR}
+        self.instances = OrderedDict(sliced_instances)
+        if subset == 1:
+            # add all pre-filtered tests that are skipped or got error status
+            # to the first set to allow for better distribution among all sets.
+            self.instances.update(skipped)
+            self.instances.update(errors)
+
+
+    @staticmethod
+    def subset_bounds(total, subset, sets):
+        """Return the start and end index of a subset of total items."""
         per_set = int(total / sets)
         num_extra_sets = total - (per_set * sets)
 
@@ -325,17 +461,33 @@ class TestPlan:
             base = num_extra_sets * (per_set + 1)
             start = ((subset - num_extra_sets - 1) * per_set) + base
             end = start + per_set
+        return start, end
 
-        sliced_instances = islice(to_run.items(), start, end)
-        skipped = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.SKIP}
-        errors = {k : v for k,v in self.instances.items() if v.status == TwisterStatus.ERROR}
-        self.instances = OrderedDict(sliced_instances)
-        if subset == 1:
-            # add all pre-filtered tests that are skipped or got error status
-            # to the first set to allow for better distribution among all sets.
-            self.instances.update(skipped)
-            self.instances.update(errors)
+    def balance_subset(self, to_run, subset, sets):
+        """Return the instances of the given subset, with the subsets balanced
+        by the durations recorded in a previous run instead of by count.
 
+        Instances are assigned longest first to the subset with the lowest
+        total duration so far (and the fewest instances, on a tie). Every host
+        computes the same assignment, as long as it uses the same durations
+        file (and shuffle seed).
+        """
+        loads = [(0.0, 0)] * sets
+        assignment = {}
+        by_duration = sorted(
+            to_run, key=lambda k: self.durations.estimate(to_run[k]), reverse=True
+        )
+        for name in by_duration:
+            index = loads.index(min(loads))
+            duration, count = loads[index]
+            loads[index] = (duration + self.durations.estimate(to_run[name]), count + 1)
+            assignment[name] = index
+
+        logger.debug(
+            f"Expected duration of subset {subset}/{sets}: {loads[subset - 1][0]:.2f}s"
+        )
+        # keep the original order inside the subset
+        return [(k, v) for k, v in to_run.items() if assignment[k] == subset - 1]
 
     def handle_modules(self):
         # get all enabled west projects
@@ -490,15 +642,18 @@ class TestPlan:
                             testcases.remove(case.detailed_name)
         return testcases
 
-    def add_testsuites(self, testsuite_filter=None):
-        if testsuite_filter is None:
-            testsuite_filter = []
+    def find_testsuite_configs(self):
+        """Walk the test roots and yield a TestsuiteConfig for every test
+        configuration file found, in a deterministic order."""
         for root in self.env.test_roots:
             root = os.path.abspath(root)
 
             logger.debug(f"Reading testsuite configuration files under {root}...")
 
-            for dirpath, _, filenames in os.walk(root, topdown=True):
+            for dirpath, dirnames, filenames in os.walk(root, topdown=True):
+                # os.walk() order depends on the file system, sort it so
+                # the testsuites are always added in the same order.
+                dirnames.sort()
                 if self.SAMPLE_FILENAME in filenames:
                     filename = self.SAMPLE_FILENAME
                 elif self.TESTSUITE_FILENAME in filenames:
@@ -522,65 +677,101 @@ class TestPlan:
                         suite_yaml_path = alt_config
                         break
 
-                try:
-                    parsed_data = TwisterConfigParser(suite_yaml_path, self.suite_schema)
-                    parsed_data.load()
-                    subcases = None
-                    ztest_suite_names = None
-
-                    for name in parsed_data.scenarios:
-                        suite_dict = parsed_data.get_scenario(name)
-                        suite = TestSuite(
-                            root,
-                            suite_path,
-                            name,
-                            data=suite_dict,
-                            detailed_test_id=self.options.detailed_test_id
+                yield TestsuiteConfig(root, suite_path, suite_yaml_path)
+
+    def load_testsuite_configs(self):
+        """Parse all test configuration files and scan the test sources.
+
+        With --parallel-discovery the work is spread over a process pool,
+        results are still returned in the order of find_testsuite_configs().
+        """
+        configs = self.find_testsuite_configs()
+        if not self.options.parallel_discovery:
+            for config in configs:
+                yield config.load(self.suite_schema, self.discovery_cache)
+            return
+
+        configs = list(configs)
+        jobs = self.options.jobs or multiprocessing.cpu_count()
+        chunksize = max(1, len(configs) // (jobs * 4))
+        logger.info(f"Loading {len(configs)} test configurations using {jobs} processes")
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_discovery_worker,
+            initargs=(self.suite_schema, self.discovery_cache)
+        ) as executor:
+            for config, cache_updates in executor.map(
+                _load_testsuite_config, configs, chunksize=chunksize
+            ):
+                if self.discovery_cache and cache_updates:
+                    self.discovery_cache.merge_updates(cache_updates)
+                yield config
+
+    def add_testsuites(self, testsuite_filter=None):
+        if testsuite_filter is None:
+            testsuite_filter = []
+        for config in self.load_testsuite_configs():
+            root = config.root
+            suite_path = config.suite_path
+            try:
+                if config.load_error:
+                    raise TestsuiteLoadError(config.load_error)
+                parsed_data = config.get_parser(self.suite_schema)
+
+                for name in parsed_data.scenarios:
+                    suite_dict = parsed_data.get_scenario(name)
+                    suite = TestSuite(
+                        root,
+                        suite_path,
+                        name,
+                        data=suite_dict,
+                        detailed_test_id=self.options.detailed_test_id
+                    )
+
+                    # convert to fully qualified names
+                    suite.integration_platforms = self.verify_platforms_existence(
+                            suite.integration_platforms,
+                            f"integration_platforms in {suite.name}")
+                    suite.platform_exclude = self.verify_platforms_existence(
+                            suite.platform_exclude,
+                            f"platform_exclude in {suite.name}")
+                    suite.platform_allow =  self.verify_platforms_existence(
+                            suite.platform_allow,
+                            f"platform_allow in {suite.name}")
+
+                    if suite.harness in ['ztest', 'test']:
+                        if config.scan_error:
+                            raise TestsuiteLoadError(config.scan_error)
+                        suite.add_subcases(
+                            suite_dict, config.subcases, config.ztest_suite_names
                         )
+                    else:
+                        suite.add_subcases(suite_dict)
 
-                        # convert to fully qualified names
-                        suite.integration_platforms = self.verify_platforms_existence(
-                                suite.integration_platforms,
-                                f"integration_platforms in {suite.name}")
-                        suite.platform_exclude = self.verify_platforms_existence(
-                                suite.platform_exclude,
-                                f"platform_exclude in {suite.name}")
-                        suite.platform_allow =  self.verify_platforms_existence(
-                                suite.platform_allow,
-                                f"platform_allow in {suite.name}")
-
-                        if suite.harness in ['ztest', 'test']:
-                            if subcases is None:
-                                # scan it only once per testsuite
-                                subcases, ztest_suite_names = scan_testsuite_path(suite_path)
-                            suite.add_subcases(suite_dict, subcases, ztest_suite_names)
+                    if testsuite_filter:
+                        scenario = os.path.basename(suite.name)
+                        if (
+                            suite.name
+                            and (suite.name in testsuite_filter or scenario in testsuite_filter)
+                        ):
+                            self.testsuites[suite.name] = suite
+                    elif suite.name in self.testsuites:
+                        msg = (
+                            f"test suite '{suite.name}' in '{suite.yamlfile}' is already added"
+                        )
+                        if suite.yamlfile == self.testsuites[suite.name].yamlfile:
+                            logger.debug(f"Skip - {msg}")
                         else:
-                            suite.add_subcases(suite_dict)
-
-                        if testsuite_filter:
-                            scenario = os.path.basename(suite.name)
-                            if (
-                                suite.name
-                                and (suite.name in testsuite_filter or scenario in testsuite_filter)
-                            ):
-                                self.testsuites[suite.name] = suite
-                        elif suite.name in self.testsuites:
                             msg = (
-                                f"test suite '{suite.name}' in '{suite.yamlfile}' is already added"
+                                f"Duplicate {msg} from '{self.testsuites[suite.name].yamlfile}'"
                             )
-                            if suite.yamlfile == self.testsuites[suite.name].yamlfile:
-                                logger.debug(f"Skip - {msg}")
-                            else:
-                                msg = (
-                                    f"Duplicate {msg} from '{self.testsuites[suite.name].yamlfile}'"
-                                )
-                                raise TwisterRuntimeError(msg)
-                        else:
-                            self.testsuites[suite.name] = suite
+                            raise TwisterRuntimeError(msg)
+                    else:
+                        self.testsuites[suite.name] = suite
 
-                except Exception as e:
-                    logger.error(f"{suite_path}: can't load (skipping): {e!r}")
-                    self.load_errors += 1
+            except Exception as e:
+                logger.error(f"{suite_path}: can't load (skipping): {e!r}")
+                self.load_errors += 1
         return len(self.testsuites)
 
     def __str__(self):
@@ -612,90 +803,113 @@ class TestPlan:
     def load_from_file(self, file, filter_platform=None):
         if filter_platform is None:
             filter_platform = []
+        platforms = {}
         try:
-            with open(file) as json_test_plan:
-                jtp = json.load(json_test_plan)
-                instance_list = []
-                for ts in jtp.get("testsuites", []):
-                    logger.debug(f"loading {ts['name']}...")
-                    testsuite = ts["name"]
-                    toolchain = ts["toolchain"]
-
-                    platform = self.get_platform(ts["platform"])
-                    if filter_platform and platform.name not in filter_platform:
-                        continue
-                    instance = TestInstance(
-                        self.testsuites[testsuite], platform, toolchain, self.env.outdir
-                    )
-                    if ts.get("run_id"):
-                        instance.run_id = ts.get("run_id")
+            instance_list = []
+            for ts in self._load_suites_from_file(file, filter_platform, platforms):
+                logger.debug(f"loading {ts['name']}...")
+                testsuite = ts["name"]
+                toolchain = ts["toolchain"]
+
+                platform = platforms[ts["platform"]]
+                instance = TestInstance(
+                    self.testsuites[testsuite], platform, toolchain, self.env.outdir
+                )
+                if ts.get("run_id"):
+                    instance.run_id = ts.get("run_id")
 
-                    instance.run = instance.check_runnable(
-                        self.options,
-                        self.hwm
-                    )
+                instance.run = instance.check_runnable(
+                    self.options,
+                    self.hwm
+                )
 
-                    if self.options.test_only and not instance.run:
-                        continue
-
-                    instance.metrics['handler_time'] = ts.get('execution_time', 0)
-                    instance.metrics['used_ram'] = ts.get("used_ram", 0)
-                    instance.metrics['used_rom']  = ts.get("used_rom",0)
-                    instance.metrics['available_ram'] = ts.get('available_ram', 0)
-                    instance.metrics['available_rom'] = ts.get('available_rom', 0)
-
-                    status = TwisterStatus(ts.get('status'))
-                    reason = ts.get("reason", "Unknown")
-                    if status in [TwisterStatus.ERROR, TwisterStatus.FAIL]:
-                        if self.options.report_summary is not None:
-                            instance.status = status
-                            instance.reason = reason
-                            self.instance_fail_count += 1
-                        else:
-                            instance.status = TwisterStatus.NONE
-                            instance.reason = None
-                            instance.retries += 1
-                    # test marked as built only can run when --test-only is used.
-                    # Reset status to capture new results.
-                    elif status == TwisterStatus.NOTRUN and instance.run and self.options.test_only:
-                        instance.status = TwisterStatus.NONE
-                        instance.reason = None
-                    else:
+                if self.options.test_only and not instance.run:
+                    continue
+
+                instance.metrics['handler_time'] = ts.get('execution_time', 0)
+                instance.metrics['used_ram'] = ts.get("used_ram", 0)
+                instance.metrics['used_rom']  = ts.get("used_rom",0)
+                instance.metrics['available_ram'] = ts.get('available_ram', 0)
+                instance.metrics['available_rom'] = ts.get('available_rom', 0)
+
+                status = TwisterStatus(ts.get('status'))
+                reason = ts.get("reason", "Unknown")
+                if status in [TwisterStatus.ERROR, TwisterStatus.FAIL]:
+                    if self.options.report_summary is not None:
                         instance.status = status
                         instance.reason = reason
-
-                    self.handle_quarantined_tests(instance, platform)
-
-                    for tc in ts.get('testcases', []):
-                        identifier = tc['identifier']
-                        tc_status = TwisterStatus(tc.get('status'))
-                        tc_reason = None
-                        # we set reason only if status is valid, it might have been
-                        # reset above...
-                        if instance.status != TwisterStatus.NONE:
-                            tc_reason = tc.get('reason')
-                        if tc_status != TwisterStatus.NONE:
-                            case = instance.set_case_status_by_name(
-                                identifier,
-                                tc_status,
-                                tc_reason
-                            )
-                            case.duration = tc.get('execution_time', 0)
-                            if tc.get('log'):
-                                case.output = tc.get('log')
-
-                    instance.create_overlay(platform,
-                                            self.options.enable_asan,
-                                            self.options.enable_ubsan,
-                                            self.options.enable_coverage,
-                                            self.options.coverage_platform
-                                            )
-                    instance_list.append(instance)
-                self.add_instances(instance_list)
+                        self.instance_fail_count += 1
+                    else:
+                        instance.status = TwisterStatus.NONE
+                        instance.reason = None
+                        instance.retries += 1
+                # test marked as built only can run when --test-only is used.
+                # Reset status to capture new results.
+                elif status == TwisterStatus.NOTRUN and instance.run and self.options.test_only:
+                    instance.status = TwisterStatus.NONE
+                    instance.reason = None
+                else:
+                    instance.status = status
+                    instance.reason = reason
+
+                self.handle_quarantined_tests(instance, platform)
+
+                for tc in ts.get('testcases', []):
+                    identifier = tc['identifier']
+                    tc_status = TwisterStatus(tc.get('status'))
+                    tc_reason = None
+                    # we set reason only if status is valid, it might have been
+                    # reset above...
+                    if instance.status != TwisterStatus.NONE:
+                        tc_reason = tc.get('reason')
+                    if tc_status != TwisterStatus.NONE:
+                        case = instance.set_case_status_by_name(
+                            identifier,
+                            tc_status,
+                            tc_reason
+                        )
+                        case.duration = tc.get('execution_time', 0)
+                        if tc.get('log'):
+                            case.output = tc.get('log')
+
+                instance.create_overlay(platform,
+                                        self.options.enable_asan,
+                                        self.options.enable_ubsan,
+                                        self.options.enable_coverage,
+                                        self.options.coverage_platform
+                                        )
+                instance_list.append(instance)
+            self.add_instances(instance_list)
         except FileNotFoundError as e:
             logger.error(f"{e}")
             return 1
 
+    def _load_suites_from_file(self, file, filter_platform, platforms):
+        """Yield the suites of a JSON report, except those of filtered out platforms.
+
+        The ReportIndex of the report is used when it is valid, so the suites
+        of filtered out platforms are not even parsed.
+
+        @param platforms Dictionary filled with the Platform of every
+            platform name in the yielded suites
+        """
+        def selected(name):
+            if name not in platforms:
+                platforms[name] = self.get_platform(name)
+            return not filter_platform or platforms[name].name in filter_platform
+
+        index = ReportIndex.load(file)
+        if index:
+            logger.debug(f"Loading {file} from its index")
+            yield from index.suites([p for p in index.platforms() if selected(p)])
+            return
+
+        with open(file) as json_test_plan:
+            jtp = json.load(json_test_plan)
+        for ts in jtp.get("testsuites", []):
+            if selected(ts["platform"]):
+                yield ts
+
     def check_platform(self, platform, platform_list):
         return any(p in platform.aliases for p in platform_list)
 
@@ -772,6 +986,29 @@ class TestPlan:
 
         keyed_tests = {}
 
+        # Unless filtered configurations are reported, do not create instances
+        # for configurations which are statically filtered anyway.
+        prune_filtered = not (
+            self.options.report_filtered
+            or self.options.detailed_skipped_report
+            or self.options.verbose > 1
+        )
+        if prune_filtered:
+            platform_index = PlatformIndex(self.platforms)
+            static_filter_args = {
+                'platform_filter': platform_filter,
+                'exclude_platform': exclude_platform,
+                'testsuite_filter': testsuite_filter,
+                'arch_filter': arch_filter,
+                'tag_filter': tag_filter,
+                'exclude_tag': exclude_tag,
+                'slow_only': slow_only,
+                'force_platform': force_platform,
+            }
+            excluded_platforms = {
+                p.name for p in self.platforms if self.check_platform(p, exclude_platform)
+            }
+
         for _, ts in self.testsuites.items():
             if (
                 ts.build_on_all
@@ -811,8 +1048,25 @@ class TestPlan:
                     platform_scope = list(
                         filter(lambda item: item.name in ts.platform_allow, self.platforms)
                     )
+            if ts.required_snippets:
+                # The snippet roots only depend on the test suite, look them up
+                # once for all platforms.
+                found_snippets = self.snippet_index.find_snippets_in_roots(
+                    ts.required_snippets,
+                    [*self.env.snippet_roots, Path(ts.source_dir)]
+                )
+
+            statically_filtered = set()
+            if prune_filtered and not ts.required_snippets:
+                statically_filtered = self.get_statically_filtered_platforms(
+                    ts, platform_index, excluded_platforms, **static_filter_args
+                )
+                # skips on integration platforms might be turned into errors
+                statically_filtered.difference_update(ts.integration_platforms)
+
             # list of instances per testsuite, aka configurations.
             instance_list = []
+            pruned_list = []
             for itoolchain, plat in itertools.product(
                 ts.integration_toolchains or [None], platform_scope
             ):
@@ -827,6 +1081,13 @@ class TestPlan:
                 else:
                     toolchain = "zephyr" if not self.env.toolchain else self.env.toolchain
 
+                if plat.name in statically_filtered:
+                    if (plat.arch == "unit") == (ts.type == "unit"):
+                        pruned_list.append(PrunedInstance(
+                            os.path.join(plat.name, toolchain, ts.name), plat, ts
+                        ))
+                    continue
+
                 instance = TestInstance(ts, plat, toolchain, self.env.outdir)
                 instance.run = instance.check_runnable(
                     self.options,
@@ -976,14 +1237,9 @@ class TestPlan:
 
                 if ts.required_snippets:
                     missing_snippet = False
-                    snippet_args = {"snippets": ts.required_snippets}
-                    found_snippets = snippets.find_snippets_in_roots(
-                        snippet_args,
-                        [*self.env.snippet_roots, Path(ts.source_dir)]
-                    )
 
                     # Search and check that all required snippet files are found
-                    for this_snippet in snippet_args['snippets']:
+                    for this_snippet in ts.required_snippets:
                         if this_snippet not in found_snippets:
                             logger.error(
                                 f"Can't find snippet '{this_snippet}' for test '{ts.name}'"
@@ -996,7 +1252,7 @@ class TestPlan:
                     if not missing_snippet:
                         # Look for required snippets and check that they are applicable for these
                         # platforms/boards
-                        for this_snippet in snippet_args['snippets']:
+                        for this_snippet in ts.required_snippets:
                             matched_snippet_board = False
 
                             # If the "appends" key is present with at least one entry then this
@@ -1072,44 +1328,19 @@ class TestPlan:
                 # needs to be added.
                 instance_list.append(instance)
 
+            for pruned in self.select_instances(
+                ts, pruned_list, default_platforms, integration
+            ):
+                self.pruned_instances[pruned.name] = pruned
+
             # no configurations, so jump to next testsuite
             if not instance_list:
                 continue
 
-            # if twister was launched with no platform options at all, we
-            # take all default platforms
-            if default_platforms and not ts.build_on_all and not integration:
-                if ts.platform_allow:
-                    _default_p = set(self.default_platforms)
-                    _platform_allow = set(ts.platform_allow)
-                    _intersection = _default_p.intersection(_platform_allow)
-                    if _intersection:
-                        aa = list(
-                            filter(
-                                lambda _scenario: _scenario.platform.name in _intersection,
-                                instance_list
-                            )
-                        )
-                        self.add_instances(aa)
-                    else:
-                        self.add_instances(instance_list)
-                else:
-                    # add integration platforms to the list of default
-                    # platforms, even if we are not in integration mode
-                    _platforms = self.default_platforms + ts.integration_platforms
-                    instances = list(
-                        filter(lambda ts: ts.platform.name in _platforms, instance_list)
-                    )
-                    self.add_instances(instances)
-            elif integration:
-                instances = list(
-                    filter(
-                        lambda item:  item.platform.name in ts.integration_platforms,
-                        instance_list
-                    )
+            if (default_platforms and not ts.build_on_all and not integration) or integration:
+                self.add_instances(
+                    self.select_instances(ts, instance_list, default_platforms, integration)
                 )
-                self.add_instances(instances)
-
             elif emulation_platforms:
                 self.add_instances(instance_list)
                 for instance in list(
@@ -1144,6 +1375,11 @@ class TestPlan:
                                 self.options.coverage_platform)
 
         self.selected_platforms = set(p.platform.name for p in self.instances.values())
+        self.selected_platforms.update(p.platform.name for p in self.pruned_instances.values())
+        if self.pruned_instances:
+            logger.debug(
+                f"{len(self.pruned_instances)} statically filtered configurations not instantiated"
+            )
 
         filtered_instances = list(
             filter(lambda item:  item.status == TwisterStatus.FILTER, self.instances.values())
@@ -1153,6 +1389,113 @@ class TestPlan:
 
             filtered_instance.add_missing_case_status(filtered_instance.status)
 
+    def select_instances(self, ts, instance_list, default_platforms, integration):
+        """Select the configurations of a testsuite to be added to the test plan."""
+        # if twister was launched with no platform options at all, we
+        # take all default platforms
+        if default_platforms and not ts.build_on_all and not integration:
+            if ts.platform_allow:
+                _default_p = set(self.default_platforms)
+                _platform_allow = set(ts.platform_allow)
+                _intersection = _default_p.intersection(_platform_allow)
+                if _intersection:
+                    return list(
+                        filter(
+                            lambda _scenario: _scenario.platform.name in _intersection,
+                            instance_list
+                        )
+                    )
+                return instance_list
+            # add integration platforms to the list of default
+            # platforms, even if we are not in integration mode
+            _platforms = self.default_platforms + ts.integration_platforms
+            return list(filter(lambda ts: ts.platform.name in _platforms, instance_list))
+        elif integration:
+            return list(
+                filter(
+                    lambda item:  item.platform.name in ts.integration_platforms,
+                    instance_list
+                )
+            )
+        return instance_list
+
+    def get_statically_filtered_platforms(
+        self,
+        ts,
+        index: PlatformIndex,
+        excluded_platforms,
+        platform_filter,
+        exclude_platform,
+        testsuite_filter,
+        arch_filter,
+        tag_filter,
+        exclude_tag,
+        slow_only,
+        force_platform
+    ):
+        """
+        Return the names of platforms on which the testsuite is certainly
+        filtered by one of the static filters of apply_filters(), evaluating
+        each constraint for all platforms at once using the platform index.
+        Filters depending on the toolchain or on the instance (runnable,
+        quarantine, platform key, snippets) are not considered here.
+        """
+        # testsuite level filters, all platforms are filtered
+        if ts.modules and self.modules and not set(ts.modules).issubset(set(self.modules)):
+            return set(index.names)
+        if self.options.level:
+            tl = self.get_level(self.options.level)
+            if (
+                tl is None
+                or (ts.id not in tl.scenarios and not set(ts.levels).intersection(set(tl.levels)))
+            ):
+                return set(index.names)
+        if ts.skip:
+            return set(index.names)
+        if tag_filter and not ts.tags.intersection(tag_filter):
+            return set(index.names)
+        if slow_only and not ts.slow:
+            return set(index.names)
+        if exclude_tag and ts.tags.intersection(exclude_tag):
+            return set(index.names)
+        if testsuite_filter:
+            normalized_f = [os.path.basename(_ts) for _ts in testsuite_filter]
+            if ts.id not in normalized_f:
+                return set(index.names)
+
+        filtered = set()
+        if not force_platform:
+            filtered |= excluded_platforms
+            if ts.arch_allow:
+                filtered |= index.names - index.with_attr('arch', ts.arch_allow)
+            if ts.arch_exclude:
+                filtered |= index.with_attr('arch', ts.arch_exclude)
+            if ts.vendor_allow:
+                filtered |= index.names - index.with_attr('vendor', ts.vendor_allow)
+            if ts.vendor_exclude:
+                filtered |= index.with_attr('vendor', ts.vendor_exclude)
+            if ts.platform_exclude:
+                filtered |= set(ts.platform_exclude)
+        if self.options.integration and ts.integration_platforms:
+            filtered |= index.names - set(ts.integration_platforms)
+        if arch_filter:
+            filtered |= index.names - index.with_attr('arch', arch_filter)
+        if platform_filter:
+            filtered |= index.names - set(platform_filter)
+        if ts.platform_allow and not (platform_filter and force_platform):
+            filtered |= index.names - set(ts.platform_allow)
+        if ts.platform_type:
+            filtered |= index.names - index.with_attr('type', ts.platform_type)
+        filtered |= index.env_unsatisfied
+        if sys.platform != 'linux':
+            filtered |= index.with_attr('type', ['native'])
+        filtered |= index.below('ram', ts.min_ram)
+        filtered |= index.below('flash', ts.min_flash)
+        if ts.depends_on:
+            filtered |= index.lacking_features(ts.depends_on)
+        filtered |= index.excluded_by_tags(ts.tags)
+        return filtered
+
     def add_instances(self, instance_list):
         for instance in instance_list:
             self.instances[instance.name] = instance
@@ -1232,6 +1575,77 @@ class TestPlan:
 
         self.link_dir_counter += 1
 
+    def can_share_build(self, instance):
+        """Check whether an instance can run with the binaries of another build directory."""
+        if instance.status != TwisterStatus.NONE:
+            return False
+        instance.setup_handler(self.env)
+        if not BuildCache.supported(instance, self.options):
+            return False
+        # Other handlers run the binaries through the build system of the build directory.
+        run = instance.run and not self.options.build_only
+        return not run or instance.handler.type_str in self.SHARED_BUILD_HANDLERS
+
+    @staticmethod
+    def shared_build_key(instance, cmake_args):
+        """Return the key of the instances producing the same build.
+
+        @param instance Test instance
+        @param cmake_args Effective CMake arguments of the instance
+        """
+        # The Kconfig settings of the test scenario are passed in a file of the build directory
+        extra_conf = os.path.join(instance.build_dir, "twister", "testsuite_extra.conf")
+        extra_conf_content = None
+        if os.path.exists(extra_conf):
+            with open(extra_conf, encoding='utf-8') as f:
+                extra_conf_content = f.read()
+        return (
+            instance.platform.name,
+            instance.toolchain,
+            instance.testsuite.source_dir,
+            instance.handler.type_str,
+            instance.testsuite.filter,
+            tuple(instance.testsuite.required_snippets),
+            tuple(arg.replace(instance.build_dir, '') for arg in cmake_args),
+            extra_conf_content,
+        )
+
+    def group_shared_builds(self):
+        """Let instances with identical build inputs share one build.
+
+        Test scenarios of the same application often only differ in their run
+        time settings, e.g. the harness configuration or the timeout. Of the
+        instances with the same platform and effective CMake arguments only
+        the first one is built, the others are marked with its name in
+        shared_build and run their handler and harness against its binaries.
+        """
+        # ProjectBuilder imports this module
+        from twisterlib.runner import ProjectBuilder
+
+        groups = {}
+        for instance in self.instances.values():
+            if not self.can_share_build(instance):
+                continue
+            args = ProjectBuilder(instance, self.env, None).cmake_args()
+            groups.setdefault(self.shared_build_key(instance, args), []).append(instance)
+
+        shared = 0
+        for leader, *users in groups.values():
+            for instance in users:
+                instance.shared_build = leader.name
+                # The binaries print the run id they were built with
+                instance.run_id = leader.run_id
+                os.makedirs(instance.build_dir, exist_ok=True)
+                with open(os.path.join(instance.build_dir, "run_id.txt"), 'w') as fp:
+                    fp.write(leader.run_id)
+            shared += len(users)
+
+        if shared:
+            logger.info(
+                f"{shared} configurations use the build of another configuration"
+                f" ({len(groups)} builds for {len(groups) + shared} configurations)"
+            )
+
 
 def change_skip_to_error_if_integration(options, instance):
     ''' All skips on integration_platforms are treated as errors.'''
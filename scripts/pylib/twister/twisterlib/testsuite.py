@@ -303,7 +303,18 @@ def find_c_files_in(path: str, extensions: list = None) -> list:
 
     return filenames
 
-def scan_testsuite_path(testsuite_path):
+def scan_testsuite_path(testsuite_path, cache=None):
+    """
+    Scan the sources of a test suite for ztest suites and test cases.
+
+    @param testsuite_path path to the test suite
+    @param cache optional DiscoveryCache used to skip scanning unchanged files
+    """
+    def _scan_file(filename):
+        if cache is not None:
+            return cache.scan_file(filename, scan_file)
+        return scan_file(filename)
+
     subcases = []
     has_registered_test_suites = False
     has_run_registered_test_suites = False
@@ -315,7 +326,7 @@ def scan_testsuite_path(testsuite_path):
         if os.stat(filename).st_size == 0:
             continue
         try:
-            result: ScanPathResult = scan_file(filename)
+            result: ScanPathResult = _scan_file(filename)
             if result.warnings:
                 logger.error(f"{filename}: {result.warnings}")
                 raise TwisterRuntimeError(f"{filename}: {result.warnings}")
@@ -341,7 +352,7 @@ def scan_testsuite_path(testsuite_path):
             continue
 
         try:
-            result: ScanPathResult = scan_file(filename)
+            result: ScanPathResult = _scan_file(filename)
             if result.warnings:
                 logger.error(f"{filename}: {result.warnings}")
             if result.matches:
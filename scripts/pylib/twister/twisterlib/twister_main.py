@@ -13,10 +13,12 @@ import time
 import colorama
 from colorama import Fore
 from twisterlib.coverage import run_coverage
+from twisterlib.durations import TestDurations
 from twisterlib.environment import TwisterEnv
-from twisterlib.hardwaremap import HardwareMap
+from twisterlib.hardwaremap import DUTPool, HardwareMap
 from twisterlib.log_helper import close_logging, setup_logging
 from twisterlib.package import Artifacts
+from twisterlib.profiling import Profiler
 from twisterlib.reports import Reporting
 from twisterlib.runner import TwisterRunner
 from twisterlib.statuses import TwisterStatus
@@ -36,6 +38,12 @@ def twister(options: argparse.Namespace, default_options: argparse.Namespace):
     colorama.init(strip=color_strip)
     init_color(colorama_strip=color_strip)
 
+    # Read the durations before the output directory, which may hold the
+    # durations file, is renamed or deleted.
+    durations = None
+    if options.durations_file:
+        durations = TestDurations.from_file(options.durations_file)
+
     previous_results = None
     # Cleanup
     if (
@@ -78,6 +86,12 @@ def twister(options: argparse.Namespace, default_options: argparse.Namespace):
     setup_logging(options.outdir, options.log_file, options.log_level, options.timestamps)
     logger = logging.getLogger("twister")
 
+    if options.profile or options.profile_trace:
+        trace_dir = None
+        if options.profile_trace:
+            trace_dir = os.path.join(options.outdir, "profile_trace")
+        Profiler.setup(trace_dir)
+
     env = TwisterEnv(options, default_options)
     env.discover()
 
@@ -89,8 +103,10 @@ def twister(options: argparse.Namespace, default_options: argparse.Namespace):
     env.hwm = hwm
 
     tplan = TestPlan(env)
+    tplan.durations = durations
     try:
-        tplan.discover()
+        with Profiler.phase('discover'):
+            tplan.discover()
     except RuntimeError as e:
         logger.error(f"{e}")
         return 1
@@ -99,7 +115,8 @@ def twister(options: argparse.Namespace, default_options: argparse.Namespace):
         return 0
 
     try:
-        tplan.load()
+        with Profiler.phase('load'):
+            tplan.load()
     except RuntimeError as e:
         logger.error(f"{e}")
         return 1
@@ -148,7 +165,12 @@ def twister(options: argparse.Namespace, default_options: argparse.Namespace):
     if options.short_build_path:
         tplan.create_build_dir_links()
 
-    runner = TwisterRunner(tplan.instances, tplan.testsuites, env)
+    if options.shared_builds:
+        tplan.group_shared_builds()
+
+    runner = TwisterRunner(tplan.instances, tplan.testsuites, env,
+                           pruned_instances=tplan.pruned_instances)
+    runner.durations = durations
     # FIXME: This is a workaround for the fact that the hardware map can be usng
     # the short name of the platform, while the testplan is using the full name.
     #
@@ -158,7 +180,12 @@ def twister(options: argparse.Namespace, default_options: argparse.Namespace):
     for d in hwm.duts:
         if d.platform in tplan.platform_names:
             d.platform = tplan.get_platform(d.platform).name
-    runner.duts = hwm.duts
+    runner.duts = DUTPool(hwm.duts)
+    if not options.no_update:
+        runner.report_stream = report.suite_stream(
+            options.report_name, options.report_suffix, options.report_dir
+        )
+        runner.report_stream.reset()
     runner.run()
 
     # figure out which report to use for size comparison
@@ -193,13 +220,17 @@ def twister(options: argparse.Namespace, default_options: argparse.Namespace):
     if options.device_testing and not options.build_only:
         hwm.summary(tplan.selected_platforms)
 
-    report.save_reports(
-        options.report_name,
-        options.report_suffix,
-        options.report_dir,
-        options.no_update,
-        options.platform_reports,
-    )
+    with Profiler.phase('save_reports'):
+        report.save_reports(
+            options.report_name,
+            options.report_suffix,
+            options.report_dir,
+            options.no_update,
+            options.platform_reports,
+        )
+
+    if options.profile_trace:
+        Profiler.write_trace(options.profile_trace)
 
     report.synopsis()
 
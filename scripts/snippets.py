@@ -17,7 +17,7 @@ Output CMake variables:
 from collections import defaultdict, UserDict
 from dataclasses import dataclass, field
 from pathlib import Path, PurePosixPath
-from typing import Dict, Iterable, List, Set
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
 import argparse
 import logging
 import os
@@ -260,10 +260,58 @@ def find_snippets_in_roots(requested_snippets, snippet_roots) -> Snippets:
 
     return snippets
 
+class SnippetIndex:
+    '''Memoized snippet discovery.
+
+    Tools which look up snippets many times, like twister checking the
+    required snippets of every test suite, would otherwise walk every
+    snippet root and reload every snippet.yml file on each lookup.
+    The index walks each root once and builds the Snippets for each
+    unique list of roots once.'''
+
+    def __init__(self, sysbuild: bool = False):
+        self.sysbuild = sysbuild
+        self._roots: Dict[Path, List[Tuple[Path, dict]]] = {}
+        self._snippets: Dict[Tuple[Path, ...], Snippets] = {}
+
+    def root_snippet_ymls(self, root_dir: Path) -> List[Tuple[Path, dict]]:
+        '''Return the loaded snippet.yml files in *root_dir*.'''
+        if root_dir not in self._roots:
+            self._roots[root_dir] = list(walk_snippet_ymls(root_dir))
+        return self._roots[root_dir]
+
+    def find_snippets_in_roots(self, requested_snippets,
+                               snippet_roots) -> Snippets:
+        '''Cached equivalent of the module level
+        find_snippets_in_roots().'''
+        key = tuple(Path(root) for root in snippet_roots)
+        if key not in self._snippets:
+            found = Snippets()
+            for root in key:
+                for snippet_yml, snippet_data in self.root_snippet_ymls(root):
+                    add_snippet_data(found, snippet_yml, snippet_data,
+                                     self.sysbuild)
+            self._snippets[key] = found
+
+        # The Snippet objects are shared between lookups; callers only
+        # read them.
+        found = self._snippets[key]
+        snippets = Snippets(requested=requested_snippets)
+        snippets.update(found)
+        snippets.paths.update(found.paths)
+        return snippets
+
 def process_snippets_in(root_dir: Path, snippets: Snippets, sysbuild: bool) -> None:
     '''Process snippet.yml files in *root_dir*,
     updating *snippets* as needed.'''
 
+    for snippet_yml, snippet_data in walk_snippet_ymls(root_dir):
+        add_snippet_data(snippets, snippet_yml, snippet_data, sysbuild)
+
+def walk_snippet_ymls(root_dir: Path) -> Iterator[Tuple[Path, dict]]:
+    '''Yield the path and loaded contents of each snippet.yml file
+    in *root_dir*, in discovery order.'''
+
     if not root_dir.is_dir():
         LOG.warning(f'SNIPPET_ROOT {root_dir} '
                     'is not a directory; ignoring it')
@@ -278,12 +326,16 @@ def process_snippets_in(root_dir: Path, snippets: Snippets, sysbuild: bool) -> N
             continue
 
         snippet_yml = Path(dirpath) / SNIPPET_YML
-        snippet_data = load_snippet_yml(snippet_yml)
-        name = snippet_data['name']
-        if name not in snippets:
-            snippets[name] = Snippet(name=name)
-        snippets[name].process_data(snippet_yml, snippet_data, sysbuild)
-        snippets.paths.add(snippet_yml)
+        yield snippet_yml, load_snippet_yml(snippet_yml)
+
+def add_snippet_data(snippets: Snippets, snippet_yml: Path,
+                     snippet_data: dict, sysbuild: bool) -> None:
+    '''Add the loaded contents of *snippet_yml* to *snippets*.'''
+    name = snippet_data['name']
+    if name not in snippets:
+        snippets[name] = Snippet(name=name)
+    snippets[name].process_data(snippet_yml, snippet_data, sysbuild)
+    snippets.paths.add(snippet_yml)
 
 def load_snippet_yml(snippet_yml: Path) -> dict:
     '''Load a snippet.yml file *snippet_yml*, validate the contents
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""tests for build_server.py"""
+
+import os
+import pickle
+import subprocess
+import sys
+import time
+
+import pytest
+
+ZEPHYR_BASE = os.environ["ZEPHYR_BASE"]
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "build"))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts", "dts", "python-devicetree", "src"))
+import build_server as iut  # Implementation Under Test
+from devicetree import edtlib
+
+DTS_SCRIPTS = os.path.join(ZEPHYR_BASE, "scripts", "dts")
+KCONFIG_SCRIPT = os.path.join(ZEPHYR_BASE, "scripts", "kconfig", "kconfig.py")
+DT_TESTS = os.path.join(DTS_SCRIPTS, "python-devicetree", "tests")
+
+KCONFIG = """\
+config FOO
+	bool "foo"
+
+config BAR
+	int "bar"
+	default $(BAR_DEFAULT)
+
+osource "sub/*.kconfig"
+"""
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Server with the scripts imported, running them in this process"""
+    environ = dict(os.environ)
+    server = iut.BuildServer("unused.sock", 1)
+    server.import_scripts()
+    yield server
+    os.environ.clear()
+    os.environ.update(environ)
+
+
+@pytest.fixture
+def edt_pickle(tmp_path):
+    """Pickled EDT of the devicetree tests"""
+    cwd = os.getcwd()
+    os.chdir(DT_TESTS)
+    try:
+        edt = edtlib.EDT("test-multidir.dts", ["test-bindings", "test-bindings-2"])
+    finally:
+        os.chdir(cwd)
+    path = tmp_path / "edt.pickle"
+    with open(path, "wb") as f:
+        pickle.dump(edt, f, protocol=4)
+    return str(path)
+
+
+def request(script, argv, cwd, **env):
+    return {
+        "version": iut.PROTOCOL_VERSION,
+        "script": script,
+        "argv": argv,
+        "cwd": str(cwd),
+        "env": dict(os.environ, **env),
+    }
+
+
+def test_run_without_server(tmp_path, monkeypatch):
+    """Test that the client runs the scripts itself without a server"""
+    monkeypatch.delenv(iut.SOCKET_VAR, raising=False)
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+    script = tmp_path / "script.py"
+    script.write_text("import sys\nopen(sys.argv[1], 'w').write(__name__)\nsys.exit(3)\n")
+
+    with pytest.raises(SystemExit) as e:
+        iut.run(str(script), [str(tmp_path / "out.txt")])
+    assert e.value.code == 3
+    assert (tmp_path / "out.txt").read_text() == "__main__"
+
+    # Same without a server listening on the socket
+    monkeypatch.setenv(iut.SOCKET_VAR, str(tmp_path / "none.sock"))
+    with pytest.raises(SystemExit):
+        iut.run(str(script), [str(tmp_path / "out2.txt")])
+    assert (tmp_path / "out2.txt").read_text() == "__main__"
+
+
+def test_server_fallback(server, tmp_path):
+    """Test the requests which the clients have to run themselves"""
+    other = request(str(tmp_path / "other.py"), [], tmp_path)
+    assert server.run(other)["status"] == "fallback"
+
+    old = dict(request(KCONFIG_SCRIPT, [], tmp_path), version=0)
+    assert server.run(old)["status"] == "fallback"
+
+
+def test_server_edt(server, edt_pickle, tmp_path):
+    """Test that the served scripts write the same files, loading the EDT once"""
+    script = os.path.join(DTS_SCRIPTS, "gen_dts_cmake.py")
+    subprocess.run([sys.executable, script, "--edt-pickle", edt_pickle,
+                    "--cmake-out", "direct.cmake"], cwd=tmp_path, check=True)
+
+    for _ in range(2):
+        response = server.run(request(script, ["--edt-pickle", edt_pickle,
+                                               "--cmake-out", "served.cmake"], tmp_path))
+        assert response == {"status": "done", "returncode": 0, "output": []}
+        assert (tmp_path / "served.cmake").read_text() == \
+            (tmp_path / "direct.cmake").read_text()
+    assert len(server.edt_cache._edts) == 1
+
+    # Errors of the scripts are reported to the clients
+    response = server.run(request(script, ["--edt-pickle", edt_pickle], tmp_path))
+    assert response["returncode"] == 2
+    assert "--cmake-out" in response["output"][-1][1]
+
+
+def test_server_kconfig(server, tmp_path):
+    """Test that Kconfig trees are reused until their inputs change"""
+    (tmp_path / "Kconfig").write_text(KCONFIG)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "prj.conf").write_text("CONFIG_FOO=y\n")
+    argv = ["--handwritten-input-configs", "Kconfig", "out.config", "out.h", "list.txt",
+            "prj.conf"]
+
+    def run(bar_default="3"):
+        response = server.run(request(KCONFIG_SCRIPT, argv, tmp_path, srctree=str(tmp_path),
+                                      BAR_DEFAULT=bar_default))
+        assert response["returncode"] == 0, response["output"]
+        entries = list(server.kconfig_cache._entries.values())
+        values = [line for line in (tmp_path / "out.config").read_text().splitlines()
+                  if not line.startswith("#")]
+        return entries[-1]["kconf"], values
+
+    kconf, values = run()
+    assert values == ["CONFIG_FOO=y", "CONFIG_BAR=3"]
+    (tmp_path / "prj.conf").write_text("CONFIG_BAR=4\n")
+    assert run() == (kconf, ["CONFIG_BAR=4"])
+
+    # A changed environment variable, or a new sourced file, parses again
+    kconf2, values = run("5")
+    assert kconf2 is not kconf
+    assert values == ["CONFIG_BAR=4"]
+    (tmp_path / "sub" / "baz.kconfig").write_text('config BAZ\n\tbool "baz"\n\tdefault y\n')
+    kconf3, values = run("5")
+    assert kconf3 is not kconf2
+    assert values == ["CONFIG_BAR=4", "CONFIG_BAZ=y"]
+
+
+def test_server_socket(edt_pickle, tmp_path):
+    """Test a server with its clients"""
+    socket_path = str(tmp_path / "server.sock")
+    env = dict(os.environ, **{iut.SOCKET_VAR: socket_path})
+    server = subprocess.Popen([sys.executable, iut.__file__, "serve", "-j", "2", "-v"],
+                              env=env, stderr=subprocess.PIPE, text=True)
+    try:
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.1)
+
+        script = os.path.join(DTS_SCRIPTS, "gen_defines.py")
+        for name in ["a.h", "b.h"]:
+            subprocess.run([sys.executable, iut.__file__, "run", script,
+                            "--edt-pickle", edt_pickle, "--header-out", name],
+                           env=env, cwd=tmp_path, check=True)
+        assert (tmp_path / "a.h").read_text() == (tmp_path / "b.h").read_text()
+
+        subprocess.run([sys.executable, iut.__file__, "stop"], env=env, check=True)
+        assert server.wait(timeout=30) == 0
+        log = server.stderr.read()
+        assert "Serving 5 scripts" in log
+        # The headers were written by the server, not by the clients themselves
+        for name in ["a.h", "b.h"]:
+            assert f"done: {script} --edt-pickle {edt_pickle} --header-out {name}" in log
+        assert not os.path.exists(socket_path)
+    finally:
+        server.kill()
+        server.wait()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for build_cache.py classes' methods
+"""
+
+import mock
+import os
+import pytest
+import subprocess
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.build_cache import BuildCache
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    (source / 'prj.conf').write_text('CONFIG_ZTEST=y\n')
+    (source / 'extra.conf').write_text('CONFIG_FOO=y\n')
+    return source
+
+
+def make_instance(source_dir, **kwargs):
+    kwargs.setdefault('build_dir', str(source_dir.parent / 'build'))
+    instance = mock.Mock(toolchain='zephyr', sysbuild=False, run=True, **kwargs)
+    instance.platform.name = 'native_sim'
+    instance.testsuite.source_dir = str(source_dir)
+    instance.testsuite.filter = ''
+    instance.testsuite.harness = 'ztest'
+    instance.handler.type_str = 'native'
+    return instance
+
+
+def test_buildcache_source_state(tmp_path):
+    def git(*args):
+        subprocess.run(['git', '-C', str(tmp_path), *args], check=True, capture_output=True)
+
+    assert BuildCache.source_state([str(tmp_path)]) is None
+
+    git('init', '-q')
+    (tmp_path / 'a.c').write_text('int a;\n')
+    git('add', 'a.c')
+    git('-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '-m', 'a')
+    state = BuildCache.source_state([str(tmp_path)])
+    assert state
+    assert BuildCache.source_state([str(tmp_path)]) == state
+
+    (tmp_path / 'a.c').write_text('int b;\n')
+    modified = BuildCache.source_state([str(tmp_path)])
+    assert modified != state
+
+    (tmp_path / 'b.c').write_text('int c;\n')
+    untracked = BuildCache.source_state([str(tmp_path)])
+    assert untracked != modified
+    (tmp_path / 'b.c').write_text('int d;\n')
+    assert BuildCache.source_state([str(tmp_path)]) != untracked
+
+
+def test_buildcache_key(tmp_path, source_dir):
+    cache = BuildCache(str(tmp_path / 'cache'), 'state')
+    instance = make_instance(source_dir)
+    args = ['-DBOARD=native_sim', '-DOVERLAY_CONFIG="extra.conf"']
+    key = cache.key(instance, args)
+
+    assert cache.key(instance, list(args)) == key
+    assert cache.key(instance, args + ['-DCONFIG_BAR=y']) != key
+    assert BuildCache(str(tmp_path / 'cache'), 'other').key(instance, args) != key
+
+    (source_dir / 'extra.conf').write_text('CONFIG_FOO=n\n')
+    changed_overlay = cache.key(instance, args)
+    assert changed_overlay != key
+
+    (source_dir / 'src').mkdir()
+    (source_dir / 'src' / 'main.c').write_text('int main(void) {}\n')
+    assert cache.key(instance, args) != changed_overlay
+
+    instance.testsuite.filter = 'CONFIG_FOO'
+    assert cache.key(instance, args) != changed_overlay
+
+
+def test_buildcache_key_build_dir(tmp_path, source_dir):
+    cache = BuildCache(str(tmp_path / 'cache'), 'state')
+    keys = []
+    for name in ['build1', 'build2']:
+        build_dir = tmp_path / name
+        (build_dir / 'twister').mkdir(parents=True)
+        (build_dir / 'twister' / 'testsuite_extra.conf').write_text('CONFIG_FOO=y\n')
+        instance = make_instance(source_dir, build_dir=str(build_dir))
+        args = [f'-DOVERLAY_CONFIG={build_dir}/twister/testsuite_extra.conf']
+        keys.append(cache.key(instance, args))
+
+    assert keys[0] == keys[1]
+
+    # The content of the Kconfig settings of the build directory is hashed
+    (build_dir / 'twister' / 'testsuite_extra.conf').write_text('CONFIG_FOO=n\n')
+    assert cache.key(instance, args) != keys[1]
+
+
+def test_buildcache_key_roots(tmp_path, source_dir):
+    board_root = source_dir / 'my_boards'
+    (board_root / 'boards').mkdir(parents=True)
+    (board_root / 'boards' / 'board.yml').write_text('board: a\n')
+    module = tmp_path / 'module'
+    module.mkdir()
+    (module / 'a.c').write_text('int a;\n')
+    instance = make_instance(source_dir)
+    args = ['-DBOARD_ROOT=my_boards', f'-DEXTRA_ZEPHYR_MODULES={module}']
+
+    key = BuildCache(str(tmp_path / 'cache'), 'state').key(instance, args)
+    (board_root / 'boards' / 'board.yml').write_text('board: b\n')
+    board_changed = BuildCache(str(tmp_path / 'cache'), 'state').key(instance, args)
+    assert board_changed != key
+    (module / 'a.c').write_text('int b;\n')
+    module_changed = BuildCache(str(tmp_path / 'cache'), 'state').key(instance, args)
+    assert module_changed != board_changed
+
+    # Roots can be given in the environment as well
+    with mock.patch.dict(os.environ, {'DTS_ROOT': str(module)}):
+        env_key = BuildCache(str(tmp_path / 'cache'), 'state').key(instance, args)
+        assert env_key != module_changed
+        (module / 'a.c').write_text('int c;\n')
+        assert BuildCache(str(tmp_path / 'cache'), 'state').key(instance, args) != env_key
+
+
+def make_build_dir(build_dir, compiler=sys.executable):
+    (build_dir / 'zephyr').mkdir(parents=True)
+    (build_dir / 'CMakeCache.txt').write_text(f'CMAKE_C_COMPILER:FILEPATH={compiler}\n')
+
+
+def test_buildcache_store_restore(tmp_path):
+    cache = BuildCache(str(tmp_path / 'cache'), 'state')
+    build_dir = tmp_path / 'build'
+    make_build_dir(build_dir)
+    (build_dir / 'zephyr' / '.config').write_text('CONFIG_X=y\n')
+    (build_dir / 'zephyr' / 'zephyr.exe').write_bytes(b'\x7fELF')
+    (build_dir / 'zephyr' / 'zephyr.exe').chmod(0o755)
+    (build_dir / 'zephyr' / 'extra.bin').write_bytes(b'\x7fELF')
+    (build_dir / 'handler.log').write_text('not cached\n')
+
+    assert cache.restore('k1', str(tmp_path / 'other')) is None
+    assert cache.misses == 1
+
+    cache.store('k1', str(build_dir), 'run1', extra_files=['zephyr/extra.bin', '/abs.hex'])
+    # Identical files are stored once
+    blobs = [f for _, _, files in os.walk(tmp_path / 'cache' / 'blobs') for f in files]
+    assert len(blobs) == 2
+
+    restore_dir = tmp_path / 'restored'
+    assert cache.restore('k1', str(restore_dir)) == 'run1'
+    assert cache.hits == 1
+    assert (restore_dir / 'zephyr' / '.config').read_text() == 'CONFIG_X=y\n'
+    assert (restore_dir / 'zephyr' / 'extra.bin').read_bytes() == b'\x7fELF'
+    assert os.access(restore_dir / 'zephyr' / 'zephyr.exe', os.X_OK)
+    assert not (restore_dir / 'handler.log').exists()
+    # The CMake state refers to the original build directory
+    assert not (restore_dir / 'CMakeCache.txt').exists()
+
+    # The restored files are copies
+    (restore_dir / 'zephyr' / 'zephyr.exe').write_bytes(b'changed')
+    assert cache.restore('k1', str(tmp_path / 'again')) == 'run1'
+    assert (tmp_path / 'again' / 'zephyr' / 'zephyr.exe').read_bytes() == b'\x7fELF'
+
+
+def test_buildcache_compiler(tmp_path):
+    cache = BuildCache(str(tmp_path / 'cache'), 'state')
+    build_dir = tmp_path / 'build'
+    make_build_dir(build_dir)
+    (build_dir / 'zephyr' / 'zephyr.exe').write_bytes(b'\x7fELF')
+
+    cache.store('k1', str(build_dir), 'run1')
+    assert cache.restore('k1', str(tmp_path / 'restored')) == 'run1'
+
+    # Builds of another compiler version are not restored
+    with mock.patch.dict(BuildCache._compiler_versions, {sys.executable: 'other version'}):
+        assert cache.restore('k1', str(tmp_path / 'other')) is None
+    assert cache.misses == 1
+
+    # Builds whose compiler can not be run are not stored
+    other_build_dir = tmp_path / 'other_build'
+    make_build_dir(other_build_dir, compiler=str(tmp_path / 'missing-gcc'))
+    cache.store('k2', str(other_build_dir), 'run2')
+    assert cache.restore('k2', str(tmp_path / 'k2')) is None
+
+
+def test_buildcache_prune(tmp_path):
+    cache = BuildCache(str(tmp_path / 'cache'), 'state')
+    for n, content in enumerate([b'a' * 100, b'b' * 100, b'c' * 100]):
+        build_dir = tmp_path / f'build{n}'
+        make_build_dir(build_dir)
+        (build_dir / 'zephyr' / 'zephyr.exe').write_bytes(content)
+        (build_dir / 'zephyr' / '.config').write_text('CONFIG_X=y\n')
+        cache.store(f'k{n}', str(build_dir), f'run{n}')
+        os.utime(cache._entry_file(f'k{n}'), (n, n))
+    # k0 is used again, k1 is the least recently used build
+    cache.restore('k0', str(tmp_path / 'restored'))
+
+    cache.prune(max_size=250)
+
+    assert cache.restore('k1', str(tmp_path / 'k1')) is None
+    assert cache.restore('k0', str(tmp_path / 'k0')) == 'run0'
+    assert cache.restore('k2', str(tmp_path / 'k2')) == 'run2'
+    # The blobs of the removed build are removed, the shared .config is kept
+    blobs = [f for _, _, files in os.walk(tmp_path / 'cache' / 'blobs') for f in files]
+    assert len(blobs) == 3
+
+    cache.prune(max_size=0)
+    assert not [f for _, _, files in os.walk(tmp_path / 'cache') for f in files]
+
+
+TESTDATA_1 = [
+    ({}, {}, True),
+    ({}, {'coverage': True}, False),
+    ({}, {'cmake_only': True}, False),
+    ({}, {'create_rom_ram_report': True}, False),
+    ({'sysbuild': True}, {}, False),
+    ({'type_str': 'qemu'}, {}, False),
+    ({'type_str': 'qemu', 'run': False}, {}, True),
+    ({'type_str': 'qemu'}, {'build_only': True}, True),
+    ({'type_str': 'device'}, {}, False),
+    ({'type_str': 'device', 'run': False}, {}, True),
+]
+
+
+@pytest.mark.parametrize('instance_attrs, options_attrs, expected', TESTDATA_1)
+def test_buildcache_supported(source_dir, instance_attrs, options_attrs, expected):
+    instance = make_instance(source_dir)
+    instance.handler.type_str = instance_attrs.pop('type_str', 'native')
+    for k, v in instance_attrs.items():
+        setattr(instance, k, v)
+    options = mock.Mock(coverage=False, cmake_only=False, create_rom_ram_report=False,
+                        build_only=False)
+    for k, v in options_attrs.items():
+        setattr(options, k, v)
+
+    assert BuildCache.supported(instance, options) == expected
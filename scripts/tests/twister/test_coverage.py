@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for coverage.py classes' methods
+"""
+
+import mock
+import os
+import pytest
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.coverage import CoverageTool, GcovDumpCollector
+
+
+def gcov_log(build_dir, dumps):
+    lines = []
+    for dump in dumps:
+        lines.append("GCOV_COVERAGE_DUMP_START")
+        lines.extend(f"*{build_dir / name}<{hex_dump}" for name, hex_dump in dump)
+        lines.append("GCOV_COVERAGE_DUMP_END")
+    return lines
+
+
+def test_gcovdumpcollector(tmp_path):
+    lines = gcov_log(tmp_path, [
+        [('a.gcda', '0102'), ('b.gcda', '03')],
+        [('a.gcda', '0405')],
+    ])
+    collector = GcovDumpCollector(str(tmp_path))
+
+    for line in lines[:4]:
+        collector.feed(line)
+
+    # The gcda files are written at the end of the dump
+    assert (tmp_path / 'a.gcda').read_bytes() == b'\x01\x02'
+    assert (tmp_path / 'b.gcda').read_bytes() == b'\x03'
+    assert GcovDumpCollector.load(str(tmp_path)) == {
+        'complete': True, 'valid': True, 'data': {}
+    }
+
+    collector.feed(lines[4])
+    assert not GcovDumpCollector.load(str(tmp_path))['complete']
+
+    for line in lines[5:]:
+        collector.feed(line)
+
+    # Repeated dumps are merged with the written file
+    assert GcovDumpCollector.load(str(tmp_path)) == {
+        'complete': True,
+        'valid': True,
+        'data': {str(tmp_path / 'a.gcda'): ['0102', '0405']}
+    }
+
+    # A new collector forgets about the previous run
+    GcovDumpCollector(str(tmp_path))
+    assert GcovDumpCollector.load(str(tmp_path)) is None
+
+
+def test_gcovdumpcollector_invalid(tmp_path):
+    collector = GcovDumpCollector(str(tmp_path))
+    for line in gcov_log(tmp_path, [[('a.gcda', 'xyz')]]):
+        collector.feed(line)
+
+    assert not GcovDumpCollector.load(str(tmp_path))['valid']
+
+
+@pytest.mark.parametrize('collected', [True, False], ids=['collected', 'from log'])
+def test_coveragetool_capture_data(tmp_path, collected):
+    lines = gcov_log(tmp_path, [
+        [('a.gcda', '0102'), ('b.gcda', '03')],
+        [('a.gcda', '0405')],
+    ])
+    (tmp_path / 'handler.log').write_text('\n'.join(['boot', *lines, 'done']) + '\n')
+    if collected:
+        collector = GcovDumpCollector(str(tmp_path))
+        for line in lines:
+            collector.feed(line)
+
+    tool = CoverageTool()
+    tool.merge_hexdumps = mock.Mock(side_effect=lambda hexdumps: ''.join(hexdumps))
+
+    with mock.patch.object(CoverageTool, 'retrieve_gcov_data',
+                           wraps=CoverageTool.retrieve_gcov_data) as retrieve:
+        assert tool.capture_data(str(tmp_path))
+
+    assert retrieve.called != collected
+    assert (tmp_path / 'a.gcda').read_bytes() == b'\x01\x02\x04\x05'
+    assert (tmp_path / 'b.gcda').read_bytes() == b'\x03'
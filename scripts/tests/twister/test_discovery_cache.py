@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for discovery_cache.py classes' methods
+"""
+
+import mock
+import os
+import pickle
+import pytest
+
+from twisterlib.discovery_cache import DiscoveryCache, user_cache_dir
+from twisterlib.testsuite import ScanPathResult
+
+
+TESTDATA_1 = [
+    ('posix', {'XDG_CACHE_HOME': '/xdg'}, os.path.join('/xdg', 'zephyr', 'twister')),
+    ('nt', {'LOCALAPPDATA': '/appdata'}, os.path.join('/appdata', 'zephyr', 'twister')),
+    ('posix', {}, os.path.join('/home/user', '.cache', 'zephyr', 'twister')),
+]
+
+@pytest.mark.parametrize(
+    'os_name, environ, expected',
+    TESTDATA_1,
+    ids=['xdg', 'windows', 'home']
+)
+def test_user_cache_dir(os_name, environ, expected):
+    with mock.patch('os.name', os_name), \
+         mock.patch.dict('os.environ', environ, clear=True), \
+         mock.patch('os.path.expanduser', return_value='/home/user'):
+        assert user_cache_dir() == expected
+
+
+def test_discoverycache_yaml_load_verify(tmp_path):
+    yaml_file = tmp_path / 'testcase.yaml'
+    yaml_file.write_text('tests:\n  dummy.test: {}\n')
+    loaded = {'tests': {'dummy.test': {}}}
+
+    cache = DiscoveryCache(tmp_path / 'cache')
+    cache.load()
+    with mock.patch('scl.yaml_load_verify', return_value=loaded) as mock_load:
+        assert cache.yaml_load_verify(str(yaml_file), None) == loaded
+        assert cache.yaml_load_verify(str(yaml_file), None) == loaded
+    mock_load.assert_called_once_with(str(yaml_file), None)
+    cache.save()
+
+    # A new run reuses the cache from disk.
+    cache = DiscoveryCache(tmp_path / 'cache')
+    cache.load()
+    with mock.patch('scl.yaml_load_verify') as mock_load:
+        assert cache.yaml_load_verify(str(yaml_file), None) == loaded
+    mock_load.assert_not_called()
+    assert cache.hits == 1
+
+    # Only the modification time changed - content hash still matches.
+    os.utime(yaml_file, ns=(0, 0))
+    with mock.patch('scl.yaml_load_verify') as mock_load:
+        assert cache.yaml_load_verify(str(yaml_file), None) == loaded
+    mock_load.assert_not_called()
+    assert cache.dirty
+
+    # The content changed, so the file is parsed again.
+    yaml_file.write_text('tests:\n  dummy.test2: {}\n')
+    with mock.patch('scl.yaml_load_verify', return_value={}) as mock_load:
+        assert cache.yaml_load_verify(str(yaml_file), None) == {}
+    mock_load.assert_called_once()
+
+
+def test_discoverycache_yaml_error_not_cached(tmp_path):
+    yaml_file = tmp_path / 'testcase.yaml'
+    yaml_file.write_text('tests:\n wrong:\n  yaml: {]}\n')
+
+    cache = DiscoveryCache(tmp_path)
+    with pytest.raises(Exception):
+        cache.yaml_load_verify(str(yaml_file), None)
+
+    assert not cache.yaml_entries
+    assert not cache.dirty
+
+
+def test_discoverycache_scan_file(tmp_path):
+    src_file = tmp_path / 'main.c'
+    src_file.write_text('ZTEST(suite, test_a)\n')
+    result = ScanPathResult(matches=['suite.a'], ztest_suite_names=['suite'])
+    scanner = mock.Mock(return_value=result)
+
+    cache = DiscoveryCache(tmp_path)
+    assert cache.scan_file(str(src_file), scanner) == result
+    assert cache.scan_file(str(src_file), scanner) == result
+    scanner.assert_called_once_with(os.path.abspath(src_file))
+
+
+def test_discoverycache_scan_file_error(tmp_path):
+    src_file = tmp_path / 'main.c'
+    src_file.write_text('ztest_test_suite(suite, ztest_unit_test(test_a));\n')
+    scanner = mock.Mock(side_effect=ValueError("can't find ztest_run_test_suite"))
+
+    cache = DiscoveryCache(tmp_path)
+    for _ in range(2):
+        with pytest.raises(ValueError, match="can't find ztest_run_test_suite"):
+            cache.scan_file(str(src_file), scanner)
+    scanner.assert_called_once()
+
+
+TESTDATA_2 = [
+    ({'fingerprint': None, 'yaml': {'f': {}}, 'scan': {}}, False, False),
+    (None, False, False),
+    ('valid', False, True),
+    ('valid', True, False),
+]
+
+@pytest.mark.parametrize(
+    'cache_content, rescan, expected_loaded',
+    TESTDATA_2,
+    ids=['outdated fingerprint', 'garbage', 'valid', 'rescan']
+)
+def test_discoverycache_load(tmp_path, cache_content, rescan, expected_loaded):
+    cache = DiscoveryCache(tmp_path, schema={'type': 'map'}, rescan=rescan)
+    if cache_content == 'valid':
+        cache_content = {'fingerprint': cache.fingerprint, 'yaml': {'f': {}}, 'scan': {}}
+    with open(cache.cache_file, 'wb') as f:
+        pickle.dump(cache_content, f)
+
+    cache.load()
+
+    assert bool(cache.yaml_entries) == expected_loaded
+
+
+def test_discoverycache_fingerprint_scanner_sources(tmp_path, monkeypatch):
+    scanner = tmp_path / 'testsuite.py'
+    scanner.write_text('rules = 1\n')
+    monkeypatch.setattr(DiscoveryCache, 'SCANNER_SOURCES', [str(scanner)])
+    fingerprint = DiscoveryCache(tmp_path).fingerprint
+
+    assert DiscoveryCache(tmp_path).fingerprint == fingerprint
+    scanner.write_text('rules = 2\n')
+    assert DiscoveryCache(tmp_path).fingerprint != fingerprint
+
+
+def test_discoverycache_save_prunes_removed_files(tmp_path):
+    kept = tmp_path / 'kept.yaml'
+    kept.write_text('tests: {}\n')
+    removed = tmp_path / 'removed.yaml'
+    removed.write_text('tests: {}\n')
+
+    cache = DiscoveryCache(tmp_path / 'cache')
+    with mock.patch('scl.yaml_load_verify', return_value={'tests': {}}):
+        cache.yaml_load_verify(str(kept), None)
+        cache.yaml_load_verify(str(removed), None)
+    removed.unlink()
+    cache.save()
+
+    assert not cache.dirty
+    with open(cache.cache_file, 'rb') as f:
+        saved = pickle.load(f)
+    assert list(saved['yaml']) == [os.path.abspath(kept)]
+
+
+def test_discoverycache_export_merge_updates(tmp_path):
+    yaml_file = tmp_path / 'testcase.yaml'
+    yaml_file.write_text('tests: {}\n')
+
+    worker_cache = DiscoveryCache(tmp_path)
+    with mock.patch('scl.yaml_load_verify', return_value={'tests': {}}):
+        worker_cache.yaml_load_verify(str(yaml_file), None)
+
+    updates = worker_cache.export_updates()
+    assert list(updates['yaml']) == [os.path.abspath(yaml_file)]
+    assert worker_cache.export_updates() == {'yaml': {}, 'scan': {}}
+
+    cache = DiscoveryCache(tmp_path)
+    cache.merge_updates(updates)
+    assert cache.dirty
+    with mock.patch('scl.yaml_load_verify') as mock_load:
+        assert cache.yaml_load_verify(str(yaml_file), None) == {'tests': {}}
+    mock_load.assert_not_called()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for durations.py classes' methods
+"""
+
+import json
+import mock
+import os
+import pytest
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.durations import TestDurations
+
+
+def test_testdurations_from_file(tmp_path):
+    report = {
+        'testsuites': [
+            {'name': 'test.a', 'platform': 'p1', 'toolchain': 'zephyr',
+             'build_time': '10.00', 'execution_time': '5.50'},
+            {'name': 'test.b', 'platform': 'p1',
+             'build_time': '2.00'},
+            {'name': 'test.c', 'platform': 'p2', 'toolchain': 'zephyr',
+             'build_time': 'invalid'},
+        ]
+    }
+    report_file = tmp_path / 'twister.json'
+    report_file.write_text(json.dumps(report))
+
+    durations = TestDurations.from_file(report_file)
+
+    assert durations
+    assert durations.durations == {
+        ('p1', 'test.a'): 15.5,
+        os.path.join('p1', 'zephyr', 'test.a'): 15.5,
+        ('p1', 'test.b'): 2.0,
+    }
+
+
+@pytest.mark.parametrize(
+    'content',
+    [None, 'not json'],
+    ids=['missing', 'invalid']
+)
+def test_testdurations_from_file_error(caplog, tmp_path, content):
+    report_file = tmp_path / 'twister.json'
+    if content is not None:
+        report_file.write_text(content)
+
+    durations = TestDurations.from_file(report_file)
+
+    assert not durations
+    assert 'Unable to read test durations' in caplog.text
+
+
+TESTDATA_1 = [
+    ('p1/zephyr/test.a', 'p1', 'test.a', 20.0),
+    ('p1/llvm/test.a', 'p1', 'test.a', 10.0),
+    ('p2/zephyr/test.a', 'p2', 'test.a', 5.0),
+    ('p3/zephyr/test.new', 'p3', 'test.new', 10.0),
+]
+
+@pytest.mark.parametrize(
+    'name, platform_name, suite_name, expected_duration',
+    TESTDATA_1,
+    ids=['instance name', 'platform and suite', 'other platform', 'default']
+)
+def test_testdurations_estimate(name, platform_name, suite_name, expected_duration):
+    durations = TestDurations({
+        'p1/zephyr/test.a': 20.0,
+        ('p1', 'test.a'): 10.0,
+        ('p2', 'test.a'): 5.0,
+    })
+    instance = mock.Mock()
+    instance.name = name
+    instance.platform.name = platform_name
+    instance.testsuite.name = suite_name
+
+    assert durations.estimate(instance) == expected_duration
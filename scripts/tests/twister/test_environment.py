@@ -94,6 +94,13 @@ TESTDATA_1 = [
         ['--device-flash-with-test'],
         '--device-flash-with-test requires --device_testing'
     ),
+    (
+        None,
+        None,
+        None,
+        ['--run-jobs', '4'],
+        '--run-jobs requires --scheduler pool'
+    ),
     (
         None,
         None,
@@ -142,6 +149,7 @@ TESTDATA_1 = [
         'device serial without platform',
         'device serial with multiple platforms',
         'device flash with test without device testing',
+        'run-jobs without pool scheduler',
         'shuffle-tests without subset',
         'shuffle-tests-seed without shuffle-tests',
         'unrecognised argument',
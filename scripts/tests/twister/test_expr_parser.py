@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for expr_parser.py functions
+"""
+
+import mock
+import os
+import pytest
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+import expr_parser
+
+
+ENVS = [
+    {},
+    {"ARCH": "arm", "CONFIG_A": "y", "CONFIG_NUM": "0x20", "BOARD": "qemu_x86"},
+    {"ARCH": "x86", "CONFIG_NUM": "8", "BOARD": "native_sim"},
+]
+
+TESTDATA_1 = [
+    'ARCH == "arm"',
+    'ARCH != "arm" and CONFIG_A',
+    'not CONFIG_A or ARCH in ["x86", "riscv"]',
+    'CONFIG_NUM > 0x10',
+    'CONFIG_NUM < 10',
+    'CONFIG_NUM >= 8 and CONFIG_NUM <= 32',
+    'BOARD : "qemu.*"',
+    '(ARCH == "arm" or ARCH == "x86") and not (BOARD : "native.*")',
+]
+
+
+@pytest.mark.parametrize('expr_text', TESTDATA_1)
+def test_compile_expr(expr_text):
+    ast = expr_parser.parser.parse(expr_text)
+    compiled = expr_parser.compile_expr(expr_text)
+
+    for env in ENVS:
+        assert compiled(env, None) == expr_parser.ast_expr(ast, env, None)
+        assert expr_parser.parse(expr_text, env, None) == \
+            expr_parser.ast_expr(ast, env, None)
+
+
+def test_compile_expr_dt_function():
+    node = mock.Mock(status='okay', props={'p': mock.Mock(val=1)})
+    edt = mock.Mock(label2node={'n': node})
+
+    assert expr_parser.parse('dt_node_prop_enabled("n", "p")', {}, edt)
+    assert not expr_parser.parse('dt_nodelabel_enabled("m")', {}, edt)
+
+
+def test_parse_cache():
+    expr_parser.parse_ast.cache_clear()
+    expr_parser.compile_expr.cache_clear()
+    expr_text = 'CONFIG_A and ARCH == "arm"'
+
+    with mock.patch.object(expr_parser, 'parser',
+                           wraps=expr_parser.parser) as parser_mock:
+        for env in ENVS:
+            expr_parser.parse(expr_text, env, None)
+
+    parser_mock.parse.assert_called_once_with(expr_text)
+
+
+def test_parse_errors():
+    # Syntax errors are raised for every evaluation, not cached
+    for _ in range(2):
+        with pytest.raises(SyntaxError):
+            expr_parser.parse('ARCH ==', {}, None)
+
+    # Invalid values are reported when the expression is evaluated
+    compiled = expr_parser.compile_expr('CONFIG_NUM > 1')
+    assert not compiled({}, None)
+    with pytest.raises(ValueError):
+        compiled({'CONFIG_NUM': 'y'}, None)
+
+    compiled = expr_parser.compile_expr('BOARD : "("')
+    assert compiled is not None
+    with pytest.raises(Exception):
+        compiled({'BOARD': 'x'}, None)
+
+
+@pytest.mark.parametrize('expr_text', TESTDATA_1)
+def test_benchmark_methods_agree(expr_text):
+    # The two methods timed by benchmark() must evaluate to the same results
+    envs = [dict(env, BOARD=f"board_{i}") for env in ENVS for i in range(10)]
+
+    for env in envs:
+        with expr_parser.mutex:
+            ast = expr_parser.parser.parse(expr_text)
+        assert expr_parser.parse(expr_text, env, None) == \
+            expr_parser.ast_expr(ast, env, None)
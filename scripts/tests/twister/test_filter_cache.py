@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for filter_cache.py classes' methods
+"""
+
+import mock
+import os
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.filter_cache import FilterDataCache
+
+
+def test_filterdatacache_get():
+    cache = FilterDataCache(maxsize=2)
+    loader = mock.Mock(side_effect=lambda content: {'content': content})
+
+    first = cache.get('defconfig', 'CONFIG_A=y', loader)
+    assert cache.get('defconfig', 'CONFIG_A=y', loader) is first
+    # same content, other kind
+    cache.get('edt', 'CONFIG_A=y', loader)
+    assert loader.call_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # least recently used entry is evicted
+    cache.get('defconfig', b'CONFIG_B=y', loader)
+    assert len(cache.entries) == 2
+    cache.get('defconfig', 'CONFIG_A=y', loader)
+    assert loader.call_count == 4
+
+
+def test_filterdatacache_store(tmp_path):
+    loader = mock.Mock(side_effect=lambda content: {'CONFIG_A': 'y'})
+    cache = FilterDataCache(store_dir=str(tmp_path))
+
+    assert cache.get('edt', 'data', loader) == {'CONFIG_A': 'y'}
+    assert not os.listdir(tmp_path)
+
+    assert cache.get('defconfig', 'data', loader, persist=True) == {'CONFIG_A': 'y'}
+    assert len(os.listdir(tmp_path)) == 1
+
+    # a new process finds the stored data
+    other = FilterDataCache(store_dir=str(tmp_path))
+    assert other.get('defconfig', 'data', loader, persist=True) == {'CONFIG_A': 'y'}
+    assert loader.call_count == 2
+
+
+def test_filterdatacache_store_unreadable(tmp_path):
+    loader = mock.Mock(return_value={'CONFIG_A': 'y'})
+    cache = FilterDataCache(store_dir=str(tmp_path))
+    cache.get('defconfig', 'data', loader, persist=True)
+    for name in os.listdir(tmp_path):
+        (tmp_path / name).write_bytes(b'garbage')
+
+    other = FilterDataCache(store_dir=str(tmp_path))
+    assert other.get('defconfig', 'data', loader, persist=True) == {'CONFIG_A': 'y'}
+    assert loader.call_count == 2
+
+
+def test_filterdatacache_prune(tmp_path):
+    cache = FilterDataCache(store_dir=str(tmp_path))
+    for i in range(4):
+        path = tmp_path / f'defconfig-{i}.pickle'
+        path.write_bytes(b'')
+        os.utime(path, (i, i))
+
+    cache.prune(max_stored=2)
+    assert sorted(os.listdir(tmp_path)) == ['defconfig-2.pickle', 'defconfig-3.pickle']
+
+    # a missing store is not an error
+    FilterDataCache(store_dir=str(tmp_path / 'missing')).prune()
+
+
+def test_filterdatacache_load_marks_used(tmp_path):
+    loader = mock.Mock(return_value={'CONFIG_A': 'y'})
+    cache = FilterDataCache(store_dir=str(tmp_path))
+    cache.get('defconfig', 'data', loader, persist=True)
+    (name,) = os.listdir(tmp_path)
+    os.utime(tmp_path / name, (0, 0))
+
+    FilterDataCache(store_dir=str(tmp_path)).get('defconfig', 'data', loader, persist=True)
+    assert os.stat(tmp_path / name).st_mtime > 0
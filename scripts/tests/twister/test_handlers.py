@@ -7,13 +7,17 @@
 Tests for handlers.py classes' methods
 """
 
+import asyncio
 import itertools
 import mock
 import os
 import pytest
+import queue
 import signal
 import subprocess
 import sys
+import threading
+import time
 
 from contextlib import nullcontext
 from importlib import reload
@@ -28,14 +32,19 @@ ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
 from twisterlib.error import TwisterException
 from twisterlib.statuses import TwisterStatus
 from twisterlib.handlers import (
+    AsyncFdLineReader,
+    AsyncHandlerEngine,
     Handler,
     BinaryHandler,
     DeviceHandler,
+    FdLineReader,
     QEMUHandler,
+    QueueLineReader,
     SimulationHandler
 )
 from twisterlib.hardwaremap import (
-    DUT
+    DUT,
+    DUTPool
 )
 
 @pytest.fixture
@@ -61,6 +70,7 @@ def mocked_instance(tmp_path):
 
     instance.status = TwisterStatus.NONE
     instance.reason = 'Unknown'
+    instance.metrics = {}
 
     return instance
 
@@ -78,6 +88,107 @@ def faux_timer():
     return Counter()
 
 
+def test_fdlinereader_readline():
+    read_fd, write_fd = os.pipe()
+    reader = FdLineReader(read_fd)
+    try:
+        os.write(write_fd, 'one\ntw'.encode())
+        assert reader.readline(1) == 'one\n'
+        # incomplete line
+        assert reader.readline(0) is None
+
+        # multi-byte character split between two writes
+        os.write(write_fd, 'o \u00b5'.encode()[:-1])
+        assert reader.readline(0) is None
+        os.write(write_fd, 'o \u00b5'.encode()[-1:] + b'\nthree\r\nlast')
+        assert reader.readline(1) == 'two \u00b5\n'
+        assert reader.readline(0) == 'three\r\n'
+
+        os.close(write_fd)
+        assert reader.readline(1) == 'last'
+        assert reader.readline(1) == ''
+        assert reader.readline(1) == ''
+    finally:
+        reader.close()
+        os.close(read_fd)
+
+
+@pytest.mark.parametrize(
+    'errors, expected',
+    [('strict', UnicodeDecodeError), ('replace', 'bad \ufffd\n')],
+    ids=['strict', 'replace']
+)
+def test_queuelinereader_readline(errors, expected):
+    chunks = queue.Queue()
+    reader = QueueLineReader(chunks, errors)
+
+    assert reader.readline(0) is None
+    chunks.put(b'good\nbad \x81\n')
+    chunks.put(b'')
+    assert reader.readline(0) == 'good\n'
+    if isinstance(expected, str):
+        assert reader.readline(0) == expected
+    else:
+        with pytest.raises(expected):
+            reader.readline(0)
+    assert reader.readline(0) == ''
+
+
+def test_asyncfdlinereader_areadline():
+    async def read_lines():
+        read_fd, write_fd = os.pipe()
+        writer_exited = asyncio.get_running_loop().create_future()
+        reader = AsyncFdLineReader(read_fd, writer_exited=writer_exited)
+        try:
+            assert await reader.areadline(0.01) is None
+            os.write(write_fd, b'one\ntwo')
+            assert await reader.areadline(1) == 'one\n'
+            assert await reader.areadline(0.01) is None
+
+            # The write end stays open, the end of the output is detected
+            # once the writer exited.
+            writer_exited.set_result(0)
+            assert await reader.areadline() == 'two'
+            assert await reader.areadline() == ''
+        finally:
+            reader.close()
+            os.close(write_fd)
+
+    asyncio.run(read_lines())
+
+
+def test_asynchandlerengine():
+    running = []
+    max_running = []
+
+    async def dummy_test(i):
+        running.append(i)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(i)
+        return i
+
+    engine = AsyncHandlerEngine(2)
+    engine.start()
+    try:
+        futures = [engine.submit(dummy_test(i)) for i in range(5)]
+        assert [f.result(timeout=5) for f in futures] == list(range(5))
+        assert max(max_running) == 2
+
+        blocked = engine.submit(asyncio.sleep(100))
+    finally:
+        engine.stop()
+
+    assert blocked.cancelled()
+    assert not engine.thread.is_alive()
+
+
+def test_asynchandlerengine_supports():
+    assert AsyncHandlerEngine.supports(mock.Mock(spec=QEMUHandler, ready=True))
+    assert not AsyncHandlerEngine.supports(mock.Mock(spec=QEMUHandler, ready=False))
+    assert not AsyncHandlerEngine.supports(mock.Mock(spec=DeviceHandler, ready=True))
+
+
 TESTDATA_1 = [
     (True, False, 'posix', ['Install pyserial python module with pip to use' \
      ' --device-testing option.'], None),
@@ -369,6 +480,9 @@ def test_binaryhandler_output_handler(
             self.text = text
             self.line_index = 0
 
+        def fileno(self):
+            return 0
+
         def readline(self):
             if self.line_index == len(self.text):
                 self.line_index = 0
@@ -388,6 +502,16 @@ def test_binaryhandler_output_handler(
             if timeout_wait:
                 raise TimeoutExpired('dummy cmd', 'dummyamount')
 
+    class MockLineReader:
+        def __init__(self, fd, errors):
+            self.errors = errors
+
+        def readline(self, timeout):
+            return proc.stdout.readline().decode('utf-8', self.errors)
+
+        def close(self):
+            pass
+
     handler = BinaryHandler(mocked_instance, 'build', mock.Mock(timeout_multiplier=1))
     handler.terminate = mock.Mock()
 
@@ -397,7 +521,8 @@ def test_binaryhandler_output_handler(
         'builtins.open',
         mock.mock_open(read_data='')
     ) as mock_file, \
-         mock.patch('time.time', side_effect=faux_timer.time):
+         mock.patch('time.time', side_effect=faux_timer.time), \
+         mock.patch('twisterlib.handlers.FdLineReader', MockLineReader):
         handler._output_handler(proc, harness)
 
         mock_file.assert_called_with(handler.log, 'w')
@@ -415,6 +540,39 @@ def test_binaryhandler_output_handler(
         handler.terminate.assert_called_once_with(proc)
 
 
+@pytest.mark.parametrize(
+    'script, expected_returncode, expected_lines',
+    [
+        ('print("one"); print("two")', 0, ['one', 'two']),
+        ('import sys; print("one"); sys.exit(3)', 3, ['one']),
+    ],
+    ids=['passed', 'failed']
+)
+def test_binaryhandler_handle_async(
+    mocked_instance,
+    script,
+    expected_returncode,
+    expected_lines
+):
+    handler = BinaryHandler(mocked_instance, 'native', mock.Mock(timeout_multiplier=1))
+    handler._create_command = mock.Mock(return_value=[sys.executable, '-c', script])
+    handler._create_env = mock.Mock(return_value=os.environ.copy())
+    handler._update_instance_info = mock.Mock()
+    handler._final_handle_actions = mock.Mock()
+    harness = mock.Mock(status=TwisterStatus.NONE, capture_coverage=False)
+
+    asyncio.run(handler.handle_async(harness))
+
+    assert harness.handle.call_args_list == [mock.call(line) for line in expected_lines]
+    assert handler.returncode == expected_returncode
+    if expected_returncode:
+        assert mocked_instance.status == TwisterStatus.ERROR
+    with open(handler.log) as log:
+        assert log.read().splitlines() == expected_lines
+    handler._update_instance_info.assert_called_once_with(harness, mock.ANY)
+    handler._final_handle_actions.assert_called_once_with(harness, mock.ANY)
+
+
 TESTDATA_4 = [
     (True, False, True, None, None,
      ['valgrind', '--error-exitcode=2', '--leak-check=full',
@@ -1054,6 +1212,41 @@ def test_devicehandler_get_hardware(
         assert mocked_instance.reason == 'dummy message'
     else:
         assert hardware == expected_hardware
+    assert mocked_instance.metrics['dut_wait_time'] >= num_of_failures
+
+
+def test_devicehandler_get_hardware_pool(tmp_path):
+    dut = DUT(platform='dummy_platform', id='dummy_id', serial='dummy_serial')
+    pool = DUTPool([dut])
+
+    def create_handler(name):
+        instance = mock.Mock(
+            status=TwisterStatus.NONE,
+            metrics={},
+            build_dir=str(tmp_path / name)
+        )
+        instance.platform.name = 'dummy_platform'
+        instance.testsuite.harness_config = {}
+        handler = DeviceHandler(instance, 'build', mock.Mock())
+        handler.duts = pool
+        return handler
+
+    first = create_handler('first')
+    second = create_handler('second')
+
+    assert first.get_hardware() is dut
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(second.get_hardware()))
+    waiter.start()
+    time.sleep(0.2)
+    assert not results
+    first.make_dut_available(dut)
+    waiter.join(5)
+
+    assert results == [dut]
+    assert 0.2 <= second.instance.metrics['dut_wait_time'] < 1
+    assert first.instance.metrics['dut_wait_time'] < 0.2
 
 
 TESTDATA_13 = [
@@ -1919,6 +2112,20 @@ def test_qemuhandler_thread(
         side_effect=itertools.cycle([True, True, True, True, False])
     )
 
+    class MockLineReader:
+        def __init__(self, fd, errors='strict'):
+            self.lines = content.splitlines(True)
+
+        def readline(self, timeout):
+            # QEMU polls the FIFO once per received byte
+            for _ in self.lines[0] if self.lines else b' ':
+                if not p.poll(timeout):
+                    return None
+            return self.lines.pop(0).decode('utf-8') if self.lines else ''
+
+        def close(self):
+            pass
+
     mock_thread_get_fifo_names = mock.Mock(
         return_value=('fifo_fn.in', 'fifo_fn.out')
     )
@@ -1926,7 +2133,7 @@ def test_qemuhandler_thread(
 
     with mock.patch('time.time', side_effect=faux_timer.time), \
          mock.patch('builtins.open', new=mocked_open), \
-         mock.patch('select.poll', return_value=p), \
+         mock.patch('twisterlib.handlers.FdLineReader', MockLineReader), \
          mock.patch('os.path.exists', return_value=True), \
          mock.patch('os.unlink', mock.Mock()), \
          mock.patch('os.mkfifo', mock.Mock()), \
@@ -1959,6 +2166,78 @@ def test_qemuhandler_thread(
     file_objs[handler.log].write.assert_has_calls(expected_log_calls)
 
 
+FAKE_QEMU = """
+import os, signal, stat, sys, time
+signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+build_dir = sys.argv[1]
+# The FIFOs must exist when QEMU starts
+for suffix in ['.in', '.out']:
+    if not stat.S_ISFIFO(os.stat(os.path.join(build_dir, 'qemu-fifo' + suffix)).st_mode):
+        sys.exit(5)
+with open(os.path.join(build_dir, 'qemu.pid'), 'w') as pid_file:
+    pid_file.write(str(os.getpid()))
+fifo_out = os.open(os.path.join(build_dir, 'qemu-fifo.out'), os.O_RDWR)
+os.write(fifo_out, sys.argv[2].encode())
+if sys.argv[3] == 'hang':
+    time.sleep(100)
+sys.exit(int(sys.argv[3]))
+"""
+
+@pytest.mark.parametrize(
+    'output, end, timeout, expected_status, expected_reason,' \
+    ' expected_returncode, expected_timeout',
+    [
+        ('one\nPROJECT EXECUTION SUCCESSFUL\n', 'hang', 10,
+         TwisterStatus.PASS, None, 0, False),
+        ('one\ncrash', '3', 10, TwisterStatus.FAIL, 'unexpected eof', 3, False),
+        # QEMU killed by the timeout closes the output fifo as well
+        ('one\n', 'hang', 1, TwisterStatus.FAIL, 'unexpected eof', mock.ANY, True),
+    ],
+    ids=['passed', 'crashed', 'timeout']
+)
+def test_qemuhandler_handle_async(
+    mocked_instance,
+    tmp_path,
+    output,
+    end,
+    timeout,
+    expected_status,
+    expected_reason,
+    expected_returncode,
+    expected_timeout
+):
+    mocked_instance.testsuite.ignore_qemu_crash = False
+    type(mocked_instance.testsuite).timeout = mock.PropertyMock(return_value=timeout)
+    type(mocked_instance.platform).timeout_multiplier = mock.PropertyMock(return_value=1)
+    fake_qemu = tmp_path / 'fake_qemu.py'
+    fake_qemu.write_text(FAKE_QEMU)
+
+    handler = QEMUHandler(mocked_instance, 'qemu', mock.Mock(timeout_multiplier=1))
+    handler.get_default_domain_build_dir = mock.Mock(return_value=handler.build_dir)
+    handler._create_command = mock.Mock(
+        return_value=[sys.executable, str(fake_qemu), handler.build_dir, output, end]
+    )
+    handler._update_instance_info = mock.Mock()
+    handler._final_handle_actions = mock.Mock()
+    harness = mock.Mock(status=TwisterStatus.NONE, reason=None, capture_coverage=False)
+    harness.handle = mock.Mock(
+        side_effect=lambda line: setattr(harness, 'status', TwisterStatus.PASS)
+            if 'SUCCESSFUL' in line else None
+    )
+
+    asyncio.run(handler.handle_async(harness))
+
+    harness.handle.assert_any_call('one')
+    assert mocked_instance.status == expected_status
+    if expected_reason:
+        assert mocked_instance.reason == expected_reason
+    assert handler.returncode == expected_returncode
+    handler._update_instance_info.assert_called_once_with(harness, expected_timeout)
+    assert not os.path.exists(handler.pid_fn)
+    assert not os.path.exists(handler.fifo_fn + '.in')
+    assert not os.path.exists(handler.fifo_fn + '.out')
+
+
 TESTDATA_26 = [
     (True, False, TwisterStatus.NONE, True,
      ['No timeout, return code from QEMU (1): 1',
@@ -7,17 +7,77 @@ Tests for hardwaremap.py classes' methods
 """
 
 import mock
+import multiprocessing
 import pytest
 import sys
+import threading
+import time
 
 from pathlib import Path
 
 from twisterlib.hardwaremap import(
     DUT,
+    DUTPool,
     HardwareMap
 )
 
 
+def select_available(duts, platform):
+    for d in duts:
+        if d.platform == platform and d.available:
+            d.available = 0
+            return d
+    return None
+
+
+def test_dutpool_acquire():
+    duts = [DUT(platform='p1', id=1), DUT(platform='p1', id=2), DUT(platform='p2', id=3)]
+    duts[1].fixtures = ['fixture:param']
+    pool = DUTPool(duts)
+
+    assert list(pool) == duts
+    assert len(pool) == 3
+
+    select = lambda: select_available(duts, 'p1')
+    assert pool.acquire('p1', None, select) is duts[0]
+    assert pool.acquire('p1', 'fixture', select) is duts[1]
+    assert pool.acquire('p1', None, select, timeout=0.1) is None
+
+    # no DUT for the key, the selection reports it
+    select_unknown = mock.Mock(return_value=None)
+    assert pool.acquire('p1', 'unknown', select_unknown, timeout=0.1) is None
+    select_unknown.assert_called_once()
+
+
+def _release_later(pool, dut, delay):
+    time.sleep(delay)
+    dut.available = 1
+    pool.release(dut)
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'thread'])
+def test_dutpool_release(start_method):
+    duts = [DUT(platform='p1', id=1)]
+    duts[0].available = 0
+    pool = DUTPool(duts)
+
+    if start_method == 'thread':
+        releaser = threading.Thread(target=_release_later, args=(pool, duts[0], 0.2))
+    else:
+        releaser = multiprocessing.get_context('fork').Process(
+            target=_release_later, args=(pool, duts[0], 0.2)
+        )
+    start_time = time.monotonic()
+    releaser.start()
+    dut = pool.acquire('p1', None, lambda: select_available(duts, 'p1'), timeout=10)
+    wait_time = time.monotonic() - start_time
+    releaser.join()
+
+    assert dut is duts[0]
+    # woken up by the release, not by the timeout or polling
+    assert 0.2 <= wait_time < 1
+
+
 @pytest.fixture
 def mocked_hm():
     duts = [
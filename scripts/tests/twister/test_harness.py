@@ -24,10 +24,12 @@ from twisterlib.harness import (
     Gtest,
     Harness,
     HarnessImporter,
+    LineMatcher,
     Pytest,
     PytestHarnessException,
     Robot,
     Test,
+    benchmark,
 )
 from twisterlib.statuses import TwisterStatus
 from twisterlib.testsuite import TestSuite
@@ -402,6 +404,55 @@ def test_robot_run_robot_test(tmp_path, caplog, exp_out, returncode, expected_st
     assert exp_out in caplog.text
 
 
+TEST_DATA_LINE_MATCHER = [
+    ("no match here", None, None),
+    ("START - test_a", "start", ("a",)),
+    ("xx START - test_a", "start", ("a",)),
+    # start has priority over end when both match
+    ("START - test_a END - b", "start", ("a",)),
+    ("xx END - b", None, None),
+    ("END - b", "end", ("b",)),
+    ("x\nSTART - test_a", "start", ("a",)),
+]
+
+
+@pytest.mark.parametrize(
+    "line, exp_name, exp_groups",
+    TEST_DATA_LINE_MATCHER,
+    ids=["no match", "search", "search not at start", "priority", "anchored",
+         "anchored match", "multiple lines"],
+)
+def test_line_matcher_match(line, exp_name, exp_groups):
+    matcher = LineMatcher([
+        ("start", re.compile(r"START - (?:test_)?(?P<name>\w+)"), "START - ", False),
+        ("end", r"END - (?P<name>\w+)", "END - ", True),
+    ])
+
+    name, match = matcher.match(line)
+
+    assert name == exp_name
+    if exp_groups:
+        assert match.groups() == exp_groups
+        assert match.group("name") == exp_groups[0]
+    else:
+        assert match is None
+
+
+def test_line_matcher_any_of():
+    patterns = [re.compile("abc"), re.compile(r"(\d+) items")]
+
+    any_pattern = LineMatcher.any_of(patterns)
+    assert any_pattern.search("3 items")
+    assert any_pattern.search("xabcx")
+    assert not any_pattern.search("ab items")
+
+    # backreferences and clashing groups cannot be combined
+    assert LineMatcher.any_of([re.compile(r"(a)\1")]) is None
+    assert LineMatcher.any_of(
+        [re.compile(r"(?P<x>a)"), re.compile(r"(?P<x>b)")]
+    ) is None
+
+
 TEST_DATA_3 = [
     ("one_line", None),
     ("multi_line", 2),
@@ -526,6 +577,39 @@ def test_console_handle(
     assert console.capture_coverage == exp_capture
 
 
+@pytest.mark.parametrize(
+    "regex, exp_any_pattern",
+    [(["first (\\d+)", "second"], True), (["(a)\\1", "second"], False)],
+    ids=["combined", "not combined"],
+)
+def test_console_handle_unordered(tmp_path, regex, exp_any_pattern):
+    mock_platform = mock.Mock()
+    mock_platform.name = "mock_platform"
+    mock_platform.normalized_name = "mock_platform"
+
+    mock_testsuite = mock.Mock(id="id", testcases=[])
+    mock_testsuite.name = "mock_testsuite"
+    mock_testsuite.harness_config = {
+        "type": "multi_line",
+        "ordered": False,
+        "regex": regex,
+    }
+
+    instance = TestInstance(
+        testsuite=mock_testsuite, platform=mock_platform, toolchain='zephyr', outdir=tmp_path
+    )
+    console = Console()
+    console.configure(instance)
+
+    assert (console.any_pattern is not None) == exp_any_pattern
+
+    for line in ["second", "unrelated", "aa first 1", "first 2"]:
+        console.handle(line)
+
+    assert console.status == TwisterStatus.PASS
+    assert list(console.matches.items()) == [(regex[1], "second"), (regex[0], "aa first 1")]
+
+
 TEST_DATA_5 = [("serial_pty", 0), (None, 0), (None, 1)]
 
 
@@ -821,6 +905,39 @@ def test_test_handle(
         assert test_obj.instance.testcases[1].status == exp_status
 
 
+TESTDATA_BENCHMARK = [
+    ('Test', None, 'PROJECT EXECUTION SUCCESSFUL', TwisterStatus.PASS),
+    ('Test', None, 'PROJECT EXECUTION FAILED', TwisterStatus.FAIL),
+    ('console', {'type': 'one_line', 'regex': ['SUCCESSFUL']},
+     'PROJECT EXECUTION SUCCESSFUL', TwisterStatus.PASS),
+    ('console', {'type': 'one_line', 'regex': ['SUCCESSFUL']},
+     'PROJECT EXECUTION FAILED', TwisterStatus.FAIL),
+]
+
+
+@pytest.mark.parametrize(
+    'harness_name, harness_config, last_line, expected_status',
+    TESTDATA_BENCHMARK,
+    ids=['test pass', 'test fail', 'console pass', 'console fail']
+)
+def test_benchmark(tmp_path, harness_name, harness_config, last_line, expected_status):
+    log_file = tmp_path / "handler.log"
+    log_file.write_text(
+        "Running TESTSUITE suite\n"
+        "START - test_a\n"
+        "some output\n"
+        " PASS - test_a in 0.001 seconds\n"
+        "TESTSUITE suite succeeded\n"
+        f"{last_line}\n"
+    )
+
+    count, _, harness = benchmark([str(log_file), str(log_file)], harness_name,
+                                  harness_config, repeat=1)
+
+    assert count == 12
+    assert harness.status == expected_status
+
+
 @pytest.fixture
 def gtest(tmp_path):
     mock_platform = mock.Mock()
@@ -17,7 +17,7 @@ from pykwalify.errors import SchemaError
 ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
 sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
 
-from twisterlib.platform import Platform, Simulator, generate_platforms
+from twisterlib.platform import Platform, PlatformIndex, Simulator, generate_platforms
 
 
 TESTDATA_1 = [
@@ -492,3 +492,42 @@ board:
             actual = getattr(platform, attr, None)
             assert expected == actual, \
                 f"expected '{platform}.{attr}' to be '{expected}', was '{actual}'"
+
+
+def test_platform_index():
+    def make_platform(name, arch, vendor, type, ram, flash, supported,
+                      ignore_tags=None, only_tags=None, env_satisfied=True):
+        p = Platform()
+        p.name = name
+        p.arch = arch
+        p.vendor = vendor
+        p.type = type
+        p.ram = ram
+        p.flash = flash
+        p.supported = set(supported)
+        p.ignore_tags = ignore_tags or []
+        p.only_tags = only_tags or []
+        p.env_satisfied = env_satisfied
+        return p
+
+    platforms = [
+        make_platform('p1', 'arm', 'nordic', 'mcu', 64, 256, ['gpio', 'spi'],
+                      ignore_tags=['net']),
+        make_platform('p2', 'arm', 'st', 'mcu', 256, 1024, ['gpio']),
+        make_platform('p3', 'x86', 'intel', 'qemu', 128, 512, ['netif'],
+                      only_tags=['kernel'], env_satisfied=False),
+    ]
+
+    index = PlatformIndex(platforms)
+
+    assert index.names == {'p1', 'p2', 'p3'}
+    assert index.with_attr('arch', ['arm']) == {'p1', 'p2'}
+    assert index.with_attr('vendor', {'st', 'intel', 'unknown'}) == {'p2', 'p3'}
+    assert index.with_attr('type', ['native']) == set()
+    assert index.below('ram', 128) == {'p1'}
+    assert index.below('flash', 1024) == {'p1', 'p3'}
+    assert index.lacking_features({'gpio'}) == {'p3'}
+    assert index.lacking_features({'gpio', 'spi'}) == {'p2', 'p3'}
+    assert index.excluded_by_tags({'net'}) == {'p1', 'p3'}
+    assert index.excluded_by_tags({'kernel'}) == set()
+    assert index.env_unsatisfied == {'p3'}
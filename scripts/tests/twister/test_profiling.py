@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for profiling.py classes' methods
+"""
+
+import json
+import mock
+import os
+import pytest
+import subprocess
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.profiling import Profiler
+
+
+@pytest.fixture
+def profiler():
+    yield Profiler
+    Profiler.enabled = False
+    Profiler.trace_dir = None
+    Profiler.phases = {}
+    Profiler._lanes = []
+    Profiler._trace_file = None
+    Profiler._trace_pid = None
+
+
+def make_instance(name):
+    instance = mock.Mock(profile=None, queued_at=None)
+    instance.name = name
+    return instance
+
+
+def test_profiler_disabled():
+    instance = make_instance('i')
+
+    Profiler.queued(instance)
+    assert Profiler.start('cmake', instance) is None
+    Profiler.stop(None)
+
+    assert instance.profile is None
+    assert instance.queued_at is None
+
+
+def test_profiler_phases(tmp_path, profiler):
+    profiler.setup(str(tmp_path / 'trace'))
+    instance = make_instance('platform/zephyr/suite')
+
+    profiler.queued(instance)
+    phase = profiler.start('run', instance)
+    subprocess.run([sys.executable, '-c', 'x = bytearray(1 << 24)'], check=True)
+    # Overlapping phases are put on separate lanes
+    with profiler.phase('load'):
+        pass
+    profiler.stop(phase)
+    # Stopping twice has no effect
+    profiler.stop(phase)
+
+    with profiler.phase('build', instance):
+        pass
+    with profiler.phase('build', instance):
+        pass
+    # Ends after the report is serialized, only traced
+    with profiler.phase('report', instance):
+        pass
+    with profiler.phase('save_reports'):
+        pass
+
+    profile = instance.profile
+    assert profile['queue_wait'] >= 0
+    assert instance.queued_at is None
+    assert set(profile['phases']) == {'handler', 'build'}
+    handler = profile['phases']['handler']
+    assert handler['count'] == 1
+    assert handler['wall'] >= handler['cpu'] >= 0
+    assert handler['children_cpu'] > 0
+    assert profile['phases']['build']['count'] == 2
+    assert set(profiler.phases) == {'load'}
+
+    trace_file = tmp_path / 'trace.json'
+    profiler.write_trace(str(trace_file))
+
+    with open(trace_file) as f:
+        events = json.load(f)['traceEvents']
+    assert not (tmp_path / 'trace').exists()
+    assert events[0] == {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                         'args': {'name': 'twister'}}
+    lanes = {(e['name'], e.get('args', {}).get('instance')): e['tid'] for e in events[1:]}
+    assert lanes == {
+        ('load', None): 1,
+        ('handler', 'platform/zephyr/suite'): 0,
+        ('build', 'platform/zephyr/suite'): 0,
+        ('report', 'platform/zephyr/suite'): 0,
+        ('save_reports', None): 0,
+    }
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events[1:])
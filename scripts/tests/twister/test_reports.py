@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for reports.py classes' methods
+"""
+
+import argparse
+import json
+import mock
+import os
+import pytest
+import sys
+import xml.etree.ElementTree as ET
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.reports import (
+    JsonReportWriter,
+    ReportIndex,
+    Reporting,
+    SuiteStream,
+    XunitReport,
+    XunitSuitesReport,
+)
+from twisterlib.statuses import TwisterStatus
+
+
+def make_options(**kwargs):
+    options = dict(
+        outdir='out',
+        report_all_options=False,
+        report_filtered=False,
+        detailed_skipped_report=False,
+        create_rom_ram_report=False,
+        footprint_report=None,
+    )
+    options.update(kwargs)
+    return argparse.Namespace(**options)
+
+
+def make_instance(tmp_path, platform, name, status, reason=None):
+    build_dir = tmp_path / 'build' / platform / name
+    build_dir.mkdir(parents=True)
+    case = mock.Mock(freeform=False, status=status, output='', reason=None, duration=0.5)
+    case.name = f'{name}.case'
+    instance = mock.Mock(
+        build_dir=str(build_dir),
+        status=status,
+        reason=reason,
+        run=True,
+        run_id=None,
+        retries=0,
+        toolchain='zephyr',
+        dut=None,
+        build_time=1,
+        testcases=[case],
+        recording=None,
+        metrics={'handler_time': 2},
+        profile=None,
+    )
+    instance.testsuite.name = name
+    instance.testsuite.source_dir_rel = f'tests/{name}'
+    instance.platform.name = platform
+    instance.platform.arch = 'arm'
+    instance.platform.normalized_name = platform.replace('/', '_')
+    instance.name = os.path.join(platform, 'zephyr', name)
+    return instance
+
+
+def make_reporting(tmp_path, instances, **kwargs):
+    plan = mock.Mock(
+        instances={i.name: i for i in instances},
+        platforms=[],
+        selected_platforms=sorted({i.platform.name for i in instances}),
+        instance_fail_count=0,
+    )
+    env = mock.Mock(
+        options=make_options(outdir=str(tmp_path), **kwargs),
+        toolchain='zephyr',
+        commit_date='date',
+        run_date='date',
+        version='v1',
+    )
+    env.non_default_options.return_value = {}
+    return Reporting(plan, env)
+
+
+def test_suitestream(tmp_path):
+    instance = make_instance(tmp_path, 'board/a', 'suite.a', TwisterStatus.FAIL, 'Build failure')
+    (tmp_path / 'build' / 'board/a' / 'suite.a' / 'build.log').write_text('error: oops\n')
+    stream = SuiteStream(str(tmp_path / 'twister.jsonl'), make_options())
+    stream.reset()
+
+    stream.write(instance)
+    # The detailed reason is passed to the instance
+    assert instance.reason == 'Build failure - error: oops'
+
+    instance.status = TwisterStatus.PASS
+    stream.write(instance)
+    with open(stream.filename, 'a') as f:
+        f.write('{"name": "trunc')
+
+    latest = stream.latest()
+    assert list(latest) == [instance.name]
+    status, line = latest[instance.name]
+    assert status == 'passed'
+    assert json.loads(line)['status'] == 'passed'
+
+    stream.reset()
+    assert stream.latest() == {}
+
+
+@pytest.mark.parametrize('keep_open', [True, False])
+def test_jsonreportwriter(tmp_path, keep_open):
+    filename = str(tmp_path / 'report.json')
+    writer = JsonReportWriter(filename, {'os': 'posix'}, keep_open=keep_open)
+    assert writer.file.closed != keep_open
+    for n in range(3):
+        writer.add({'name': f's{n}', 'path': tmp_path})
+    writer.close()
+
+    with open(filename) as f:
+        report = json.load(f)
+    assert report == {
+        'environment': {'os': 'posix'},
+        'testsuites': [{'name': f's{n}', 'path': str(tmp_path)} for n in range(3)]
+    }
+
+    writer = JsonReportWriter(filename, {})
+    writer.close()
+    with open(filename) as f:
+        assert json.load(f) == {'environment': {}, 'testsuites': []}
+
+
+def test_reportindex(tmp_path):
+    filename = str(tmp_path / 'report.json')
+    suites = [
+        {'name': 's0', 'platform': 'p1', 'status': 'passed', 'testcases': []},
+        {'name': 's1', 'platform': 'p2', 'status': 'failed', 'log': 'x',
+         'testcases': [{'identifier': 's1.a', 'status': 'failed', 'log': 'y'}]},
+        {'name': 's2', 'platform': 'p1', 'status': 'failed', 'log': 'x',
+         'testcases': [{'identifier': 's2.a', 'status': 'failed'}]},
+        {'name': 's3', 'platform': 'p1', 'status': None, 'testcases': []},
+    ]
+    writer = JsonReportWriter(filename, {}, index=True)
+    for suite in suites:
+        writer.add(suite)
+    writer.close()
+
+    index = ReportIndex.load(filename)
+    assert sorted(index.platforms()) == ['p1', 'p2']
+    # Suites are loaded in report order, without their log
+    loaded = index.suites()
+    assert [s['name'] for s in loaded] == ['s0', 's1', 's2', 's3']
+    assert loaded[1] == {k:v for k,v in suites[1].items() if k != 'log'}
+    assert loaded[1]['testcases'][0]['log'] == 'y'
+    assert [s['name'] for s in index.suites(['p1'])] == ['s0', 's2', 's3']
+    assert [s['name'] for s in index.suites(statuses=[TwisterStatus.FAIL])] == ['s1', 's2']
+    assert [s['name'] for s in index.suites(statuses=[TwisterStatus.NONE])] == ['s3']
+
+    with open(filename, 'a') as f:
+        f.write('\n')
+    assert ReportIndex.load(filename) is None
+    assert ReportIndex.load(str(tmp_path / 'missing.json')) is None
+
+
+def test_reporting_suites(tmp_path):
+    instances = [
+        make_instance(tmp_path, 'board/a', 'suite.a', TwisterStatus.NONE),
+        make_instance(tmp_path, 'board/a', 'suite.b', TwisterStatus.FILTER, 'Skip filter'),
+        make_instance(tmp_path, 'board/b', 'suite.a', TwisterStatus.NONE),
+    ]
+    report = make_reporting(tmp_path, instances)
+
+    # Filtered suites are not reported by default
+    assert [(s['name'], s['platform']) for s in report.suites()] == [
+        ('suite.a', 'board/a'), ('suite.a', 'board/b')
+    ]
+    assert [s['platform'] for s in report.suites(platform='board/b')] == ['board/b']
+
+    report.env.options.report_filtered = True
+    filters = {'deny_suite': ['testcases']}
+    suites = list(report.suites(filters=filters))
+    assert len(suites) == 3
+    assert all('testcases' not in s for s in suites)
+
+
+@pytest.mark.parametrize('detailed', [False, True], ids=['filtered', 'detailed'])
+def test_xunitreport(tmp_path, detailed):
+    suites = [
+        {'name': 's1', 'platform': 'p1', 'status': 'passed', 'execution_time': '1.00',
+         'testcases': [{'identifier': 's1.a', 'status': 'passed'}]},
+        {'name': 's2', 'platform': 'p1', 'status': 'failed', 'execution_time': '2.00',
+         'reason': 'bad', 'testcases': [{'identifier': 's2.a', 'status': 'failed'}]},
+        {'name': 's3', 'platform': 'p2', 'status': 'filtered', 'reason': 'x', 'testcases': []},
+        {'name': 's4', 'platform': 'p4', 'status': 'passed', 'testcases': []},
+    ]
+    for suite in suites:
+        suite['arch'] = 'arm'
+    report = XunitReport(['p1', 'p2', 'p3'], 'T', 'v1', False, detailed)
+    suites_report = XunitSuitesReport('T', 'v1', detailed)
+    for suite in suites:
+        report.add(suite)
+        suites_report.add(suite)
+    report.write(tmp_path / 'report.xml')
+    suites_report.write(tmp_path / 'suites.xml')
+
+    root = ET.parse(tmp_path / 'report.xml').getroot()
+    names = [ts.get('name') for ts in root]
+    assert names == (['p1', 'p2', 'p3'] if detailed else ['p1'])
+    p1 = root[0]
+    assert (p1.get('tests'), p1.get('failures'), p1.get('time')) == ('2', '1', '3.0')
+    assert [tc.get('classname') for tc in p1.iter('testcase')] == ['p1:s1', 'p1:s2']
+
+    root = ET.parse(tmp_path / 'suites.xml').getroot()
+    expected = ['s1', 's2', 's3', 's4'] if detailed else ['s1', 's2', 's4']
+    assert [ts.get('name') for ts in root] == expected
+
+
+def test_save_reports(tmp_path):
+    instances = [
+        make_instance(tmp_path, 'board/a', 'suite.a', TwisterStatus.PASS),
+        make_instance(tmp_path, 'board/b', 'suite.b', TwisterStatus.FAIL, 'failed'),
+        make_instance(tmp_path, 'board/b', 'suite.c', TwisterStatus.FILTER, 'filtered'),
+    ]
+    reporting = make_reporting(tmp_path, instances)
+    stream = reporting.suite_stream(None, None, None)
+    stream.reset()
+    stream.write(instances[0])
+    stream.write(instances[1])
+    # The instance changed after it was reported
+    instances[1].status = TwisterStatus.ERROR
+
+    with mock.patch.object(Reporting, 'suite_report', wraps=Reporting.suite_report) as report:
+        reporting.save_reports(None, None, None, False, True)
+    assert [c.args[0] for c in report.call_args_list] == instances[1:]
+
+    with open(tmp_path / 'twister.jsonl') as f:
+        streamed = [json.loads(line) for line in f]
+    assert [(s['name'], s['status']) for s in streamed] == [
+        ('suite.a', 'passed'), ('suite.b', 'error'), ('suite.c', 'filtered')
+    ]
+
+    with open(tmp_path / 'twister.json') as f:
+        report = json.load(f)
+    assert [s['name'] for s in report['testsuites']] == ['suite.a', 'suite.b']
+    with open(tmp_path / 'board_b.json') as f:
+        report = json.load(f)
+    assert [s['name'] for s in report['testsuites']] == ['suite.b']
+
+    for xml_file in ['twister.xml', 'twister_report.xml', 'board_a.xml', 'board_b.xml']:
+        root = ET.parse(tmp_path / xml_file).getroot()
+        assert root.tag == 'testsuites'
+    root = ET.parse(tmp_path / 'twister_suite_report.xml').getroot()
+    assert [ts.get('name') for ts in root] == ['suite.a', 'suite.b']
@@ -6,6 +6,8 @@
 Tests for runner.py classes
 """
 
+import asyncio
+import copy
 import errno
 import mock
 import os
@@ -13,10 +15,12 @@ import pathlib
 import pytest
 import queue
 import re
+import struct
 import subprocess
 import sys
 import yaml
 
+from concurrent.futures import Future
 from contextlib import nullcontext
 from elftools.elf.sections import SymbolTableSection
 from typing import List
@@ -27,13 +31,17 @@ sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
 from twisterlib.statuses import TwisterStatus
 from twisterlib.error import BuildError
 from twisterlib.harness import Pytest
+from twisterlib.profiling import Profiler
 
 from twisterlib.runner import (
     CMake,
     ExecutionCounter,
+    ExecutionCounterDelta,
     FilterBuilder,
     ProjectBuilder,
-    TwisterRunner
+    TwisterRunner,
+    _init_pool_worker,
+    _run_pool_task
 )
 
 @pytest.fixture
@@ -762,6 +770,16 @@ def test_filterbuilder_parse_generated(
     assert result == expected_return
 
 
+
+def test_filterbuilder_parse_defconfig():
+    content = '# comment\nCONFIG_A=y\nCONFIG_B="b"\n\nbogus line\n'
+
+    defconfig, unrecognized = FilterBuilder.parse_defconfig(content)
+
+    assert defconfig == {'CONFIG_A': 'y', 'CONFIG_B': 'b'}
+    assert unrecognized == ['bogus line\n']
+
+
 TESTDATA_4 = [
     (False, False, [f"see: {os.path.join('dummy', 'path', 'dummy_file.log')}"]),
     (True, False, [os.path.join('dummy', 'path', 'dummy_file.log'),
@@ -1522,6 +1540,7 @@ def test_projectbuilder_process(
     instance_mock.handler = mock.Mock()
     instance_mock.handler.ready = instance_handler_ready
     instance_mock.testsuite.harness = 'test'
+    instance_mock.shared_build_users = []
     env_mock = mock.Mock()
 
     pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
@@ -1638,6 +1657,22 @@ TESTDATA_7 = [
     ),
 ]
 
+def symbol_table_section_mock(symbols_names, little_endian=True):
+    """Mock of an ELF32 .symtab section holding the given symbols"""
+    strtab = b'\0'
+    symtab = bytes(16)
+    for name in symbols_names:
+        symtab += struct.pack('<I12x' if little_endian else '>I12x', len(strtab))
+        strtab += name.encode() + b'\0'
+
+    section = mock.MagicMock(spec=SymbolTableSection)
+    section.__getitem__.side_effect = {'sh_entsize': 16, 'sh_link': 1}.get
+    section.data = mock.Mock(return_value=symtab)
+    section.strtab = mock.Mock()
+    section.strtab.data = mock.Mock(return_value=strtab)
+    return section
+
+
 @pytest.mark.parametrize(
     'detailed_id, symbols_names, added_tcs',
     TESTDATA_7,
@@ -1650,15 +1685,12 @@ def test_projectbuilder_determine_testcases(
     symbols_names,
     added_tcs
 ):
-    symbols_mock = [mock.Mock(n=name) for name in symbols_names]
-    for m in symbols_mock:
-        m.configure_mock(name=m.n)
-
-    sections_mock = [mock.Mock(spec=SymbolTableSection)]
-    sections_mock[0].iter_symbols = mock.Mock(return_value=symbols_mock)
+    sections_mock = [symbol_table_section_mock(symbols_names)]
 
     elf_mock = mock.Mock()
     elf_mock().iter_sections = mock.Mock(return_value=sections_mock)
+    elf_mock().get_section = mock.Mock(return_value=sections_mock[0].strtab)
+    elf_mock().little_endian = True
 
     results_mock = mock.Mock()
 
@@ -1683,6 +1715,45 @@ def test_projectbuilder_determine_testcases(
     )
 
 
+@pytest.mark.parametrize('little_endian', [True, False], ids=['little endian', 'big endian'])
+def test_projectbuilder_elf_symbol_names(little_endian):
+    names = ['main', 'z_ztest_unit_test__suite__test_a', 'z_ztest_unit_test__suite__test_b']
+    section = symbol_table_section_mock(names, little_endian)
+    elf = mock.Mock(little_endian=little_endian)
+    elf.get_section = mock.Mock(return_value=section.strtab)
+
+    assert list(ProjectBuilder.elf_symbol_names(elf, section, 'z_ztest_unit_test__')) == \
+        names[1:]
+    assert list(ProjectBuilder.elf_symbol_names(elf, section, 'not_there')) == []
+    # The symbol table is not read when the marker is not in the string table
+    assert section.data.call_count == 1
+
+    section.__getitem__.side_effect = {'sh_entsize': 0, 'sh_link': 1}.get
+    symbols = [mock.Mock() for name in names]
+    for symbol, name in zip(symbols, names):
+        symbol.name = name
+    section.iter_symbols = mock.Mock(return_value=symbols)
+    assert list(ProjectBuilder.elf_symbol_names(elf, section, 'main')) == ['main']
+
+
+def test_projectbuilder_demangle_all(mocked_jobserver, mocked_env):
+    names = ['_ZN1a1bE', 'plain', '_ZN1a1cE']
+    pb = ProjectBuilder(mock.Mock(), mocked_env, mocked_jobserver)
+
+    run_mock = mock.Mock(return_value=mock.Mock(stdout='a::b\na::c\n'))
+    with mock.patch('subprocess.run', run_mock):
+        assert pb.demangle_all(names) == ['a::b', 'plain', 'a::c']
+        assert pb.demangle_all(['plain']) == ['plain']
+
+    run_mock.assert_called_once_with(
+        'c++filt', input='_ZN1a1bE\n_ZN1a1cE\n', text=True, check=True, capture_output=True
+    )
+
+    run_mock = mock.Mock(side_effect=FileNotFoundError('c++filt'))
+    with mock.patch('subprocess.run', run_mock):
+        assert pb.demangle_all(names) == names
+
+
 TESTDATA_8 = [
     (
         ['addition.al'],
@@ -2237,6 +2308,7 @@ def test_projectbuilder_cmake():
 def test_projectbuilder_build(mocked_jobserver):
     instance_mock = mock.Mock()
     instance_mock.testsuite.harness = 'test'
+    instance_mock.shared_build_users = []
     env_mock = mock.Mock()
 
     pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
@@ -2343,6 +2415,7 @@ def test_projectbuilder_run(
 
     pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
     pb.options.extra_test_args = ['dummy_arg1', 'dummy_arg2']
+    pb.options.coverage = False
     pb.duts = ['another dut']
     pb.options.seed = seed
     pb.defconfig = defconfig
@@ -2520,6 +2593,8 @@ def test_twisterrunner_run(
     tr.options.retry_build_errors = True
     tr.options.jobs = None
     tr.options.build_only = None
+    tr.options.persistent_filter_cache = False
+    tr.options.build_cache = False
     for k, v in options.items():
         setattr(tr.options, k, v)
     tr.update_counting_before_pipeline = mock.Mock()
@@ -2726,11 +2801,16 @@ def test_twisterrunner_add_tasks_to_queue(
         return [filter]
 
     instances = {
-        'dummy1': mock.Mock(run=True, retries=0, status=TwisterStatus.PASS, build_dir="/tmp"),
-        'dummy2': mock.Mock(run=True, retries=0, status=TwisterStatus.SKIP, build_dir="/tmp"),
-        'dummy3': mock.Mock(run=True, retries=0, status=TwisterStatus.FILTER, build_dir="/tmp"),
-        'dummy4': mock.Mock(run=True, retries=0, status=TwisterStatus.ERROR, build_dir="/tmp"),
-        'dummy5': mock.Mock(run=True, retries=0, status=TwisterStatus.FAIL, build_dir="/tmp")
+        'dummy1': mock.Mock(run=True, retries=0, status=TwisterStatus.PASS, build_dir="/tmp",
+                            shared_build=None),
+        'dummy2': mock.Mock(run=True, retries=0, status=TwisterStatus.SKIP, build_dir="/tmp",
+                            shared_build=None),
+        'dummy3': mock.Mock(run=True, retries=0, status=TwisterStatus.FILTER, build_dir="/tmp",
+                            shared_build=None),
+        'dummy4': mock.Mock(run=True, retries=0, status=TwisterStatus.ERROR, build_dir="/tmp",
+                            shared_build=None),
+        'dummy5': mock.Mock(run=True, retries=0, status=TwisterStatus.FAIL, build_dir="/tmp",
+                            shared_build=None)
     }
     instances['dummy4'].testsuite.filter = 'some'
     instances['dummy5'].testsuite.filter = 'full'
@@ -2767,6 +2847,278 @@ def test_twisterrunner_add_tasks_to_queue(
            [mock.call(el) for el in expected_pipeline_elements]
 
 
+def test_twisterrunner_add_tasks_to_queue_durations():
+    instances = {
+        name: mock.Mock(run=True, retries=0, status=TwisterStatus.NONE,
+                        build_dir="/tmp", filter_stages=[], shared_build=None)
+        for name in ['short', 'long', 'medium']
+    }
+    for name, instance in instances.items():
+        instance.name = name
+        instance.testsuite.filter = None
+
+    tr = TwisterRunner(instances, [], env=mock.Mock())
+    tr.env.options.aggressive_no_clean = False
+    tr.results = mock.Mock(iteration=1)
+    tr.durations = mock.Mock(
+        estimate=lambda instance: {'short': 1, 'long': 30, 'medium': 10}[instance.name]
+    )
+
+    pipeline_mock = mock.Mock()
+    tr.add_tasks_to_queue(pipeline_mock)
+
+    # the longest instance is put last, so it is taken first
+    assert [c.args[0]['test'].name for c in pipeline_mock.put.call_args_list] == \
+           ['short', 'medium', 'long']
+
+
+def test_twisterrunner_add_tasks_to_queue_shared_build():
+    def make_instance(name, status, shared_build=None, shared_build_done=None):
+        instance = mock.Mock(run=True, retries=0, status=status, build_dir="/tmp",
+                             filter_stages=[], shared_build=shared_build,
+                             shared_build_users=[], shared_build_done=shared_build_done or [])
+        instance.name = name
+        instance.testsuite.filter = None
+        return instance
+
+    instances = {
+        'leader': make_instance('leader', TwisterStatus.FAIL),
+        'user': make_instance('user', TwisterStatus.FAIL, shared_build='leader'),
+        'built': make_instance('built', TwisterStatus.PASS, shared_build_done=['old_user']),
+        'old_user': make_instance('old_user', TwisterStatus.FAIL, shared_build='built'),
+    }
+    tr = TwisterRunner(instances, [], env=mock.Mock())
+    tr.env.options.aggressive_no_clean = False
+    tr.options.shared_dts_filter = False
+    tr.results = mock.Mock(iteration=1)
+
+    pipeline_mock = mock.Mock()
+    tr.add_tasks_to_queue(pipeline_mock)
+
+    # The user of a queued build is queued by the instance building it
+    assert instances['leader'].shared_build_users == [instances['user']]
+    assert pipeline_mock.put.call_args_list == [
+        mock.call({'op': 'cmake', 'test': instances['leader']}),
+        mock.call({'op': 'build', 'test': instances['old_user'], 'cached': True}),
+    ]
+
+
+def test_projectbuilder_shared_build(tmp_path, mocked_jobserver):
+    def make_instance(name, **kwargs):
+        instance = mock.Mock(build_dir=str(tmp_path / name), status=TwisterStatus.NONE,
+                             reason=None, shared_build_users=[], shared_build_done=[], **kwargs)
+        instance.name = name
+        return instance
+
+    leader = make_instance('leader', sysbuild=False)
+    leader.platform.binaries = []
+    users = [
+        make_instance('user1'),
+        make_instance('user2', filter_stages=['dts']),
+        make_instance('user3', filter_stages=[]),
+    ]
+    leader.shared_build_users = list(users)
+    (tmp_path / 'leader' / 'zephyr').mkdir(parents=True)
+    (tmp_path / 'leader' / 'zephyr' / 'zephyr.exe').write_bytes(b'exe')
+    (tmp_path / 'leader' / 'handler.log').write_text('not shared')
+    # A failing user does not prevent sharing with the others
+    (tmp_path / 'user2').write_text('not a directory')
+
+    pb = ProjectBuilder(leader, mock.Mock(), mocked_jobserver)
+    pb.share_build()
+
+    assert leader.shared_build_done == ['user1', 'user3']
+    for name in leader.shared_build_done:
+        assert (tmp_path / name / 'zephyr' / 'zephyr.exe').read_bytes() == b'exe'
+        assert not (tmp_path / name / 'handler.log').exists()
+
+    pipeline = mock.Mock()
+    pb.release_shared_build_users(pipeline)
+
+    assert pipeline.put.call_args_list == [
+        mock.call({'test': users[0], 'status': TwisterStatus.NONE, 'reason': None,
+                   'op': 'build', 'cached': True}),
+        mock.call({'test': users[1], 'status': TwisterStatus.NONE, 'reason': None,
+                   'op': 'filter'}),
+        mock.call({'test': users[2], 'status': TwisterStatus.NONE, 'reason': None,
+                   'op': 'build', 'cached': True}),
+    ]
+    assert leader.shared_build_users == []
+
+
+TESTDATA_DTS_KEY = [
+    (['-DCONFIG_FOO=y', '-DCONF_FILE=prj.conf'], False, True),
+    (['-DCONFIG_FOO=y'], True, False),
+    (['-DSHIELD=foo'], False, False),
+]
+
+@pytest.mark.parametrize(
+    'args, app_dts_inputs, shared',
+    TESTDATA_DTS_KEY,
+    ids=['kconfig only', 'app overlays', 'other args']
+)
+def test_twisterrunner_dts_filter_group_key(args, app_dts_inputs, shared):
+    tr = TwisterRunner({}, [], env=mock.Mock())
+
+    def make_instance(source_dir):
+        instance = mock.Mock(toolchain='zephyr')
+        instance.platform.name = 'dummy_board'
+        instance.testsuite.source_dir = source_dir
+        instance.testsuite.required_snippets = []
+        instance.handler.ready = True
+        instance.handler.args = ['QEMU_PIPE=' + os.path.join(source_dir, 'fifo')]
+        return instance
+
+    keys = []
+    with mock.patch.object(TwisterRunner, 'has_app_dts_inputs',
+                           return_value=app_dts_inputs):
+        for source_dir in ['app1', 'app2']:
+            instance = make_instance(source_dir)
+            handler_arg = f'-D{instance.handler.args[0]}'
+            keys.append(tr.dts_filter_group_key(instance, args + [handler_arg]))
+
+    assert (keys[0] == keys[1]) == shared
+
+
+def test_twisterrunner_has_app_dts_inputs(tmp_path):
+    (tmp_path / 'boards').mkdir()
+    (tmp_path / 'boards' / 'board.conf').write_text('CONFIG_FOO=y')
+    (tmp_path / 'CMakeLists.txt').write_text('find_package(Zephyr)\n')
+    assert not TwisterRunner.has_app_dts_inputs(str(tmp_path))
+
+    (tmp_path / 'boards' / 'board.overlay').write_text('/ { };')
+    # results are cached per application directory
+    assert not TwisterRunner.has_app_dts_inputs(str(tmp_path))
+    assert TwisterRunner.has_app_dts_inputs(str(tmp_path) + os.sep)
+
+
+@pytest.mark.parametrize(
+    'filename, content, expected',
+    [
+        ('CMakeLists.txt', 'set(SHIELD x_nucleo_53l0a1)\n', True),
+        ('CMakeLists.txt', 'list(APPEND DTS_ROOT ${CMAKE_CURRENT_SOURCE_DIR})\n', True),
+        (os.path.join('cmake', 'app.cmake'), 'set(DTC_OVERLAY_FILE app.overlay)\n', True),
+        ('CMakeLists.txt', 'set(SHIELDED_SOURCES a.c)\n', False),
+    ],
+    ids=['shield', 'dts root', 'included file', 'other variable']
+)
+def test_twisterrunner_has_app_dts_inputs_cmake(tmp_path, filename, content, expected):
+    path = tmp_path / filename
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(content)
+
+    assert TwisterRunner.has_app_dts_inputs(str(tmp_path)) == expected
+
+
+TESTDATA_DTS_FILTER = [
+    (True, None, 'cmake', TwisterStatus.NONE),
+    (False, None, 'report', TwisterStatus.FILTER),
+    (None, ValueError, 'filter', TwisterStatus.NONE),
+    (None, None, 'filter', TwisterStatus.NONE),
+]
+
+@pytest.mark.parametrize(
+    'parse_result, parse_error, expected_op, expected_status',
+    TESTDATA_DTS_FILTER,
+    ids=['selected', 'filtered', 'parse error', 'no edt']
+)
+def test_projectbuilder_apply_dts_filter(
+    parse_result,
+    parse_error,
+    expected_op,
+    expected_status
+):
+    results = ExecutionCounter()
+    instance = mock.Mock(status=TwisterStatus.NONE)
+    edt = mock.Mock() if parse_result is not None or parse_error else None
+    pipeline = mock.Mock()
+
+    with mock.patch('expr_parser.parse',
+                    mock.Mock(return_value=parse_result, side_effect=parse_error)):
+        ProjectBuilder.apply_dts_filter(instance, edt, pipeline, results)
+
+    pipeline.put.assert_called_once_with({'op': expected_op, 'test': instance})
+    assert instance.status == expected_status
+    assert results.filtered_runtime == (expected_status == TwisterStatus.FILTER)
+
+
+def test_twisterrunner_queue_shared_dts_filters(tmp_path):
+    instances = []
+    for name in ['a', 'b', 'c']:
+        instance = mock.Mock(toolchain='zephyr')
+        instance.name = name
+        instances.append(instance)
+
+    tr = TwisterRunner({}, [], env=mock.Mock(outdir=str(tmp_path)))
+    tr.dts_filter_group_key = mock.Mock(
+        side_effect=lambda instance, args: 'ab' if instance.name in 'ab' else 'c'
+    )
+    pipeline = mock.Mock()
+
+    with mock.patch('twisterlib.runner.ProjectBuilder') as pb_mock:
+        tr.queue_shared_dts_filters(instances, pipeline)
+
+    # one task per group, no cmake run yet
+    pb_mock().run_cmake.assert_not_called()
+    tasks = [c.args[0] for c in pipeline.put.call_args_list]
+    assert [(t['op'], t['test'].name, [m.name for m in t['members']]) for t in tasks] == \
+        [('dts_filter', 'a', ['b']), ('dts_filter', 'c', [])]
+    assert tasks[0]['build_dir'] != tasks[1]['build_dir']
+    assert os.path.dirname(tasks[0]['build_dir']) == os.path.join(str(tmp_path), 'dts_filter')
+
+
+@pytest.mark.parametrize(
+    'returncode, expected_edt',
+    [(0, 'dummy edt'), (1, None)],
+    ids=['configured', 'cmake error']
+)
+def test_projectbuilder_configure_dts_filter(
+    mocked_jobserver,
+    tmp_path,
+    returncode,
+    expected_edt
+):
+    instance_mock = mock.Mock(build_dir='instance build dir')
+    pb = ProjectBuilder(instance_mock, mock.Mock(), mocked_jobserver)
+    pb.cmake_args = mock.Mock(return_value=['-DCONFIG_FOO=y'])
+    build_dir = str(tmp_path / 'group')
+
+    def mock_run_cmake(self, args, filter_stages):
+        assert self.build_dir == build_dir
+        assert (args, filter_stages) == (['-DCONFIG_FOO=y'], ['dts'])
+        os.makedirs(os.path.join(build_dir, 'zephyr'))
+        with open(os.path.join(build_dir, 'zephyr', 'edt.pickle'), 'wb') as f:
+            f.write(b'dummy edt pickle')
+        return {'returncode': returncode}
+
+    with mock.patch.object(ProjectBuilder, 'run_cmake', mock_run_cmake), \
+         mock.patch('twisterlib.runner.FilterBuilder.load_edt', return_value='dummy edt'):
+        assert pb.configure_dts_filter(build_dir) == expected_edt
+
+    # the instance itself is not configured
+    assert instance_mock.build_dir == 'instance build dir'
+
+
+def test_projectbuilder_process_dts_filter(mocked_jobserver):
+    instance_mock = mock.Mock()
+    members = [mock.Mock(), mock.Mock()]
+    pb = ProjectBuilder(instance_mock, mock.Mock(), mocked_jobserver)
+    pb.configure_dts_filter = mock.Mock(return_value='dummy edt')
+    pipeline_mock = mock.Mock()
+    results_mock = mock.Mock()
+    message = {'op': 'dts_filter', 'test': instance_mock, 'members': members,
+               'build_dir': 'group build dir'}
+
+    with mock.patch.object(ProjectBuilder, 'apply_dts_filter') as apply_mock:
+        pb.process(pipeline_mock, mock.Mock(), message, mock.Mock(), results_mock)
+
+    pb.configure_dts_filter.assert_called_once_with('group build dir')
+    assert apply_mock.call_args_list == [
+        mock.call(instance, 'dummy edt', pipeline_mock, results_mock)
+        for instance in [instance_mock] + members
+    ]
+
+
 TESTDATA_19 = [
     ('linux'),
     ('nt')
@@ -2846,6 +3198,320 @@ def test_twisterrunner_execute(caplog):
 
 
 
+def test_executioncounterdelta():
+    delta = ExecutionCounterDelta()
+    delta.skipped_increment()
+    delta.passed_cases_increment(3)
+    delta.passed_cases_increment(-1)
+
+    with pytest.raises(AttributeError):
+        delta.skipped
+
+    ec = ExecutionCounter(total=5)
+    ExecutionCounterDelta.apply(delta.increments, ec)
+
+    assert ec.skipped == 1
+    assert ec.passed_cases == 2
+    assert ec.total == 5
+
+
+TESTDATA_POOL = [
+    ('cmake', {}, ['build', 'report'], {'op': 'report'}),
+    ('cmake', {}, ['build', None], None),
+    ('cleanup', {'mode': 'all', 'status': TwisterStatus.ERROR, 'reason': 'dummy'},
+     [None], None),
+]
+
+@pytest.mark.parametrize(
+    'op, additionals, next_ops, expected_task',
+    TESTDATA_POOL,
+    ids=['report', 'no report', 'cleanup']
+)
+def test_run_pool_task(op, additionals, next_ops, expected_task):
+    instance = mock.Mock(status=TwisterStatus.NONE, reason=None)
+    jobserver = mock.Mock(get_job=mock.Mock(return_value=nullcontext()))
+    _init_pool_worker(mock.Mock(), jobserver, None, {'dummy': instance})
+
+    ops = iter(next_ops)
+    def mock_process(pipeline, done, message, lock, results):
+        assert message['test'] is instance
+        results.filtered_runtime_increment()
+        next_op = next(ops)
+        if next_op:
+            pipeline.put({'op': next_op, 'test': instance})
+
+    with mock.patch('twisterlib.runner.ProjectBuilder') as pb:
+        pb().process = mock.Mock(side_effect=mock_process)
+        task, result, increments = _run_pool_task('dummy', op, additionals)
+
+    jobserver.get_job.assert_called_once()
+    assert task == expected_task
+    assert result is (instance if expected_task else None)
+    assert increments == {'filtered_runtime': len(next_ops)}
+    assert instance.reason == additionals.get('reason')
+
+
+def test_run_pool_task_schedule():
+    instance = mock.Mock(status=TwisterStatus.NONE, reason=None)
+    member = mock.Mock(status=TwisterStatus.NONE, reason=None)
+    _init_pool_worker(mock.Mock(), None, None, {'dummy': instance})
+
+    def mock_process(pipeline, done, message, lock, results):
+        pipeline.put({'op': 'cmake', 'test': instance})
+        pipeline.put({'op': 'report', 'test': member})
+
+    with mock.patch('twisterlib.runner.ProjectBuilder') as pb:
+        pb().process = mock.Mock(side_effect=mock_process)
+        task, result, _ = _run_pool_task('dummy', 'dts_filter', {'members': [member]})
+
+    # the tasks of the group are scheduled by the main process
+    assert task == {'op': 'schedule', 'tasks': [{'op': 'cmake', 'test': instance},
+                                                {'op': 'report', 'test': member}]}
+    assert result is instance
+
+
+@pytest.mark.parametrize(
+    'run_async, can_run_async, expected_ops',
+    [(True, True, ['cmake']), (True, False, ['cmake', 'run']), (False, True, ['cmake', 'run'])],
+    ids=['async', 'not supported', 'disabled']
+)
+def test_run_pool_task_run_async(run_async, can_run_async, expected_ops):
+    instance = mock.Mock(status=TwisterStatus.NONE, reason=None)
+    _init_pool_worker(mock.Mock(), None, None, {'dummy': instance}, run_async)
+
+    next_ops = {'cmake': 'run', 'run': 'report'}
+    processed_ops = []
+    def mock_process(pipeline, done, message, lock, results):
+        processed_ops.append(message['op'])
+        pipeline.put({'op': next_ops[message['op']], 'test': instance})
+
+    with mock.patch('twisterlib.runner.ProjectBuilder') as pb:
+        pb().process = mock.Mock(side_effect=mock_process)
+        pb().can_run_async = mock.Mock(return_value=can_run_async)
+        task, result, _ = _run_pool_task('dummy', 'cmake', {})
+
+    assert processed_ops == expected_ops
+    assert task == {'op': 'report' if expected_ops[-1] == 'run' else 'run'}
+    assert result is instance
+
+
+def test_projectbuilder_process_profile(mocked_jobserver):
+    instance_mock = mock.Mock(status=TwisterStatus.NONE, run=False, profile=None, queued_at=None)
+    instance_mock.name = 'dummy'
+    pb = ProjectBuilder(instance_mock, mock.Mock(), mocked_jobserver)
+    pb.gather_metrics = mock.Mock(return_value={'returncode': 0})
+    profiles = []
+    pipeline_mock = mock.Mock()
+    # The instance is sent with the task, the phase must be recorded by then
+    pipeline_mock.put.side_effect = lambda task: profiles.append(copy.deepcopy(
+        task['test'].profile
+    ))
+
+    Profiler.setup()
+    try:
+        Profiler.queued(instance_mock)
+        pb.process(pipeline_mock, mock.Mock(), {'op': 'gather_metrics'}, mock.Mock(),
+                   mock.Mock())
+    finally:
+        Profiler.enabled = False
+
+    assert pipeline_mock.put.call_args.args[0]['op'] == 'report'
+    assert set(profiles[0]['phases']) == {'size_calc'}
+    assert profiles[0]['phases']['size_calc']['count'] == 1
+    assert profiles[0]['queue_wait'] >= 0
+    assert instance_mock.queued_at is not None
+
+
+@pytest.mark.parametrize(
+    'coverage, expected_op',
+    [(False, 'report'), (True, 'coverage')],
+    ids=['report', 'coverage']
+)
+def test_projectbuilder_process_run_async(mocked_jobserver, coverage, expected_op):
+    instance_mock = mock.Mock(status=TwisterStatus.NONE, reason=None)
+    instance_mock.name = 'dummy'
+    env_mock = mock.Mock()
+    env_mock.options.coverage = coverage
+    harness = mock.Mock()
+
+    async def handle_async(harness):
+        instance_mock.status = TwisterStatus.PASS
+
+    instance_mock.handler.handle_async = mock.Mock(side_effect=handle_async)
+
+    pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
+    pb.prepare_run = mock.Mock(return_value=harness)
+    task = asyncio.run(pb.process_run_async())
+
+    instance_mock.handler.handle_async.assert_called_once_with(harness)
+    assert task == {
+        'op': expected_op,
+        'test': instance_mock,
+        'status': TwisterStatus.PASS,
+        'reason': None
+    }
+
+
+class MockExecutor:
+    def __init__(self, *args, initializer=None, initargs=(), **kwargs):
+        self.initializer = initializer
+        self.initargs = initargs
+        self.submitted = []
+        self.shutdown = mock.Mock()
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_twisterrunner_execute_pool():
+    instances = {
+        'passed': mock.Mock(status=TwisterStatus.NONE),
+        'failed': mock.Mock(status=TwisterStatus.NONE),
+    }
+    for name, instance in instances.items():
+        instance.name = name
+    env_mock = mock.Mock()
+    env_mock.options.quit_on_failure = False
+
+    tr = TwisterRunner(instances, [], env=env_mock)
+    tr.jobs = 3
+    tr.results = ExecutionCounter(total=2)
+
+    def mock_add_tasks_to_queue(pipeline, *args, **kwargs):
+        for instance in instances.values():
+            pipeline.put({'op': 'cmake', 'test': instance})
+    tr.add_tasks_to_queue = mock.Mock(side_effect=mock_add_tasks_to_queue)
+
+    def mock_run_pool_task(name, op, additionals):
+        if op == 'cleanup':
+            return None, None, {'warnings': 1}
+        instance = instances[name]
+        instance.status = TwisterStatus(name)
+        return {'op': 'report'}, instance, {'skipped': 1}
+
+    def mock_process(pipeline, done, message, lock, results):
+        assert message['op'] == 'report'
+        done.put(message['test'])
+        if message['test'].status == TwisterStatus.PASS:
+            pipeline.put({'op': 'cleanup', 'test': message['test'], 'mode': 'passed'})
+
+    done = queue.Queue()
+    with mock.patch('twisterlib.runner.ProcessPoolExecutor', MockExecutor), \
+         mock.patch('twisterlib.runner._run_pool_task', mock_run_pool_task), \
+         mock.patch('twisterlib.runner.ProjectBuilder') as pb:
+        pb().process = mock.Mock(side_effect=mock_process)
+        tr.execute_pool(done)
+
+    assert sorted(done.get().name for _ in range(done.qsize())) == ['failed', 'passed']
+    assert tr.results.skipped == 2
+    assert tr.results.warnings == 1
+
+
+def test_twisterrunner_execute_pool_schedule():
+    instances = {}
+    for name in ['leader', 'selected', 'filtered']:
+        instances[name] = mock.Mock(status=TwisterStatus.NONE)
+        instances[name].name = name
+    env_mock = mock.Mock()
+    env_mock.options.quit_on_failure = False
+
+    tr = TwisterRunner(instances, [], env=env_mock)
+    tr.jobs = 1
+    tr.results = ExecutionCounter(total=3)
+    tr.add_tasks_to_queue = mock.Mock(
+        side_effect=lambda pipeline, *args, **kwargs: pipeline.put(
+            {'op': 'dts_filter', 'test': instances['leader'],
+             'members': [instances['selected'], instances['filtered']]}
+        )
+    )
+
+    submitted = []
+    def mock_run_pool_task(name, op, additionals, instance_arg=None):
+        submitted.append((name, op))
+        if op == 'dts_filter':
+            return {'op': 'schedule', 'tasks': [
+                {'op': 'cmake', 'test': instances['leader']},
+                {'op': 'cmake', 'test': instances['selected']},
+                {'op': 'report', 'test': instances['filtered']},
+            ]}, instances['leader'], {'filtered_runtime': 1}
+        assert instance_arg is instances[name]
+        return {'op': 'report'}, instance_arg, {}
+
+    def mock_process(pipeline, done, message, lock, results):
+        done.put(message['test'])
+
+    done = queue.Queue()
+    with mock.patch('twisterlib.runner.ProcessPoolExecutor', MockExecutor), \
+         mock.patch('twisterlib.runner._run_pool_task', mock_run_pool_task), \
+         mock.patch('twisterlib.runner.ProjectBuilder') as pb:
+        pb().process = mock.Mock(side_effect=mock_process)
+        tr.execute_pool(done)
+
+    assert sorted(submitted) == [('leader', 'cmake'), ('leader', 'dts_filter'),
+                                 ('selected', 'cmake')]
+    assert sorted(done.get().name for _ in range(done.qsize())) == \
+        ['filtered', 'leader', 'selected']
+    assert tr.results.filtered_runtime == 1
+
+
+class MockRunEngine:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, coro):
+        self.submitted.append(coro)
+        future = Future()
+        future.set_result(asyncio.run(coro))
+        return future
+
+
+def test_twisterrunner_execute_pool_run_async():
+    instance = mock.Mock(status=TwisterStatus.NONE)
+    instance.name = 'dummy'
+    env_mock = mock.Mock()
+    env_mock.options.quit_on_failure = False
+
+    tr = TwisterRunner({'dummy': instance}, [], env=env_mock)
+    tr.jobs = 1
+    tr.results = ExecutionCounter(total=1)
+    tr.run_engine = MockRunEngine()
+    tr.add_tasks_to_queue = mock.Mock(
+        side_effect=lambda pipeline, *args, **kwargs:
+            pipeline.put({'op': 'cmake', 'test': instance})
+    )
+
+    pool_ops = []
+    def mock_run_pool_task(name, op, additionals, instance_arg=None):
+        pool_ops.append((op, instance_arg))
+        if op == 'cmake':
+            return {'op': 'run'}, instance, {}
+        return {'op': 'report', 'status': instance.status}, instance, {}
+
+    async def mock_process_run_async():
+        instance.status = TwisterStatus.PASS
+        return {'op': 'coverage', 'test': instance}
+
+    def mock_process(pipeline, done, message, lock, results):
+        assert message == {'op': 'report', 'test': instance, 'status': TwisterStatus.PASS}
+        done.put(message['test'])
+
+    done = queue.Queue()
+    with mock.patch('twisterlib.runner.ProcessPoolExecutor', MockExecutor) as executor, \
+         mock.patch('twisterlib.runner._run_pool_task', mock_run_pool_task), \
+         mock.patch('twisterlib.runner.ProjectBuilder') as pb:
+        pb().process = mock.Mock(side_effect=mock_process)
+        pb().process_run_async = mock_process_run_async
+        tr.execute_pool(done)
+
+    # The coverage runs in the pool with the instance updated by the run.
+    assert pool_ops == [('cmake', None), ('coverage', instance)]
+    assert len(tr.run_engine.submitted) == 1
+    assert done.get() is instance
+
+
 TESTDATA_20 = [
     ('', []),
     ('not ARCH in ["x86", "arc"]', ['full']),
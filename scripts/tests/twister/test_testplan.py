@@ -6,17 +6,21 @@
 '''
 This test file contains testsuites for testsuite.py module of twister
 '''
+import json
 import sys
 import os
 import mock
 import pytest
 
 from contextlib import nullcontext
+from pathlib import Path
 
 ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
 sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
 
 from twisterlib.statuses import TwisterStatus
+from twisterlib.durations import TestDurations
+from twisterlib.reports import JsonReportWriter
 from twisterlib.testplan import TestPlan, change_skip_to_error_if_integration
 from twisterlib.testinstance import TestInstance
 from twisterlib.testsuite import TestSuite
@@ -24,6 +28,8 @@ from twisterlib.platform import Platform
 from twisterlib.quarantine import Quarantine
 from twisterlib.error import TwisterRuntimeError
 
+import snippets
+
 
 def test_testplan_add_testsuites_short(class_testplan):
     """ Testing add_testcase function of Testsuite class in twister """
@@ -251,6 +257,39 @@ def test_apply_filters_part3(class_testplan, all_testsuites_dict, platforms_list
     filtered_instances = list(filter(lambda item:  item.status == TwisterStatus.FILTER, class_testplan.instances.values()))
     assert not filtered_instances
 
+def test_apply_filters_pruned(class_testplan, all_testsuites_dict, platforms_list):
+    """ Testing apply_filters function of TestPlan class in Twister
+    Statically filtered configurations are not instantiated unless
+    filtered tests are reported, the selection stays the same.
+    """
+    plan = class_testplan
+    plan.platforms = platforms_list
+    plan.platform_names = [p.name for p in platforms_list]
+    plan.testsuites = all_testsuites_dict
+    plan.options.all = True
+    for _, testcase in plan.testsuites.items():
+        testcase.arch_exclude = {'x86'}
+
+    plan.options.report_filtered = True
+    plan.apply_filters()
+    full_instances = plan.instances
+    full_platforms = plan.selected_platforms
+    assert not plan.pruned_instances
+
+    plan.instances = {}
+    plan.options.report_filtered = False
+    plan.apply_filters()
+
+    filtered = {
+        name for name, instance in full_instances.items()
+        if instance.status == TwisterStatus.FILTER
+    }
+    assert filtered
+    assert set(plan.pruned_instances) == filtered
+    assert set(plan.instances) == set(full_instances) - filtered
+    assert plan.selected_platforms == full_platforms
+
+
 def test_add_instances_short(tmp_path, class_env, all_testsuites_dict, platforms_list):
     """ Testing add_instances() function of TestPlan class in Twister
     Test 1: instances dictionary keys have expected values (Platform Name + Testcase Name)
@@ -401,6 +440,28 @@ def test_required_snippets_short(
             assert d.reason == expected_filtered_reason
 
 
+def test_required_snippets_index(class_testplan, all_testsuites_dict, platforms_list):
+    """ Snippet roots are only walked once, not once per platform """
+    plan = class_testplan
+    plan.platforms = platforms_list
+    plan.platform_names = [p.name for p in platforms_list]
+    plan.testsuites = all_testsuites_dict
+
+    for _, testcase in plan.testsuites.items():
+        testcase.exclude_platform = []
+        testcase.required_snippets = ['cdc-acm-console']
+        testcase.build_on_all = True
+
+    with mock.patch('snippets.walk_snippet_ymls',
+                    wraps=snippets.walk_snippet_ymls) as walk_mock:
+        plan.apply_filters()
+
+    roots = {Path(ts.source_dir) for ts in plan.testsuites.values()}
+    roots.update(plan.env.snippet_roots)
+    assert walk_mock.call_count == len(roots)
+    assert len(plan.testsuites) < len(plan.instances)
+
+
 def test_testplan_get_level():
     testplan = TestPlan(env=mock.Mock())
     lvl1 = mock.Mock()
@@ -561,7 +622,7 @@ def test_testplan_discover(
         tmp_qf = tmp_path / qf
         tmp_qf.write_text(data)
 
-    testplan = TestPlan(env=mock.Mock())
+    testplan = TestPlan(env=mock.Mock(cache_dir=None))
     testplan.options = mock.Mock(
         test='ts1',
         quarantine_list=[tmp_path / qf for qf in ql],
@@ -849,6 +910,52 @@ def test_testplan_generate_subset(
            expected_subset
 
 
+@pytest.mark.parametrize(
+    'subset, expected_subset',
+    [(1, ['plat1/testA', 'plat3/testA', 'plat3/testB', 'plat3/testC']),
+     (2, ['plat1/testB', 'plat1/testC', 'plat2/testA', 'plat2/testB'])],
+    ids=['subset 1', 'subset 2']
+)
+def test_testplan_generate_subset_durations(subset, expected_subset):
+    testplan = TestPlan(env=mock.Mock())
+    testplan.options = mock.Mock(device_testing=False, shuffle_tests=False)
+    testplan.instances = {
+        'plat1/testA': mock.Mock(status=TwisterStatus.NONE),
+        'plat1/testB': mock.Mock(status=TwisterStatus.NONE),
+        'plat1/testC': mock.Mock(status=TwisterStatus.NONE),
+        'plat2/testA': mock.Mock(status=TwisterStatus.NONE),
+        'plat2/testB': mock.Mock(status=TwisterStatus.NONE),
+        'plat3/testA': mock.Mock(status=TwisterStatus.SKIP),
+        'plat3/testB': mock.Mock(status=TwisterStatus.SKIP),
+        'plat3/testC': mock.Mock(status=TwisterStatus.ERROR),
+    }
+    for name, instance in testplan.instances.items():
+        instance.name = name
+    testplan.durations = TestDurations({
+        'plat1/testA': 100.0,
+        'plat1/testB': 40.0,
+        'plat1/testC': 30.0,
+        'plat2/testA': 20.0,
+        'plat2/testB': 10.0,
+    })
+
+    testplan.generate_subset(subset, 2)
+
+    assert list(testplan.instances.keys()) == expected_subset
+
+
+@pytest.mark.parametrize('subset', [1, 2, 3])
+def test_testplan_generate_subset_pruned(subset):
+    testplan = TestPlan(env=mock.Mock())
+    testplan.options = mock.Mock(device_testing=False, shuffle_tests=False)
+    testplan.instances = {'plat1/testA': mock.Mock(status=TwisterStatus.NONE)}
+    testplan.pruned_instances = {f'plat{i}/testB': mock.Mock() for i in range(1, 6)}
+
+    testplan.generate_subset(subset, 3)
+
+    assert testplan.pruned_instances == {}
+
+
 def test_testplan_handle_modules():
     testplan = TestPlan(env=mock.Mock())
 
@@ -1187,6 +1294,7 @@ TESTDATA_9 = [
     (['good_test/dummy.common.1', 'good_test/dummy.common.2', 'good_test/dummy.common.3'], True, True, 0, 1),
 ]
 
+@pytest.mark.parametrize('parallel', [False, True], ids=['serial', 'parallel'])
 @pytest.mark.parametrize(
     'testsuite_filter, use_alt_root, detailed_id, expected_suite_count, expected_errors',
     TESTDATA_9,
@@ -1203,7 +1311,7 @@ TESTDATA_9 = [
     ]
 )
 def test_testplan_add_testsuites(tmp_path, testsuite_filter, use_alt_root, detailed_id,
-                                 expected_errors, expected_suite_count):
+                                 expected_errors, expected_suite_count, parallel):
     # tmp_path
     # ├ tests  <- test root
     # │ ├ good_test
@@ -1305,7 +1413,7 @@ tests:
 
     env = mock.Mock(
         test_roots=[tmp_test_root_dir],
-        options=mock.Mock(detailed_test_id=detailed_id),
+        options=mock.Mock(detailed_test_id=detailed_id, parallel_discovery=parallel, jobs=2),
         alt_config_root=[tmp_alt_test_root_dir] if use_alt_root else []
     )
 
@@ -1602,6 +1710,73 @@ def test_testplan_load_from_file(caplog, device_testing, expected_tfilter):
     assert all([log in caplog.text for log in expected_logs])
 
 
+@pytest.mark.parametrize('indexed', [True, False], ids=['index', 'no index'])
+def test_testplan_load_from_file_index(tmp_path, indexed):
+    def get_platform(name):
+        p = mock.Mock()
+        p.name = name
+        p.normalized_name = name
+        return p
+
+    testplan = TestPlan(env=mock.Mock(outdir=str(tmp_path)))
+    testplan.options = mock.Mock(test_only=False, report_summary=None)
+    testplan.get_platform = mock.Mock(side_effect=get_platform)
+    testplan.testsuites = {}
+    suites = []
+    for n, (platform, status) in enumerate([
+        ('p1', 'passed'), ('p2', 'failed'), ('p1', 'failed'), ('p2', 'filtered'), ('p1', None)
+    ]):
+        tc = mock.Mock()
+        tc.name = f'ts{n}.tc'
+        ts = mock.Mock(testcases=[tc])
+        ts.name = f'ts{n}'
+        testplan.testsuites[ts.name] = ts
+        testcase = {'identifier': tc.name, 'status': status or 'started', 'execution_time': '1.00'}
+        if status == 'failed':
+            testcase['log'] = f'log of {ts.name}'
+        suites.append({'name': ts.name, 'platform': platform, 'toolchain': 'zephyr',
+                       'status': status, 'reason': 'r', 'log': 'suite log',
+                       'execution_time': '2.00', 'testcases': [testcase]})
+
+    report_file = str(tmp_path / 'twister.json')
+    writer = JsonReportWriter(report_file, {}, index=indexed)
+    for suite in suites:
+        writer.add(suite)
+    writer.close()
+    assert os.path.exists(report_file + '.index') == indexed
+
+    with mock.patch('twisterlib.testinstance.TestInstance.check_runnable', return_value=True), \
+         mock.patch('twisterlib.testinstance.TestInstance.create_overlay'), \
+         mock.patch('json.load', wraps=json.load) as json_load:
+        testplan.load_from_file(report_file, ['p1'])
+
+    assert json_load.called != indexed
+    assert list(testplan.instances) == ['p1/zephyr/ts0', 'p1/zephyr/ts2', 'p1/zephyr/ts4']
+    loaded = {
+        name: (i.status, i.retries, i.metrics['handler_time'],
+               [(tc.status, tc.reason, tc.duration, tc.output) for tc in i.testcases])
+        for name, i in testplan.instances.items()
+    }
+    assert loaded == {
+        'p1/zephyr/ts0': (TwisterStatus.PASS, 0, '2.00', [(TwisterStatus.PASS, None, '1.00', '')]),
+        'p1/zephyr/ts2': (TwisterStatus.NONE, 1, '2.00',
+                          [(TwisterStatus.FAIL, None, '1.00', 'log of ts2')]),
+        'p1/zephyr/ts4': (TwisterStatus.NONE, 0, '2.00',
+                          [(TwisterStatus.STARTED, None, '1.00', '')]),
+    }
+
+    # An index is not used once the report changed
+    with open(report_file, 'a') as f:
+        f.write('\n')
+    testplan.instances = {}
+    with mock.patch('twisterlib.testinstance.TestInstance.check_runnable', return_value=True), \
+         mock.patch('twisterlib.testinstance.TestInstance.create_overlay'), \
+         mock.patch('json.load', wraps=json.load) as json_load:
+        testplan.load_from_file(report_file, ['p1'])
+    assert json_load.called
+    assert len(testplan.instances) == 3
+
+
 def test_testplan_add_instances():
     testplan = TestPlan(env=mock.Mock())
     instance1 = mock.Mock()
@@ -1741,6 +1916,63 @@ def test_testplan_create_build_dir_link(os_name):
         assert testplan.link_dir_counter == 1
 
 
+def test_testplan_group_shared_builds(tmp_path):
+    def make_instance(name, args, type_str='native', status=TwisterStatus.NONE, filter=''):
+        instance = mock.Mock(status=status, run=True, toolchain='zephyr', sysbuild=False,
+                             shared_build=None, run_id=f'id_{name}',
+                             build_dir=str(tmp_path / name))
+        instance.name = name
+        instance.platform.name = 'native_sim'
+        instance.testsuite.source_dir = 'app'
+        instance.testsuite.filter = filter
+        instance.testsuite.harness = 'console'
+        instance.testsuite.required_snippets = []
+        instance.handler.type_str = type_str
+        instance.cmake_args = [f'-DOVERLAY_CONFIG="{instance.build_dir}/twister/extra.conf"',
+                               *args]
+        return instance
+
+    instances = [
+        make_instance('a', []),
+        make_instance('b', []),
+        make_instance('c', ['-DCONFIG_X=y']),
+        make_instance('d', ['-DCONFIG_X=y']),
+        make_instance('e', []),
+        make_instance('f', [], type_str='qemu'),
+        make_instance('g', [], type_str='qemu'),
+        make_instance('h', [], status=TwisterStatus.FILTER),
+        make_instance('i', [], filter='CONFIG_Y'),
+    ]
+    # Different Kconfig settings of the test scenario
+    (tmp_path / 'e' / 'twister').mkdir(parents=True)
+    (tmp_path / 'e' / 'twister' / 'testsuite_extra.conf').write_text('CONFIG_Z=y')
+
+    testplan = TestPlan(env=mock.Mock())
+    testplan.options = mock.Mock(coverage=False, cmake_only=False, create_rom_ram_report=False,
+                                 build_only=False)
+    testplan.instances = {instance.name: instance for instance in instances}
+
+    def project_builder(instance, env, jobserver):
+        return mock.Mock(cmake_args=mock.Mock(return_value=instance.cmake_args))
+
+    with mock.patch('twisterlib.runner.ProjectBuilder', project_builder):
+        testplan.group_shared_builds()
+
+    assert {i.name: i.shared_build for i in instances if i.shared_build} == {'b': 'a', 'd': 'c'}
+    assert instances[1].run_id == 'id_a'
+    assert (tmp_path / 'b' / 'run_id.txt').read_text() == 'id_a'
+    assert instances[0].run_id == 'id_a'
+
+    # Build only instances run no handler
+    for instance in instances:
+        instance.shared_build = None
+    testplan.options.build_only = True
+    with mock.patch('twisterlib.runner.ProjectBuilder', project_builder):
+        testplan.group_shared_builds()
+
+    assert instances[6].shared_build == 'f'
+
+
 TESTDATA_14 = [
     ('bad platform', 'dummy reason', [],
      'dummy status', 'dummy reason'),
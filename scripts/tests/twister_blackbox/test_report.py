@@ -282,16 +282,13 @@ class TestReport:
             'outdir',
         ]
     )
-    def test_outdir(self, capfd, test_path, test_platforms, file_name, dir_name):
-        args = ['-i', '-T', test_path, "--outdir", dir_name] + \
+    def test_outdir(self, capfd, tmp_path, test_path, test_platforms, file_name, dir_name):
+        twister_path = os.path.join(tmp_path, dir_name)
+        args = ['-i', '-T', test_path, "--outdir", twister_path] + \
                [val for pair in zip(
                    ['-p'] * len(test_platforms), test_platforms
                ) for val in pair]
 
-        twister_path = os.path.join(ZEPHYR_BASE, dir_name)
-        if os.path.exists(twister_path):
-            shutil.rmtree(twister_path)
-
         with mock.patch.object(sys, 'argv', [sys.argv[0]] + args), \
                 pytest.raises(SystemExit) as sys_exit:
             self.loader.exec_module(self.twister_module)
@@ -300,20 +297,15 @@ class TestReport:
         sys.stdout.write(out)
         sys.stderr.write(err)
 
-        try:
-            for f_name in file_name:
-                path = os.path.join(twister_path, f_name)
-                assert os.path.exists(path), 'file not found {f_name}'
+        for f_name in file_name:
+            path = os.path.join(twister_path, f_name)
+            assert os.path.exists(path), f'file not found {f_name}'
 
-            for f_platform in test_platforms:
-                platform_path = os.path.join(twister_path, f_platform.replace("/", "_"))
-                assert os.path.exists(platform_path), f'file not found {f_platform}'
+        for f_platform in test_platforms:
+            platform_path = os.path.join(twister_path, f_platform.replace("/", "_"))
+            assert os.path.exists(platform_path), f'file not found {f_platform}'
 
-            assert str(sys_exit.value) == '0'
-        finally:
-            twister_path = os.path.join(ZEPHYR_BASE, dir_name)
-            if os.path.exists(twister_path):
-                shutil.rmtree(twister_path)
+        assert str(sys_exit.value) == '0'
 
     @pytest.mark.parametrize(
         'test_path, test_platforms, file_name',
@@ -322,16 +314,13 @@ class TestReport:
             'log_file',
         ]
     )
-    def test_log_file(self, capfd, test_path, test_platforms, out_path, file_name):
-        args = ['-i','--outdir', out_path, '-T', test_path, "--log-file", file_name] + \
+    def test_log_file(self, capfd, tmp_path, test_path, test_platforms, out_path, file_name):
+        file_path = os.path.join(tmp_path, file_name)
+        args = ['-i','--outdir', out_path, '-T', test_path, "--log-file", file_path] + \
                [val for pair in zip(
                    ['-p'] * len(test_platforms), test_platforms
                ) for val in pair]
 
-        file_path = os.path.join(ZEPHYR_BASE, file_name)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
         with mock.patch.object(sys, 'argv', [sys.argv[0]] + args), \
                 pytest.raises(SystemExit) as sys_exit:
             self.loader.exec_module(self.twister_module)
@@ -340,7 +329,7 @@ class TestReport:
         sys.stdout.write(out)
         sys.stderr.write(err)
 
-        assert os.path.exists(file_path), 'file not found {f_name}'
+        assert os.path.exists(file_path), f'file not found {file_name}'
 
         assert str(sys_exit.value) == '0'
 